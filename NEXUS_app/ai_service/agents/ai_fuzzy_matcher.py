@@ -10,6 +10,7 @@ import asyncio
 import logging
 import re
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional
@@ -17,8 +18,18 @@ from dataclasses import dataclass, field
 
 import jaro
 import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
 
 from ...taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .fuzzy_candidate_index import FuzzyCandidateIndex
+from .similarity_kernels import (
+    levenshtein_distance,
+    levenshtein_one_to_many,
+    ngram_one_to_many,
+    ngram_similarity,
+)
+from .tfidf_target_index import TfidfTargetIndex
 
 class FuzzyAlgorithm(Enum):
     """Fuzzy matching algorithm types."""
@@ -116,10 +127,28 @@ class AIFuzzyMatcher:
         self.good_threshold = config.get("good_threshold", 0.80)
         self.fair_threshold = config.get("fair_threshold", 0.70)
 
+        # Candidate search: only the top LSH/phonetic candidates are scored.
+        # It is approximate and can miss matches, so it is opt-in.
+        self.enable_candidate_search = config.get("enable_candidate_search", False)
+        self.candidate_search_min_targets = config.get(
+            "candidate_search_min_targets", 100
+        )
+
         # Internal state
         self.vectorizer = TfidfVectorizer(
             max_features=1000, stop_words="english", ngram_range=(1, 3), min_df=1
         )
+        self.tfidf_index = TfidfTargetIndex(
+            self.vectorizer, refit_ratio=config.get("tfidf_refit_ratio", 0.5)
+        )
+        self.max_indexed_targets = config.get("max_indexed_targets", 100000)
+        self.candidate_index = FuzzyCandidateIndex(
+            num_perm=config.get("candidate_num_perm", 64),
+            bands=config.get("candidate_bands", 16),
+            ngram_size=config.get("candidate_ngram_size", 3),
+            max_candidates=config.get("max_candidates", 50),
+            enable_phonetic=self.enable_phonetic,
+        )
         self.feature_vectors: Dict[str, np.ndarray] = {}
         self.matching_history: List[FuzzyMatchResult] = []
 
@@ -177,6 +206,144 @@ class AIFuzzyMatcher:
             self.logger.error(f"Error in fuzzy matching: {e}")
             return []
 
+    async def find_fuzzy_matches_batch(
+        self,
+        source_records: List[Dict[str, Any]],
+        target_records: List[Dict[str, Any]],
+        algorithm: FuzzyAlgorithm = FuzzyAlgorithm.HYBRID,
+        top_k: Optional[int] = None,
+    ) -> Dict[str, List[FuzzyMatchResult]]:
+        """Find fuzzy matches for many source records against one target set."""
+        try:
+            # Fit the TF-IDF index once for the whole batch
+            indexed = await self.index_targets(target_records)
+
+            if indexed and algorithm == FuzzyAlgorithm.TFIDF_COSINE:
+                source_texts = [
+                    self._prepare_text_for_tfidf(record) for record in source_records
+                ]
+                restrict_to = {record["id"] for record in target_records}
+                hits = self.tfidf_index.query(
+                    source_texts, top_k=top_k, restrict_to=restrict_to
+                )
+                return {
+                    source_record.get("id", "unknown"): [
+                        self._create_tfidf_match(source_record, target_id, similarity)
+                        for target_id, similarity in source_hits
+                    ]
+                    for source_record, source_hits in zip(source_records, hits)
+                }
+
+            results = {}
+            for source_record in source_records:
+                matches = await self.find_fuzzy_matches(
+                    source_record, target_records, algorithm
+                )
+                results[source_record.get("id", "unknown")] = (
+                    matches[:top_k] if top_k is not None else matches
+                )
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error in batch fuzzy matching: {e}")
+            return {}
+
+    async def index_targets(self, target_records: List[Dict[str, Any]]) -> bool:
+        """Make sure the target indexes cover the given targets and texts."""
+        try:
+            target_ids = [record.get("id") for record in target_records]
+            if not target_ids or None in target_ids:
+                # Targets without ids cannot be indexed; callers fall back
+                return False
+
+            # Targets that are new or whose text changed since they were indexed
+            texts = [self._prepare_text_for_tfidf(record) for record in target_records]
+            stale = self.tfidf_index.stale(target_ids, texts)
+            if not stale:
+                return True
+
+            if len(self.tfidf_index) + len(stale) > self.max_indexed_targets:
+                # Start over from the current targets rather than grow unbounded
+                self.reset_target_index()
+                stale = list(range(len(target_records)))
+
+            if len(self.tfidf_index) == 0:
+                self.tfidf_index.fit(
+                    [target_ids[position] for position in stale],
+                    [texts[position] for position in stale],
+                )
+            else:
+                self.tfidf_index.add(
+                    [target_ids[position] for position in stale],
+                    [texts[position] for position in stale],
+                )
+
+            if self.enable_candidate_search:
+                candidate_texts = [
+                    self._prepare_text_for_candidates(record)
+                    for record in target_records
+                ]
+                stale = self.candidate_index.stale(target_ids, candidate_texts)
+                self.candidate_index.add(
+                    [target_ids[position] for position in stale],
+                    [candidate_texts[position] for position in stale],
+                )
+            return True
+
+        except Exception as e:
+            self.logger.warning(f"TF-IDF index build failed: {e}")
+            return False
+
+    async def add_targets(self, target_records: List[Dict[str, Any]]):
+        """Add or replace targets in the TF-IDF and candidate indexes."""
+        target_ids = [record["id"] for record in target_records]
+        self.tfidf_index.add(
+            target_ids,
+            [self._prepare_text_for_tfidf(record) for record in target_records],
+        )
+        if self.enable_candidate_search:
+            self.candidate_index.add(
+                target_ids,
+                [
+                    self._prepare_text_for_candidates(record)
+                    for record in target_records
+                ],
+            )
+
+    async def remove_targets(self, target_ids: List[str]):
+        """Remove targets from the TF-IDF and candidate indexes."""
+        self.tfidf_index.remove(target_ids)
+        self.candidate_index.remove(target_ids)
+
+    def reset_target_index(self):
+        """Drop every indexed target."""
+        self.tfidf_index.clear()
+        self.candidate_index.clear()
+
+    def _select_candidates(
+        self, source_record: Dict[str, Any], target_records: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Narrow the targets to the source's nearest candidates, if indexed."""
+        if (
+            not self.enable_candidate_search
+            or len(target_records) < self.candidate_search_min_targets
+        ):
+            return target_records
+
+        target_ids = [record.get("id") for record in target_records]
+        if None in target_ids or not self.candidate_index.contains_all(
+            target_ids,
+            [self._prepare_text_for_candidates(record) for record in target_records],
+        ):
+            return target_records
+
+        candidates = self.candidate_index.query(
+            self._prepare_text_for_candidates(source_record),
+            restrict_to=set(target_ids),
+        )
+        candidate_ids = {target_id for target_id, _ in candidates}
+        return [record for record in target_records if record["id"] in candidate_ids]
+
     async def _hybrid_fuzzy_match(
         self, source_record: Dict[str, Any], target_records: List[Dict[str, Any]]
     ) -> List[FuzzyMatchResult]:
@@ -184,6 +351,9 @@ class AIFuzzyMatcher:
         try:
             all_matches = []
 
+            # Only the nearest candidates reach the per-pair algorithms
+            target_records = self._select_candidates(source_record, target_records)
+
             # Get matches from different algorithms
             if self.enable_tfidf:
                 tfidf_matches = await self._tfidf_cosine_match(
@@ -237,17 +407,32 @@ class AIFuzzyMatcher:
             source_text = self._prepare_text_for_tfidf(source_record)
 
             # Prepare target texts
-            target_texts = []
-            target_ids = []
-
-            for target_record in target_records:
-                target_text = self._prepare_text_for_tfidf(target_record)
-                target_texts.append(target_text)
-                target_ids.append(target_record.get("id", str(uuid.uuid4())))
-
+            target_texts = [
+                self._prepare_text_for_tfidf(target_record)
+                for target_record in target_records
+            ]
             if not target_texts:
                 return []
 
+            # Query the fitted target index instead of refitting when it
+            # holds every target with its current text
+            target_ids = [target_record.get("id") for target_record in target_records]
+            if None not in target_ids and self.tfidf_index.contains_all(
+                target_ids, target_texts
+            ):
+                hits = self.tfidf_index.query(
+                    [source_text], restrict_to=set(target_ids)
+                )[0]
+                return [
+                    self._create_tfidf_match(source_record, target_id, similarity)
+                    for target_id, similarity in hits
+                ]
+
+            target_ids = [
+                target_record.get("id", str(uuid.uuid4()))
+                for target_record in target_records
+            ]
+
             # Vectorize texts
             try:
                 all_texts = [source_text] + target_texts
@@ -264,23 +449,12 @@ class AIFuzzyMatcher:
                 # Create match results
                 for i, similarity in enumerate(similarities):
                     if similarity > 0:
-                        confidence = float(similarity)
-                        quality = self._determine_quality(confidence)
-
-                        match = FuzzyMatchResult(
-                            source_id=source_record.get("id", "unknown"),
-                            target_id=target_ids[i],
-                            algorithm=FuzzyAlgorithm.TFIDF_COSINE,
-                            confidence=confidence,
-                            quality=quality,
-                            similarity_score=similarity,
-                            matched_features=["text_content"],
-                            feature_scores={"text_similarity": similarity},
-                            metadata={"algorithm": "tfidf_cosine"},
+                        matches.append(
+                            self._create_tfidf_match(
+                                source_record, target_ids[i], similarity
+                            )
                         )
 
-                        matches.append(match)
-
             except Exception as e:
                 self.logger.warning(f"TF-IDF processing failed: {e}")
 
@@ -290,6 +464,23 @@ class AIFuzzyMatcher:
             self.logger.error(f"Error in TF-IDF matching: {e}")
             return []
 
+    def _create_tfidf_match(
+        self, source_record: Dict[str, Any], target_id: str, similarity: float
+    ) -> FuzzyMatchResult:
+        """Create a TF-IDF cosine match result."""
+        confidence = float(similarity)
+        return FuzzyMatchResult(
+            source_id=source_record.get("id", "unknown"),
+            target_id=target_id,
+            algorithm=FuzzyAlgorithm.TFIDF_COSINE,
+            confidence=confidence,
+            quality=self._determine_quality(confidence),
+            similarity_score=similarity,
+            matched_features=["text_content"],
+            feature_scores={"text_similarity": similarity},
+            metadata={"algorithm": "tfidf_cosine"},
+        )
+
     async def _jaro_winkler_match(
         self, source_record: Dict[str, Any], target_records: List[Dict[str, Any]]
     ) -> List[FuzzyMatchResult]:
@@ -355,31 +546,19 @@ class AIFuzzyMatcher:
 
             # Extract text fields for comparison
             source_fields = self._extract_text_fields(source_record)
+            target_fields_list = [
+                self._extract_text_fields(target_record)
+                for target_record in target_records
+            ]
 
-            for target_record in target_records:
-                target_fields = self._extract_text_fields(target_record)
-
-                # Calculate Levenshtein similarity for each field
-                field_scores = {}
-                total_similarity = 0.0
-                field_count = 0
-
-                for field_name in source_fields.keys():
-                    if field_name in target_fields:
-                        source_value = source_fields[field_name]
-                        target_value = target_fields[field_name]
-
-                        # Calculate Levenshtein distance and convert to similarity
-                        distance = self._levenshtein_distance(
-                            source_value, target_value
-                        )
-                        max_length = max(len(source_value), len(target_value))
+            # Calculate Levenshtein similarity for each field, one-vs-many
+            all_field_scores = self._batched_field_scores(
+                source_fields, target_fields_list, self._levenshtein_similarities
+            )
 
-                        if max_length > 0:
-                            similarity = 1 - (distance / max_length)
-                            field_scores[field_name] = similarity
-                            total_similarity += similarity
-                            field_count += 1
+            for target_record, field_scores in zip(target_records, all_field_scores):
+                total_similarity = sum(field_scores.values())
+                field_count = len(field_scores)
 
                 if field_count > 0:
                     average_similarity = total_similarity / field_count
@@ -415,25 +594,19 @@ class AIFuzzyMatcher:
 
             # Extract text fields for comparison
             source_fields = self._extract_text_fields(source_record)
+            target_fields_list = [
+                self._extract_text_fields(target_record)
+                for target_record in target_records
+            ]
 
-            for target_record in target_records:
-                target_fields = self._extract_text_fields(target_record)
-
-                # Calculate N-gram similarity for each field
-                field_scores = {}
-                total_similarity = 0.0
-                field_count = 0
-
-                for field_name in source_fields.keys():
-                    if field_name in target_fields:
-                        source_value = source_fields[field_name]
-                        target_value = target_fields[field_name]
+            # Calculate N-gram similarity for each field, one-vs-many
+            all_field_scores = self._batched_field_scores(
+                source_fields, target_fields_list, ngram_one_to_many
+            )
 
-                        # Calculate N-gram similarity
-                        similarity = self._ngram_similarity(source_value, target_value)
-                        field_scores[field_name] = similarity
-                        total_similarity += similarity
-                        field_count += 1
+            for target_record, field_scores in zip(target_records, all_field_scores):
+                total_similarity = sum(field_scores.values())
+                field_count = len(field_scores)
 
                 if field_count > 0:
                     average_similarity = total_similarity / field_count
@@ -565,42 +738,52 @@ class AIFuzzyMatcher:
             return []
 
     def _levenshtein_distance(self, s1: str, s2: str) -> int:
-        """Calculate Levenshtein distance between two strings.Calculate Levenshtein distance between two strings."""
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-
-        if len(s2) == 0:
-            return len(s1)
-
-        previous_row = list(range(len(s2) + 1))
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-
-        return previous_row[-1]
+        """Calculate Levenshtein distance between two strings."""
+        return levenshtein_distance(s1, s2)
+
+    def _levenshtein_similarities(
+        self, source_value: str, target_values: List[str]
+    ) -> List[Optional[float]]:
+        """Calculate Levenshtein similarity from one value to many values."""
+        distances = levenshtein_one_to_many(source_value, target_values)
+        similarities = []
+        for target_value, distance in zip(target_values, distances):
+            max_length = max(len(source_value), len(target_value))
+            similarities.append(1 - (distance / max_length) if max_length > 0 else None)
+        return similarities
 
     def _ngram_similarity(self, s1: str, s2: str, n: int = 3) -> float:
-        """Calculate N-gram similarity between two strings.Calculate N-gram similarity between two strings."""
-        if not s1 or not s2:
-            return 0.0
-
-        # Generate N-grams
-        s1_grams = set(s1[i : i + n] for i in range(len(s1) - n + 1))
-        s2_grams = set(s2[i : i + n] for i in range(len(s2) - n + 1))
-
-        if not s1_grams or not s2_grams:
-            return 0.0
+        """Calculate N-gram similarity between two strings."""
+        return ngram_similarity(s1, s2, n)
 
-        # Calculate Jaccard similarity
-        intersection = s1_grams.intersection(s2_grams)
-        union = s1_grams.union(s2_grams)
+    def _batched_field_scores(
+        self,
+        source_fields: Dict[str, str],
+        target_fields_list: List[Dict[str, str]],
+        scorer,
+    ) -> List[Dict[str, float]]:
+        """Score each source field against the same field of every target.
+
+        The scorer takes one source value and the list of target values and
+        returns one score per target, or None to leave the field unscored.
+        """
+        all_field_scores: List[Dict[str, float]] = [{} for _ in target_fields_list]
+
+        for field_name, source_value in source_fields.items():
+            positions = [
+                position
+                for position, target_fields in enumerate(target_fields_list)
+                if field_name in target_fields
+            ]
+            scores = scorer(
+                source_value,
+                [target_fields_list[position][field_name] for position in positions],
+            )
+            for position, score in zip(positions, scores):
+                if score is not None:
+                    all_field_scores[position][field_name] = score
 
-        return len(intersection) / len(union) if union else 0.0
+        return all_field_scores
 
     def _phonetic_similarity(self, s1: str, s2: str) -> float:
         """Calculate phonetic similarity between two strings.Calculate phonetic similarity between two strings."""
@@ -675,6 +858,14 @@ class AIFuzzyMatcher:
 
         return " ".join(text_parts)
 
+    def _prepare_text_for_candidates(self, record: Dict[str, Any]) -> str:
+        """Prepare text from record for candidate search, ignoring its id."""
+        return " ".join(
+            value
+            for key, value in self._extract_text_fields(record).items()
+            if key != "id"
+        )
+
     def _extract_text_fields(self, record: Dict[str, Any]) -> Dict[str, str]:
         """Extract text fields from a record.Extract text fields from a record."""
         text_fields = {}
@@ -821,6 +1012,8 @@ class AIFuzzyMatcher:
                 "phonetic": self.enable_phonetic,
                 "semantic": self.enable_semantic,
             },
+            "tfidf_index": self.tfidf_index.get_statistics(),
+            "candidate_index": self.candidate_index.get_statistics(),
         }
 
 # Example usage and testing
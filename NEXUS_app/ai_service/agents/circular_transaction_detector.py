@@ -9,18 +9,24 @@ and complex financial flow cycles.
 
 import asyncio
 import logging
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
 import networkx as nx
+import numpy as np
 
 from ...taskmaster.models.job import Job, JobPriority, JobStatus, JobType
 import logging
 from datetime import datetime, timedelta
 
 from ...taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .graph_partitioning import GraphPartitioner
+from .graph_store import resolve_graph_store
+from .temporal_cycle_engine import TemporalCycle, TemporalCycleEngine
 
 class CircularType(Enum):
     """Types of circular transactions."""
@@ -33,6 +39,7 @@ class CircularType(Enum):
     INTEGRATION = "integration"  # Integration pattern
     SMURFING = "smurfing"  # Smurfing pattern
     STRUCTURING = "structuring"  # Structuring pattern
+    TEMPORAL_CIRCLE = "temporal_circle"  # Time-ordered circular flow
 
 
 class RiskLevel(Enum):
@@ -111,8 +118,49 @@ class CircularTransactionDetector:
         self.time_window = config.get("time_window", timedelta(days=30))
         self.risk_threshold = config.get("risk_threshold", 0.7)
 
-        # Transaction graph
-        self.transaction_graph = nx.DiGraph()
+        # Cycle and layering searches run per graph component, in a process
+        # pool once the graph is large enough
+        self.scc_partitioning = config.get("scc_partitioning", True)
+        self.layering_max_path_length = config.get(
+            "layering_max_path_length", self.max_cycle_length
+        )
+        self.partitioner = GraphPartitioner(
+            max_workers=config.get("partition_workers"),
+            min_parallel_edges=config.get("parallel_min_edges", 5000),
+        )
+
+        # Temporal detection: cycles whose transactions follow each other in
+        # time within temporal_window, over a windowed edge index
+        self.temporal_detection = config.get("temporal_detection", False)
+        self.temporal_engine = TemporalCycleEngine(
+            window=config.get("temporal_window", self.time_window),
+            max_cycle_length=self.max_cycle_length,
+            min_cycle_length=self.min_cycle_length,
+            retention=config.get("temporal_retention"),
+            max_cycles=config.get("max_temporal_cycles", 10000),
+        )
+
+        # Streaming detection: cycles closed by each new edge are emitted
+        # to the registered callbacks and the cycle queue as they appear
+        self.streaming_detection = config.get("streaming_detection", False)
+        self.max_cycles_per_edge = config.get("max_cycles_per_edge", 100)
+        self.cycle_callbacks: List[Callable[[CircularTransaction], Any]] = []
+        self.cycle_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=config.get("cycle_queue_size", 10000)
+        )
+
+        # Transaction graph; with a graph_store configured it is a read-only
+        # view of this agent's namespace in that (possibly shared) store and
+        # writes go to the store
+        self.graph_store = resolve_graph_store(config.get("graph_store"))
+        self.graph_namespace = config.get("graph_namespace", "transactions")
+        if self.graph_store is not None:
+            self.transaction_graph = self.graph_store.view(
+                field_names={"key": "transaction_id"},
+                namespace=self.graph_namespace,
+            )
+        else:
+            self.transaction_graph = nx.DiGraph()
         self.nodes: Dict[str, TransactionNode] = {}
         self.edges: Dict[str, TransactionEdge] = {}
 
@@ -120,10 +168,20 @@ class CircularTransactionDetector:
         self.detected_circles: List[CircularTransaction] = []
         self.circle_history: Dict[str, List[CircularTransaction]] = {}
 
+        # Cycles shared by the detectors during one detection pass
+        self._cycle_cache: Optional[List[List[str]]] = None
+        self._cycle_pass_active = False
+
         # Performance tracking
         self.total_circles_detected = 0
         self.average_detection_time = 0.0
         self.detection_accuracy = 0.0
+        self.last_cycle_count = 0
+        self.last_cycle_enumeration_time = 0.0
+        self.streaming_cycles_emitted = 0
+        self.streaming_edges_checked = 0
+        self.streaming_edges_truncated = 0
+        self.average_streaming_check_time = 0.0
 
         # Event loop
         self.loop = asyncio.get_event_loop()
@@ -185,15 +243,29 @@ class CircularTransactionDetector:
                 metadata=transaction.get("metadata", {}),
             )
 
+            # A repeated transaction on an existing edge closes no new cycle
+            is_new_edge = not self.transaction_graph.has_edge(source, target)
+
             # Add to graph
-            self.transaction_graph.add_edge(
-                source,
-                target,
-                amount=amount,
-                timestamp=timestamp,
-                transaction_id=transaction_id,
-                edge_data=edge,
-            )
+            if self.graph_store is not None:
+                self.graph_store.add_edge(
+                    source,
+                    target,
+                    amount=amount,
+                    timestamp=timestamp,
+                    key=transaction_id,
+                    namespace=self.graph_namespace,
+                    edge_data=edge,
+                )
+            else:
+                self.transaction_graph.add_edge(
+                    source,
+                    target,
+                    amount=amount,
+                    timestamp=timestamp,
+                    transaction_id=transaction_id,
+                    edge_data=edge,
+                )
 
             # Store edge
             edge_key = f"{source}_{target}_{transaction_id}"
@@ -202,12 +274,165 @@ class CircularTransactionDetector:
             self.logger.info(
                 f"Added transaction: {transaction_id} ({source} -> {target}: {amount})"
             )
+
+            if self.streaming_detection and is_new_edge:
+                await self._detect_cycles_for_edge(source, target)
+
+            if self.temporal_detection:
+                temporal_cycles = self.temporal_engine.add_edge(
+                    source,
+                    target,
+                    amount,
+                    timestamp,
+                    transaction_id,
+                    find_cycles=self.streaming_detection,
+                )
+                for temporal_cycle in temporal_cycles:
+                    circle = self._build_temporal_circle(
+                        temporal_cycle, self.streaming_cycles_emitted
+                    )
+                    if circle and self._calculate_risk_score(circle) >= (
+                        self.risk_threshold
+                    ):
+                        await self._emit_cycle(circle)
+
             return True
 
         except Exception as e:
             self.logger.error(f"Error adding transaction: {e}")
             return False
 
+    def add_cycle_callback(self, callback: Callable[[CircularTransaction], Any]):
+        """Register a callback (plain or coroutine) for streamed cycles."""
+        self.cycle_callbacks.append(callback)
+
+    async def _detect_cycles_for_edge(self, source: str, target: str):
+        """Detect and emit the cycles closed by a new edge."""
+        try:
+            start = time.perf_counter()
+            cycles, truncated = self._find_cycles_through_edge(source, target)
+            if truncated:
+                self.streaming_edges_truncated += 1
+                self.logger.warning(
+                    f"Streaming cycle search for {source} -> {target} stopped at "
+                    f"max_cycles_per_edge={self.max_cycles_per_edge}; "
+                    "further cycles through this edge were not reported"
+                )
+
+            for cycle in cycles:
+                if len(cycle) < self.min_cycle_length:
+                    continue
+
+                cycle_amount = self._calculate_cycle_amount(cycle)
+                if cycle_amount < self.amount_threshold:
+                    continue
+
+                cycle_risk = self._calculate_cycle_risk(cycle)
+                circle = CircularTransaction(
+                    id=f"streaming_circle_{datetime.utcnow().timestamp()}_{self.streaming_cycles_emitted}",
+                    circular_type=CircularType.SIMPLE_CIRCLE,
+                    risk_level=self._get_risk_level(cycle_risk),
+                    entities_involved=cycle,
+                    transaction_path=cycle,
+                    total_amount=cycle_amount,
+                    cycle_length=len(cycle),
+                    confidence=0.8,
+                    detection_time=datetime.utcnow(),
+                    evidence={
+                        "cycle": cycle,
+                        "closing_edge": [source, target],
+                        "amount": cycle_amount,
+                        "risk_score": cycle_risk,
+                    },
+                    metadata={"streaming": True, "truncated": truncated},
+                )
+
+                if self._calculate_risk_score(circle) < self.risk_threshold:
+                    continue
+
+                await self._emit_cycle(circle)
+
+            check_time = time.perf_counter() - start
+            self.average_streaming_check_time = (
+                self.average_streaming_check_time * self.streaming_edges_checked
+                + check_time
+            ) / (self.streaming_edges_checked + 1)
+            self.streaming_edges_checked += 1
+
+        except Exception as e:
+            self.logger.error(f"Error detecting cycles for {source} -> {target}: {e}")
+
+    def _find_cycles_through_edge(
+        self, source: str, target: str
+    ) -> Tuple[List[List[str]], bool]:
+        """
+        Find the cycles of at most max_cycle_length through source -> target.
+
+        At most max_cycles_per_edge cycles are returned, together with a flag
+        telling whether the search stopped there with more cycles left.
+        """
+        if source == target:
+            return [], False
+
+        # Edges left on the way back from target to source
+        max_depth = self.max_cycle_length - 1
+
+        # Distances to the source bound the search: a branch is abandoned
+        # as soon as it cannot reach the source within the remaining depth
+        distance_to_source = nx.single_source_shortest_path_length(
+            self.transaction_graph.reverse(copy=False), source, cutoff=max_depth
+        )
+        if distance_to_source.get(target, max_depth + 1) > max_depth:
+            return [], False
+
+        cycles = []
+        path = [source, target]
+        on_path = {source, target}
+        stack = [iter(self.transaction_graph.successors(target))]
+
+        # One cycle past the cap tells whether the output was truncated
+        while stack and len(cycles) <= self.max_cycles_per_edge:
+            depth = len(path) - 1
+            for successor in stack[-1]:
+                if successor == source:
+                    cycles.append(list(path))
+                    continue
+                if successor in on_path:
+                    continue
+                if depth + distance_to_source.get(successor, max_depth + 1) > max_depth:
+                    continue
+
+                path.append(successor)
+                on_path.add(successor)
+                stack.append(iter(self.transaction_graph.successors(successor)))
+                break
+            else:
+                stack.pop()
+                on_path.discard(path.pop())
+
+        truncated = len(cycles) > self.max_cycles_per_edge
+        return cycles[: self.max_cycles_per_edge], truncated
+
+    async def _emit_cycle(self, circle: CircularTransaction):
+        """Record a streamed cycle and deliver it to callbacks and the queue."""
+        self.detected_circles.append(circle)
+        self.total_circles_detected += 1
+        self.streaming_cycles_emitted += 1
+
+        for callback in self.cycle_callbacks:
+            try:
+                result = callback(circle)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.logger.error(f"Error in cycle callback: {e}")
+
+        # Without a consumer the queue would grow forever: drop the oldest
+        if self.cycle_queue.full():
+            self.cycle_queue.get_nowait()
+            self.logger.warning("Cycle queue full, dropped oldest streamed cycle")
+        self.cycle_queue.put_nowait(circle)
+
     async def _add_or_update_node(self, entity_id: str, metadata: Dict[str, Any]):
         """Add or update a node in the transaction graph.Add or update a node in the transaction graph."""
         try:
@@ -224,7 +449,12 @@ class CircularTransactionDetector:
                 self.nodes[entity_id] = node
 
                 # Add to graph
-                self.transaction_graph.add_node(entity_id, **node.__dict__)
+                if self.graph_store is not None:
+                    self.graph_store.add_node(
+                        entity_id, namespace=self.graph_namespace, **node.__dict__
+                    )
+                else:
+                    self.transaction_graph.add_node(entity_id, **node.__dict__)
             else:
                 # Update existing node
                 self.nodes[entity_id].transaction_count += 1
@@ -259,6 +489,10 @@ class CircularTransactionDetector:
 
             detected_circles = []
 
+            # Cycle-based detectors share one bounded enumeration per pass
+            self._cycle_cache = None
+            self._cycle_pass_active = True
+
             # Detect each type of circular transaction
             for circular_type in circular_types:
                 try:
@@ -278,6 +512,8 @@ class CircularTransactionDetector:
                         circles = await self._detect_smurfing_patterns()
                     elif circular_type == CircularType.STRUCTURING:
                         circles = await self._detect_structuring_patterns()
+                    elif circular_type == CircularType.TEMPORAL_CIRCLE:
+                        circles = await self._detect_temporal_circles()
                     else:
                         continue
 
@@ -290,6 +526,9 @@ class CircularTransactionDetector:
                     )
                     continue
 
+            self._cycle_pass_active = False
+            self._cycle_cache = None
+
             # Filter by risk and confidence
             filtered_circles = [
                 circle
@@ -314,19 +553,49 @@ class CircularTransactionDetector:
             return filtered_circles
 
         except Exception as e:
+            self._cycle_pass_active = False
+            self._cycle_cache = None
             self.logger.error(f"Error in circular transaction detection: {e}")
             return []
 
+    def _enumerate_cycles(self) -> List[List[str]]:
+        """Enumerate simple cycles of at most max_cycle_length entities."""
+        if self._cycle_cache is not None:
+            return self._cycle_cache
+
+        start = time.perf_counter()
+
+        # The length bound prunes the search itself instead of filtering
+        # an exhaustive enumeration afterwards
+        if self.scc_partitioning:
+            cycles = self.partitioner.enumerate_cycles(
+                self.transaction_graph, length_bound=self.max_cycle_length
+            )
+        else:
+            cycles = list(
+                nx.simple_cycles(
+                    self.transaction_graph, length_bound=self.max_cycle_length
+                )
+            )
+
+        self.last_cycle_count = len(cycles)
+        self.last_cycle_enumeration_time = time.perf_counter() - start
+        self.logger.debug(
+            f"Enumerated {len(cycles)} cycles of length <= {self.max_cycle_length} "
+            f"in {self.last_cycle_enumeration_time:.3f}s"
+        )
+
+        if self._cycle_pass_active:
+            self._cycle_cache = cycles
+        return cycles
+
     async def _detect_simple_circles(self) -> List[CircularTransaction]:
         """Detect simple circular transactions.Detect simple circular transactions."""
         try:
             circles = []
 
             # Find all simple cycles in the graph
-            try:
-                simple_cycles = list(nx.simple_cycles(self.transaction_graph))
-            except nx.NetworkXNoCycle:
-                return circles
+            simple_cycles = self._enumerate_cycles()
 
             for cycle in simple_cycles:
                 if self.min_cycle_length <= len(cycle) <= self.max_cycle_length:
@@ -365,11 +634,8 @@ class CircularTransactionDetector:
             circles = []
 
             # Find all cycles with length > 3
-            try:
-                all_cycles = list(nx.simple_cycles(self.transaction_graph))
-                complex_cycles = [cycle for cycle in all_cycles if len(cycle) > 3]
-            except nx.NetworkXNoCycle:
-                return circles
+            all_cycles = self._enumerate_cycles()
+            complex_cycles = [cycle for cycle in all_cycles if len(cycle) > 3]
 
             for cycle in complex_cycles:
                 if len(cycle) <= self.max_cycle_length:
@@ -409,45 +675,37 @@ class CircularTransactionDetector:
         try:
             circles = []
 
-            # Look for layering patterns (multiple hops)
-            for node in self.transaction_graph.nodes():
-                # Find paths from this node back to itself
-                try:
-                    paths = list(
-                        nx.all_simple_paths(self.transaction_graph, node, node)
-                    )
-                    laundering_paths = [path for path in paths if len(path) > 3]
-
-                    for path in laundering_paths:
-                        if len(path) <= self.max_cycle_length:
-                            # Calculate laundering indicators
-                            laundering_score = self._calculate_laundering_score(path)
-                            path_amount = self._calculate_path_amount(path)
+            # Look for layering patterns (multiple hops): closed paths that
+            # leave an entity and return to it, taken from the shared cycles
+            for cycle in self._enumerate_cycles():
+                path = cycle + [cycle[0]]
 
-                            if (
-                                laundering_score > 0.7
-                                and path_amount >= self.amount_threshold
-                            ):
-                                circle = CircularTransaction(
-                                    id=f"money_laundering_{datetime.utcnow().timestamp()}_{len(circles)}",
-                                    circular_type=CircularType.MONEY_LAUNDERING,
-                                    risk_level=RiskLevel.CRITICAL,
-                                    entities_involved=path,
-                                    transaction_path=path,
-                                    total_amount=path_amount,
-                                    cycle_length=len(path),
-                                    confidence=0.9,
-                                    detection_time=datetime.utcnow(),
-                                    evidence={
-                                        "path": path,
-                                        "laundering_score": laundering_score,
-                                        "amount": path_amount,
-                                    },
-                                )
-                                circles.append(circle)
+                if 3 < len(path) <= self.max_cycle_length:
+                    # Calculate laundering indicators
+                    laundering_score = self._calculate_laundering_score(path)
+                    path_amount = self._calculate_path_amount(path)
 
-                except nx.NetworkXNoPath:
-                    continue
+                    if (
+                        laundering_score > 0.7
+                        and path_amount >= self.amount_threshold
+                    ):
+                        circle = CircularTransaction(
+                            id=f"money_laundering_{datetime.utcnow().timestamp()}_{len(circles)}",
+                            circular_type=CircularType.MONEY_LAUNDERING,
+                            risk_level=RiskLevel.CRITICAL,
+                            entities_involved=path,
+                            transaction_path=path,
+                            total_amount=path_amount,
+                            cycle_length=len(path),
+                            confidence=0.9,
+                            detection_time=datetime.utcnow(),
+                            evidence={
+                                "path": path,
+                                "laundering_score": laundering_score,
+                                "amount": path_amount,
+                            },
+                        )
+                        circles.append(circle)
 
             return circles
 
@@ -455,6 +713,56 @@ class CircularTransactionDetector:
             self.logger.error(f"Error detecting money laundering: {e}")
             return []
 
+    async def _detect_temporal_circles(self) -> List[CircularTransaction]:
+        """Detect time-ordered circular transactions within the temporal window."""
+        try:
+            circles = []
+
+            if not self.temporal_detection:
+                return circles
+
+            for temporal_cycle in self.temporal_engine.find_cycles():
+                circle = self._build_temporal_circle(temporal_cycle, len(circles))
+                if circle:
+                    circles.append(circle)
+
+            return circles
+
+        except Exception as e:
+            self.logger.error(f"Error detecting temporal circles: {e}")
+            return []
+
+    def _build_temporal_circle(
+        self, temporal_cycle: TemporalCycle, index: int
+    ) -> Optional[CircularTransaction]:
+        """Build a circular transaction from a temporal cycle above the threshold."""
+        cycle = temporal_cycle.entities
+        cycle_amount = temporal_cycle.total_amount
+        if cycle_amount < self.amount_threshold:
+            return None
+
+        cycle_risk = self._calculate_cycle_risk(cycle)
+        return CircularTransaction(
+            id=f"temporal_circle_{datetime.utcnow().timestamp()}_{index}",
+            circular_type=CircularType.TEMPORAL_CIRCLE,
+            risk_level=self._get_risk_level(cycle_risk),
+            entities_involved=cycle,
+            transaction_path=cycle,
+            total_amount=cycle_amount,
+            cycle_length=len(cycle),
+            confidence=0.85,
+            detection_time=datetime.utcnow(),
+            evidence={
+                "cycle": cycle,
+                "transaction_ids": temporal_cycle.transaction_ids,
+                "timestamps": [ts.isoformat() for ts in temporal_cycle.timestamps],
+                "amounts": temporal_cycle.amounts,
+                "duration_seconds": temporal_cycle.duration.total_seconds(),
+                "amount": cycle_amount,
+                "risk_score": cycle_risk,
+            },
+        )
+
     async def _detect_shell_company_circles(self) -> List[CircularTransaction]:
         """Detect circular transactions involving shell companies.Detect circular transactions involving shell companies."""
         try:
@@ -468,9 +776,9 @@ class CircularTransactionDetector:
             ]
 
             # Look for cycles involving shell companies
+            cycles = self._enumerate_cycles() if shell_companies else []
             for shell_company in shell_companies:
                 try:
-                    cycles = list(nx.simple_cycles(self.transaction_graph))
                     shell_cycles = [
                         cycle
                         for cycle in cycles
@@ -523,67 +831,39 @@ class CircularTransactionDetector:
             circles = []
 
             # Look for multiple transaction layers
-            for source in self.transaction_graph.nodes():
-                for target in self.transaction_graph.nodes():
-                    if source != target:
-                        try:
-                            # Find all paths between source and target
-                            all_paths = list(
-                                nx.all_simple_paths(
-                                    self.transaction_graph, source, target
-                                )
-                            )
+            for source, target, all_paths in self._find_layered_paths():
+                # Look for layering (multiple paths with different lengths)
+                path_lengths = [len(path) for path in all_paths]
+                if max(path_lengths) - min(path_lengths) >= 2:  # Significant layering
+                    layering_score = self._calculate_layering_score(all_paths)
+                    total_amount = sum(
+                        self._calculate_path_amount(path) for path in all_paths
+                    )
 
-                            # Look for layering (multiple paths with different lengths)
-                            if len(all_paths) > 1:
-                                path_lengths = [len(path) for path in all_paths]
-                                if (
-                                    max(path_lengths) - min(path_lengths) >= 2
-                                ):  # Significant layering
-                                    layering_score = self._calculate_layering_score(
-                                        all_paths
-                                    )
-                                    total_amount = sum(
-                                        self._calculate_path_amount(path)
-                                        for path in all_paths
-                                    )
-
-                                    if (
-                                        layering_score > 0.7
-                                        and total_amount >= self.amount_threshold
-                                    ):
-                                        # Create circular transaction for the layering pattern
-                                        circle = CircularTransaction(
-                                            id=f"layering_{datetime.utcnow().timestamp()}_{len(circles)}",
-                                            circular_type=CircularType.LAYERING,
-                                            risk_level=RiskLevel.HIGH,
-                                            entities_involved=list(
-                                                set(
-                                                    [
-                                                        node
-                                                        for path in all_paths
-                                                        for node in path
-                                                    ]
-                                                )
-                                            ),
-                                            transaction_path=all_paths[
-                                                0
-                                            ],  # Use first path as representative
-                                            total_amount=total_amount,
-                                            cycle_length=len(all_paths[0]),
-                                            confidence=0.85,
-                                            detection_time=datetime.utcnow(),
-                                            evidence={
-                                                "paths": all_paths,
-                                                "layering_score": layering_score,
-                                                "total_amount": total_amount,
-                                                "path_count": len(all_paths),
-                                            },
-                                        )
-                                        circles.append(circle)
-
-                        except nx.NetworkXNoPath:
-                            continue
+                    if layering_score > 0.7 and total_amount >= self.amount_threshold:
+                        # Create circular transaction for the layering pattern
+                        circle = CircularTransaction(
+                            id=f"layering_{datetime.utcnow().timestamp()}_{len(circles)}",
+                            circular_type=CircularType.LAYERING,
+                            risk_level=RiskLevel.HIGH,
+                            entities_involved=list(
+                                set([node for path in all_paths for node in path])
+                            ),
+                            transaction_path=all_paths[
+                                0
+                            ],  # Use first path as representative
+                            total_amount=total_amount,
+                            cycle_length=len(all_paths[0]),
+                            confidence=0.85,
+                            detection_time=datetime.utcnow(),
+                            evidence={
+                                "paths": all_paths,
+                                "layering_score": layering_score,
+                                "total_amount": total_amount,
+                                "path_count": len(all_paths),
+                            },
+                        )
+                        circles.append(circle)
 
             return circles
 
@@ -591,6 +871,30 @@ class CircularTransactionDetector:
             self.logger.error(f"Error detecting layering patterns: {e}")
             return []
 
+    def _find_layered_paths(self) -> List[Tuple[str, str, List[List[str]]]]:
+        """Find entity pairs joined by more than one bounded simple path."""
+        if self.scc_partitioning:
+            return self.partitioner.layering_paths(
+                self.transaction_graph, cutoff=self.layering_max_path_length
+            )
+
+        layered = []
+        for source in self.transaction_graph.nodes():
+            for target in self.transaction_graph.nodes():
+                if source == target:
+                    continue
+                all_paths = list(
+                    nx.all_simple_paths(
+                        self.transaction_graph,
+                        source,
+                        target,
+                        cutoff=self.layering_max_path_length,
+                    )
+                )
+                if len(all_paths) > 1:
+                    layered.append((source, target, all_paths))
+        return layered
+
     async def _detect_integration_patterns(self) -> List[CircularTransaction]:
         """Detect integration patterns in transactions.Detect integration patterns in transactions."""
         try:
@@ -1083,6 +1387,7 @@ class CircularTransactionDetector:
                 CircularType.INTEGRATION: 0.6,
                 CircularType.SMURFING: 0.8,
                 CircularType.STRUCTURING: 0.8,
+                CircularType.TEMPORAL_CIRCLE: 0.85,
             }.get(circle.circular_type, 0.5)
 
             # Risk from amount
@@ -1172,13 +1477,19 @@ class CircularTransactionDetector:
                     if edge.timestamp < cutoff_time:
                         old_edges.append(edge_key)
 
+                # Clean up graph; entity ids may contain "_", so the edge's own
+                # fields are used rather than splitting its key
                 for edge_key in old_edges:
-                    del self.edges[edge_key]
-
-                # Clean up graph
-                for edge_key in old_edges:
-                    source, target, transaction_id = edge_key.split("_", 2)
-                    if self.transaction_graph.has_edge(source, target):
+                    edge = self.edges.pop(edge_key)
+                    source, target = edge.source, edge.target
+                    if self.graph_store is not None:
+                        self.graph_store.remove_edges(
+                            source,
+                            target,
+                            key=edge.transaction_id,
+                            namespace=self.graph_namespace,
+                        )
+                    elif self.transaction_graph.has_edge(source, target):
                         self.transaction_graph.remove_edge(source, target)
 
                 await asyncio.sleep(3600)  # Clean up every hour
@@ -1199,6 +1510,16 @@ class CircularTransactionDetector:
             "total_circles_detected": self.total_circles_detected,
             "average_detection_time": self.average_detection_time,
             "detection_accuracy": self.detection_accuracy,
+            "last_cycle_count": self.last_cycle_count,
+            "last_cycle_enumeration_time": self.last_cycle_enumeration_time,
+            "streaming": {
+                "enabled": self.streaming_detection,
+                "edges_checked": self.streaming_edges_checked,
+                "edges_truncated": self.streaming_edges_truncated,
+                "cycles_emitted": self.streaming_cycles_emitted,
+                "average_check_time": self.average_streaming_check_time,
+                "queue_depth": self.cycle_queue.qsize(),
+            },
             "graph_size": {
                 "nodes": self.transaction_graph.number_of_nodes(),
                 "edges": self.transaction_graph.number_of_edges(),
@@ -1212,7 +1533,13 @@ class CircularTransactionDetector:
                 "integration",
                 "smurfing",
                 "structuring",
+                "temporal_circle",
             ],
+            "temporal_engine": self.temporal_engine.get_statistics(),
+            "partitioning": self.partitioner.get_statistics(),
+            "graph_store": (
+                self.graph_store.get_statistics() if self.graph_store else None
+            ),
         }
 
 # Example usage and testing
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Community Engine - Incremental Community Detection
+
+This module implements the CommunityEngine used by the network-analysis
+agents. The partition is kept across calls: added or removed entities and
+relationships mark their endpoints dirty, and ``update()`` re-optimizes
+only the dirty nodes and, as they move, their neighbours, using the local
+moving phase of Louvain driven by a work queue. Community totals are kept
+up to date, so modularity is available without a pass over the graph.
+
+Local moves never split a community, so when more than ``rebuild_ratio``
+of the nodes are dirty, or on ``rebuild()``, a full multi-level Louvain
+run replaces the partition. Community ids are kept stable across updates
+and rebuilds (a rebuilt community takes the id of the old community it
+overlaps most), and every node whose community changes is reported as a
+CommunityChange.
+"""
+
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+import networkx as nx
+
+
+@dataclass
+class CommunityChange:
+    """A node moving between communities (None when added or removed)."""
+
+    node: Hashable
+    old_community: Optional[int]
+    new_community: Optional[int]
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+
+class CommunityEngine:
+    """
+    Incremental Louvain partition of an undirected weighted graph.
+
+    Parallel relationships are summed into one weight per node pair, as
+    networkx Louvain does for multigraphs.
+    """
+
+    def __init__(
+        self,
+        resolution: float = 1.0,
+        rebuild_ratio: float = 0.2,
+        max_sweeps: int = 10,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the community engine."""
+        self.logger = logging.getLogger(__name__)
+        self.resolution = resolution
+        self.rebuild_ratio = rebuild_ratio
+        self.max_sweeps = max_sweeps
+        self.seed = seed
+
+        # Weighted adjacency; a self-loop is stored once under adj[u][u]
+        self._adj: Dict[Hashable, Dict[Hashable, float]] = {}
+        self._degree: Dict[Hashable, float] = {}
+        self._total_weight = 0.0
+
+        # Partition with per-community degree totals and internal weights
+        self._community: Dict[Hashable, int] = {}
+        self._tot: Dict[int, float] = defaultdict(float)
+        self._internal: Dict[int, float] = defaultdict(float)
+        self._size: Dict[int, int] = defaultdict(int)
+        self._next_id = 0
+
+        # Nodes to revisit, nodes added and nodes removed since the last update
+        self._dirty: Set[Hashable] = set()
+        self._added: Set[Hashable] = set()
+        self._removed: Dict[Hashable, int] = {}
+        self._needs_rebuild = True
+
+        # Statistics
+        self.updates = 0
+        self.rebuilds = 0
+        self.local_moves = 0
+        self.changes_emitted = 0
+
+    # Graph edits
+
+    def add_node(self, node: Hashable):
+        """Add a node; it starts in a community of its own."""
+        if node in self._adj:
+            return
+        self._adj[node] = {}
+        self._degree[node] = 0.0
+        if self._removed.pop(node, None) is None:
+            self._added.add(node)
+        self._assign(node, self._new_community())
+        self._dirty.add(node)
+
+    def add_edge(self, u: Hashable, v: Hashable, weight: float = 1.0):
+        """Add weight to the edge between u and v."""
+        self.add_node(u)
+        self.add_node(v)
+        self._change_weight(u, v, weight)
+
+    def set_edge(self, u: Hashable, v: Hashable, weight: float):
+        """Set the weight of the edge between u and v."""
+        self.add_node(u)
+        self.add_node(v)
+        self._change_weight(u, v, weight - self._adj[u].get(v, 0.0))
+
+    def remove_edge(self, u: Hashable, v: Hashable, weight: Optional[float] = None):
+        """Remove weight from the edge between u and v (all of it by default)."""
+        if u not in self._adj or v not in self._adj[u]:
+            return
+        current = self._adj[u][v]
+        removed = current if weight is None else min(weight, current)
+        self._change_weight(u, v, -removed)
+
+    def remove_node(self, node: Hashable):
+        """Remove a node and its edges."""
+        if node not in self._adj:
+            return
+        for neighbor in list(self._adj[node]):
+            self.remove_edge(node, neighbor)
+
+        community = self._community.pop(node)
+        self._tot[community] -= self._degree.pop(node)
+        self._size[community] -= 1
+        self._drop_if_empty(community)
+        del self._adj[node]
+        self._dirty.discard(node)
+        if node in self._added:
+            self._added.discard(node)
+        else:
+            self._removed[node] = community
+
+    def load(self, graph: nx.Graph, weight: str = "weight"):
+        """Replace the graph, keeping community ids of nodes still present."""
+        old = dict(self._community)
+        self._adj = {}
+        self._degree = {}
+        self._total_weight = 0.0
+        self._community = {}
+        self._tot = defaultdict(float)
+        self._internal = defaultdict(float)
+        self._size = defaultdict(int)
+
+        for node in graph.nodes():
+            self._adj[node] = {}
+            self._degree[node] = 0.0
+            self._assign(node, old.get(node, -1))
+        for u, v, w in graph.edges(data=weight, default=1.0):
+            self._change_weight(u, v, float(w))
+
+        self._removed = {
+            node: community
+            for node, community in old.items()
+            if node not in self._adj
+        }
+        self._added = {node for node in self._adj if node not in old}
+        self._dirty = set(self._adj)
+        self._needs_rebuild = True
+
+    # Partition
+
+    def update(self) -> List[CommunityChange]:
+        """Re-optimize the dirty neighbourhoods and report community changes."""
+        if not self._dirty and not self._removed and not self._needs_rebuild:
+            return []
+
+        self.updates += 1
+        before = {node: self._previous(node) for node in self._dirty}
+        changes = [
+            CommunityChange(node, community, None)
+            for node, community in self._removed.items()
+        ]
+
+        rebuild = len(self._dirty) > self.rebuild_ratio * len(self._adj)
+        if rebuild or self._needs_rebuild:
+            before = self._rebuild()
+        else:
+            for node, community in self._local_moves(self._dirty).items():
+                before.setdefault(node, community)
+
+        for node, old_community in before.items():
+            new_community = self._community.get(node)
+            if new_community != old_community:
+                changes.append(CommunityChange(node, old_community, new_community))
+
+        self._dirty = set()
+        self._added = set()
+        self._removed = {}
+        self.changes_emitted += len(changes)
+        return changes
+
+    def rebuild(self) -> List[CommunityChange]:
+        """Run full Louvain on the next update, then apply it."""
+        self._needs_rebuild = True
+        return self.update()
+
+    def labels(self) -> Dict[Hashable, int]:
+        """Node -> community id."""
+        return dict(self._community)
+
+    def communities(self) -> List[Set[Hashable]]:
+        """Communities as node sets, largest first."""
+        members: Dict[int, Set[Hashable]] = defaultdict(set)
+        for node, community in self._community.items():
+            members[community].add(node)
+        return sorted(members.values(), key=len, reverse=True)
+
+    def modularity(self) -> float:
+        """Modularity of the current partition, as nx.community.modularity."""
+        m = self._total_weight
+        if m == 0:
+            return 0.0
+        return sum(
+            self._internal[c] / m - self.resolution * (self._tot[c] / (2 * m)) ** 2
+            for c in self._tot
+        )
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get community engine statistics."""
+        return {
+            "nodes": len(self._adj),
+            "communities": len(self._tot),
+            "dirty_nodes": len(self._dirty),
+            "updates": self.updates,
+            "rebuilds": self.rebuilds,
+            "local_moves": self.local_moves,
+            "changes_emitted": self.changes_emitted,
+        }
+
+    # Internals
+
+    def _previous(self, node: Hashable) -> Optional[int]:
+        """Community of a node at the last update (None if added since)."""
+        if node in self._added:
+            return None
+        return self._community.get(node)
+
+    def _new_community(self) -> int:
+        """Allocate an unused community id."""
+        community = self._next_id
+        self._next_id += 1
+        return community
+
+    def _assign(self, node: Hashable, community: int):
+        """Put an isolated-from-totals node into a community (-1 for a new one)."""
+        if community < 0:
+            community = self._new_community()
+        self._community[node] = community
+        self._tot[community] += self._degree[node]
+        self._size[community] += 1
+
+    def _drop_if_empty(self, community: int):
+        """Forget the totals of a community with no members."""
+        if self._size[community] <= 0:
+            self._tot.pop(community, None)
+            self._internal.pop(community, None)
+            self._size.pop(community, None)
+
+    def _change_weight(self, u: Hashable, v: Hashable, delta: float):
+        """Apply a weight change to an edge and the community totals."""
+        if delta == 0:
+            return
+        weight = self._adj[u].get(v, 0.0) + delta
+        if weight <= 1e-12:
+            delta -= weight
+            self._adj[u].pop(v, None)
+            self._adj[v].pop(u, None)
+        else:
+            self._adj[u][v] = weight
+            self._adj[v][u] = weight
+
+        self._total_weight += delta
+        self._degree[u] += delta
+        self._degree[v] += delta
+        cu = self._community[u]
+        cv = self._community[v]
+        self._tot[cu] += delta
+        self._tot[cv] += delta
+        if cu == cv:
+            self._internal[cu] += delta
+        self._dirty.add(u)
+        self._dirty.add(v)
+
+    def _move(self, node: Hashable, community: int, links: Dict[int, float]):
+        """Move a node to a community, given its link weight to each community."""
+        old = self._community[node]
+        loop = self._adj[node].get(node, 0.0)
+        degree = self._degree[node]
+
+        self._tot[old] -= degree
+        self._internal[old] -= links.get(old, 0.0) + loop
+        self._size[old] -= 1
+        self._drop_if_empty(old)
+
+        self._community[node] = community
+        self._tot[community] += degree
+        self._internal[community] += links.get(community, 0.0) + loop
+        self._size[community] += 1
+
+    def _local_moves(self, seeds: Set[Hashable]) -> Dict[Hashable, int]:
+        """
+        Louvain local moving, starting from the seeds and spreading on moves.
+
+        Returns the original community of every node that moved.
+        """
+        moved: Dict[Hashable, int] = {}
+        m = self._total_weight
+        if m == 0:
+            return moved
+
+        queue = deque(node for node in self._adj if node in seeds)
+        queued = set(queue)
+        budget = self.max_sweeps * max(len(queue), 1)
+
+        while queue and budget > 0:
+            budget -= 1
+            node = queue.popleft()
+            queued.discard(node)
+            current = self._community[node]
+            degree = self._degree[node]
+
+            links: Dict[int, float] = defaultdict(float)
+            for neighbor, weight in self._adj[node].items():
+                if neighbor != node:
+                    links[self._community[neighbor]] += weight
+
+            # Gain of joining c, with the node taken out of its community
+            scale = self.resolution * degree / (2 * m)
+            own_tot = self._tot[current] - degree
+            best = current
+            best_gain = links.get(current, 0.0) - scale * own_tot
+            for community, weight in links.items():
+                if community == current:
+                    continue
+                gain = weight - scale * self._tot[community]
+                if gain > best_gain + 1e-12:
+                    best, best_gain = community, gain
+
+            if best == current:
+                continue
+            moved.setdefault(node, current)
+            self._move(node, best, links)
+            self.local_moves += 1
+            for neighbor in self._adj[node]:
+                if (
+                    neighbor != node
+                    and neighbor not in queued
+                    and self._community[neighbor] != best
+                ):
+                    queue.append(neighbor)
+                    queued.add(neighbor)
+        return moved
+
+    def _rebuild(self) -> Dict[Hashable, Optional[int]]:
+        """Full Louvain run with stable ids; returns every node's old community."""
+        self.rebuilds += 1
+        self._needs_rebuild = False
+        before = {node: self._previous(node) for node in self._adj}
+
+        graph = nx.Graph()
+        graph.add_nodes_from(self._adj)
+        graph.add_weighted_edges_from(
+            (u, v, w)
+            for u, neighbors in self._adj.items()
+            for v, w in neighbors.items()
+        )
+        found = nx.community.louvain_communities(
+            graph, resolution=self.resolution, seed=self.seed
+        )
+
+        # Each new community keeps the id of the old one it overlaps most
+        candidates = []
+        for index, members in enumerate(found):
+            overlap: Dict[int, int] = defaultdict(int)
+            for node in members:
+                if before[node] is not None:
+                    overlap[before[node]] += 1
+            candidates.extend(
+                (count, index, community) for community, count in overlap.items()
+            )
+        assigned: Dict[int, int] = {}
+        used: Set[int] = set()
+        for _, index, community in sorted(candidates, key=lambda c: (-c[0], c[1])):
+            if index not in assigned and community not in used:
+                assigned[index] = community
+                used.add(community)
+
+        self._community = {}
+        self._tot = defaultdict(float)
+        self._internal = defaultdict(float)
+        self._size = defaultdict(int)
+        for index, members in enumerate(found):
+            community = assigned.get(index)
+            if community is None:
+                community = self._new_community()
+            for node in members:
+                self._assign(node, community)
+        for u, neighbors in self._adj.items():
+            for v, weight in neighbors.items():
+                if self._community[u] == self._community[v]:
+                    # Each pair is listed from both ends; a self-loop once
+                    self._internal[self._community[u]] += (
+                        weight if u == v else weight / 2
+                    )
+        return before
@@ -11,7 +11,7 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass, field
 
 import networkx as nx
@@ -21,6 +21,10 @@ import logging
 from datetime import datetime, timedelta
 
 from ..taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .centrality_service import CentralityService
+from .community_engine import CommunityChange, CommunityEngine
+from .graph_store import resolve_graph_store
+from .path_analytics import PathAnalytics
 
 class NetworkAnalysisType(Enum):
     """Types of network analysis."""
@@ -159,14 +163,60 @@ class EntityNetworkAnalyzer:
         self.risk_threshold = config.get("risk_threshold", 0.7)
         self.suspicious_threshold = config.get("suspicious_threshold", 0.8)
 
-        # Network components
-        self.network = nx.MultiDiGraph()
+        # Network components; with a graph_store configured the network is a
+        # read-only view of this agent's namespace in that (possibly shared)
+        # store
+        self.graph_store = resolve_graph_store(config.get("graph_store"))
+        self.graph_namespace = config.get("graph_namespace", "entity_network")
+        if self.graph_store is not None:
+            self.network = self.graph_store.view(
+                multigraph=True,
+                field_names={
+                    "type": "relationship_type",
+                    "timestamp": "first_seen",
+                    "key": "id",
+                },
+                namespace=self.graph_namespace,
+            )
+        else:
+            self.network = nx.MultiDiGraph()
         self.entities: Dict[str, Entity] = {}
         self.relationships: Dict[str, Relationship] = {}
 
+        # Bumped on every structural change; keys the analysis caches
+        self.graph_version = 0
+
         # Analysis components
         self.centrality_scores: Dict[str, Dict[str, float]] = {}
+        self.centrality_service = CentralityService(
+            exact_betweenness_max_nodes=config.get("exact_betweenness_max_nodes", 2000),
+            betweenness_samples=config.get("betweenness_samples"),
+            betweenness_error=config.get("betweenness_error", 0.05),
+            betweenness_confidence=config.get("betweenness_confidence", 0.9),
+            seed=config.get("centrality_seed"),
+        )
+        self.path_analytics = PathAnalytics(
+            exact_max_nodes=config.get("exact_path_max_nodes", 1000),
+            sample_sources=config.get("path_sample_sources", 64),
+            diameter_sweeps=config.get("diameter_sweeps", 4),
+            seed=config.get("path_seed"),
+        )
         self.community_labels: Dict[str, int] = {}
+
+        # Communities are kept across analyses and re-optimized only around
+        # new or removed entities and relationships; with streaming enabled
+        # changes are emitted to the callbacks and queue as they happen
+        self.community_engine = CommunityEngine(
+            resolution=config.get("community_resolution", 1.0),
+            rebuild_ratio=config.get("community_rebuild_ratio", 0.2),
+            seed=config.get("community_seed"),
+        )
+        self.streaming_communities = config.get("streaming_communities", False)
+        self.community_callbacks: List[Callable[[CommunityChange], Any]] = []
+        self.community_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=config.get("community_queue_size", 10000)
+        )
+        self._community_version = self._network_version()
         self.shell_company_indicators: List[ShellCompanyIndicator] = []
 
         # Performance tracking
@@ -200,12 +250,21 @@ class EntityNetworkAnalyzer:
     async def add_entity(self, entity: Entity) -> bool:
         """Add an entity to the network.Add an entity to the network."""
         try:
+            stale = self._communities_stale()
             if entity.id in self.entities:
                 self.logger.warning(f"Entity {entity.id} already exists, updating")
                 self.entities[entity.id] = entity
             else:
                 self.entities[entity.id] = entity
-                self.network.add_node(entity.id, **entity.__dict__)
+                if self.graph_store is not None:
+                    self.graph_store.add_node(
+                        entity.id, namespace=self.graph_namespace, **entity.__dict__
+                    )
+                else:
+                    self.network.add_node(entity.id, **entity.__dict__)
+                self.graph_version += 1
+                self.community_engine.add_node(entity.id)
+                await self._sync_communities(stale)
 
             self.logger.info(f"Added entity: {entity.id} ({entity.entity_type.value})")
             return True
@@ -225,14 +284,28 @@ class EntityNetworkAnalyzer:
             else:
                 self.relationships[relationship.id] = relationship
 
-            # Add edge to network
-            self.network.add_edge(
-                relationship.source_id,
-                relationship.target_id,
-                key=relationship.id,
-                **relationship.__dict__,
+            stale = self._communities_stale()
+            is_new_edge = not self.network.has_edge(
+                relationship.source_id, relationship.target_id, key=relationship.id
             )
 
+            # Add edge to network
+            if self.graph_store is not None:
+                self._store_relationship(relationship)
+            else:
+                self.network.add_edge(
+                    relationship.source_id,
+                    relationship.target_id,
+                    key=relationship.id,
+                    **relationship.__dict__,
+                )
+            self.graph_version += 1
+            if is_new_edge:
+                self.community_engine.add_edge(
+                    relationship.source_id, relationship.target_id
+                )
+            await self._sync_communities(stale)
+
             self.logger.info(
                 f"Added relationship: {relationship.id} ({relationship.relationship_type.value})"
             )
@@ -242,6 +315,72 @@ class EntityNetworkAnalyzer:
             self.logger.error(f"Error adding relationship {relationship.id}: {e}")
             return False
 
+    def add_community_callback(self, callback: Callable[[CommunityChange], Any]):
+        """Register a callback (plain or coroutine) for community changes."""
+        self.community_callbacks.append(callback)
+
+    def _communities_stale(self) -> bool:
+        """Whether another writer has changed our namespace since our last sync."""
+        return (
+            self.graph_store is not None
+            and self.graph_store.namespace_version(self.graph_namespace)
+            != self._community_version
+        )
+
+    async def _sync_communities(self, stale: bool = False, force: bool = False):
+        """Bring the community engine up to date after a change to the network."""
+        if stale:
+            self.community_engine.load(self.network)
+        self._community_version = self._network_version()
+
+        if force or self.streaming_communities:
+            for change in self.community_engine.update():
+                await self._emit_community_change(change)
+
+    async def _emit_community_change(self, change: CommunityChange):
+        """Deliver a community change to callbacks and the queue."""
+        for callback in self.community_callbacks:
+            try:
+                result = callback(change)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.logger.error(f"Error in community callback: {e}")
+
+        # Without a consumer the queue would grow forever: drop the oldest
+        if self.community_queue.full():
+            self.community_queue.get_nowait()
+        self.community_queue.put_nowait(change)
+
+    def _network_version(self) -> int:
+        """Version of the network; other agents' namespaces do not bump it."""
+        if self.graph_store is not None:
+            return self.graph_store.namespace_version(self.graph_namespace)
+        return self.graph_version
+
+    def _store_relationship(self, relationship: Relationship):
+        """Write a relationship to the graph store, replacing any earlier copy."""
+        self.graph_store.remove_edges(
+            relationship.source_id,
+            relationship.target_id,
+            key=relationship.id,
+            namespace=self.graph_namespace,
+        )
+        extra = {
+            name: value
+            for name, value in relationship.__dict__.items()
+            if name not in ("id", "relationship_type", "first_seen")
+        }
+        self.graph_store.add_edge(
+            relationship.source_id,
+            relationship.target_id,
+            timestamp=relationship.first_seen,
+            edge_type=relationship.relationship_type,
+            key=relationship.id,
+            namespace=self.graph_namespace,
+            **extra,
+        )
+
     async def analyze_network(
         self, analysis_types: List[NetworkAnalysisType] = None
     ) -> Dict[str, Any]:
@@ -307,25 +446,12 @@ class EntityNetworkAnalyzer:
             if not self.network.nodes():
                 return {}
 
-            centrality_metrics = {}
-
-            # Degree centrality
-            centrality_metrics["degree"] = nx.degree_centrality(self.network)
-
-            # Betweenness centrality
-            centrality_metrics["betweenness"] = nx.betweenness_centrality(self.network)
-
-            # Closeness centrality
-            centrality_metrics["closeness"] = nx.closeness_centrality(self.network)
-
-            # Eigenvector centrality
-            centrality_metrics["eigenvector"] = nx.eigenvector_centrality_numpy(
-                self.network, max_iter=1000
+            # Degree, betweenness, closeness, eigenvector and PageRank from
+            # sparse matrices, cached until the network changes
+            centrality_metrics = self.centrality_service.compute(
+                self.network, self._network_version()
             )
 
-            # PageRank centrality
-            centrality_metrics["pagerank"] = nx.pagerank(self.network)
-
             # Store results
             self.centrality_scores = centrality_metrics
 
@@ -341,23 +467,16 @@ class EntityNetworkAnalyzer:
             if not self.network.nodes():
                 return {}
 
-            # Convert to undirected graph for community detection
-            undirected_graph = self.network.to_undirected()
-
-            # Louvain community detection
-            communities = nx.community.louvain_communities(undirected_graph)
-
-            # Label nodes with community IDs
-            community_labels = {}
-            for i, community in enumerate(communities):
-                for node in community:
-                    community_labels[node] = i
+            # Re-optimize the partition around what changed since last time
+            await self._sync_communities(self._communities_stale(), force=True)
+            communities = self.community_engine.communities()
+            community_labels = self.community_engine.labels()
 
             # Store results
             self.community_labels = community_labels
 
-            # Calculate modularity
-            modularity = nx.community.modularity(undirected_graph, communities)
+            # Kept up to date by the engine
+            modularity = self.community_engine.modularity()
 
             results = {
                 "communities": [list(community) for community in communities],
@@ -378,22 +497,10 @@ class EntityNetworkAnalyzer:
             if not self.network.nodes():
                 return {}
 
-            # Check if network is connected
-            is_connected = nx.is_weakly_connected(self.network)
-
-            # Calculate diameter (longest shortest path)
-            try:
-                diameter = nx.diameter(self.network.to_undirected())
-            except nx.NetworkXError:
-                diameter = float("inf")
-
-            # Calculate average shortest path length
-            try:
-                avg_path_length = nx.average_shortest_path_length(
-                    self.network.to_undirected()
-                )
-            except nx.NetworkXError:
-                avg_path_length = float("inf")
+            # Connectivity, diameter and average path length; exact on small
+            # graphs, double-sweep and sampled estimates on large ones
+            version = self._network_version()
+            summary = self.path_analytics.summary(self.network, version)
 
             # Find shortest paths between high-risk entities
             high_risk_entities = [
@@ -406,7 +513,9 @@ class EntityNetworkAnalyzer:
             for i, source in enumerate(high_risk_entities[:5]):  # Limit to top 5
                 for j, target in enumerate(high_risk_entities[i + 1 : 6]):
                     try:
-                        shortest_path = nx.shortest_path(self.network, source, target)
+                        shortest_path = self.path_analytics.shortest_path(
+                            self.network, version, source, target
+                        )
                         path_analysis[f"{source}_to_{target}"] = {
                             "path": shortest_path,
                             "length": len(shortest_path) - 1,
@@ -417,12 +526,7 @@ class EntityNetworkAnalyzer:
                             "length": float("inf"),
                         }
 
-            results = {
-                "is_connected": is_connected,
-                "diameter": diameter,
-                "average_path_length": avg_path_length,
-                "path_analysis": path_analysis,
-            }
+            results = {**summary, "path_analysis": path_analysis}
 
             return results
 
@@ -1011,11 +1115,10 @@ class EntityNetworkAnalyzer:
             )
             metrics.isolated_nodes = len(list(nx.isolates(self.network)))
 
-            # Calculate diameter
-            try:
-                metrics.diameter = nx.diameter(self.network.to_undirected())
-            except nx.NetworkXError:
-                metrics.diameter = float("inf")
+            # Diameter from the cached path analytics
+            metrics.diameter = self.path_analytics.summary(
+                self.network, self._network_version()
+            )["diameter"]
 
             # Calculate average clustering
             try:
@@ -1025,23 +1128,10 @@ class EntityNetworkAnalyzer:
             except nx.NetworkXError:
                 metrics.average_clustering = 0.0
 
-            # Get community count
+            # Get community count and modularity
             if self.community_labels:
                 metrics.communities = len(set(self.community_labels.values()))
-
-            # Get modularity
-            if self.community_labels:
-                try:
-                    undirected_graph = self.network.to_undirected()
-                    communities = [set() for _ in range(metrics.communities)]
-                    for node, community_id in self.community_labels.items():
-                        communities[community_id].add(node)
-                    metrics.modularity = nx.community.modularity(
-                        undirected_graph, communities
-                    )
-                except Exception:
-                    logger.error(f"Error: {e}")
-                    metrics.modularity = 0.0
+                metrics.modularity = self.community_engine.modularity()
 
             # Count suspicious patterns
             if hasattr(self, "shell_company_indicators"):
@@ -1090,10 +1180,18 @@ class EntityNetworkAnalyzer:
                     if entity.last_seen < cutoff_time
                 ]
 
+                stale = self._communities_stale()
                 for entity_id in old_entities:
                     del self.entities[entity_id]
                     if self.network.has_node(entity_id):
-                        self.network.remove_node(entity_id)
+                        if self.graph_store is not None:
+                            self.graph_store.remove_node(
+                                entity_id, namespace=self.graph_namespace
+                            )
+                        else:
+                            self.network.remove_node(entity_id)
+                        self.graph_version += 1
+                        self.community_engine.remove_node(entity_id)
 
                 old_relationships = [
                     rel_id
@@ -1107,7 +1205,18 @@ class EntityNetworkAnalyzer:
                 # Clean up network edges
                 for source, target, key in list(self.network.edges(keys=True)):
                     if key in old_relationships:
-                        self.network.remove_edge(source, target, key)
+                        if self.graph_store is not None:
+                            self.graph_store.remove_edges(
+                                source,
+                                target,
+                                key=key,
+                                namespace=self.graph_namespace,
+                            )
+                        else:
+                            self.network.remove_edge(source, target, key)
+                        self.graph_version += 1
+                        self.community_engine.remove_edge(source, target, 1.0)
+                await self._sync_communities(stale)
 
                 await asyncio.sleep(3600)  # Clean up every hour
 
@@ -1131,6 +1240,13 @@ class EntityNetworkAnalyzer:
                 "nodes": len(self.entities),
                 "edges": len(self.relationships),
             },
+            "graph_version": self.graph_version,
+            "centrality": self.centrality_service.get_statistics(),
+            "paths": self.path_analytics.get_statistics(),
+            "communities": self.community_engine.get_statistics(),
+            "graph_store": (
+                self.graph_store.get_statistics() if self.graph_store else None
+            ),
             "analysis_types_supported": [
                 "centrality_analysis",
                 "community_detection",
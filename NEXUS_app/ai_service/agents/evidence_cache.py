@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Evidence Cache - Content-Addressed Stage Result Cache
+
+This module implements the EvidenceResultCache used by the
+EvidenceProcessor. Stage outputs (EXIF metadata, OCR text, NLP analysis)
+are stored on disk under the SHA-256 of the file they were computed from,
+so duplicate or re-ingested evidence is not analysed again:
+
+- Each entry is one JSON file, ``<directory>/<sha[:2]>/<sha>.json``,
+  written to a temporary name and renamed into place. Entries are plain
+  data, so a tampered cache directory cannot execute code on load.
+- The cache is bounded by total size on disk. Entries are evicted least
+  recently used first; the recency order is rebuilt from file mtimes when
+  the cache is reopened, and a hit refreshes the entry's mtime.
+- Hits, misses and evictions are counted for the hit ratio.
+"""
+
+import logging
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class EvidenceResultCache:
+    """Size-bounded LRU cache of stage results keyed by SHA-256."""
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        """Open the cache directory, indexing existing entries."""
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def get(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """The stored results of a file, or None on a miss."""
+        key = sha256.lower()
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                results = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return results
+
+    def put(self, sha256: str, results: Dict[str, Any]):
+        """
+        Store the JSON-serialisable results of a file, evicting old entries
+        past max_bytes.
+        """
+        key = sha256.lower()
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, separators=(",", ":"))
+        except (TypeError, ValueError):
+            os.remove(temp_path)
+            raise
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self.total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self.stores += 1
+        self._evict()
+
+    def hit_ratio(self) -> float:
+        """Fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio(),
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self):
+        """Remove least recently used entries until under max_bytes."""
+        with self._lock:
+            evicted = []
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self.total_bytes -= old_size
+                evicted.append(old_key)
+            self.evictions += len(evicted)
+
+        for old_key in evicted:
+            self._remove_file(old_key)
+
+    def _path(self, key: str) -> str:
+        """Path of an entry."""
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _discard(self, key: str):
+        """Forget an entry and delete its file."""
+        with self._lock:
+            self.total_bytes -= self._entries.pop(key, 0)
+        self._remove_file(key)
+
+    def _remove_file(self, key: str):
+        """Delete an entry's file if it is still there."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Could not remove cache entry {key}: {e}")
+
+    def _load_index(self):
+        """Index entries on disk, least recently used first."""
+        found = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    # Left behind by an interrupted write
+                    os.remove(entry.path)
+                elif entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime_ns, entry.name[:-5], stat.st_size))
+
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.total_bytes += size
+        self._evict()
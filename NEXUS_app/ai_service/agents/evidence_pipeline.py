@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Evidence Pipeline - Bounded, Staged Asyncio Processing Pipeline
+
+This module implements the StagedPipeline used by the EvidenceProcessor:
+
+- Each stage has its own worker tasks and a bounded input queue. A worker
+  takes an item, awaits the stage handler and puts the item on the next
+  stage's queue.
+- Queues are bounded, so a full downstream stage blocks upstream workers
+  and, in the end, ``submit``; a large evidence drop cannot pile up in
+  memory.
+- Handlers are coroutines; blocking or CPU-heavy work is expected to be
+  sent to an executor by the handler itself.
+- Per-stage queue depth, throughput, wait and service latency are tracked
+  for monitoring.
+
+An item whose handler raises leaves the pipeline and is passed to the
+error callback; items that clear the last stage go to the completion
+callback.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+StageHandler = Callable[[Any], Awaitable[Any]]
+
+
+@dataclass
+class PipelineStage:
+    """Definition of one pipeline stage."""
+
+    name: str
+    handler: StageHandler
+    workers: int = 1
+    queue_size: int = 100
+
+
+class StageMetrics:
+    """Counters and recent latencies of one stage."""
+
+    def __init__(self, name: str, workers: int, window: int):
+        """Initialize the stage metrics."""
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_workers = 0
+        self.busy_time = 0.0
+        self.wait_times: Deque[float] = deque(maxlen=window)
+        self.service_times: Deque[float] = deque(maxlen=window)
+
+    def snapshot(self, queue: asyncio.Queue, elapsed: float) -> Dict[str, Any]:
+        """Metrics of the stage as a dictionary."""
+        return {
+            "workers": self.workers,
+            "busy_workers": self.busy_workers,
+            "queue_depth": queue.qsize(),
+            "queue_size": queue.maxsize,
+            "processed": self.processed,
+            "failed": self.failed,
+            "throughput_per_s": self.processed / elapsed if elapsed > 0 else 0.0,
+            "utilization": (
+                self.busy_time / (elapsed * self.workers) if elapsed > 0 else 0.0
+            ),
+            **self._latency("wait", self.wait_times),
+            **self._latency("service", self.service_times),
+        }
+
+    @staticmethod
+    def _latency(prefix: str, samples: Deque[float]) -> Dict[str, float]:
+        """Mean, p95 and max of recent latency samples."""
+        if not samples:
+            return {f"{prefix}_mean": 0.0, f"{prefix}_p95": 0.0, f"{prefix}_max": 0.0}
+        values = np.fromiter(samples, dtype=float)
+        return {
+            f"{prefix}_mean": float(values.mean()),
+            f"{prefix}_p95": float(np.percentile(values, 95)),
+            f"{prefix}_max": float(values.max()),
+        }
+
+
+class StagedPipeline:
+    """Runs items through a sequence of stages with bounded queues."""
+
+    def __init__(
+        self,
+        stages: List[PipelineStage],
+        on_complete: Optional[Callable[[Any], Any]] = None,
+        on_error: Optional[Callable[[Any, str, Exception], Any]] = None,
+        latency_window: int = 1000,
+    ):
+        """Initialize the pipeline."""
+        self.logger = logging.getLogger(__name__)
+        self.stages = stages
+        self.on_complete = on_complete
+        self.on_error = on_error
+        self.latency_window = latency_window
+
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self.metrics = {
+            stage.name: StageMetrics(stage.name, stage.workers, latency_window)
+            for stage in stages
+        }
+        self.started_at: Optional[float] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers are running."""
+        return bool(self._workers)
+
+    async def start(self):
+        """Create the stage queues and start the workers."""
+        if self.running:
+            return
+        self._queues = [
+            asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages
+        ]
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                self._workers.append(
+                    asyncio.create_task(
+                        self._worker(index), name=f"{stage.name}-{worker}"
+                    )
+                )
+        self.started_at = time.perf_counter()
+
+    async def submit(self, item: Any):
+        """Queue an item, waiting while the first stage is full."""
+        if not self.running:
+            raise RuntimeError("Pipeline is not running")
+        self.submitted += 1
+        await self._queues[0].put((item, time.perf_counter()))
+
+    async def join(self):
+        """Wait until every submitted item has left the pipeline."""
+        for queue in self._queues:
+            await queue.join()
+
+    async def stop(self):
+        """Cancel the workers; queued items are dropped."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def pending(self) -> int:
+        """Items waiting in stage queues."""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def in_flight(self) -> int:
+        """Items submitted that have not yet completed or failed."""
+        return self.submitted - self.completed - self.failed
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get pipeline and per-stage statistics."""
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        stages = {}
+        for stage, queue in zip(self.stages, self._queues):
+            stages[stage.name] = self.metrics[stage.name].snapshot(queue, elapsed)
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight(),
+            "queued": self.pending(),
+            "throughput_per_s": self.completed / elapsed if elapsed > 0 else 0.0,
+            "stages": stages,
+        }
+
+    async def _worker(self, index: int):
+        """Take items from one stage's queue until cancelled."""
+        stage = self.stages[index]
+        queue = self._queues[index]
+        next_queue = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        metrics = self.metrics[stage.name]
+
+        while True:
+            item, queued_at = await queue.get()
+            try:
+                started = time.perf_counter()
+                metrics.wait_times.append(started - queued_at)
+                metrics.busy_workers += 1
+                try:
+                    await stage.handler(item)
+                finally:
+                    service_time = time.perf_counter() - started
+                    metrics.busy_workers -= 1
+                    metrics.busy_time += service_time
+                    metrics.service_times.append(service_time)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.failed += 1
+                self.failed += 1
+                await self._notify(self.on_error, item, stage.name, e)
+            else:
+                metrics.processed += 1
+                if next_queue is not None:
+                    # Blocks while the next stage is full (backpressure)
+                    await next_queue.put((item, time.perf_counter()))
+                else:
+                    self.completed += 1
+                    await self._notify(self.on_complete, item)
+            finally:
+                queue.task_done()
+
+    async def _notify(self, callback: Optional[Callable[..., Any]], *args):
+        """Call a completion or error callback, awaiting coroutines."""
+        if callback is None:
+            return
+        try:
+            result = callback(*args)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            self.logger.error(f"Error in pipeline callback: {e}")
@@ -12,11 +12,14 @@ import hashlib
 import logging
 import mimetypes
 import os
+import shutil
+import time
 import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 
 import exifread
 import nltk
@@ -24,9 +27,12 @@ import pytesseract
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import sent_tokenize, word_tokenize
+from PIL import Image
 
 from ...taskmaster.models.job import Job, JobPriority, JobStatus, JobType
-import hashlib
+from .evidence_cache import EvidenceResultCache
+from .evidence_pipeline import PipelineStage, StagedPipeline
+from .file_hashing import MultiDigestHasher
 import logging
 import mimetypes
 import os
@@ -150,6 +156,67 @@ class ProcessingResult:
     timestamp: datetime
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class EvidenceWorkItem:
+    """A file moving through the processing pipeline."""
+
+    file_id: str
+    file_metadata: FileMetadata
+    start_time: float
+    processing_stages: List[ProcessingStage] = field(default_factory=list)
+    processing_errors: List[str] = field(default_factory=list)
+    exif_data: Optional[EXIFData] = None
+    ocr_result: Optional[OCRResult] = None
+    nlp_analysis: Optional[NLPAnalysis] = None
+    cache_hit: bool = False
+    # Whether this item analyses the file for identical files in flight
+    caches_results: bool = False
+
+
+def analyze_text_file(file_path: str) -> NLPAnalysis:
+    """NLP analysis of a text file; runs in the CPU process pool."""
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        text_content = f.read()
+
+    # Basic NLP analysis
+    words = word_tokenize(text_content)
+    sentences = sent_tokenize(text_content)
+
+    # Entity extraction (simplified)
+    entities = []
+    key_phrases = []
+
+    # Simple named entity detection
+    named_entities = []
+
+    # Sentiment analysis (simplified)
+    positive_words = ["good", "great", "excellent", "positive", "happy"]
+    negative_words = ["bad", "terrible", "awful", "negative", "sad"]
+
+    positive_count = sum(1 for word in words if word.lower() in positive_words)
+    negative_count = sum(1 for word in words if word.lower() in negative_words)
+
+    if positive_count + negative_count > 0:
+        sentiment_score = (positive_count - negative_count) / (
+            positive_count + negative_count
+        )
+    else:
+        sentiment_score = 0.0
+
+    # Language detection (simplified)
+    language_detected = "en"  # Placeholder
+
+    return NLPAnalysis(
+        entities=entities,
+        key_phrases=key_phrases,
+        sentiment_score=sentiment_score,
+        language_detected=language_detected,
+        word_count=len(words),
+        sentence_count=len(sentences),
+        named_entities=named_entities,
+    )
+
+
 class EvidenceProcessor:
     """
     Comprehensive evidence processing system.
@@ -204,8 +271,58 @@ class EvidenceProcessor:
         # Processing components
         self.file_metadata: Dict[str, FileMetadata] = {}
         self.processing_results: Dict[str, ProcessingResult] = {}
+        # Files uploaded before the pipeline is started
         self.processing_queue: List[str] = []
-        self.active_processing: Dict[str, asyncio.Task] = {}
+
+        # Blocking file work runs in the I/O thread pool, hashing in the
+        # hasher's pool and NLP in a process pool created on first use
+        self.upload_concurrency = config.get("upload_concurrency", 16)
+        self.io_executor = ThreadPoolExecutor(
+            max_workers=config.get("io_workers", 16), thread_name_prefix="evidence-io"
+        )
+        self.cpu_workers = config.get("cpu_workers", os.cpu_count() or 1)
+        self._cpu_executor: Optional[ProcessPoolExecutor] = None
+        self.hasher = MultiDigestHasher(max_workers=config.get("hash_workers"))
+
+        # Stage results of analysed files, keyed by content, so duplicates
+        # skip extraction and analysis
+        self.result_cache = (
+            EvidenceResultCache(
+                config.get(
+                    "cache_directory",
+                    os.path.join(self.processed_directory, "evidence_cache"),
+                ),
+                max_bytes=config.get("cache_max_bytes", 1 << 30),
+            )
+            if config.get("enable_result_cache", True)
+            else None
+        )
+        self._pending_results: Dict[str, asyncio.Future] = {}
+
+        # Staged pipeline: validation -> metadata -> content -> storage
+        stage_workers = {
+            "validation": 8,
+            "metadata_extraction": 4,
+            "content_analysis": self.cpu_workers,
+            "evidence_storage": 4,
+            **config.get("pipeline_workers", {}),
+        }
+        queue_size = config.get("pipeline_queue_size", 100)
+        self.pipeline = StagedPipeline(
+            [
+                PipelineStage(
+                    name, handler, workers=stage_workers[name], queue_size=queue_size
+                )
+                for name, handler in [
+                    ("validation", self._validation_stage),
+                    ("metadata_extraction", self._metadata_stage),
+                    ("content_analysis", self._content_stage),
+                    ("evidence_storage", self._storage_stage),
+                ]
+            ],
+            on_complete=self._complete_processing,
+            on_error=self._fail_processing,
+        )
 
         # Performance tracking
         self.total_files_processed = 0
@@ -243,8 +360,13 @@ class EvidenceProcessor:
         # Initialize processing components
         await self._initialize_processing_components()
 
+        # Start the pipeline and queue files uploaded before start
+        await self.pipeline.start()
+        pending, self.processing_queue = self.processing_queue, []
+        for file_id in pending:
+            await self._submit(file_id)
+
         # Start background tasks
-        asyncio.create_task(self._process_upload_queue())
         asyncio.create_task(self._cleanup_temp_files())
 
         self.logger.info("EvidenceProcessor started successfully")
@@ -254,8 +376,11 @@ class EvidenceProcessor:
         self.logger.info("Stopping EvidenceProcessor...")
 
         # Cancel active processing
-        for task in self.active_processing.values():
-            task.cancel()
+        await self.pipeline.stop()
+        self.io_executor.shutdown(wait=False)
+        self.hasher.shutdown()
+        if self._cpu_executor is not None:
+            self._cpu_executor.shutdown(wait=False)
 
         self.logger.info("EvidenceProcessor stopped")
 
@@ -279,8 +404,7 @@ class EvidenceProcessor:
             upload_path = os.path.join(self.upload_directory, f"{file_id}_{filename}")
 
             # Copy file
-            with open(file_path, "rb") as src, open(upload_path, "wb") as dst:
-                dst.write(src.read())
+            await self._run_io(shutil.copyfile, file_path, upload_path)
 
             # Create file metadata
             file_metadata = await self._create_file_metadata(
@@ -288,8 +412,11 @@ class EvidenceProcessor:
             )
             self.file_metadata[file_id] = file_metadata
 
-            # Add to processing queue
-            self.processing_queue.append(file_id)
+            # Add to processing queue; waits while the pipeline is full
+            if self.pipeline.running:
+                await self._submit(file_id)
+            else:
+                self.processing_queue.append(file_id)
 
             self.logger.info(f"File uploaded: {file_id} - {filename}")
 
@@ -299,6 +426,51 @@ class EvidenceProcessor:
             self.logger.error(f"Error uploading file: {e}")
             raise
 
+    async def upload_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Upload many files, up to upload_concurrency at a time.
+
+        Returns the IDs of the files uploaded; failures are logged and
+        skipped.
+        """
+        semaphore = asyncio.Semaphore(self.upload_concurrency)
+
+        async def upload(file_path: str) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await self.upload_file(file_path)
+                except Exception:
+                    return None
+
+        file_ids = await asyncio.gather(*(upload(path) for path in file_paths))
+        return [file_id for file_id in file_ids if file_id is not None]
+
+    async def wait_until_processed(self):
+        """Wait until every file submitted to the pipeline has been processed."""
+        await self.pipeline.join()
+
+    async def _submit(self, file_id: str):
+        """Submit an uploaded file to the processing pipeline."""
+        await self.pipeline.submit(
+            EvidenceWorkItem(
+                file_id=file_id,
+                file_metadata=self.file_metadata[file_id],
+                start_time=time.perf_counter(),
+            )
+        )
+
+    async def _run_io(self, func, *args):
+        """Run a blocking call in the I/O thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.io_executor, func, *args
+        )
+
+    def _cpu_pool(self) -> Executor:
+        """The CPU process pool, created on first use."""
+        if self._cpu_executor is None:
+            self._cpu_executor = ProcessPoolExecutor(max_workers=self.cpu_workers)
+        return self._cpu_executor
+
     async def _validate_file(self, file_path: str) -> bool:
         """Validate file for processing."""
         try:
@@ -335,7 +507,7 @@ class EvidenceProcessor:
         """Create file metadata."""
         try:
             # Get file information
-            file_size = os.path.getsize(file_path)
+            file_size = await self._run_io(os.path.getsize, file_path)
             mime_type, _ = mimetypes.guess_type(file_path)
 
             # Determine evidence type
@@ -413,162 +585,252 @@ class EvidenceProcessor:
     async def _calculate_file_hashes(self, file_path: str) -> Tuple[str, str, str]:
         """Calculate file hashes."""
         try:
-            hash_md5 = hashlib.md5()
-            hash_sha256 = hashlib.sha256()
-            hash_sha512 = hashlib.sha512()
-
-            with open(file_path, "rb") as f:
-                while chunk := f.read(8192):
-                    hash_md5.update(chunk)
-                    hash_sha256.update(chunk)
-                    hash_sha512.update(chunk)
-
-            return (
-                hash_md5.hexdigest(),
-                hash_sha256.hexdigest(),
-                hash_sha512.hexdigest(),
+            # One read of the file feeds all three digests, off the event loop
+            file_digests = await asyncio.get_running_loop().run_in_executor(
+                self.hasher.executor,
+                self.hasher.hash_file,
+                file_path,
+                ["md5", "sha256", "sha512"],
             )
+            digests = file_digests.digests
+
+            return digests["md5"], digests["sha256"], digests["sha512"]
 
         except Exception as e:
             self.logger.error(f"Error calculating file hashes: {e}")
             raise
 
-    async def _process_upload_queue(self):
-        """Process files in the upload queue."""
-        while True:
-            try:
-                if (
-                    self.processing_queue and len(self.active_processing) < 5
-                ):  # Max 5 concurrent
-                    file_id = self.processing_queue.pop(0)
-
-                    # Start processing
-                    task = asyncio.create_task(self._process_file(file_id))
-                    self.active_processing[file_id] = task
+    async def _validation_stage(self, item: EvidenceWorkItem):
+        """Pipeline stage: check the uploaded file and its hashes."""
+        item.processing_stages.append(ProcessingStage.VALIDATION)
+        if not await self._validate_uploaded_file(item.file_metadata):
+            item.processing_errors.append("File validation failed")
+            raise ValueError("File validation failed")
+
+        item.processing_stages.append(ProcessingStage.HASH_VERIFICATION)
+        if not await self._verify_file_hashes(item.file_metadata):
+            item.processing_errors.append("Hash verification failed")
+            raise ValueError("Hash verification failed")
+
+    async def _metadata_stage(self, item: EvidenceWorkItem):
+        """Pipeline stage: extract EXIF metadata from images."""
+        if await self._load_cached_results(item):
+            return
+
+        item.processing_stages.append(ProcessingStage.METADATA_EXTRACTION)
+        if item.file_metadata.evidence_type == EvidenceType.IMAGE:
+            item.exif_data = await self._extract_exif_data(item.file_metadata)
+
+    async def _content_stage(self, item: EvidenceWorkItem):
+        """Pipeline stage: OCR documents and analyse text."""
+        if item.cache_hit:
+            return
+
+        item.processing_stages.append(ProcessingStage.CONTENT_ANALYSIS)
+        evidence_type = item.file_metadata.evidence_type
+
+        if evidence_type == EvidenceType.DOCUMENT:
+            item.ocr_result = await self._perform_ocr_processing(item.file_metadata)
+
+        if evidence_type in [EvidenceType.TEXT, EvidenceType.CHAT_LOG]:
+            item.nlp_analysis = await self._perform_nlp_analysis(item.file_metadata)
+
+        if item.caches_results:
+            await self._store_cached_results(item)
+
+    async def _storage_stage(self, item: EvidenceWorkItem):
+        """Pipeline stage: store the processed evidence."""
+        item.processing_stages.append(ProcessingStage.EVIDENCE_STORAGE)
+        await self._store_evidence(item.file_metadata)
+        item.processing_stages.append(ProcessingStage.COMPLETION)
+
+    def _result_cache_key(self, file_metadata: FileMetadata) -> str:
+        """Cache key of a file: its SHA-256 and the evidence type analysed."""
+        return f"{file_metadata.hash_sha256}-{file_metadata.evidence_type.value}"
+
+    async def _load_cached_results(self, item: EvidenceWorkItem) -> bool:
+        """
+        Fill in the stage results of a file already analysed.
+
+        When an identical file is being analysed, waits for it first. On a
+        miss, the item takes over analysing the file for later duplicates.
+        """
+        if self.result_cache is None:
+            return False
 
-                await asyncio.sleep(1)  # Check queue every second
+        key = self._result_cache_key(item.file_metadata)
+        pending = self._pending_results.get(key)
+        if pending is not None:
+            await asyncio.shield(pending)
+        else:
+            self._pending_results[key] = asyncio.get_running_loop().create_future()
+            item.caches_results = True
 
-            except Exception as e:
-                self.logger.error(f"Error processing upload queue: {e}")
-                await asyncio.sleep(5)
+        cached = await self._run_io(self.result_cache.get, key)
+        if cached is None:
+            return False
 
-    async def _process_file(self, file_id: str):
-        """Process a single file."""
         try:
-            start_time = datetime.utcnow()
-
-            if file_id not in self.file_metadata:
-                raise ValueError(f"File metadata not found: {file_id}")
-
-            file_metadata = self.file_metadata[file_id]
-            processing_stages = []
-            processing_errors = []
-
-            self.logger.info(f"Starting processing for file: {file_id}")
-
-            # Stage 1: Validation
-            processing_stages.append(ProcessingStage.VALIDATION)
-            if not await self._validate_uploaded_file(file_metadata):
-                processing_errors.append("File validation failed")
-                raise ValueError("File validation failed")
-
-            # Stage 2: Hash verification
-            processing_stages.append(ProcessingStage.HASH_VERIFICATION)
-            if not await self._verify_file_hashes(file_metadata):
-                processing_errors.append("Hash verification failed")
-                raise ValueError("Hash verification failed")
-
-            # Stage 3: Metadata extraction
-            processing_stages.append(ProcessingStage.METADATA_EXTRACTION)
-            exif_data = None
-            if file_metadata.evidence_type == EvidenceType.IMAGE:
-                exif_data = await self._extract_exif_data(file_metadata)
-
-            # Stage 4: Content analysis
-            processing_stages.append(ProcessingStage.CONTENT_ANALYSIS)
-            ocr_result = None
-            nlp_analysis = None
-
-            if file_metadata.evidence_type == EvidenceType.DOCUMENT:
-                ocr_result = await self._perform_ocr_processing(file_metadata)
-
-            if file_metadata.evidence_type in [
-                EvidenceType.TEXT,
-                EvidenceType.CHAT_LOG,
-            ]:
-                nlp_analysis = await self._perform_nlp_analysis(file_metadata)
-
-            # Stage 5: Evidence storage
-            processing_stages.append(ProcessingStage.EVIDENCE_STORAGE)
-            await self._store_evidence(file_metadata)
+            item.exif_data, item.ocr_result, item.nlp_analysis = (
+                self._decode_cached_results(cached)
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Ignoring malformed cache entry {key}: {e}")
+            item.exif_data = item.ocr_result = item.nlp_analysis = None
+            return False
 
-            # Stage 6: Completion
-            processing_stages.append(ProcessingStage.COMPLETION)
+        item.cache_hit = True
+        self._release_pending_results(item)
+        return True
 
-            # Calculate processing time
-            end_time = datetime.utcnow()
-            processing_time = (end_time - start_time).total_seconds()
-
-            # Create processing result
-            processing_result = ProcessingResult(
-                result_id=str(uuid.uuid4()),
-                file_id=file_id,
-                processing_status=ProcessingStatus.COMPLETED,
-                processing_stages=processing_stages,
-                file_metadata=file_metadata,
-                exif_data=exif_data,
-                ocr_result=ocr_result,
-                nlp_analysis=nlp_analysis,
-                processing_errors=processing_errors,
-                processing_time=processing_time,
-                timestamp=datetime.utcnow(),
+    async def _store_cached_results(self, item: EvidenceWorkItem):
+        """Cache the stage results of a file and release waiting duplicates."""
+        key = self._result_cache_key(item.file_metadata)
+        try:
+            missing = self._missing_stage_results(item)
+            if missing:
+                # A failed stage must be retried, not replayed for duplicates
+                self.logger.info(
+                    f"Not caching results of {item.file_id}: no {', '.join(missing)}"
+                )
+                return
+            await self._run_io(
+                self.result_cache.put, key, self._encode_cached_results(item)
             )
+        except Exception as e:
+            self.logger.warning(f"Could not cache results of {item.file_id}: {e}")
+        finally:
+            self._release_pending_results(item)
+
+    def _missing_stage_results(self, item: EvidenceWorkItem) -> List[str]:
+        """Stage results the item's evidence type should have but does not."""
+        evidence_type = item.file_metadata.evidence_type
+        missing = []
+        if evidence_type == EvidenceType.IMAGE and item.exif_data is None:
+            missing.append("exif_data")
+        if evidence_type == EvidenceType.DOCUMENT and item.ocr_result is None:
+            missing.append("ocr_result")
+        if (
+            evidence_type in [EvidenceType.TEXT, EvidenceType.CHAT_LOG]
+            and item.nlp_analysis is None
+        ):
+            missing.append("nlp_analysis")
+        return missing
+
+    def _encode_cached_results(self, item: EvidenceWorkItem) -> Dict[str, Any]:
+        """The stage results of an item as JSON-serialisable data."""
+        exif_data = None
+        if item.exif_data is not None:
+            exif_data = asdict(item.exif_data)
+            if item.exif_data.date_taken is not None:
+                exif_data["date_taken"] = item.exif_data.date_taken.isoformat()
 
-            # Store result
-            self.processing_results[processing_result.result_id] = processing_result
+        return {
+            "exif_data": exif_data,
+            "ocr_result": asdict(item.ocr_result) if item.ocr_result else None,
+            "nlp_analysis": (
+                asdict(item.nlp_analysis) if item.nlp_analysis else None
+            ),
+        }
 
-            # Update statistics
-            self.total_files_processed += 1
-            self.successful_processing += 1
+    def _decode_cached_results(
+        self, cached: Dict[str, Any]
+    ) -> Tuple[Optional[EXIFData], Optional[OCRResult], Optional[NLPAnalysis]]:
+        """Rebuild the stage results stored by _encode_cached_results."""
+        exif_data = None
+        if cached["exif_data"] is not None:
+            fields = dict(cached["exif_data"])
+            if fields["date_taken"] is not None:
+                fields["date_taken"] = datetime.fromisoformat(fields["date_taken"])
+            fields["image_dimensions"] = tuple(fields["image_dimensions"])
+            exif_data = EXIFData(**fields)
+
+        ocr_result = cached["ocr_result"]
+        nlp_analysis = cached["nlp_analysis"]
+        return (
+            exif_data,
+            OCRResult(**ocr_result) if ocr_result is not None else None,
+            NLPAnalysis(**nlp_analysis) if nlp_analysis is not None else None,
+        )
 
-            self.logger.info(
-                f"File processing completed: {file_id} in {processing_time:.2f}s"
-            )
+    def _release_pending_results(self, item: EvidenceWorkItem):
+        """Wake duplicates waiting on this item's analysis."""
+        if not item.caches_results:
+            return
+        item.caches_results = False
+        pending = self._pending_results.pop(
+            self._result_cache_key(item.file_metadata), None
+        )
+        if pending is not None and not pending.done():
+            pending.set_result(None)
+
+    def _complete_processing(self, item: EvidenceWorkItem):
+        """Record the result of a file that cleared every stage."""
+        processing_time = time.perf_counter() - item.start_time
+
+        # Create processing result
+        processing_result = ProcessingResult(
+            result_id=str(uuid.uuid4()),
+            file_id=item.file_id,
+            processing_status=ProcessingStatus.COMPLETED,
+            processing_stages=item.processing_stages,
+            file_metadata=item.file_metadata,
+            exif_data=item.exif_data,
+            ocr_result=item.ocr_result,
+            nlp_analysis=item.nlp_analysis,
+            processing_errors=item.processing_errors,
+            processing_time=processing_time,
+            timestamp=datetime.utcnow(),
+            metadata={"cache_hit": item.cache_hit},
+        )
 
-        except Exception as e:
-            self.logger.error(f"Error processing file {file_id}: {e}")
+        # Store result
+        self.processing_results[processing_result.result_id] = processing_result
 
-            # Create failed result
-            processing_result = ProcessingResult(
-                result_id=str(uuid.uuid4()),
-                file_id=file_id,
-                processing_status=ProcessingStatus.FAILED,
-                processing_stages=(
-                    processing_stages if "processing_stages" in locals() else []
-                ),
-                file_metadata=file_metadata if "file_metadata" in locals() else None,
-                exif_data=None,
-                ocr_result=None,
-                nlp_analysis=None,
-                processing_errors=[str(e)],
-                processing_time=0.0,
-                timestamp=datetime.utcnow(),
-            )
+        # Update statistics
+        self.total_files_processed += 1
+        self.successful_processing += 1
+        self.average_processing_time += (
+            processing_time - self.average_processing_time
+        ) / self.successful_processing
+
+        self.logger.info(
+            f"File processing completed: {item.file_id} in {processing_time:.2f}s"
+        )
 
-            # Store result
-            self.processing_results[processing_result.result_id] = processing_result
+    def _fail_processing(self, item: EvidenceWorkItem, stage: str, error: Exception):
+        """Record the result of a file whose processing failed."""
+        self.logger.error(f"Error processing file {item.file_id} ({stage}): {error}")
+        self._release_pending_results(item)
+
+        # Create failed result
+        processing_result = ProcessingResult(
+            result_id=str(uuid.uuid4()),
+            file_id=item.file_id,
+            processing_status=ProcessingStatus.FAILED,
+            processing_stages=item.processing_stages,
+            file_metadata=item.file_metadata,
+            exif_data=None,
+            ocr_result=None,
+            nlp_analysis=None,
+            processing_errors=[str(error)],
+            processing_time=time.perf_counter() - item.start_time,
+            timestamp=datetime.utcnow(),
+        )
 
-            # Update statistics
-            self.total_files_processed += 1
-            self.failed_processing += 1
+        # Store result
+        self.processing_results[processing_result.result_id] = processing_result
 
-        finally:
-            # Remove from active processing
-            if file_id in self.active_processing:
-                del self.active_processing[file_id]
+        # Update statistics
+        self.total_files_processed += 1
+        self.failed_processing += 1
 
     async def _validate_uploaded_file(self, file_metadata: FileMetadata) -> bool:
         """Validate uploaded file."""
+        return await self._run_io(self._check_uploaded_file, file_metadata)
+
+    def _check_uploaded_file(self, file_metadata: FileMetadata) -> bool:
+        """Check that an uploaded file is intact and readable; blocking."""
         try:
             # Check if file still exists
             if not os.path.exists(file_metadata.file_path):
@@ -619,6 +881,10 @@ class EvidenceProcessor:
         self, file_metadata: FileMetadata
     ) -> Optional[EXIFData]:
         """Extract EXIF data from image files."""
+        return await self._run_io(self._read_exif_data, file_metadata)
+
+    def _read_exif_data(self, file_metadata: FileMetadata) -> Optional[EXIFData]:
+        """Read and parse the EXIF tags of an image; blocking."""
         try:
             if file_metadata.evidence_type != EvidenceType.IMAGE:
                 return None
@@ -681,6 +947,12 @@ class EvidenceProcessor:
         self, file_metadata: FileMetadata
     ) -> Optional[OCRResult]:
         """Perform OCR processing on documents."""
+        # Tesseract runs as a subprocess, so a thread is enough to keep the
+        # event loop free
+        return await self._run_io(self._ocr_document, file_metadata)
+
+    def _ocr_document(self, file_metadata: FileMetadata) -> Optional[OCRResult]:
+        """OCR a document; blocking."""
         try:
             if file_metadata.evidence_type != EvidenceType.DOCUMENT:
                 return None
@@ -738,48 +1010,9 @@ class EvidenceProcessor:
             ]:
                 return None
 
-            # Read file content
-            with open(
-                file_metadata.file_path, "r", encoding="utf-8", errors="ignore"
-            ) as f:
-                text_content = f.read()
-
-            # Basic NLP analysis
-            words = word_tokenize(text_content)
-            sentences = sent_tokenize(text_content)
-
-            # Entity extraction (simplified)
-            entities = []
-            key_phrases = []
-
-            # Simple named entity detection
-            named_entities = []
-
-            # Sentiment analysis (simplified)
-            positive_words = ["good", "great", "excellent", "positive", "happy"]
-            negative_words = ["bad", "terrible", "awful", "negative", "sad"]
-
-            positive_count = sum(1 for word in words if word.lower() in positive_words)
-            negative_count = sum(1 for word in words if word.lower() in negative_words)
-
-            if positive_count + negative_count > 0:
-                sentiment_score = (positive_count - negative_count) / (
-                    positive_count + negative_count
-                )
-            else:
-                sentiment_score = 0.0
-
-            # Language detection (simplified)
-            language_detected = "en"  # Placeholder
-
-            nlp_analysis = NLPAnalysis(
-                entities=entities,
-                key_phrases=key_phrases,
-                sentiment_score=sentiment_score,
-                language_detected=language_detected,
-                word_count=len(words),
-                sentence_count=len(sentences),
-                named_entities=named_entities,
+            # Tokenising is pure Python, so it runs in the process pool
+            nlp_analysis = await asyncio.get_running_loop().run_in_executor(
+                self._cpu_pool(), analyze_text_file, file_metadata.file_path
             )
 
             return nlp_analysis
@@ -798,11 +1031,7 @@ class EvidenceProcessor:
             )
 
             # Copy file to processed directory
-            with (
-                open(file_metadata.file_path, "rb") as src,
-                open(processed_path, "wb") as dst,
-            ):
-                dst.write(src.read())
+            await self._run_io(shutil.copyfile, file_metadata.file_path, processed_path)
 
             # Update file path
             file_metadata.file_path = processed_path
@@ -870,8 +1099,12 @@ class EvidenceProcessor:
             "successful_processing": self.successful_processing,
             "failed_processing": self.failed_processing,
             "average_processing_time": self.average_processing_time,
-            "files_in_queue": len(self.processing_queue),
-            "active_processing": len(self.active_processing),
+            "files_in_queue": len(self.processing_queue) + self.pipeline.pending(),
+            "active_processing": self.pipeline.in_flight(),
+            "pipeline": self.pipeline.get_statistics(),
+            "result_cache": (
+                self.result_cache.get_statistics() if self.result_cache else None
+            ),
             "evidence_types_supported": [t.value for t in EvidenceType],
             "processing_stages_supported": [s.value for s in ProcessingStage],
             "supported_formats": self.supported_formats,
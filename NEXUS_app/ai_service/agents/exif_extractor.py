@@ -11,9 +11,10 @@ import asyncio
 import logging
 import os
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 from dataclasses import dataclass, field
 
 import exifread
@@ -39,6 +40,8 @@ except ImportError:
     PIXEXIF_AVAILABLE = False
 
 from ..taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .exif_reader import HEADER_READ_BYTES, BulkEXIFReader, MetadataHeader, RawEXIFTags
+from .spatial_index import resolve_spatial_index
 
 class ImageFormat(Enum):
     """Supported image formats."""
@@ -187,12 +190,25 @@ class EXIFExtractor:
         # Configuration
         self.supported_formats = config.get(
             "supported_formats",
-            ["jpeg", "jpg", "png", "tiff", "tif", "gif", "bmp", "webp"],
+            ["jpeg", "jpg", "png", "tiff", "tif", "gif", "bmp", "webp", "heic", "heif"],
         )
         self.extraction_timeout = config.get("extraction_timeout", 60)  # 1 minute
         self.enable_advanced_parsing = config.get("enable_advanced_parsing", True)
         self.gps_precision = config.get("gps_precision", 6)  # Decimal places for GPS
 
+        # Batch extraction reads only each file's header region, parsing
+        # several files per task in a process pool
+        self.bulk_reader = BulkEXIFReader(
+            max_workers=config.get("batch_workers"),
+            max_in_flight=config.get("batch_tasks_in_flight"),
+            files_per_task=config.get("batch_files_per_task", 16),
+            header_bytes=config.get("header_read_bytes", HEADER_READ_BYTES),
+        )
+
+        # GPS positions of extracted images are added to the shared spatial
+        # index, when one is configured
+        self.spatial_index = resolve_spatial_index(config.get("spatial_index"))
+
         # Metadata management
         self.extracted_metadata: Dict[str, EXIFMetadata] = {}
         self.metadata_history: Dict[str, List[str]] = defaultdict(list)
@@ -224,6 +240,7 @@ class EXIFExtractor:
     async def stop(self):
         """Stop the EXIFExtractor."""
         self.logger.info("Stopping EXIFExtractor...")
+        self.bulk_reader.shutdown()
         self.logger.info("EXIFExtractor stopped")
 
     async def extract_metadata(self, file_path: str) -> EXIFMetadata:
@@ -275,6 +292,7 @@ class EXIFExtractor:
 
             # Store metadata
             self.extracted_metadata[exif_metadata.metadata_id] = exif_metadata
+            self._index_location(exif_metadata)
 
             # Update history
             file_id = str(uuid.uuid4())  # Generate file ID
@@ -293,30 +311,124 @@ class EXIFExtractor:
         except Exception as e:
             self.logger.error(f"Error extracting EXIF metadata: {e}")
 
-            # Create failed metadata object
-            failed_metadata = EXIFMetadata(
-                metadata_id=str(uuid.uuid4()),
-                file_path=file_path,
-                image_format=ImageFormat.UNKNOWN,
-                extraction_status=ExtractionStatus.FAILED,
-                camera_info=None,
-                gps_data=None,
-                timestamp_info=None,
-                technical_data=None,
-                editing_info=None,
-                raw_exif={},
-                extraction_time=0.0,
-                timestamp=datetime.utcnow(),
+            # Create and store failed metadata object
+            self._failed_metadata(file_path, str(e))
+
+            raise
+
+    async def extract_metadata_batch(
+        self, file_paths: Iterable[str]
+    ) -> AsyncIterator[EXIFMetadata]:
+        """
+        Extract metadata from many image files, yielding each as it completes.
+
+        Each file is opened once and only its metadata header region is
+        read; parsing runs in the bulk reader's worker pool. Results come in
+        completion order. ``raw_exif`` is a RawEXIFTags view whose strings
+        are built on first access. Files that cannot be read are yielded
+        with FAILED status instead of raising.
+        """
+        rejected: List[str] = []
+
+        def supported_paths():
+            for file_path in file_paths:
+                extension = os.path.splitext(file_path)[1].lower().lstrip(".")
+                if extension in self.supported_formats:
+                    yield file_path
+                else:
+                    rejected.append(file_path)
+
+        async for header in self.bulk_reader.read_headers(
+            supported_paths(), details=self.enable_advanced_parsing
+        ):
+            while rejected:
+                yield self._failed_metadata(rejected.pop(), "Unsupported image format")
+            yield self._metadata_from_header(header)
+
+        while rejected:
+            yield self._failed_metadata(rejected.pop(), "Unsupported image format")
+
+    def _metadata_from_header(self, header: MetadataHeader) -> EXIFMetadata:
+        """Build and store the EXIFMetadata of a bulk-read header."""
+        if header.error is not None:
+            return self._failed_metadata(header.file_path, header.error)
+
+        if header.image_format:
+            image_format = ImageFormat(header.image_format)
+        else:
+            image_format = self._determine_image_format(header.file_path)
+
+        tags = header.tags
+        technical_data = self._extract_technical_data(tags) if tags else None
+        size = header.image_info.get("size")
+        if size and (technical_data is None or technical_data.image_width is None):
+            technical_data = self._basic_technical_data(
+                size, header.image_info.get("mode")
             )
 
-            # Store failed metadata
-            self.extracted_metadata[failed_metadata.metadata_id] = failed_metadata
+        exif_metadata = EXIFMetadata(
+            metadata_id=str(uuid.uuid4()),
+            file_path=header.file_path,
+            image_format=image_format,
+            extraction_status=(
+                ExtractionStatus.COMPLETED
+                if tags or size
+                else ExtractionStatus.NO_METADATA
+            ),
+            camera_info=self._extract_camera_info(tags) if tags else None,
+            gps_data=self._extract_gps_data(tags) if tags else None,
+            timestamp_info=self._extract_timestamp_info(tags) if tags else None,
+            technical_data=technical_data,
+            editing_info=self._extract_editing_info(tags) if tags else None,
+            raw_exif=RawEXIFTags(tags, header.image_info),
+            extraction_time=header.parse_time,
+            timestamp=datetime.utcnow(),
+            metadata={"file_size": header.file_size, "bytes_read": header.bytes_read},
+        )
 
-            # Update statistics
-            self.total_extractions += 1
-            self.failed_extractions += 1
+        self.extracted_metadata[exif_metadata.metadata_id] = exif_metadata
+        self._index_location(exif_metadata)
+        self.total_extractions += 1
+        self.successful_extractions += 1
+        return exif_metadata
 
-            raise
+    def _index_location(self, exif_metadata: EXIFMetadata):
+        """Add the GPS position of an image to the shared spatial index."""
+        if self.spatial_index is None:
+            return
+        try:
+            self.spatial_index.add_exif_metadata(exif_metadata)
+        except ValueError as e:
+            self.logger.warning(
+                f"Not indexing GPS position of {exif_metadata.file_path}: {e}"
+            )
+
+    def _failed_metadata(self, file_path: str, error: str) -> EXIFMetadata:
+        """Build and store the EXIFMetadata of a failed extraction."""
+        failed_metadata = EXIFMetadata(
+            metadata_id=str(uuid.uuid4()),
+            file_path=file_path,
+            image_format=ImageFormat.UNKNOWN,
+            extraction_status=ExtractionStatus.FAILED,
+            camera_info=None,
+            gps_data=None,
+            timestamp_info=None,
+            technical_data=None,
+            editing_info=None,
+            raw_exif={},
+            extraction_time=0.0,
+            timestamp=datetime.utcnow(),
+            metadata={"error": error},
+        )
+
+        # Store failed metadata
+        self.extracted_metadata[failed_metadata.metadata_id] = failed_metadata
+
+        # Update statistics
+        self.total_extractions += 1
+        self.failed_extractions += 1
+
+        return failed_metadata
 
     async def _validate_image_format(self, file_path: str) -> bool:
         """Validate image format."""
@@ -357,7 +469,7 @@ class EXIFExtractor:
                 return ImageFormat.BMP
             elif file_extension == "webp":
                 return ImageFormat.WEBP
-            elif file_extension == "heic":
+            elif file_extension in ["heic", "heif"]:
                 return ImageFormat.HEIC
             else:
                 return ImageFormat.UNKNOWN
@@ -468,17 +580,19 @@ class EXIFExtractor:
 
             if "GPS GPSLatitude" in tags and "GPS GPSLongitude" in tags:
                 latitude = self._convert_gps_coordinate(
-                    tags["GPS GPSLatitude"], tags.get("GPS GPSLatitudeRef", "N")
+                    tags["GPS GPSLatitude"], str(tags.get("GPS GPSLatitudeRef", "N"))
                 )
                 longitude = self._convert_gps_coordinate(
-                    tags["GPS GPSLongitude"], tags.get("GPS GPSLongitudeRef", "E")
+                    tags["GPS GPSLongitude"], str(tags.get("GPS GPSLongitudeRef", "E"))
                 )
 
             if "GPS GPSAltitude" in tags:
-                altitude = float(tags["GPS GPSAltitude"].num) / float(
-                    tags["GPS GPSAltitude"].den
-                )
-                if "GPS GPSAltitudeRef" in tags and tags["GPS GPSAltitudeRef"].num == 1:
+                altitude = self._tag_number(tags["GPS GPSAltitude"])
+                if (
+                    altitude is not None
+                    and "GPS GPSAltitudeRef" in tags
+                    and self._tag_number(tags["GPS GPSAltitudeRef"]) == 1
+                ):
                     altitude = -altitude
 
             # GPS references
@@ -542,18 +656,20 @@ class EXIFExtractor:
             if not coordinate:
                 return None
 
-            # Parse coordinate components
-            parts = str(coordinate).split(",")
+            # Parse coordinate components: exifread tags hold ratios in
+            # ``values``; otherwise parse "[d, m, s]" text
+            values = getattr(coordinate, "values", None)
+            if values is None:
+                values = str(coordinate).strip("[]").split(",")
+            parts = [self._ratio_value(value) for value in values]
             if len(parts) >= 3:
-                degrees = float(parts[0])
-                minutes = float(parts[1])
-                seconds = float(parts[2])
+                degrees, minutes, seconds = parts[:3]
 
                 # Convert to decimal
                 decimal = degrees + (minutes / 60.0) + (seconds / 3600.0)
 
                 # Apply reference
-                if ref in ["S", "W"]:
+                if ref.strip().upper() in ["S", "W"]:
                     decimal = -decimal
 
                 # Round to specified precision
@@ -565,6 +681,27 @@ class EXIFExtractor:
             self.logger.error(f"Error converting GPS coordinate: {e}")
             return None
 
+    @staticmethod
+    def _ratio_value(value) -> float:
+        """A ratio (num/den), fraction, number or "a/b" string as a float."""
+        if hasattr(value, "num") and hasattr(value, "den"):
+            return float(value.num) / float(value.den)
+        text = str(value).strip()
+        if "/" in text:
+            num, den = text.split("/", 1)
+            return float(num) / float(den)
+        return float(text)
+
+    def _tag_number(self, tag) -> Optional[float]:
+        """The first value of an EXIF tag as a float, or None."""
+        values = getattr(tag, "values", None)
+        try:
+            if isinstance(values, (list, tuple)):
+                return self._ratio_value(values[0]) if values else None
+            return self._ratio_value(tag)
+        except (TypeError, ValueError, ZeroDivisionError):
+            return None
+
     def _extract_timestamp_info(self, tags: Dict) -> Optional[TimestampInfo]:
         """Extract timestamp information from EXIF tags."""
         try:
@@ -835,33 +972,37 @@ class EXIFExtractor:
                 }
 
             # Extract technical data
-            technical_data = TechnicalData(
-                image_width=metadata["raw_exif"]["size"][0],
-                image_height=metadata["raw_exif"]["size"][1],
-                orientation=None,
-                color_space=metadata["raw_exif"]["mode"],
-                bits_per_sample=None,
-                compression=None,
-                x_resolution=None,
-                y_resolution=None,
-                resolution_unit=None,
-                exposure_time=None,
-                f_number=None,
-                iso_speed=None,
-                flash=None,
-                focal_length=None,
-                white_balance=None,
-                metering_mode=None,
+            metadata["technical_data"] = self._basic_technical_data(
+                metadata["raw_exif"]["size"], metadata["raw_exif"]["mode"]
             )
 
-            metadata["technical_data"] = technical_data
-
             return metadata
 
         except Exception as e:
             self.logger.error(f"Error extracting PNG metadata: {e}")
             raise
 
+    def _basic_technical_data(self, size, mode: Optional[str]) -> TechnicalData:
+        """Technical data holding only the image size and mode."""
+        return TechnicalData(
+            image_width=size[0],
+            image_height=size[1],
+            orientation=None,
+            color_space=mode,
+            bits_per_sample=None,
+            compression=None,
+            x_resolution=None,
+            y_resolution=None,
+            resolution_unit=None,
+            exposure_time=None,
+            f_number=None,
+            iso_speed=None,
+            flash=None,
+            focal_length=None,
+            white_balance=None,
+            metering_mode=None,
+        )
+
     async def _extract_heic_metadata(self, file_path: str) -> Dict[str, Any]:
         """Extract metadata from HEIC files."""
         try:
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+EXIF Reader - Bulk, Header-Only Image Metadata Reading
+
+This module implements the BulkEXIFReader used by the EXIFExtractor for
+batch extraction:
+
+- Each file is opened once and its first ``header_bytes`` are read in a
+  single call. EXIF in JPEG (APP1), PNG (eXIf and text chunks) and HEIC
+  (the Exif item of the ``meta`` box) almost always lies within that
+  region; the parsers read through a HeaderSource that serves reads from
+  the prefix and only goes back to the file for data past it.
+- The format is sniffed from the header bytes, so renamed files are read
+  with the right parser.
+- Files are parsed in a process pool, several files per task, with a
+  bounded number of tasks in flight. Results stream back as they complete.
+- Tags are returned as parsed; raw tag strings are only built when the
+  RawEXIFTags view is first read.
+
+The parsers are module functions so they can run in the workers.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import struct
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import exifread
+
+try:
+    from PIL import Image
+
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Bytes read up front from each file
+HEADER_READ_BYTES = 128 << 10
+
+# ISO-BMFF brands of HEIF/HEIC files
+HEIF_BRANDS = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1"}
+
+
+@dataclass
+class MetadataHeader:
+    """Metadata read from the header region of one image file."""
+
+    file_path: str
+    image_format: Optional[str]  # Sniffed from the content; None if unknown
+    tags: Dict[str, Any] = field(default_factory=dict)  # exifread tags
+    image_info: Dict[str, Any] = field(default_factory=dict)
+    file_size: int = 0
+    bytes_read: int = 0
+    reads: int = 0
+    parse_time: float = 0.0
+    error: Optional[str] = None
+
+
+class RawEXIFTags(Mapping):
+    """Read-only raw EXIF mapping whose tag strings are built on first access."""
+
+    def __init__(self, tags: Dict[str, Any], extra: Optional[Dict[str, Any]] = None):
+        """Wrap parsed tags and any non-EXIF image information."""
+        self._tags = tags
+        self._extra = extra or {}
+        self._values: Optional[Dict[str, Any]] = None
+
+    @property
+    def materialized(self) -> bool:
+        """Whether the tag strings have been built."""
+        return self._values is not None
+
+    def _materialize(self) -> Dict[str, Any]:
+        """Build the tag strings once."""
+        if self._values is None:
+            values = {str(tag): str(value) for tag, value in self._tags.items()}
+            values.update(self._extra)
+            self._values = values
+        return self._values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._materialize()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return len(self._tags) + len(self._extra)
+
+    def __repr__(self) -> str:
+        if self._values is None:
+            return f"RawEXIFTags({len(self)} tags, not materialized)"
+        return f"RawEXIFTags({self._values!r})"
+
+
+class HeaderSource:
+    """Read-only file object serving reads from a prefix read in one call."""
+
+    def __init__(self, f, prefix_bytes: int):
+        """Read the prefix of an open binary file."""
+        self._file = f
+        self.size = os.fstat(f.fileno()).st_size
+        self.prefix = f.read(prefix_bytes)
+        self.reads = 1
+        self.bytes_read = len(self.prefix)
+        self._position = 0
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        """Read from the current position, going to the file past the prefix."""
+        if size is None or size < 0:
+            end = self.size
+        else:
+            end = min(self._position + size, self.size)
+        if end <= len(self.prefix):
+            data = self.prefix[self._position : end]
+        else:
+            data = self.prefix[self._position :]
+            offset = self._position + len(data)
+            self._file.seek(offset)
+            tail = self._file.read(end - offset)
+            self.reads += 1
+            self.bytes_read += len(tail)
+            data += tail
+        self._position += len(data)
+        return data
+
+    def readline(self, size: Optional[int] = -1) -> bytes:
+        """Read up to and including the next newline."""
+        if size is None or size < 0:
+            end = self.size
+        else:
+            end = min(self._position + size, self.size)
+        data = b""
+        while self._position < end:
+            # The rest of the prefix first, then the file a block at a time
+            if self._position < len(self.prefix):
+                chunk = self.read(min(end, len(self.prefix)) - self._position)
+            else:
+                chunk = self.read(min(end - self._position, 4096))
+            newline = chunk.find(b"\n")
+            if newline >= 0:
+                self._position -= len(chunk) - newline - 1
+                return data + chunk[: newline + 1]
+            data += chunk
+        return data
+
+    def readable(self) -> bool:
+        """Always readable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Always seekable."""
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move the current position."""
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def tell(self) -> int:
+        """The current position."""
+        return self._position
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        """Read ``length`` bytes at ``offset``."""
+        self.seek(offset)
+        return self.read(length)
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """Image format from the leading bytes of a file, or None."""
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[4:8] == b"ftyp" and (
+        data[8:12] in HEIF_BRANDS
+        or any(data[i : i + 4] in HEIF_BRANDS for i in range(16, min(len(data), 64), 4))
+    ):
+        return "heic"
+    if data.startswith(b"BM"):
+        return "bmp"
+    return None
+
+
+def _parse_exif(data, details: bool) -> Dict[str, Any]:
+    """exifread tags of a file object or TIFF/JPEG bytes, without thumbnails."""
+    if isinstance(data, (bytes, bytearray)):
+        if data.startswith(b"Exif\x00\x00"):
+            data = data[6:]
+        data = io.BytesIO(data)
+    return dict(exifread.process_file(data, details=details, extract_thumbnail=False))
+
+
+def _parse_exif_file(source: HeaderSource, header: MetadataHeader, details: bool):
+    """JPEG and TIFF: EXIF IFDs parsed straight from the source."""
+    header.tags = _parse_exif(source, details)
+
+
+def _parse_pil_header(source: HeaderSource, header: MetadataHeader, details: bool):
+    """PNG, GIF, BMP, WebP: image information from PIL's header parse."""
+    if not PIL_AVAILABLE:
+        header.image_info = {"format": (header.image_format or "unknown").upper()}
+        return
+    # Only the sniffed format's plugin is tried; None lets PIL try them all
+    formats = [header.image_format.upper()] if header.image_format else None
+    with Image.open(source, formats=formats) as img:
+        info = dict(img.info)
+        exif = info.pop("exif", None)
+        header.image_info = {
+            "format": img.format,
+            "mode": img.mode,
+            "size": img.size,
+            "info": info,
+        }
+    if exif:
+        header.tags = _parse_exif(exif, details)
+
+
+def _boxes(data: bytes, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """ISO-BMFF boxes in ``data[start:end]`` as (type, payload start, end)."""
+    position = start
+    while position + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, position)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, position + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size:
+            return
+        yield kind, position + header_size, min(position + size, end)
+        position += size
+
+
+def _uint(data: bytes, position: int, size: int) -> int:
+    """Big-endian unsigned integer of ``size`` bytes; 0 when size is 0."""
+    return int.from_bytes(data[position : position + size], "big") if size else 0
+
+
+def _heif_meta(source: HeaderSource) -> Optional[Tuple[bytes, int]]:
+    """The top-level ``meta`` box and the offset of its children."""
+    position = 0
+    while position + 8 <= source.size:
+        box = source.read_at(position, 16)
+        size, kind = struct.unpack_from(">I4s", box)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", box, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = source.size - position
+        if kind == b"meta":
+            # FullBox: version and flags precede the children
+            return source.read_at(position, size), header_size + 4
+        if size < header_size:
+            return None
+        position += size
+    return None
+
+
+def _heif_exif_items(meta: bytes, start: int, end: int) -> List[int]:
+    """Item IDs of Exif items listed in an ``iinf`` box."""
+    version = meta[start]
+    position = start + 4 + (2 if version == 0 else 4)
+    item_ids = []
+    for kind, box_start, _ in _boxes(meta, position, end):
+        if kind != b"infe" or meta[box_start] < 2:
+            continue
+        position = box_start + 4
+        if meta[box_start] == 2:
+            item_id = struct.unpack_from(">H", meta, position)[0]
+            position += 2
+        else:
+            item_id = struct.unpack_from(">I", meta, position)[0]
+            position += 4
+        # Skip item_protection_index
+        if meta[position + 2 : position + 6] == b"Exif":
+            item_ids.append(item_id)
+    return item_ids
+
+
+def _heif_item_locations(
+    meta: bytes, start: int
+) -> Dict[int, Tuple[int, List[Tuple[int, int]]]]:
+    """Construction method and (offset, length) extents of each ``iloc`` item."""
+    version = meta[start]
+    position = start + 4
+    offset_size, length_size = meta[position] >> 4, meta[position] & 0x0F
+    base_offset_size = meta[position + 1] >> 4
+    index_size = meta[position + 1] & 0x0F if version in (1, 2) else 0
+    position += 2
+    id_size = 2 if version < 2 else 4
+    item_count = _uint(meta, position, id_size)
+    position += id_size
+
+    locations = {}
+    for _ in range(item_count):
+        item_id = _uint(meta, position, id_size)
+        position += id_size
+        method = 0
+        if version in (1, 2):
+            method = _uint(meta, position, 2) & 0x0F
+            position += 2
+        position += 2  # data_reference_index
+        base_offset = _uint(meta, position, base_offset_size)
+        position += base_offset_size
+        extent_count = _uint(meta, position, 2)
+        position += 2
+        extents = []
+        for _ in range(extent_count):
+            position += index_size
+            offset = _uint(meta, position, offset_size)
+            position += offset_size
+            length = _uint(meta, position, length_size)
+            position += length_size
+            extents.append((base_offset + offset, length))
+        locations[item_id] = (method, extents)
+    return locations
+
+
+def _parse_heif(source: HeaderSource, header: MetadataHeader, details: bool):
+    """HEIC/HEIF: the Exif item and image size from the ``meta`` box."""
+    found = _heif_meta(source)
+    header.image_info = {"format": "HEIC"}
+    if found is None:
+        return
+    meta, children_start = found
+
+    children = {}
+    for kind, box_start, box_end in _boxes(meta, children_start, len(meta)):
+        children.setdefault(kind, (box_start, box_end))
+
+    # Largest image spatial extent among the item properties
+    if b"iprp" in children:
+        sizes = []
+        for kind, box_start, box_end in _boxes(meta, *children[b"iprp"]):
+            if kind != b"ipco":
+                continue
+            for prop, prop_start, _ in _boxes(meta, box_start, box_end):
+                if prop == b"ispe":
+                    sizes.append(struct.unpack_from(">II", meta, prop_start + 4))
+        if sizes:
+            header.image_info["size"] = max(sizes, key=lambda size: size[0] * size[1])
+
+    if b"iinf" not in children or b"iloc" not in children:
+        return
+    exif_items = _heif_exif_items(meta, *children[b"iinf"])
+    locations = _heif_item_locations(meta, children[b"iloc"][0])
+    for item_id in exif_items:
+        if item_id not in locations:
+            continue
+        method, extents = locations[item_id]
+        if method == 0:
+            payload = b"".join(
+                source.read_at(offset, length or source.size - offset)
+                for offset, length in extents
+            )
+        elif method == 1 and b"idat" in children:
+            idat_start = children[b"idat"][0]
+            payload = b"".join(
+                meta[idat_start + offset : idat_start + offset + length]
+                for offset, length in extents
+            )
+        else:
+            continue
+        # The payload starts with the offset of the TIFF header
+        tiff_offset = struct.unpack_from(">I", payload)[0]
+        header.tags = _parse_exif(payload[4 + tiff_offset :], details)
+        return
+
+
+_PARSERS = {
+    "jpeg": _parse_exif_file,
+    "tiff": _parse_exif_file,
+    "heic": _parse_heif,
+}
+
+
+def read_metadata_header(
+    file_path: str, header_bytes: int = HEADER_READ_BYTES, details: bool = True
+) -> MetadataHeader:
+    """Read and parse the metadata of one image file; errors are recorded."""
+    start = time.perf_counter()
+    header = MetadataHeader(file_path=file_path, image_format=None)
+    try:
+        with open(file_path, "rb") as f:
+            source = HeaderSource(f, header_bytes)
+            header.file_size = source.size
+            header.image_format = sniff_format(source.prefix)
+            try:
+                _PARSERS.get(header.image_format, _parse_pil_header)(
+                    source, header, details
+                )
+            finally:
+                header.bytes_read = source.bytes_read
+                header.reads = source.reads
+    except Exception as e:
+        header.error = str(e) or type(e).__name__
+    header.parse_time = time.perf_counter() - start
+    return header
+
+
+def read_metadata_headers(
+    file_paths: List[str], header_bytes: int = HEADER_READ_BYTES, details: bool = True
+) -> List[MetadataHeader]:
+    """Read the metadata of several files; one worker task."""
+    return [read_metadata_header(path, header_bytes, details) for path in file_paths]
+
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Lists of up to ``size`` consecutive items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class BulkEXIFReader:
+    """Streams header-only metadata reads of many files from a process pool."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        files_per_task: int = 16,
+        header_bytes: int = HEADER_READ_BYTES,
+    ):
+        """Initialize the reader; the pool starts on first use."""
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.files_per_task = files_per_task
+        self.header_bytes = header_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # Statistics
+        self.files_read = 0
+        self.files_failed = 0
+        self.bytes_read = 0
+        self.file_bytes = 0
+        self.extra_reads = 0
+        self.parse_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker pool, created on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def read_headers(
+        self, file_paths: Iterable[str], details: bool = True
+    ) -> AsyncIterator[MetadataHeader]:
+        """
+        Yield the metadata header of each file as soon as it is parsed.
+
+        Results come in completion order, not input order. A file that
+        cannot be read is yielded with its ``error`` set.
+        """
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        chunks = _chunked(file_paths, self.files_per_task)
+        in_flight: Dict[asyncio.Future, List[str]] = {}
+        next_chunk = next(chunks, None)
+        try:
+            while next_chunk is not None or in_flight:
+                while next_chunk is not None and len(in_flight) < self.max_in_flight:
+                    future = loop.run_in_executor(
+                        self.executor,
+                        read_metadata_headers,
+                        next_chunk,
+                        self.header_bytes,
+                        details,
+                    )
+                    in_flight[future] = next_chunk
+                    next_chunk = next(chunks, None)
+
+                done, _ = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    for header in self._chunk_result(in_flight.pop(future), future):
+                        yield header
+        finally:
+            # Stop queued tasks if the consumer stops early
+            for future in in_flight:
+                future.cancel()
+            self.wall_time += time.perf_counter() - start
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get bulk reader statistics."""
+        return {
+            "workers": self.max_workers,
+            "files_per_task": self.files_per_task,
+            "header_bytes": self.header_bytes,
+            "files_read": self.files_read,
+            "files_failed": self.files_failed,
+            "bytes_read": self.bytes_read,
+            "file_bytes": self.file_bytes,
+            "read_fraction": (
+                self.bytes_read / self.file_bytes if self.file_bytes else 0.0
+            ),
+            "extra_reads": self.extra_reads,
+            "average_parse_time": (
+                self.parse_time / self.files_read if self.files_read else 0.0
+            ),
+            "files_per_second": (
+                self.files_read / self.wall_time if self.wall_time > 0 else 0.0
+            ),
+        }
+
+    def shutdown(self):
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _chunk_result(
+        self, file_paths: List[str], future: asyncio.Future
+    ) -> List[MetadataHeader]:
+        """Headers of a finished task, turning a failed task into failed files."""
+        try:
+            headers = future.result()
+        except Exception as e:
+            self.logger.warning(
+                f"Error reading metadata of {len(file_paths)} files: {e}"
+            )
+            headers = [
+                MetadataHeader(file_path=path, image_format=None, error=str(e))
+                for path in file_paths
+            ]
+
+        for header in headers:
+            self.files_read += 1
+            self.files_failed += header.error is not None
+            self.bytes_read += header.bytes_read
+            self.file_bytes += header.file_size
+            self.extra_reads += max(0, header.reads - 1)
+            self.parse_time += header.parse_time
+        return headers
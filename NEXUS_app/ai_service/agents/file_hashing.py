@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+File Hashing - Single-Pass Multi-Digest Hashing Engine
+
+This module implements the MultiDigestHasher used by the HashVerifier.
+Each file is read once and every requested digest is fed from the same
+buffer:
+
+- Small files are read in one call.
+- Larger files are memory-mapped, so the data is paged in once and each
+  digest walks the same mapping. With several digests on a large file,
+  each digest runs in its own thread; hashlib releases the GIL while
+  hashing, so they run in parallel.
+- Files that cannot be mapped are streamed in ``read_size`` blocks, with
+  each block fed to every digest before the next is read.
+
+Calls are blocking and are meant to run in ``executor``, off the event
+loop.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class FileDigests:
+    """Digests of one file from a single read."""
+
+    file_size: int
+    digests: Dict[str, str]
+    digest_times: Dict[str, float]
+    errors: Dict[str, str]
+    elapsed: float
+    read_mode: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class MultiDigestHasher:
+    """Computes several hashlib digests of a file in one read."""
+
+    def __init__(
+        self,
+        read_size: int = 1 << 20,
+        mmap_min_size: int = 1 << 20,
+        parallel_min_size: int = 4 << 20,
+        max_workers: Optional[int] = None,
+        parallel_digests: bool = True,
+    ):
+        """Initialize the hashing engine."""
+        self.logger = logging.getLogger(__name__)
+        self.read_size = read_size
+        self.mmap_min_size = mmap_min_size
+        self.parallel_min_size = parallel_min_size
+        self.parallel_digests = parallel_digests
+
+        workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        # Files are hashed in ``executor``; digests of one file fan out to a
+        # separate pool so a file task never waits on its own pool
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hash-file"
+        )
+        self._digest_pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hash-digest"
+        )
+
+        # Statistics
+        self._lock = threading.Lock()
+        self.files_hashed = 0
+        self.bytes_hashed = 0
+        self.hashing_time = 0.0
+
+    def hash_file(self, file_path: str, algorithms: List[str]) -> FileDigests:
+        """Compute the named hashlib digests of a file."""
+        start = time.perf_counter()
+        hashers: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name in dict.fromkeys(algorithms):
+            try:
+                hashers[name] = hashlib.new(name)
+            except (ValueError, TypeError) as e:
+                errors[name] = str(e)
+
+        times = {name: 0.0 for name in hashers}
+        with open(file_path, "rb") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < self.mmap_min_size:
+                read_mode = "read"
+                self._feed_all(hashers, times, f.read())
+            else:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (OSError, ValueError):
+                    read_mode = "stream"
+                    self._stream(hashers, times, f)
+                else:
+                    read_mode = "mmap"
+                    with mapped:
+                        self._feed_mapped(hashers, times, mapped, file_size)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.files_hashed += 1
+            self.bytes_hashed += file_size
+            self.hashing_time += elapsed
+
+        return FileDigests(
+            file_size=file_size,
+            digests={name: hasher.hexdigest() for name, hasher in hashers.items()},
+            digest_times=times,
+            errors=errors,
+            elapsed=elapsed,
+            read_mode=read_mode,
+        )
+
+    def throughput_mb_s(self) -> float:
+        """Average hashing throughput in MB/s (file bytes over wall time)."""
+        with self._lock:
+            if self.hashing_time <= 0:
+                return 0.0
+            return self.bytes_hashed / 1e6 / self.hashing_time
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get hashing statistics."""
+        return {
+            "files_hashed": self.files_hashed,
+            "bytes_hashed": self.bytes_hashed,
+            "hashing_time": self.hashing_time,
+            "throughput_mb_s": self.throughput_mb_s(),
+            "read_size": self.read_size,
+        }
+
+    def shutdown(self):
+        """Shut down the thread pools."""
+        self.executor.shutdown(wait=False)
+        self._digest_pool.shutdown(wait=False)
+
+    def _feed_all(self, hashers: Dict[str, Any], times: Dict[str, float], data):
+        """Feed one block to every digest."""
+        for name, hasher in hashers.items():
+            started = time.perf_counter()
+            hasher.update(data)
+            times[name] += time.perf_counter() - started
+
+    def _stream(self, hashers: Dict[str, Any], times: Dict[str, float], f):
+        """Feed a file to every digest block by block."""
+        while block := f.read(self.read_size):
+            self._feed_all(hashers, times, block)
+
+    def _feed_mapped(
+        self,
+        hashers: Dict[str, Any],
+        times: Dict[str, float],
+        mapped: mmap.mmap,
+        file_size: int,
+    ):
+        """Feed a mapped file to every digest, one thread per digest if large."""
+        view = memoryview(mapped)
+        try:
+            if (
+                self.parallel_digests
+                and len(hashers) > 1
+                and file_size >= self.parallel_min_size
+            ):
+                futures = {
+                    name: self._digest_pool.submit(self._digest_view, hasher, view)
+                    for name, hasher in hashers.items()
+                }
+                for name, future in futures.items():
+                    times[name] += future.result()
+            else:
+                for offset in range(0, file_size, self.read_size):
+                    self._feed_all(
+                        hashers, times, view[offset : offset + self.read_size]
+                    )
+        finally:
+            view.release()
+
+    def _digest_view(self, hasher: Any, view: memoryview) -> float:
+        """Feed a whole buffer to one digest; returns the time taken."""
+        started = time.perf_counter()
+        for offset in range(0, len(view), self.read_size):
+            hasher.update(view[offset : offset + self.read_size])
+        return time.perf_counter() - started
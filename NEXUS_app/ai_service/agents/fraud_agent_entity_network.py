@@ -9,12 +9,11 @@ Required Capabilities: ai_development, network_analysis, graph_algorithms
 import asyncio
 import json
 import logging
-from collections import Counter, defaultdict
+from collections import Counter, defaultdict, deque
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
 
-import community as community_louvain
 import networkx as nx
 import numpy as np
 import pandas as pd
@@ -22,6 +21,9 @@ from sklearn.cluster import DBSCAN, KMeans
 from sklearn.metrics import silhouette_score
 from sklearn.preprocessing import StandardScaler
 
+from .community_engine import CommunityChange, CommunityEngine
+from .graph_store import resolve_graph_store
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -75,11 +77,34 @@ class FraudAgentEntityNetwork:
     
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or self._get_default_config()
-        self.entity_graph = nx.Graph()
+        # With a graph_store configured the entity graph is a read-only
+        # undirected view of this agent's namespace in that (possibly shared)
+        # store
+        self.graph_store = resolve_graph_store(self.config.get("graph_store"))
+        self.graph_namespace = self.config.get("graph_namespace", "fraud_entity_network")
+        if self.graph_store is not None:
+            self.entity_graph = self.graph_store.view(
+                directed=False,
+                field_names={
+                    "amount": "total_amount",
+                    "timestamp": "first_interaction",
+                },
+                namespace=self.graph_namespace,
+            )
+        else:
+            self.entity_graph = nx.Graph()
         self.entities: Dict[str, EntityNode] = {}
         self.relationships: List[EntityRelationship] = []
         self.shell_companies: List[ShellCompanyIndicators] = []
         self.communities: List[NetworkCommunity] = []
+        # Partition kept across analyses, re-optimized around changed edges
+        self.community_engine = CommunityEngine(
+            resolution=self.config["community_detection_resolution"]
+        )
+        # Latest community changes; older ones are dropped
+        self.community_changes: Deque[CommunityChange] = deque(
+            maxlen=self.config.get("community_change_history", 1000)
+        )
         self.scaler = StandardScaler()
         
         # Initialize MCP tracking
@@ -185,7 +210,15 @@ class FraudAgentEntityNetwork:
                 )
                 
                 self.entities[entity_node.entity_id] = entity_node
-                self.entity_graph.add_node(entity_node.entity_id, **asdict(entity_node))
+                if self.graph_store is not None:
+                    self.graph_store.add_node(
+                        entity_node.entity_id,
+                        namespace=self.graph_namespace,
+                        **asdict(entity_node)
+                    )
+                else:
+                    self.entity_graph.add_node(entity_node.entity_id, **asdict(entity_node))
+                self.community_engine.add_node(entity_node.entity_id)
             
             # Add relationships based on transactions
             relationship_weights = defaultdict(lambda: {
@@ -209,12 +242,12 @@ class FraudAgentEntityNetwork:
                     relationship_weights[key]['count'] += 1
                     relationship_weights[key]['total_amount'] += amount
                     
-                        if relationship_weights[key]['first_time'] is None or
-    timestamp < relationship_weights[key]['first_time']:
+                    if (relationship_weights[key]['first_time'] is None or
+                            timestamp < relationship_weights[key]['first_time']):
                         relationship_weights[key]['first_time'] = timestamp
                     
-                        if relationship_weights[key]['last_time'] is None or
-    timestamp > relationship_weights[key]['last_time']:
+                    if (relationship_weights[key]['last_time'] is None or
+                            timestamp > relationship_weights[key]['last_time']):
                         relationship_weights[key]['last_time'] = timestamp
             
             # Create edges in graph
@@ -225,15 +258,37 @@ class FraudAgentEntityNetwork:
     weight_data['total_amount'] / 100000
 )
                     
-                    self.entity_graph.add_edge(
-                        entity1, 
-                        entity2,
-                        weight=strength,
-                        transaction_count=weight_data['count'],
-                        total_amount=weight_data['total_amount'],
-                        first_interaction=weight_data['first_time'],
-                        last_interaction=weight_data['last_time']
-                    )
+                    if self.graph_store is not None:
+                        # Pairs are sorted, so this agent's edge for a pair is
+                        # always stored entity1 -> entity2 under the pair key
+                        self.graph_store.remove_edges(
+                            entity1,
+                            entity2,
+                            key=(entity1, entity2),
+                            namespace=self.graph_namespace
+                        )
+                        self.graph_store.add_edge(
+                            entity1,
+                            entity2,
+                            amount=weight_data['total_amount'],
+                            timestamp=weight_data['first_time'],
+                            key=(entity1, entity2),
+                            namespace=self.graph_namespace,
+                            weight=strength,
+                            transaction_count=weight_data['count'],
+                            last_interaction=weight_data['last_time']
+                        )
+                    else:
+                        self.entity_graph.add_edge(
+                            entity1, 
+                            entity2,
+                            weight=strength,
+                            transaction_count=weight_data['count'],
+                            total_amount=weight_data['total_amount'],
+                            first_interaction=weight_data['first_time'],
+                            last_interaction=weight_data['last_time']
+                        )
+                    self.community_engine.set_edge(entity1, entity2, strength)
             
             logger.info(f"Built network with {self.entity_graph.number_of_nodes()} nodes and {self.entity_graph.number_of_edges()} edges")
             
@@ -341,7 +396,7 @@ class FraudAgentEntityNetwork:
                     if age_years < self.config["shell_indicators"]["max_age_years"]:
                         indicators.append(f"Very new company: {age_years:.1f} years old")
                         score_factors.append(0.15)
-                except Exception:
+                except Exception as e:
                     logger.error(f"Error: {e}")
                     indicators.append("Invalid incorporation date")
                     score_factors.append(0.1)
@@ -434,7 +489,7 @@ class FraudAgentEntityNetwork:
             # Eigenvector centrality
             try:
                 eigenvector_centrality = nx.eigenvector_centrality(self.entity_graph, max_iter=1000)
-            except Exception:
+            except Exception as e:
                 logger.error(f"Error: {e}")
                 eigenvector_centrality = {}
             
@@ -487,12 +542,12 @@ class FraudAgentEntityNetwork:
             if self.entity_graph.number_of_nodes() < 3:
                 return communities
             
-            # Use Louvain community detection
+            # Incremental Louvain: only neighbourhoods changed since the last
+            # analysis are re-optimized
             try:
-                partition = (
-    community_louvain.best_partition(self.entity_graph, resolution=self.config["community_detection_resolution"])
-)
-            except Exception:
+                self.community_changes.extend(self.community_engine.update())
+                partition = self.community_engine.labels()
+            except Exception as e:
                 logger.error(f"Error: {e}")
                 # Fallback to simple connected components
                 partition = {}
@@ -527,7 +582,7 @@ class FraudAgentEntityNetwork:
     self,
     entity_list: List[str],
     community_id: int
-)
+):
         """Analyze a specific communityAnalyze a specific community"""
         try:
             # Calculate community metrics
@@ -549,8 +604,8 @@ class FraudAgentEntityNetwork:
             
             if 'bank' in type_counter:
                 community_type = "Financial Institution Cluster"
-                elif 'company' in type_counter and
-    type_counter['company'] > len(entity_list) * 0.7:
+            elif ('company' in type_counter and
+                    type_counter['company'] > len(entity_list) * 0.7):
                 community_type = "Business Network"
             elif len(set(entity_types)) == 1:
                 community_type = f"{entity_types[0].title()} Cluster"
@@ -660,6 +715,7 @@ class FraudAgentEntityNetwork:
             "high_risk_shell_companies": len([sc for sc in self.shell_companies if sc.risk_level == "HIGH"]),
             "communities": len(self.communities),
             "high_risk_communities": len([c for c in self.communities if c.risk_level == "HIGH"]),
+            "community_changes": len(self.community_changes),
             "network_metrics": self._calculate_network_metrics(),
             "analysis_complete": True,
             "last_updated": datetime.now().isoformat()
@@ -8,7 +8,15 @@ Required Capabilities: ai_development, pattern_detection, fraud_analysis
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import networkx as nx
+from sklearn.preprocessing import StandardScaler
+
+from .graph_partitioning import GraphPartitioner
 
 logger = logging.getLogger(__name__)
 
@@ -69,7 +77,7 @@ class FraudAgentPatternDetection:
     """Advanced fraud pattern detection with AI-powered analysisAdvanced fraud pattern detection with AI-powered analysis"""
 
     def __init__(self, config: Dict[str, Any] = None):
-    """__init__ function.__init__ function."""
+        """__init__ function.__init__ function."""
         self.config = config or self._get_default_config()
         self.transactions: Dict[str, Transaction] = {}
         self.transaction_graph = nx.DiGraph()
@@ -77,6 +85,10 @@ class FraudAgentPatternDetection:
         self.suspicious_patterns: List[SuspiciousPattern] = []
         self.alerts: List[AlertGeneration] = []
         self.scaler = StandardScaler()
+        self.partitioner = GraphPartitioner(
+            max_workers=self.config.get("partition_workers"),
+            min_parallel_edges=self.config.get("parallel_min_edges", 5000),
+        )
 
         # Initialize MCP tracking
         self.mcp_status = {
@@ -123,6 +135,8 @@ class FraudAgentPatternDetection:
             "alert_threshold": 0.8,
             "structuring_threshold": 9500.0,  # Just below reporting threshold
             "round_amount_threshold": 0.1,  # For detecting round amounts
+            "partition_workers": None,  # Defaults to the CPU count
+            "parallel_min_edges": 5000,  # Smaller graphs are searched inline
         }
 
     async def analyze_transaction_patterns(
@@ -213,29 +227,13 @@ class FraudAgentPatternDetection:
 
             circular_patterns = []
 
-            # Find all simple cycles in the graph
-            try:
-                cycles = list(nx.simple_cycles(self.transaction_graph))
-                logger.info(f"Found {len(cycles)} potential cycles")
-            except Exception:
-                logger.error(f"Error: {e}")
-                # For large graphs, use a more efficient approach
-                cycles = []
-                for node in list(self.transaction_graph.nodes())[
-                    :100
-                ]:  # Limit to prevent timeout
-                    try:
-                        node_cycles = list(
-                            nx.simple_cycles(
-                                self.transaction_graph.subgraph(
-                                    nx.ego_graph(self.transaction_graph, node, radius=3)
-                                )
-                            )
-                        )
-                        cycles.extend(node_cycles)
-                    except Exception:
-                        logger.error(f"Error: {e}")
-                        continue
+            # Find all simple cycles in the graph; cycles only exist inside
+            # strongly connected components, which are searched separately
+            cycles = self.partitioner.enumerate_cycles(
+                self.transaction_graph,
+                length_bound=self.config["circular_pattern_max_length"],
+            )
+            logger.info(f"Found {len(cycles)} potential cycles")
 
             # Analyze each cycle
             for i, cycle in enumerate(cycles):
@@ -641,10 +639,10 @@ class FraudAgentPatternDetection:
                                                 recommended_action="Review for potential layering activity",
                                             )
                                             layering_patterns.append(pattern)
-                            except Exception:
+                            except Exception as e:
                                 logger.error(f"Error: {e}")
                                 continue
-                except Exception:
+                except Exception as e:
                     logger.error(f"Error: {e}")
                     continue
 
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Candidate Index - Approximate Nearest-Neighbour Candidate Search
+
+This module implements the FuzzyCandidateIndex used by the AIFuzzyMatcher
+to pick candidate targets before the expensive per-pair algorithms run.
+Targets are indexed by MinHash signatures of their character n-grams,
+bucketed with locality-sensitive hashing (LSH), and by Soundex codes of
+their tokens. A query collects the targets sharing any bucket and ranks
+them by estimated Jaccard similarity.
+
+Recall is controlled by the LSH banding: with ``bands`` bands of ``rows``
+rows, pairs with Jaccard similarity above roughly (1 / bands) ** (1 / rows)
+are likely to collide. More bands raise recall at the cost of more
+candidates; ``max_candidates`` caps how many reach the matchers.
+"""
+
+import hashlib
+import logging
+import re
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+def soundex(word: str) -> str:
+    """Compute the American Soundex code of a word."""
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+
+    code = word[0].upper()
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for char in word[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if char not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+
+class FuzzyCandidateIndex:
+    """
+    MinHash/LSH and phonetic candidate index over target texts.
+
+    Signatures are computed with universal hashing of 32-bit shingle
+    hashes modulo a Mersenne prime, so they are stable across processes.
+    Each target is keyed by its id and a digest of its text, so targets
+    whose text changed are reported as stale and re-added.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        ngram_size: int = 3,
+        max_candidates: int = 50,
+        enable_phonetic: bool = True,
+        max_phonetic_bucket: int = 1000,
+        seed: int = 1,
+    ):
+        """Initialize the fuzzy candidate index."""
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.logger = logging.getLogger(__name__)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram_size = ngram_size
+        self.max_candidates = max_candidates
+        self.enable_phonetic = enable_phonetic
+        self.max_phonetic_bucket = max_phonetic_bucket
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._phonetic_codes: Dict[str, Set[str]] = {}
+        self._lsh_buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+        self._phonetic_buckets: Dict[str, Set[str]] = defaultdict(set)
+
+        # Query statistics
+        self.total_queries = 0
+        self.total_candidates = 0
+
+    def __len__(self) -> int:
+        """Return the number of indexed targets."""
+        return len(self._signatures)
+
+    def __contains__(self, target_id: str) -> bool:
+        """Check whether a target is indexed."""
+        return target_id in self._signatures
+
+    def contains_all(self, target_ids: Iterable[str], texts: Iterable[str]) -> bool:
+        """Check whether every given target is indexed with the given text."""
+        return all(
+            self._digests.get(target_id) == self.digest(text)
+            for target_id, text in zip(target_ids, texts)
+        )
+
+    def stale(self, target_ids: List[str], texts: List[str]) -> List[int]:
+        """Positions of the targets that are missing or indexed with other text."""
+        return [
+            position
+            for position, (target_id, text) in enumerate(zip(target_ids, texts))
+            if self._digests.get(target_id) != self.digest(text)
+        ]
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """Digest of a target text."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def clear(self):
+        """Drop every target."""
+        self._signatures.clear()
+        self._digests.clear()
+        self._phonetic_codes.clear()
+        self._lsh_buckets.clear()
+        self._phonetic_buckets.clear()
+
+    def add(self, target_ids: List[str], texts: List[str]):
+        """Add or replace targets."""
+        for target_id, text in zip(target_ids, texts):
+            if target_id in self._signatures:
+                self.remove([target_id])
+
+            signature = self.signature(text)
+            self._signatures[target_id] = signature
+            self._digests[target_id] = self.digest(text)
+            for band, key in self._band_keys(signature):
+                self._lsh_buckets[(band, key)].add(target_id)
+
+            if self.enable_phonetic:
+                codes = self.phonetic_codes(text)
+                self._phonetic_codes[target_id] = codes
+                for code in codes:
+                    self._phonetic_buckets[code].add(target_id)
+
+    def remove(self, target_ids: Iterable[str]):
+        """Remove targets from the index."""
+        for target_id in target_ids:
+            signature = self._signatures.pop(target_id, None)
+            if signature is None:
+                continue
+            self._digests.pop(target_id, None)
+            for band, key in self._band_keys(signature):
+                bucket = self._lsh_buckets.get((band, key))
+                if bucket is not None:
+                    bucket.discard(target_id)
+                    if not bucket:
+                        del self._lsh_buckets[(band, key)]
+            for code in self._phonetic_codes.pop(target_id, ()):
+                bucket = self._phonetic_buckets.get(code)
+                if bucket is not None:
+                    bucket.discard(target_id)
+                    if not bucket:
+                        del self._phonetic_buckets[code]
+
+    def query(
+        self,
+        text: str,
+        max_candidates: Optional[int] = None,
+        restrict_to: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return candidate targets ranked by estimated Jaccard similarity."""
+        limit = self.max_candidates if max_candidates is None else max_candidates
+        signature = self.signature(text)
+
+        candidates: Set[str] = set()
+        for band, key in self._band_keys(signature):
+            candidates.update(self._lsh_buckets.get((band, key), ()))
+
+        phonetic_hits: Dict[str, int] = defaultdict(int)
+        if self.enable_phonetic:
+            for code in self.phonetic_codes(text):
+                bucket = self._phonetic_buckets.get(code, ())
+                # Codes of very common tokens ("corp", "ltd") carry no signal
+                if len(bucket) > self.max_phonetic_bucket:
+                    continue
+                for target_id in bucket:
+                    phonetic_hits[target_id] += 1
+            candidates.update(phonetic_hits)
+
+        if restrict_to is not None:
+            candidates &= restrict_to
+
+        self.total_queries += 1
+        if not candidates:
+            return []
+
+        candidate_ids = sorted(candidates)
+        estimates = (
+            np.stack([self._signatures[target_id] for target_id in candidate_ids])
+            == signature
+        ).mean(axis=1)
+
+        # Ties on the Jaccard estimate are broken by shared phonetic codes
+        ranked = sorted(
+            zip(candidate_ids, estimates.tolist()),
+            key=lambda item: (item[1], phonetic_hits.get(item[0], 0)),
+            reverse=True,
+        )[:limit]
+
+        self.total_candidates += len(ranked)
+        return ranked
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a text."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode()) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def shingles(self, text: str) -> Set[str]:
+        """Split a text into character n-grams."""
+        text = re.sub(r"\s+", " ", text.lower()).strip()
+        if len(text) < self.ngram_size:
+            return {text} if text else set()
+        return {
+            text[i : i + self.ngram_size]
+            for i in range(len(text) - self.ngram_size + 1)
+        }
+
+    def phonetic_codes(self, text: str) -> Set[str]:
+        """Compute the Soundex codes of the tokens of a text."""
+        tokens = re.findall(r"[a-z]+", text.lower())
+        return {code for code in map(soundex, tokens) if code}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            "targets": len(self._signatures),
+            "lsh_buckets": len(self._lsh_buckets),
+            "phonetic_buckets": len(self._phonetic_buckets),
+            "bands": self.bands,
+            "rows_per_band": self.rows,
+            "total_queries": self.total_queries,
+            "average_candidates": (
+                self.total_candidates / self.total_queries
+                if self.total_queries
+                else 0.0
+            ),
+        }
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """Split a signature into LSH band keys."""
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
@@ -0,0 +1,817 @@
+#!/usr/bin/env python3
+"""
+Graph Store - Compact Shared Storage for Entity and Transaction Graphs
+
+This module implements the GraphStore shared by the network-analysis
+agents. Nodes get integer ids; edges are held column by column (source,
+target, amount, timestamp, type code, key) in NumPy arrays with CSR
+(outgoing) and CSC (incoming) offsets, instead of one dict per node, per
+neighbour and per edge as in networkx.
+
+New edges go to an append buffer and are merged into the arrays once the
+buffer outgrows ``compact_ratio`` of the compacted edges; removals are
+tombstoned until then. Every mutation bumps ``version``.
+
+Legacy code paths read the store through ``view()``, a read-only networkx
+graph whose node, adjacency and edge mappings are computed from the arrays
+on access, so one in-memory copy serves every agent.
+
+Agents sharing a store write under their own ``namespace``. A namespaced
+view, matrix or version only sees the nodes and edges of that namespace,
+so one agent's analysis never runs over another agent's edges.
+"""
+
+import logging
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+DEFAULT_FIELD_NAMES = {
+    "amount": "amount",
+    "timestamp": "timestamp",
+    "type": "type",
+    "key": "key",
+}
+
+_stores: Dict[str, "GraphStore"] = {}
+
+
+def get_graph_store(name: str = "default") -> "GraphStore":
+    """Return the process-wide graph store with the given name."""
+    if name not in _stores:
+        _stores[name] = GraphStore()
+    return _stores[name]
+
+
+def resolve_graph_store(setting: Any) -> Optional["GraphStore"]:
+    """Resolve a ``graph_store`` config value: a store, a shared name, or None."""
+    if setting is None or isinstance(setting, GraphStore):
+        return setting
+    return get_graph_store(str(setting))
+
+
+class GraphStore:
+    """
+    Columnar directed multigraph with integer node ids.
+
+    Naive timestamps are stored as seconds since the epoch and returned
+    naive; timezone-aware timestamps are returned in UTC.
+    """
+
+    def __init__(self, compact_ratio: float = 0.25, min_compact_edges: int = 4096):
+        """Initialize the graph store."""
+        self.logger = logging.getLogger(__name__)
+        self.compact_ratio = compact_ratio
+        self.min_compact_edges = min_compact_edges
+        self.version = 0
+
+        # Nodes: ids are stable, removed nodes are tombstoned
+        self._node_index: Dict[Hashable, int] = {}
+        self._node_keys: List[Hashable] = []
+        self._node_attrs: List[Optional[Dict[str, Any]]] = []
+        self._node_alive = bytearray()
+        self._live_nodes = 0
+
+        # Compacted edge columns, in insertion order
+        self._src = np.empty(0, dtype=np.int32)
+        self._dst = np.empty(0, dtype=np.int32)
+        self._amount = np.empty(0, dtype=np.float64)
+        self._timestamp = np.empty(0, dtype=np.float64)
+        self._type = np.empty(0, dtype=np.int16)
+        self._namespace = np.empty(0, dtype=np.int16)
+        self._alive = np.empty(0, dtype=bool)
+
+        # CSR (by source) and CSC (by target) over the compacted edges
+        self._out_indptr = np.zeros(1, dtype=np.int64)
+        self._out_order = np.empty(0, dtype=np.int64)
+        self._in_indptr = np.zeros(1, dtype=np.int64)
+        self._in_order = np.empty(0, dtype=np.int64)
+
+        # Append buffer for edges added since the last compaction
+        self._buf_src = array("i")
+        self._buf_dst = array("i")
+        self._buf_amount = array("d")
+        self._buf_timestamp = array("d")
+        self._buf_type = array("h")
+        self._buf_namespace = array("h")
+        self._buf_alive = bytearray()
+        self._buf_out: Dict[int, List[int]] = {}
+        self._buf_in: Dict[int, List[int]] = {}
+
+        # Namespaces, dictionary encoded (-1 for none), with their member
+        # nodes, live edge counts and versions
+        self._namespaces: List[Hashable] = []
+        self._namespace_codes: Dict[Hashable, int] = {}
+        self._namespace_members: List[bytearray] = []
+        self._namespace_nodes: List[int] = []
+        self._namespace_edges: List[int] = []
+        self._namespace_versions: List[int] = []
+
+        # Edge keys and rare extra attributes, indexed by edge id
+        self._keys: List[Optional[Hashable]] = []
+        self._extra: List[Optional[Dict[str, Any]]] = []
+
+        # Edge type dictionary encoding
+        self._types: List[Hashable] = []
+        self._type_codes: Dict[Hashable, int] = {}
+
+        self._tz_aware: Optional[bool] = None
+        self._live_edges = 0
+        self._dead_edges = 0
+        self.compactions = 0
+
+    # Nodes
+
+    def add_node(
+        self, key: Hashable, namespace: Optional[Hashable] = None, **attributes
+    ) -> int:
+        """Add a node, or update its attributes, and return its id."""
+        code = self._namespace_code(namespace)
+        node = self._node_index.get(key)
+        if node is None:
+            node = len(self._node_keys)
+            self._node_index[key] = node
+            self._node_keys.append(key)
+            self._node_attrs.append(None)
+            self._node_alive.append(1)
+            self._live_nodes += 1
+        elif not self._node_alive[node]:
+            self._node_alive[node] = 1
+            self._node_attrs[node] = None
+            self._live_nodes += 1
+
+        if attributes:
+            if self._node_attrs[node] is None:
+                self._node_attrs[node] = {}
+            self._node_attrs[node].update(attributes)
+
+        self._join_namespace(node, code)
+        self._touch(code)
+        return node
+
+    def has_node(self, key: Hashable, namespace: Optional[Hashable] = None) -> bool:
+        """Check whether a node is in the store (and in the namespace, if given)."""
+        node = self._node_index.get(key)
+        return node is not None and self._in_namespace(
+            node, self._namespace_code(namespace)
+        )
+
+    def node_id(self, key: Hashable, namespace: Optional[Hashable] = None) -> int:
+        """Return the id of a live node (in the namespace, if given)."""
+        node = self._node_index.get(key)
+        if node is None or not self._in_namespace(
+            node, self._namespace_code(namespace)
+        ):
+            raise KeyError(key)
+        return node
+
+    def node_attributes(
+        self, key: Hashable, namespace: Optional[Hashable] = None
+    ) -> Dict[str, Any]:
+        """Return the mutable attribute dict of a node."""
+        node = self.node_id(key, namespace)
+        if self._node_attrs[node] is None:
+            self._node_attrs[node] = {}
+        return self._node_attrs[node]
+
+    def nodes(self, namespace: Optional[Hashable] = None) -> Iterator[Hashable]:
+        """Iterate over live nodes (of the namespace, if given) in insertion order."""
+        alive = self._node_alive
+        code = self._namespace_code(namespace)
+        if code < 0:
+            return (key for node, key in enumerate(self._node_keys) if alive[node])
+        members = self._namespace_members[code]
+        return (
+            self._node_keys[node]
+            for node in range(len(members))
+            if members[node] and alive[node]
+        )
+
+    def remove_node(self, key: Hashable, namespace: Optional[Hashable] = None) -> bool:
+        """
+        Remove a node and all its edges.
+
+        With a namespace, only the node's edges in that namespace are removed
+        and the node leaves it; the node itself is removed once no namespace
+        and no edge refers to it any more.
+        """
+        code = self._namespace_code(namespace)
+        node = self._node_index.get(key)
+        if node is None or not self._in_namespace(node, code):
+            return False
+
+        for edge in list(self._edge_ids(node, True, code)) + list(
+            self._edge_ids(node, False, code)
+        ):
+            self._kill_edge(edge)
+
+        if code >= 0:
+            self._leave_namespace(node, code)
+            self._touch(code)
+            if any(
+                node < len(members) and members[node]
+                for members in self._namespace_members
+            ) or any(self._edge_ids(node, True)) or any(self._edge_ids(node, False)):
+                return True
+
+        for other, members in enumerate(self._namespace_members):
+            if node < len(members) and members[node]:
+                self._leave_namespace(node, other)
+                self._namespace_versions[other] += 1
+        self._node_alive[node] = 0
+        self._node_attrs[node] = None
+        self._live_nodes -= 1
+        self.version += 1
+        return True
+
+    def number_of_nodes(self, namespace: Optional[Hashable] = None) -> int:
+        """Return the number of live nodes (of the namespace, if given)."""
+        code = self._namespace_code(namespace)
+        if code < 0:
+            return self._live_nodes
+        return self._namespace_nodes[code]
+
+    def namespace_version(self, namespace: Optional[Hashable] = None) -> int:
+        """Version counter bumped by every mutation of the namespace."""
+        code = self._namespace_code(namespace)
+        if code < 0:
+            return self.version
+        return self._namespace_versions[code]
+
+    # Edges
+
+    def add_edge(
+        self,
+        source: Hashable,
+        target: Hashable,
+        amount: Optional[float] = None,
+        timestamp: Optional[datetime] = None,
+        edge_type: Optional[Hashable] = None,
+        key: Optional[Hashable] = None,
+        namespace: Optional[Hashable] = None,
+        **attributes,
+    ) -> int:
+        """Append an edge and return its current edge id."""
+        code = self._namespace_code(namespace)
+        u = self._ensure_node(source, code)
+        v = self._ensure_node(target, code)
+
+        edge = len(self._src) + len(self._buf_src)
+        self._buf_src.append(u)
+        self._buf_dst.append(v)
+        self._buf_amount.append(np.nan if amount is None else float(amount))
+        self._buf_timestamp.append(self._encode_time(timestamp))
+        self._buf_type.append(self._encode_type(edge_type))
+        self._buf_namespace.append(code)
+        self._buf_alive.append(1)
+        self._buf_out.setdefault(u, []).append(edge)
+        self._buf_in.setdefault(v, []).append(edge)
+        self._keys.append(key)
+        self._extra.append(attributes or None)
+
+        self._live_edges += 1
+        if code >= 0:
+            self._namespace_edges[code] += 1
+        self._touch(code)
+
+        if len(self._buf_src) > max(
+            self.min_compact_edges, self.compact_ratio * len(self._src)
+        ):
+            self.compact()
+        return edge
+
+    def remove_edges(
+        self,
+        source: Hashable,
+        target: Hashable,
+        key: Optional[Hashable] = None,
+        namespace: Optional[Hashable] = None,
+    ) -> int:
+        """
+        Remove the edges from source to target.
+
+        Only edges with the given key and in the given namespace are removed
+        when those are given.
+        """
+        u = self._node_index.get(source)
+        v = self._node_index.get(target)
+        if u is None or v is None:
+            return 0
+
+        code = self._namespace_code(namespace)
+        removed = 0
+        for edge in list(self._edge_ids(u, True, code)):
+            if self._edge_target(edge) == v and (
+                key is None or self._keys[edge] == key
+            ):
+                self._kill_edge(edge)
+                removed += 1
+
+        if removed:
+            self.version += 1
+        return removed
+
+    def number_of_edges(self, namespace: Optional[Hashable] = None) -> int:
+        """Return the number of live edges (in the namespace, if given)."""
+        code = self._namespace_code(namespace)
+        if code < 0:
+            return self._live_edges
+        return self._namespace_edges[code]
+
+    def compact(self):
+        """Merge the append buffer into the columns and drop removed edges."""
+        buffer_alive = np.frombuffer(bytes(self._buf_alive), dtype=np.uint8).astype(
+            bool
+        )
+        keep = np.concatenate([self._alive, buffer_alive])
+        kept = np.flatnonzero(keep)
+
+        def merge(column: np.ndarray, buffer: array, dtype) -> np.ndarray:
+            merged = np.concatenate([column, np.asarray(buffer, dtype=dtype)])
+            return merged[kept]
+
+        self._src = merge(self._src, self._buf_src, np.int32)
+        self._dst = merge(self._dst, self._buf_dst, np.int32)
+        self._amount = merge(self._amount, self._buf_amount, np.float64)
+        self._timestamp = merge(self._timestamp, self._buf_timestamp, np.float64)
+        self._type = merge(self._type, self._buf_type, np.int16)
+        self._namespace = merge(self._namespace, self._buf_namespace, np.int16)
+        self._alive = np.ones(len(kept), dtype=bool)
+        kept_list = kept.tolist()
+        self._keys = [self._keys[edge] for edge in kept_list]
+        self._extra = [self._extra[edge] for edge in kept_list]
+
+        n = len(self._node_keys)
+        self._out_order = np.argsort(self._src, kind="stable")
+        self._out_indptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(self._src, minlength=n))]
+        )
+        self._in_order = np.argsort(self._dst, kind="stable")
+        self._in_indptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(self._dst, minlength=n))]
+        )
+
+        self._buf_src = array("i")
+        self._buf_dst = array("i")
+        self._buf_amount = array("d")
+        self._buf_timestamp = array("d")
+        self._buf_type = array("h")
+        self._buf_namespace = array("h")
+        self._buf_alive = bytearray()
+        self._buf_out = {}
+        self._buf_in = {}
+        self._dead_edges = 0
+        self.compactions += 1
+
+    def edge_attributes(
+        self, edge: int, field_names: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Materialize the attribute dict of an edge."""
+        names = field_names or DEFAULT_FIELD_NAMES
+        compacted = len(self._src)
+        if edge < compacted:
+            amount = self._amount[edge]
+            timestamp = self._timestamp[edge]
+            type_code = self._type[edge]
+        else:
+            amount = self._buf_amount[edge - compacted]
+            timestamp = self._buf_timestamp[edge - compacted]
+            type_code = self._buf_type[edge - compacted]
+
+        attributes: Dict[str, Any] = {}
+        if not np.isnan(amount):
+            attributes[names["amount"]] = float(amount)
+        if not np.isnan(timestamp):
+            attributes[names["timestamp"]] = self._decode_time(timestamp)
+        if type_code >= 0:
+            attributes[names["type"]] = self._types[type_code]
+        if self._keys[edge] is not None:
+            attributes[names["key"]] = self._keys[edge]
+        if self._extra[edge]:
+            attributes.update(self._extra[edge])
+        return attributes
+
+    def to_scipy_sparse_array(
+        self, weight: Optional[str] = None, namespace: Optional[Hashable] = None
+    ) -> sparse.csr_matrix:
+        """
+        Adjacency matrix over live nodes in insertion order.
+
+        Parallel edges are summed: as counts without a weight, or by amount
+        with ``weight="amount"`` (edges without an amount count as 1). With
+        a namespace, rows and columns are the namespace's nodes and only its
+        edges are counted.
+        """
+        if len(self._buf_src) or self._dead_edges:
+            self.compact()
+
+        nodes = np.frombuffer(bytes(self._node_alive), dtype=np.uint8).astype(bool)
+        src, dst, amount = self._src, self._dst, self._amount
+        code = self._namespace_code(namespace)
+        if code >= 0:
+            members = np.zeros(len(nodes), dtype=bool)
+            member_bytes = self._namespace_members[code]
+            members[: len(member_bytes)] = np.frombuffer(
+                bytes(member_bytes), dtype=np.uint8
+            ).astype(bool)
+            nodes &= members
+            edges = self._namespace == code
+            src, dst, amount = src[edges], dst[edges], amount[edges]
+
+        position = np.cumsum(nodes) - 1
+        n = int(nodes.sum())
+
+        if weight == "amount":
+            data = np.where(np.isnan(amount), 1.0, amount)
+        else:
+            data = np.ones(len(src))
+        return sparse.coo_matrix(
+            (data, (position[src], position[dst])), shape=(n, n)
+        ).tocsr()
+
+    def view(
+        self,
+        directed: bool = True,
+        multigraph: bool = False,
+        field_names: Optional[Dict[str, str]] = None,
+        namespace: Optional[Hashable] = None,
+    ) -> nx.Graph:
+        """Return a read-only networkx view of the store (or one namespace)."""
+        names = {**DEFAULT_FIELD_NAMES, **(field_names or {})}
+        if not directed:
+            return GraphStoreGraph(self, names, namespace)
+        if multigraph:
+            return GraphStoreMultiDiGraph(self, names, namespace)
+        return GraphStoreDiGraph(self, names, namespace)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        columns = [
+            self._src,
+            self._dst,
+            self._amount,
+            self._timestamp,
+            self._type,
+            self._namespace,
+            self._alive,
+            self._out_indptr,
+            self._out_order,
+            self._in_indptr,
+            self._in_order,
+        ]
+        return {
+            "version": self.version,
+            "nodes": self._live_nodes,
+            "edges": self._live_edges,
+            "buffered_edges": len(self._buf_src),
+            "removed_edges_pending": self._dead_edges,
+            "edge_types": len(self._types),
+            "namespaces": {
+                namespace: {
+                    "nodes": self._namespace_nodes[code],
+                    "edges": self._namespace_edges[code],
+                    "version": self._namespace_versions[code],
+                }
+                for code, namespace in enumerate(self._namespaces)
+            },
+            "compactions": self.compactions,
+            "column_bytes": int(sum(column.nbytes for column in columns)),
+        }
+
+    # Internals shared with the views
+
+    def _ensure_node(self, key: Hashable, code: int = -1) -> int:
+        """Return the id of a node, adding it to the store and namespace if needed."""
+        node = self._node_index.get(key)
+        if node is None or not self._node_alive[node]:
+            node = self.add_node(key)
+        self._join_namespace(node, code)
+        return node
+
+    def _namespace_code(self, namespace: Optional[Hashable]) -> int:
+        """Dictionary-encode a namespace (-1 for none), registering it if new."""
+        if namespace is None:
+            return -1
+        code = self._namespace_codes.get(namespace)
+        if code is None:
+            code = len(self._namespaces)
+            self._namespaces.append(namespace)
+            self._namespace_codes[namespace] = code
+            self._namespace_members.append(bytearray())
+            self._namespace_nodes.append(0)
+            self._namespace_edges.append(0)
+            self._namespace_versions.append(0)
+        return code
+
+    def _in_namespace(self, node: int, code: int) -> bool:
+        """Whether a node is alive and, for code >= 0, a member of the namespace."""
+        if not self._node_alive[node]:
+            return False
+        if code < 0:
+            return True
+        members = self._namespace_members[code]
+        return node < len(members) and bool(members[node])
+
+    def _join_namespace(self, node: int, code: int):
+        """Make a node a member of a namespace."""
+        if code < 0:
+            return
+        members = self._namespace_members[code]
+        if node >= len(members):
+            members.extend(bytes(node + 1 - len(members)))
+        if not members[node]:
+            members[node] = 1
+            self._namespace_nodes[code] += 1
+
+    def _leave_namespace(self, node: int, code: int):
+        """Drop a node from a namespace."""
+        members = self._namespace_members[code]
+        if node < len(members) and members[node]:
+            members[node] = 0
+            self._namespace_nodes[code] -= 1
+
+    def _touch(self, code: int):
+        """Bump the store version and the version of a namespace."""
+        self.version += 1
+        if code >= 0:
+            self._namespace_versions[code] += 1
+
+    def _edge_ids(self, node: int, outgoing: bool, code: int = -1) -> Iterator[int]:
+        """Iterate over the live edge ids leaving or entering a node."""
+        if outgoing:
+            indptr, order, buffered = self._out_indptr, self._out_order, self._buf_out
+        else:
+            indptr, order, buffered = self._in_indptr, self._in_order, self._buf_in
+
+        if node + 1 < len(indptr):
+            edges = order[indptr[node] : indptr[node + 1]]
+            edges = edges[self._alive[edges]]
+            if code >= 0:
+                edges = edges[self._namespace[edges] == code]
+            yield from edges.tolist()
+
+        compacted = len(self._src)
+        for edge in buffered.get(node, ()):
+            if self._buf_alive[edge - compacted] and (
+                code < 0 or self._buf_namespace[edge - compacted] == code
+            ):
+                yield edge
+
+    def _edge_target(self, edge: int) -> int:
+        """Return the target node id of an edge."""
+        compacted = len(self._src)
+        if edge < compacted:
+            return int(self._dst[edge])
+        return self._buf_dst[edge - compacted]
+
+    def _edge_source(self, edge: int) -> int:
+        """Return the source node id of an edge."""
+        compacted = len(self._src)
+        if edge < compacted:
+            return int(self._src[edge])
+        return self._buf_src[edge - compacted]
+
+    def _kill_edge(self, edge: int):
+        """Tombstone an edge."""
+        compacted = len(self._src)
+        if edge < compacted:
+            if not self._alive[edge]:
+                return
+            self._alive[edge] = False
+            code = int(self._namespace[edge])
+        else:
+            if not self._buf_alive[edge - compacted]:
+                return
+            self._buf_alive[edge - compacted] = 0
+            code = self._buf_namespace[edge - compacted]
+        self._live_edges -= 1
+        self._dead_edges += 1
+        if code >= 0:
+            self._namespace_edges[code] -= 1
+            self._namespace_versions[code] += 1
+
+    def _encode_type(self, edge_type: Optional[Hashable]) -> int:
+        """Dictionary-encode an edge type (-1 for none)."""
+        if edge_type is None:
+            return -1
+        code = self._type_codes.get(edge_type)
+        if code is None:
+            code = len(self._types)
+            self._types.append(edge_type)
+            self._type_codes[edge_type] = code
+        return code
+
+    def _encode_time(self, timestamp: Optional[datetime]) -> float:
+        """Encode a timestamp as seconds since the epoch (NaN for none)."""
+        if timestamp is None:
+            return np.nan
+        aware = timestamp.tzinfo is not None
+        if self._tz_aware is None:
+            self._tz_aware = aware
+        if aware:
+            return (timestamp - _EPOCH_UTC).total_seconds()
+        return (timestamp - _EPOCH).total_seconds()
+
+    def _decode_time(self, seconds: float) -> datetime:
+        """Decode seconds since the epoch back into a datetime."""
+        epoch = _EPOCH_UTC if self._tz_aware else _EPOCH
+        return epoch + timedelta(seconds=float(seconds))
+
+
+class _NodeMap(Mapping):
+    """Node key -> attribute dict mapping over a graph store (or one namespace)."""
+
+    def __init__(self, store: GraphStore, namespace: Optional[Hashable] = None):
+        self._store = store
+        self._namespace = namespace
+
+    def __getitem__(self, key: Hashable) -> Dict[str, Any]:
+        return self._store.node_attributes(key, self._namespace)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return self._store.nodes(self._namespace)
+
+    def __len__(self) -> int:
+        return self._store.number_of_nodes(self._namespace)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            return self._store.has_node(key, self._namespace)
+        except TypeError:
+            return False
+
+
+class _AdjacencyMap(_NodeMap):
+    """Node key -> neighbour mapping over a graph store."""
+
+    def __init__(
+        self,
+        store: GraphStore,
+        direction: str,
+        multigraph: bool,
+        field_names: Dict[str, str],
+        namespace: Optional[Hashable] = None,
+    ):
+        super().__init__(store, namespace)
+        self._direction = direction
+        self._multigraph = multigraph
+        self._field_names = field_names
+
+    def __getitem__(self, key: Hashable) -> Mapping:
+        return _NeighborMap(
+            self._store,
+            self._store.node_id(key, self._namespace),
+            self._direction,
+            self._multigraph,
+            self._field_names,
+            self._store._namespace_code(self._namespace),
+        )
+
+
+class _NeighborMap(Mapping):
+    """Neighbour key -> edge attributes (or key -> attributes) of one node."""
+
+    def __init__(
+        self,
+        store: GraphStore,
+        node: int,
+        direction: str,
+        multigraph: bool,
+        field_names: Dict[str, str],
+        code: int = -1,
+    ):
+        self._store = store
+        self._multigraph = multigraph
+        self._field_names = field_names
+
+        edges: Dict[int, List[int]] = {}
+        if direction in ("out", "both"):
+            for edge in store._edge_ids(node, True, code):
+                edges.setdefault(store._edge_target(edge), []).append(edge)
+        if direction in ("in", "both"):
+            for edge in store._edge_ids(node, False, code):
+                source = store._edge_source(edge)
+                # A self-loop is already listed as an outgoing edge
+                if direction == "both" and source == node:
+                    continue
+                edges.setdefault(source, []).append(edge)
+
+        keys = store._node_keys
+        self._edges = {keys[neighbor]: ids for neighbor, ids in edges.items()}
+
+    def __getitem__(self, key: Hashable):
+        edges = self._edges[key]
+        if not self._multigraph:
+            # Like DiGraph.add_edge, the latest edge's attributes win
+            return self._store.edge_attributes(max(edges), self._field_names)
+        return {
+            (
+                self._store._keys[edge] if self._store._keys[edge] is not None else edge
+            ): self._store.edge_attributes(edge, self._field_names)
+            for edge in sorted(edges)
+        }
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._edges)
+
+    def __len__(self) -> int:
+        return len(self._edges)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._edges
+
+
+class GraphStoreDiGraph(nx.DiGraph):
+    """Read-only networkx DiGraph view of a graph store."""
+
+    def __init__(
+        self,
+        store: Optional[GraphStore] = None,
+        field_names: Optional[Dict[str, str]] = None,
+        namespace: Optional[Hashable] = None,
+    ):
+        # networkx builds subgraph views and copies through a bare
+        # ``G.__class__()``; without a store this is a plain graph
+        self.store = store
+        self.namespace = namespace
+        if store is None:
+            super().__init__()
+            return
+        names = field_names or DEFAULT_FIELD_NAMES
+        self.graph = {}
+        self._node = _NodeMap(store, namespace)
+        self._adj = _AdjacencyMap(store, "out", False, names, namespace)
+        self._succ = self._adj
+        self._pred = _AdjacencyMap(store, "in", False, names, namespace)
+        self.__networkx_cache__ = {}
+        nx.freeze(self)
+
+    def number_of_edges(self, u=None, v=None) -> int:
+        """Number of connected node pairs, or edges between u and v."""
+        if u is None and self.store is not None:
+            return sum(len(neighbors) for neighbors in self._adj.values())
+        return super().number_of_edges(u, v)
+
+
+class GraphStoreMultiDiGraph(nx.MultiDiGraph):
+    """Read-only networkx MultiDiGraph view of a graph store."""
+
+    def __init__(
+        self,
+        store: Optional[GraphStore] = None,
+        field_names: Optional[Dict[str, str]] = None,
+        namespace: Optional[Hashable] = None,
+    ):
+        # networkx builds subgraph views and copies through a bare
+        # ``G.__class__()``; without a store this is a plain graph
+        self.store = store
+        self.namespace = namespace
+        if store is None:
+            super().__init__()
+            return
+        names = field_names or DEFAULT_FIELD_NAMES
+        self.graph = {}
+        self._node = _NodeMap(store, namespace)
+        self._adj = _AdjacencyMap(store, "out", True, names, namespace)
+        self._succ = self._adj
+        self._pred = _AdjacencyMap(store, "in", True, names, namespace)
+        self.__networkx_cache__ = {}
+        nx.freeze(self)
+
+    def number_of_edges(self, u=None, v=None) -> int:
+        """Number of edges, or edges between u and v."""
+        if u is None and self.store is not None:
+            return self.store.number_of_edges(self.namespace)
+        return super().number_of_edges(u, v)
+
+
+class GraphStoreGraph(nx.Graph):
+    """Read-only undirected networkx Graph view of a graph store."""
+
+    def __init__(
+        self,
+        store: Optional[GraphStore] = None,
+        field_names: Optional[Dict[str, str]] = None,
+        namespace: Optional[Hashable] = None,
+    ):
+        # networkx builds subgraph views and copies through a bare
+        # ``G.__class__()``; without a store this is a plain graph
+        self.store = store
+        self.namespace = namespace
+        if store is None:
+            super().__init__()
+            return
+        names = field_names or DEFAULT_FIELD_NAMES
+        self.graph = {}
+        self._node = _NodeMap(store, namespace)
+        self._adj = _AdjacencyMap(store, "both", False, names, namespace)
+        self.__networkx_cache__ = {}
+        nx.freeze(self)
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Hash Store - Persistent, Indexed Known-Hash Database
+
+This module implements the HashStore used by the HashVerifier for its
+database of known hashes:
+
+- Records live in SQLite (on disk, or ``:memory:``) with an index on
+  (hash_value, algorithm), so lookups no longer scan every record.
+- Known-file hash sets, NSRL RDS ``NSRLFile.txt`` files or plain lists of
+  one digest per line, are imported in streamed batches inside a single
+  transaction. The index is rebuilt once at the end when importing into an
+  empty store.
+- A Bloom filter sits in front of the table. Digests it rejects are known
+  to be absent without touching SQLite; survivors of batch queries are
+  looked up with chunked ``IN`` queries.
+
+Memory use is bounded by the Bloom filter size and the batch size, not by
+the number of records. The filter is saved with the highest record id it
+covers, so records added after the last save are folded in on reopen.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+import numpy as np
+
+# Column names of NSRL RDS files mapped to hashlib names
+NSRL_COLUMNS = {"sha-1": "sha1", "md5": "md5", "sha-256": "sha256"}
+
+# Digest lengths (hex characters) used to infer the algorithm of plain lists
+DIGEST_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256", 128: "sha512"}
+
+# Stay below SQLite's host parameter limit in IN queries
+QUERY_CHUNK = 900
+
+# Set bits of each byte value
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    id INTEGER PRIMARY KEY,
+    hash_id TEXT,
+    hash_value TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    file_info TEXT,
+    source TEXT,
+    timestamp TEXT,
+    metadata TEXT
+);
+CREATE TABLE IF NOT EXISTS bloom (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    num_bits INTEGER NOT NULL,
+    num_hashes INTEGER NOT NULL,
+    max_id INTEGER NOT NULL,
+    bits BLOB NOT NULL
+);
+"""
+
+INDEX = "CREATE INDEX IF NOT EXISTS idx_hashes_value ON hashes (hash_value, algorithm)"
+
+
+@dataclass
+class KnownHash:
+    """One record of the hash store."""
+
+    hash_id: str
+    hash_value: str
+    algorithm: str
+    file_info: str
+    source: str
+    timestamp: datetime
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over digest strings, backed by a numpy bit array."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """Size the filter for ``capacity`` items at ``error_rate``."""
+        capacity = max(1, capacity)
+        num_bits = int(-capacity * np.log(error_rate) / np.log(2) ** 2)
+        self.num_bits = max(64, (num_bits + 7) // 8 * 8)
+        self.num_hashes = max(1, round(self.num_bits / capacity * np.log(2)))
+        self.bits = np.zeros(self.num_bits // 8, dtype=np.uint8)
+
+    def load(self, num_bits: int, num_hashes: int, bits: bytes):
+        """Replace the filter with saved state."""
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = np.frombuffer(bits, dtype=np.uint8).copy()
+
+    def add(self, values: Sequence[str]):
+        """Add digests to the filter."""
+        if not values:
+            return
+        positions = self._positions(values).ravel()
+        np.bitwise_or.at(
+            self.bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8)
+        )
+
+    def contains(self, values: Sequence[str]) -> np.ndarray:
+        """Whether each digest may be in the filter."""
+        if not values:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(values)
+        set_bits = (self.bits[positions >> 3] >> (positions & 7)) & 1
+        return set_bits.all(axis=1)
+
+    def fill_ratio(self) -> float:
+        """Fraction of bits set."""
+        return float(POPCOUNT[self.bits].sum(dtype=np.int64)) / self.num_bits
+
+    def false_positive_rate(self) -> float:
+        """Expected false positive rate at the current fill."""
+        return self.fill_ratio() ** self.num_hashes
+
+    def _positions(self, values: Sequence[str]) -> np.ndarray:
+        """Bit positions of each digest by double hashing, one row per digest."""
+        keys = b"".join(
+            hashlib.blake2b(value.encode(), digest_size=16).digest() for value in values
+        )
+        halves = np.frombuffer(keys, dtype=np.uint64).reshape(-1, 2)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        combined = halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))
+        return (combined % np.uint64(self.num_bits)).astype(np.int64)
+
+
+class HashStore:
+    """SQLite-backed known-hash store with a Bloom filter front."""
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        bloom_capacity: int = 10_000_000,
+        bloom_error_rate: float = 0.01,
+        batch_size: int = 50_000,
+    ):
+        """Open (or create) the store at ``path``."""
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._connection.execute(INDEX)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+
+        self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._bloom_max_id = 0
+        self._load_bloom()
+
+        # Statistics
+        self.lookups = 0
+        self.bloom_rejections = 0
+        self.database_queries = 0
+        self.records_imported = 0
+        self.import_time = 0.0
+
+    def __len__(self) -> int:
+        """Number of records."""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def add(
+        self,
+        hash_id: str,
+        hash_value: str,
+        algorithm: str,
+        file_info: str,
+        source: str,
+        timestamp: datetime,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        """Add one record."""
+        value = hash_value.lower()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO hashes (hash_id, hash_value, algorithm, file_info, "
+                "source, timestamp, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    hash_id,
+                    value,
+                    algorithm,
+                    file_info,
+                    source,
+                    timestamp.isoformat(),
+                    json.dumps(metadata or {}),
+                ),
+            )
+            self.bloom.add([value])
+
+    def lookup(
+        self, hash_value: str, algorithm: Optional[str] = None
+    ) -> List[KnownHash]:
+        """Records of one digest, optionally restricted to an algorithm."""
+        return self.lookup_many([hash_value], algorithm).get(hash_value.lower(), [])
+
+    def lookup_many(
+        self, hash_values: Iterable[str], algorithm: Optional[str] = None
+    ) -> Dict[str, List[KnownHash]]:
+        """Records of many digests, keyed by lower-case digest; misses are omitted."""
+        results: Dict[str, List[KnownHash]] = {}
+        for rows in self._query(hash_values, algorithm, "*"):
+            for row in rows:
+                results.setdefault(row[2], []).append(self._record(row))
+        return results
+
+    def contains_many(
+        self, hash_values: Iterable[str], algorithm: Optional[str] = None
+    ) -> Set[str]:
+        """The lower-case digests among ``hash_values`` that are in the store."""
+        known: Set[str] = set()
+        for rows in self._query(hash_values, algorithm, "DISTINCT hash_value"):
+            known.update(row[0] for row in rows)
+        return known
+
+    def import_hash_set(
+        self,
+        file_path: str,
+        source: Optional[str] = None,
+        algorithm: Optional[str] = None,
+    ) -> int:
+        """
+        Import an NSRL RDS file or a plain digest list; returns records added.
+
+        NSRL files are recognised by their quoted header row, and a record is
+        added for each of their SHA-1, MD5 and SHA-256 columns. Plain lists
+        hold one digest per line, optionally followed by whitespace and a
+        file name; the algorithm is inferred from the digest length unless
+        given.
+        """
+        start = time.perf_counter()
+        source = source or file_path
+        timestamp = datetime.utcnow().isoformat()
+
+        with open(file_path, "r", encoding="utf-8", errors="replace", newline="") as f:
+            first = f.readline()
+            f.seek(0)
+            if first.startswith('"'):
+                rows = self._nsrl_rows(f)
+            else:
+                rows = self._list_rows(f, algorithm)
+            added = self._bulk_insert(
+                (value, name, file_info, source, timestamp, metadata)
+                for value, name, file_info, metadata in rows
+            )
+
+        elapsed = time.perf_counter() - start
+        self.records_imported += added
+        self.import_time += elapsed
+        self.logger.info(f"Imported {added} hashes from {file_path} in {elapsed:.1f}s")
+        return added
+
+    def rebuild_bloom(self, capacity: Optional[int] = None, error_rate: float = 0.01):
+        """Rebuild the Bloom filter from the table, optionally resized."""
+        with self._lock:
+            if capacity is None:
+                records = self._connection.execute(
+                    "SELECT COUNT(*) FROM hashes"
+                ).fetchone()[0]
+                capacity = max(self.bloom_capacity(), records)
+            self.bloom = BloomFilter(capacity, error_rate)
+            self._bloom_max_id = 0
+            self._extend_bloom()
+            self._save_bloom()
+
+    def bloom_capacity(self) -> int:
+        """Items the filter holds at the error rate it was sized for."""
+        return int(self.bloom.num_bits * np.log(2) / self.bloom.num_hashes)
+
+    def close(self):
+        """Save the Bloom filter and close the database."""
+        with self._lock:
+            self._extend_bloom()
+            self._save_bloom()
+            self._connection.close()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get hash store statistics."""
+        return {
+            "path": self.path,
+            "records": len(self),
+            "lookups": self.lookups,
+            "bloom_rejections": self.bloom_rejections,
+            "database_queries": self.database_queries,
+            "records_imported": self.records_imported,
+            "import_time": self.import_time,
+            "bloom_bits": self.bloom.num_bits,
+            "bloom_hashes": self.bloom.num_hashes,
+            "bloom_fill_ratio": self.bloom.fill_ratio(),
+            "bloom_false_positive_rate": self.bloom.false_positive_rate(),
+        }
+
+    def _query(
+        self, hash_values: Iterable[str], algorithm: Optional[str], columns: str
+    ) -> Iterator[List[tuple]]:
+        """Rows matching the digests that pass the Bloom filter, chunk by chunk."""
+        values = list(dict.fromkeys(value.lower() for value in hash_values))
+        self.lookups += len(values)
+        if not values:
+            return
+
+        with self._lock:
+            candidates = [
+                value
+                for value, maybe in zip(values, self.bloom.contains(values))
+                if maybe
+            ]
+        self.bloom_rejections += len(values) - len(candidates)
+
+        for offset in range(0, len(candidates), QUERY_CHUNK):
+            chunk = candidates[offset : offset + QUERY_CHUNK]
+            sql = (
+                f"SELECT {columns} FROM hashes WHERE hash_value IN "
+                f"({','.join('?' * len(chunk))})"
+            )
+            parameters = list(chunk)
+            if algorithm is not None:
+                sql += " AND algorithm = ?"
+                parameters.append(algorithm)
+            with self._lock:
+                rows = self._connection.execute(sql, parameters).fetchall()
+            self.database_queries += 1
+            yield rows
+
+    def _bulk_insert(self, rows: Iterator[tuple]) -> int:
+        """Insert rows in batches in one transaction, updating the Bloom filter."""
+        added = 0
+        with self._lock, self._connection:
+            # sqlite3 only opens a transaction before DML; begin it here so a
+            # failed import also rolls back the index drop below
+            if not self._connection.in_transaction:
+                self._connection.execute("BEGIN")
+            empty = (
+                self._connection.execute("SELECT 1 FROM hashes LIMIT 1").fetchone()
+                is None
+            )
+            if empty:
+                # Building the index once is much faster than maintaining it
+                self._connection.execute("DROP INDEX IF EXISTS idx_hashes_value")
+
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    added += self._insert_batch(batch)
+                    batch = []
+            if batch:
+                added += self._insert_batch(batch)
+
+            if empty:
+                self._connection.execute(INDEX)
+            self._bloom_max_id = self._max_id()
+            self._save_bloom()
+        return added
+
+    def _insert_batch(self, batch: List[tuple]) -> int:
+        """Insert one batch of (value, algorithm, file_info, source, ts, metadata)."""
+        self._connection.executemany(
+            "INSERT INTO hashes (hash_value, algorithm, file_info, source, "
+            "timestamp, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+            batch,
+        )
+        self.bloom.add([row[0] for row in batch])
+        return len(batch)
+
+    @staticmethod
+    def _nsrl_rows(f: io.TextIOBase) -> Iterator[tuple]:
+        """(value, algorithm, file_info, metadata) rows of an NSRL RDS file."""
+        reader = csv.reader(f)
+        header = [column.strip().lower() for column in next(reader)]
+        hash_columns = [
+            (i, NSRL_COLUMNS[column])
+            for i, column in enumerate(header)
+            if column in NSRL_COLUMNS
+        ]
+        name_column = header.index("filename") if "filename" in header else None
+        size_column = header.index("filesize") if "filesize" in header else None
+        product_column = (
+            header.index("productcode") if "productcode" in header else None
+        )
+
+        for row in reader:
+            if len(row) < len(header):
+                continue
+            metadata = {}
+            if size_column is not None and row[size_column].isdigit():
+                metadata["file_size"] = int(row[size_column])
+            if product_column is not None:
+                metadata["product_code"] = row[product_column]
+            metadata_json = json.dumps(metadata)
+            file_info = row[name_column] if name_column is not None else ""
+            for i, name in hash_columns:
+                if row[i]:
+                    yield row[i].lower(), name, file_info, metadata_json
+
+    @staticmethod
+    def _list_rows(f: io.TextIOBase, algorithm: Optional[str]) -> Iterator[tuple]:
+        """(value, algorithm, file_info, metadata) rows of a plain digest list."""
+        for line in f:
+            parts = line.split(None, 1)
+            if not parts or parts[0].startswith("#"):
+                continue
+            value = parts[0].lower()
+            name = algorithm or DIGEST_LENGTHS.get(len(value))
+            if name is None:
+                continue
+            file_info = parts[1].strip() if len(parts) > 1 else ""
+            yield value, name, file_info, "{}"
+
+    @staticmethod
+    def _record(row: tuple) -> KnownHash:
+        """Build a record from a full table row."""
+        row_id, hash_id, value, algorithm, file_info, source, timestamp, metadata = row
+        return KnownHash(
+            hash_id=hash_id or str(row_id),
+            hash_value=value,
+            algorithm=algorithm,
+            file_info=file_info or "",
+            source=source or "",
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+            metadata=json.loads(metadata) if metadata else {},
+        )
+
+    def _max_id(self) -> int:
+        """Highest record id."""
+        return self._connection.execute("SELECT MAX(id) FROM hashes").fetchone()[0] or 0
+
+    def _load_bloom(self):
+        """Restore the saved Bloom filter, folding in records added since."""
+        saved = self._connection.execute(
+            "SELECT num_bits, num_hashes, max_id, bits FROM bloom WHERE id = 0"
+        ).fetchone()
+        if saved is not None:
+            num_bits, num_hashes, max_id, bits = saved
+            self.bloom.load(num_bits, num_hashes, bits)
+            self._bloom_max_id = max_id
+        if self._extend_bloom():
+            with self._connection:
+                self._save_bloom()
+
+    def _extend_bloom(self) -> bool:
+        """Add records newer than the filter to it; returns whether any were."""
+        cursor = self._connection.execute(
+            "SELECT id, hash_value FROM hashes WHERE id > ? ORDER BY id",
+            (self._bloom_max_id,),
+        )
+        extended = False
+        while rows := cursor.fetchmany(self.batch_size):
+            self.bloom.add([value for _, value in rows])
+            self._bloom_max_id = rows[-1][0]
+            extended = True
+        return extended
+
+    def _save_bloom(self):
+        """Persist the Bloom filter with the highest record id it covers."""
+        self._bloom_max_id = max(self._bloom_max_id, self._max_id())
+        self._connection.execute(
+            "INSERT OR REPLACE INTO bloom (id, num_bits, num_hashes, max_id, bits) "
+            "VALUES (0, ?, ?, ?, ?)",
+            (
+                self.bloom.num_bits,
+                self.bloom.num_hashes,
+                self._bloom_max_id,
+                self.bloom.bits.tobytes(),
+            ),
+        )
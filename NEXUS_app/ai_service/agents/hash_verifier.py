@@ -14,12 +14,17 @@ import json
 import logging
 import os
 import uuid
+from collections import defaultdict
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 
 from ..taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .file_hashing import MultiDigestHasher
+from .hash_store import HashStore, KnownHash
+from .manifest_engine import ManifestEngine, ManifestEntry, ProgressCallback
+from .merkle_tree import MerkleDiff, MerkleManifest, MerkleTreeBuilder
 
 
 class HashAlgorithm(Enum):
@@ -127,8 +132,35 @@ class HashVerifier:
         self.verification_timeout = config.get("verification_timeout", 300)  # 5 minutes
         self.enable_parallel_processing = config.get("enable_parallel_processing", True)
 
-        # Hash management
-        self.hash_database: Dict[str, HashDatabase] = {}
+        # Single-pass hashing engine; parallel processing runs the digests
+        # of a large file in parallel threads
+        self.hasher = MultiDigestHasher(
+            read_size=config.get("hash_read_size", 1 << 20),
+            mmap_min_size=config.get("mmap_min_size", 1 << 20),
+            parallel_min_size=config.get("parallel_digest_min_size", 4 << 20),
+            max_workers=config.get("hash_workers"),
+            parallel_digests=self.enable_parallel_processing,
+        )
+        self.manifest_engine = ManifestEngine(
+            self.hasher,
+            max_concurrency=config.get("manifest_concurrency", 8),
+            progress_interval=config.get("manifest_progress_interval", 1000),
+        )
+        self.merkle_builder = MerkleTreeBuilder(
+            self.hasher,
+            algorithm=config.get("merkle_algorithm", HashAlgorithm.SHA256.value),
+            chunk_size=config.get("merkle_chunk_size", 4 << 20),
+            max_concurrency=config.get("manifest_concurrency", 8),
+        )
+
+        # Hash management; known hashes live in an indexed SQLite store,
+        # in memory unless a path is configured
+        self.hash_store = HashStore(
+            config.get("hash_database_path", ":memory:"),
+            bloom_capacity=config.get("bloom_capacity", 10_000_000),
+            bloom_error_rate=config.get("bloom_error_rate", 0.01),
+            batch_size=config.get("hash_import_batch_size", 50_000),
+        )
         self.verification_results: Dict[str, VerificationResult] = {}
         self.verification_history: Dict[str, List[str]] = defaultdict(list)
 
@@ -159,6 +191,9 @@ class HashVerifier:
     async def stop(self):
         """Stop the HashVerifier."""
         self.logger.info("Stopping HashVerifier...")
+        self.hasher.shutdown()
+        self.merkle_builder.shutdown()
+        self.hash_store.close()
         self.logger.info("HashVerifier stopped")
 
     async def calculate_file_hashes(
@@ -174,42 +209,32 @@ class HashVerifier:
 
             self.logger.info(f"Calculating hashes for file: {file_path}")
 
-            # Get file information
-            file_size = os.path.getsize(file_path)
+            # Read the file once, in the hashing pool, feeding every digest
+            file_digests = await asyncio.get_running_loop().run_in_executor(
+                self.hasher.executor,
+                self.hasher.hash_file,
+                file_path,
+                [algorithm.value for algorithm in algorithms],
+            )
 
-            # Calculate hashes
             hash_results = {}
-
-            if self.enable_parallel_processing:
-                # Parallel hash calculation
-                tasks = []
-                for algorithm in algorithms:
-                    task = asyncio.create_task(
-                        self._calculate_hash_parallel(file_path, algorithm, file_size)
+            for algorithm in algorithms:
+                if algorithm.value in file_digests.errors:
+                    self.logger.error(
+                        f"Error calculating {algorithm.value} hash: "
+                        f"{file_digests.errors[algorithm.value]}"
                     )
-                    tasks.append(task)
-
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                for i, result in enumerate(results):
-                    if isinstance(result, Exception):
-                        self.logger.error(
-                            f"Error calculating {algorithms[i].value} hash: {result}"
-                        )
-                    else:
-                        hash_results[algorithms[i]] = result
-            else:
-                # Sequential hash calculation
-                for algorithm in algorithms:
-                    try:
-                        hash_result = await self._calculate_hash_sequential(
-                            file_path, algorithm, file_size
-                        )
-                        hash_results[algorithm] = hash_result
-                    except Exception as e:
-                        self.logger.error(
-                            f"Error calculating {algorithm.value} hash: {e}"
-                        )
+                    continue
+                hash_value = file_digests.digests[algorithm.value]
+                hash_results[algorithm] = HashResult(
+                    algorithm=algorithm,
+                    hash_value=hash_value,
+                    hash_length=len(hash_value),
+                    calculation_time=file_digests.digest_times[algorithm.value],
+                    file_size=file_digests.file_size,
+                    chunk_size=self.hasher.read_size,
+                    metadata={"read_mode": file_digests.read_mode},
+                )
 
             self.logger.info(
                 f"Hash calculation completed for {len(hash_results)} algorithms"
@@ -221,76 +246,6 @@ class HashVerifier:
             self.logger.error(f"Error calculating file hashes: {e}")
             raise
 
-    async def _calculate_hash_parallel(
-        self, file_path: str, algorithm: HashAlgorithm, file_size: int
-    ):
-        """Calculate hash using parallel processing."""
-        try:
-            start_time = datetime.utcnow()
-
-            # Initialize hash object
-            hash_obj = hashlib.new(algorithm.value)
-
-            # Calculate hash in chunks
-            with open(file_path, "rb") as f:
-                while chunk := f.read(self.chunk_size):
-                    hash_obj.update(chunk)
-
-            hash_value = hash_obj.hexdigest()
-
-            end_time = datetime.utcnow()
-            calculation_time = (end_time - start_time).total_seconds()
-
-            hash_result = HashResult(
-                algorithm=algorithm,
-                hash_value=hash_value,
-                hash_length=len(hash_value),
-                calculation_time=calculation_time,
-                file_size=file_size,
-                chunk_size=self.chunk_size,
-            )
-
-            return hash_result
-
-        except Exception as e:
-            self.logger.error(f"Error in parallel hash calculation: {e}")
-            raise
-
-    async def _calculate_hash_sequential(
-        self, file_path: str, algorithm: HashAlgorithm, file_size: int
-    ) -> HashResult:
-        """Calculate hash using sequential processing."""
-        try:
-            start_time = datetime.utcnow()
-
-            # Initialize hash object
-            hash_obj = hashlib.new(algorithm.value)
-
-            # Calculate hash in chunks
-            with open(file_path, "rb") as f:
-                while chunk := f.read(self.chunk_size):
-                    hash_obj.update(chunk)
-
-            hash_value = hash_obj.hexdigest()
-
-            end_time = datetime.utcnow()
-            calculation_time = (end_time - start_time).total_seconds()
-
-            hash_result = HashResult(
-                algorithm=algorithm,
-                hash_value=hash_value,
-                hash_length=len(hash_value),
-                calculation_time=calculation_time,
-                file_size=file_size,
-                chunk_size=self.chunk_size,
-            )
-
-            return hash_result
-
-        except Exception as e:
-            self.logger.error(f"Error in sequential hash calculation: {e}")
-            raise
-
     async def verify_file_integrity(
         self,
         file_path: str,
@@ -410,24 +365,28 @@ class HashVerifier:
             return True  # Assume corrupted on error
 
     async def add_hash_to_database(
-        self, hash_value: str, algorithm: HashAlgorithm, file_info: str, source: str
+        self,
+        hash_value: str,
+        algorithm: HashAlgorithm,
+        file_info: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None,
     ) -> str:
         """Add a hash to the database."""
         try:
             hash_id = str(uuid.uuid4())
 
-            hash_database_entry = HashDatabase(
+            # Store in database
+            self.hash_store.add(
                 hash_id=hash_id,
                 hash_value=hash_value,
-                algorithm=algorithm,
+                algorithm=algorithm.value,
                 file_info=file_info,
                 source=source,
                 timestamp=datetime.utcnow(),
+                metadata=metadata,
             )
 
-            # Store in database
-            self.hash_database[hash_id] = hash_database_entry
-
             self.logger.info(f"Hash added to database: {hash_id} - {algorithm.value}")
 
             return hash_id
@@ -441,12 +400,12 @@ class HashVerifier:
     ):
         """Search for a hash in the database."""
         try:
-            results = []
-
-            for hash_entry in self.hash_database.values():
-                if hash_entry.hash_value.lower() == hash_value.lower():
-                    if algorithm is None or hash_entry.algorithm == algorithm:
-                        results.append(hash_entry)
+            results = [
+                self._database_entry(record)
+                for record in self.hash_store.lookup(
+                    hash_value, algorithm.value if algorithm else None
+                )
+            ]
 
             self.logger.info(f"Hash search completed: {len(results)} results found")
 
@@ -456,6 +415,66 @@ class HashVerifier:
             self.logger.error(f"Error searching hash database: {e}")
             return []
 
+    async def search_hash_database_batch(
+        self, hash_values: List[str], algorithm: HashAlgorithm = None
+    ) -> Dict[str, List[HashDatabase]]:
+        """
+        Search for many hashes at once.
+
+        Returns the matching entries keyed by lower-case hash value; hashes
+        with no match are left out.
+        """
+        try:
+            records = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.hash_store.lookup_many,
+                hash_values,
+                algorithm.value if algorithm else None,
+            )
+            results = {
+                value: [self._database_entry(record) for record in matches]
+                for value, matches in records.items()
+            }
+
+            self.logger.info(
+                f"Batch hash search completed: {len(results)} of {len(hash_values)} found"
+            )
+
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error searching hash database: {e}")
+            return {}
+
+    async def import_hash_set(
+        self,
+        file_path: str,
+        source: Optional[str] = None,
+        algorithm: Optional[HashAlgorithm] = None,
+    ) -> int:
+        """
+        Import a known-file hash set into the database.
+
+        Accepts NSRL RDS files and plain lists of one hash per line; returns
+        the number of hashes added.
+        """
+        try:
+            added = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self.hash_store.import_hash_set,
+                file_path,
+                source,
+                algorithm.value if algorithm else None,
+            )
+
+            self.logger.info(f"Hash set imported: {file_path} - {added} hashes")
+
+            return added
+
+        except Exception as e:
+            self.logger.error(f"Error importing hash set: {e}")
+            raise
+
     async def verify_hash_against_database(
         self, file_path: str, algorithm: HashAlgorithm = None
     ) -> List[HashDatabase]:
@@ -537,92 +556,251 @@ class HashVerifier:
         directory_path: str,
         output_file: str,
         algorithms: List[HashAlgorithm] = None,
+        progress_callback: Optional[ProgressCallback] = None,
     ) -> str:
-        """Generate checksum file for a directory."""
+        """
+        Generate checksum file for a directory.
+
+        Files are hashed concurrently and written as an NDJSON manifest as
+        they complete; an output file ending in ``.json`` gets the legacy
+        single-object format instead.
+        """
         try:
             if not algorithms:
                 algorithms = self.default_algorithms
+            names = [algorithm.value for algorithm in algorithms]
+
+            if output_file.endswith(".json"):
+                # Hash into a temporary manifest, then collapse it
+                ndjson_file = output_file + ".ndjson.tmp"
+                await self.manifest_engine.generate(
+                    directory_path,
+                    ndjson_file,
+                    names,
+                    progress_callback,
+                    exclude=[output_file],
+                )
+                checksum_data = {
+                    entry.path: entry.hashes
+                    for entry in self.manifest_engine.read_manifest(ndjson_file)
+                }
+                with open(output_file, "w") as f:
+                    json.dump(checksum_data, f, indent=2)
+                os.remove(ndjson_file)
+            else:
+                await self.manifest_engine.generate(
+                    directory_path, output_file, names, progress_callback
+                )
+
+            self.logger.info(f"Checksum file generated: {output_file}")
+
+            return output_file
+
+        except Exception as e:
+            self.logger.error(f"Error generating checksum file: {e}")
+            raise
 
-            checksum_data = {}
+    async def verify_checksum_file(
+        self,
+        checksum_file: str,
+        directory_path: str,
+        skip_unchanged: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+    ):
+        """
+        Verify files against a checksum file.
 
-            # Process all files in directory
-            for root, dirs, files in os.walk(directory_path):
-                for filename in files:
-                    file_path = os.path.join(root, filename)
-                    relative_path = os.path.relpath(file_path, directory_path)
+        Files whose size, mtime and inode still match the manifest are not
+        re-hashed unless ``skip_unchanged`` is False.
+        """
+        try:
 
+            def expected_hashes(entry: ManifestEntry) -> Dict[HashAlgorithm, str]:
+                expected_hash_dict = {}
+                for alg_str, hash_value in entry.hashes.items():
                     try:
-                        # Calculate hashes for file
-                        file_hashes = await self.calculate_file_hashes(
-                            file_path, algorithms
-                        )
+                        expected_hash_dict[HashAlgorithm(alg_str)] = hash_value
+                    except ValueError:
+                        self.logger.warning(f"Unknown hash algorithm: {alg_str}")
+                return expected_hash_dict
+
+            async def verify_entry(file_path: str, entry: ManifestEntry):
+                expected_hash_dict = expected_hashes(entry)
+                if expected_hash_dict:
+                    return await self.verify_file_integrity(
+                        file_path, expected_hash_dict
+                    )
+
+            def skip_entry(file_path: str, entry: ManifestEntry):
+                return self._unchanged_file_result(
+                    file_path, expected_hashes(entry)
+                )
+
+            verification_results = await self.manifest_engine.verify(
+                checksum_file,
+                directory_path,
+                verify_entry,
+                skip_entry,
+                skip_unchanged=skip_unchanged,
+                progress_callback=progress_callback,
+            )
+            verification_results = {
+                path: result
+                for path, result in verification_results.items()
+                if result is not None
+            }
 
-                        # Store hash data
-                        checksum_data[relative_path] = {
-                            algorithm.value: hash_result.hash_value
-                            for algorithm, hash_result in file_hashes.items()
-                        }
+            self.logger.info(
+                f"Checksum verification completed: {len(verification_results)} files verified"
+            )
 
-                    except Exception as e:
-                        self.logger.warning(f"Could not process file {file_path}: {e}")
+            return verification_results
 
-            # Write checksum file
-            with open(output_file, "w") as f:
-                json.dump(checksum_data, f, indent=2)
+        except Exception as e:
+            self.logger.error(f"Error verifying checksum file: {e}")
+            raise
 
-            self.logger.info(f"Checksum file generated: {output_file}")
+    def _unchanged_file_result(
+        self, file_path: str, expected_hashes: Dict[HashAlgorithm, str]
+    ) -> VerificationResult:
+        """Result for a file skipped because its size, mtime and inode match."""
+        return VerificationResult(
+            verification_id=str(uuid.uuid4()),
+            file_id=str(uuid.uuid4()),
+            file_path=file_path,
+            expected_hashes=expected_hashes,
+            calculated_hashes={},
+            verification_status=VerificationStatus.VERIFIED,
+            integrity_level=IntegrityLevel.BASIC,
+            verification_time=0.0,
+            timestamp=datetime.utcnow(),
+            errors=[],
+            warnings=[],
+            metadata={"skipped": "size, mtime and inode unchanged"},
+        )
 
-            return output_file
+    async def build_merkle_manifest(
+        self,
+        path: str,
+        output_file: str,
+        previous_manifest: Optional[str] = None,
+    ) -> MerkleManifest:
+        """
+        Build a Merkle manifest of a file or directory.
+
+        With a previous manifest, files whose size, mtime and inode are
+        unchanged are not read again. The root digest is added to the hash
+        database.
+        """
+        try:
+            previous = (
+                MerkleManifest.load(previous_manifest) if previous_manifest else None
+            )
+            manifest = await self.merkle_builder.build(path, previous)
+
+            manifest.metadata["hash_id"] = await self.add_hash_to_database(
+                manifest.root_digest,
+                HashAlgorithm(manifest.algorithm),
+                file_info=f"merkle_root:{os.path.abspath(path)}",
+                source=output_file,
+                metadata={"chunk_size": manifest.chunk_size},
+            )
+            manifest.save(output_file)
+
+            self.logger.info(
+                f"Merkle manifest generated: {output_file} - root {manifest.root_digest}"
+            )
+
+            return manifest
 
         except Exception as e:
-            self.logger.error(f"Error generating checksum file: {e}")
+            self.logger.error(f"Error building Merkle manifest: {e}")
             raise
 
-    async def verify_checksum_file(self, checksum_file: str, directory_path: str):
-        """Verify files against a checksum file."""
+    async def verify_merkle_manifest(
+        self, manifest_file: str, path: str, skip_unchanged: bool = True
+    ) -> VerificationResult:
+        """
+        Verify a file or directory against a Merkle manifest.
+
+        Only files whose size, mtime or inode changed are re-hashed unless
+        ``skip_unchanged`` is False; differences are reported down to the
+        chunk.
+        """
         try:
-            # Read checksum file
-            with open(checksum_file, "r") as f:
-                checksum_data = json.load(f)
-
-            verification_results = {}
-
-            # Verify each file
-            for relative_path, expected_hashes in checksum_data.items():
-                file_path = os.path.join(directory_path, relative_path)
-
-                if os.path.exists(file_path):
-                    # Convert hash algorithms
-                    algorithms = []
-                    expected_hash_dict = {}
-
-                    for alg_str, hash_value in expected_hashes.items():
-                        try:
-                            algorithm = HashAlgorithm(alg_str)
-                            algorithms.append(algorithm)
-                            expected_hash_dict[algorithm] = hash_value
-                        except ValueError:
-                            self.logger.warning(f"Unknown hash algorithm: {alg_str}")
-
-                    if algorithms:
-                        # Verify file
-                        verification_result = await self.verify_file_integrity(
-                            file_path, expected_hash_dict
-                        )
-                        verification_results[relative_path] = verification_result
-                else:
-                    self.logger.warning(f"File not found: {file_path}")
+            start_time = datetime.utcnow()
+            stored = MerkleManifest.load(manifest_file)
+            current = await self.merkle_builder.build(
+                path, stored if skip_unchanged else None
+            )
+            diff = self.merkle_builder.diff(stored, current)
+
+            errors = [f"File added: {added}" for added in diff.added]
+            errors.extend(f"File removed: {removed}" for removed in diff.removed)
+            errors.extend(
+                f"Chunks changed in {changed}: {chunks}"
+                for changed, chunks in diff.changed.items()
+            )
+            verification_status = (
+                VerificationStatus.VERIFIED
+                if diff.is_identical
+                else VerificationStatus.MISMATCH
+            )
+
+            algorithm = HashAlgorithm(stored.algorithm)
+            verification_time = (datetime.utcnow() - start_time).total_seconds()
+            verification_result = VerificationResult(
+                verification_id=str(uuid.uuid4()),
+                file_id=str(uuid.uuid4()),
+                file_path=path,
+                expected_hashes={algorithm: stored.root_digest},
+                calculated_hashes={
+                    algorithm: HashResult(
+                        algorithm=algorithm,
+                        hash_value=current.root_digest,
+                        hash_length=len(current.root_digest),
+                        calculation_time=verification_time,
+                        file_size=sum(node.size for node in current.files()),
+                        chunk_size=current.chunk_size,
+                    )
+                },
+                verification_status=verification_status,
+                integrity_level=IntegrityLevel.FORENSIC,
+                verification_time=verification_time,
+                timestamp=datetime.utcnow(),
+                errors=errors,
+                warnings=[],
+                metadata={"merkle_diff": asdict(diff)},
+            )
+
+            self.verification_results[verification_result.verification_id] = (
+                verification_result
+            )
+            self.verification_history[verification_result.file_id].append(
+                verification_result.verification_id
+            )
+            self.total_verifications += 1
+            if verification_status == VerificationStatus.VERIFIED:
+                self.successful_verifications += 1
+            else:
+                self.failed_verifications += 1
 
             self.logger.info(
-                f"Checksum verification completed: {len(verification_results)} files verified"
+                f"Merkle verification completed: {verification_result.verification_id} - Status: {verification_status.value}",
             )
 
-            return verification_results
+            return verification_result
 
         except Exception as e:
-            self.logger.error(f"Error verifying checksum file: {e}")
+            self.logger.error(f"Error verifying Merkle manifest: {e}")
             raise
 
+    def diff_merkle_manifests(self, old_manifest: str, new_manifest: str) -> MerkleDiff:
+        """Diff two Merkle manifests, skipping subtrees whose digests match."""
+        return self.merkle_builder.diff(
+            MerkleManifest.load(old_manifest), MerkleManifest.load(new_manifest)
+        )
+
     async def _cleanup_old_results(self):
         """Clean up old verification results."""
         while True:
@@ -717,6 +895,19 @@ class HashVerifier:
             self.logger.error(f"Error getting verification status: {e}")
             return None
 
+    @staticmethod
+    def _database_entry(record: KnownHash) -> HashDatabase:
+        """Convert a hash store record to a database entry."""
+        return HashDatabase(
+            hash_id=record.hash_id,
+            hash_value=record.hash_value,
+            algorithm=HashAlgorithm(record.algorithm),
+            file_info=record.file_info,
+            source=record.source,
+            timestamp=record.timestamp,
+            metadata=record.metadata,
+        )
+
     def get_performance_metrics(self) -> Dict[str, Any]:
         """Get performance metrics."""
         return {
@@ -729,10 +920,20 @@ class HashVerifier:
             "verification_statuses_supported": [
                 status.value for status in VerificationStatus
             ],
-            "hash_database_size": len(self.hash_database),
+            "hash_database_size": len(self.hash_store),
+            "hash_store": self.hash_store.get_statistics(),
             "verification_results_count": len(self.verification_results),
             "chunk_size": self.chunk_size,
             "parallel_processing_enabled": self.enable_parallel_processing,
+            "files_hashed": self.hasher.files_hashed,
+            "bytes_hashed": self.hasher.bytes_hashed,
+            "hash_throughput_mb_s": self.hasher.throughput_mb_s(),
+            "merkle": self.merkle_builder.get_statistics(),
+            "manifest_progress": (
+                asdict(self.manifest_engine.last_progress)
+                if self.manifest_engine.last_progress
+                else None
+            ),
         }
 
 # Example usage and testing
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Manifest Engine - Concurrent Directory Manifests
+
+This module implements the ManifestEngine used by the HashVerifier to
+build and check directory checksum manifests:
+
+- Directories are listed in a worker thread and files are hashed by up to
+  ``max_concurrency`` concurrent jobs on the MultiDigestHasher pool.
+- Manifests are NDJSON: a header line, then one line per file with its
+  size, mtime and inode next to its digests. Lines are written as hashes
+  complete, so a manifest of millions of files never sits in memory.
+- Verification skips files whose size, mtime and inode still match the
+  manifest, unless told to re-hash everything.
+- Progress (files, bytes, MB/s) is reported to an optional callback.
+
+Legacy JSON manifests (a single ``{path: {algorithm: hash}}`` object) can
+still be read.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .file_hashing import MultiDigestHasher
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestProgress:
+    """Progress of a manifest generation or verification run."""
+
+    operation: str
+    files_done: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    bytes_done: int = 0
+    elapsed: float = 0.0
+    throughput_mb_s: float = 0.0
+    finished: bool = False
+
+
+@dataclass
+class ManifestEntry:
+    """One file of a manifest."""
+
+    path: str
+    hashes: Dict[str, str]
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+    inode: Optional[int] = None
+
+
+ProgressCallback = Callable[[ManifestProgress], Any]
+
+
+def list_directory(
+    directory: str,
+) -> Tuple[List[Tuple[str, os.stat_result]], List[str]]:
+    """Files (with stat) and subdirectories of one directory, sorted by name."""
+    files = []
+    subdirectories = []
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+            elif entry.is_file():
+                files.append((entry.path, entry.stat()))
+    return files, subdirectories
+
+
+class ManifestEngine:
+    """Generates and verifies directory manifests with bounded concurrency."""
+
+    def __init__(
+        self,
+        hasher: MultiDigestHasher,
+        max_concurrency: int = 8,
+        progress_interval: int = 1000,
+    ):
+        """Initialize the manifest engine."""
+        self.logger = logging.getLogger(__name__)
+        self.hasher = hasher
+        self.max_concurrency = max_concurrency
+        self.progress_interval = progress_interval
+        self.last_progress: Optional[ManifestProgress] = None
+
+    async def generate(
+        self,
+        directory_path: str,
+        output_file: str,
+        algorithms: List[str],
+        progress_callback: Optional[ProgressCallback] = None,
+        exclude: Iterable[str] = (),
+    ) -> ManifestProgress:
+        """
+        Hash every file under a directory into an NDJSON manifest.
+
+        The output file and the paths in ``exclude`` are left out, so a
+        manifest written inside the directory never lists itself.
+        """
+        progress = ManifestProgress(operation="generate")
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+
+        with open(output_file, "w") as out:
+            header = {
+                "manifest_version": MANIFEST_VERSION,
+                "root": os.path.abspath(directory_path),
+                "algorithms": algorithms,
+                "created": datetime.utcnow().isoformat(),
+            }
+            out.write(json.dumps(header) + "\n")
+
+            async def hash_one(file_path: str, relative_path: str, stat):
+                try:
+                    digests = await loop.run_in_executor(
+                        self.hasher.executor,
+                        self.hasher.hash_file,
+                        file_path,
+                        algorithms,
+                    )
+                except OSError as e:
+                    self.logger.warning(f"Could not process file {file_path}: {e}")
+                    progress.files_failed += 1
+                    return
+
+                entry = ManifestEntry(
+                    path=relative_path,
+                    hashes=digests.digests,
+                    size=digests.file_size,
+                    mtime_ns=stat.st_mtime_ns,
+                    inode=stat.st_ino,
+                )
+                out.write(json.dumps(asdict(entry)) + "\n")
+                progress.files_done += 1
+                progress.bytes_done += digests.file_size
+                await self._report(progress, start, progress_callback)
+
+            await self._run_bounded(
+                hash_one(path, relative, stat)
+                async for path, relative, stat in self._walk(
+                    directory_path, [output_file, *exclude]
+                )
+            )
+
+        await self._report(progress, start, progress_callback, finished=True)
+        return progress
+
+    async def verify(
+        self,
+        manifest_file: str,
+        directory_path: str,
+        verify_entry: Callable[[str, ManifestEntry], Awaitable[Any]],
+        skip_entry: Optional[Callable[[str, ManifestEntry], Any]] = None,
+        skip_unchanged: bool = True,
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Verify the files of a manifest.
+
+        ``verify_entry`` checks one file against its entry. Files whose
+        size, mtime and inode match the entry are passed to ``skip_entry``
+        instead when ``skip_unchanged`` is set. Returns each callback's
+        result by relative path; missing files are logged and left out.
+        """
+        progress = ManifestProgress(operation="verify")
+        start = time.perf_counter()
+        results: Dict[str, Any] = {}
+
+        async def check_one(file_path: str, entry: ManifestEntry, stat):
+            unchanged = skip_unchanged and skip_entry is not None
+            try:
+                if unchanged and self._unchanged(entry, stat):
+                    results[entry.path] = skip_entry(file_path, entry)
+                    progress.files_skipped += 1
+                else:
+                    results[entry.path] = await verify_entry(file_path, entry)
+                    progress.bytes_done += stat.st_size
+            except Exception as e:
+                self.logger.warning(f"Could not verify file {file_path}: {e}")
+                progress.files_failed += 1
+                return
+            progress.files_done += 1
+            await self._report(progress, start, progress_callback)
+
+        async def entries():
+            loop = asyncio.get_running_loop()
+            for entry in self.read_manifest(manifest_file):
+                file_path = os.path.join(directory_path, entry.path)
+                try:
+                    stat = await loop.run_in_executor(None, os.stat, file_path)
+                except OSError:
+                    self.logger.warning(f"File not found: {file_path}")
+                    progress.files_failed += 1
+                    continue
+                yield check_one(file_path, entry, stat)
+
+        await self._run_bounded(entries())
+        await self._report(progress, start, progress_callback, finished=True)
+        return results
+
+    def read_manifest(self, manifest_file: str) -> Iterator[ManifestEntry]:
+        """Stream the entries of an NDJSON or legacy JSON manifest."""
+        with open(manifest_file, "r") as f:
+            first = f.readline()
+            try:
+                header = json.loads(first)
+            except json.JSONDecodeError:
+                header = None
+
+            if not isinstance(header, dict) or "manifest_version" not in header:
+                # Legacy manifest: one JSON object of path -> hashes
+                f.seek(0)
+                for path, hashes in json.load(f).items():
+                    yield ManifestEntry(path=path, hashes=hashes)
+                return
+
+            for line in f:
+                if line.strip():
+                    yield ManifestEntry(**json.loads(line))
+
+    async def _walk(
+        self, directory_path: str, exclude: Iterable[str] = ()
+    ) -> AsyncIterator[Tuple[str, str, os.stat_result]]:
+        """Yield (path, relative path, stat) of every file, listing in a thread."""
+        excluded = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+        loop = asyncio.get_running_loop()
+        pending = [directory_path]
+        while pending:
+            directory = pending.pop()
+            try:
+                files, subdirectories = await loop.run_in_executor(
+                    None, list_directory, directory
+                )
+            except OSError as e:
+                self.logger.warning(f"Could not list directory {directory}: {e}")
+                continue
+            pending.extend(reversed(subdirectories))
+            for path, stat in files:
+                if os.path.normcase(os.path.abspath(path)) in excluded:
+                    continue
+                yield path, os.path.relpath(path, directory_path), stat
+
+    async def _run_bounded(self, jobs: AsyncIterator[Awaitable[Any]]):
+        """Run the coroutines of an async iterator, max_concurrency at a time."""
+        running = set()
+        try:
+            async for job in jobs:
+                if len(running) >= self.max_concurrency:
+                    done, running = await asyncio.wait(
+                        running, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                running.add(asyncio.ensure_future(job))
+            if running:
+                await asyncio.gather(*running)
+        except BaseException:
+            for task in running:
+                task.cancel()
+            raise
+
+    @staticmethod
+    def _unchanged(entry: ManifestEntry, stat: os.stat_result) -> bool:
+        """Whether a file still has the size, mtime and inode of its entry."""
+        return (
+            entry.size is not None
+            and entry.mtime_ns is not None
+            and entry.inode is not None
+            and stat.st_size == entry.size
+            and stat.st_mtime_ns == entry.mtime_ns
+            and stat.st_ino == entry.inode
+        )
+
+    async def _report(
+        self,
+        progress: ManifestProgress,
+        start: float,
+        callback: Optional[ProgressCallback],
+        finished: bool = False,
+    ):
+        """Update timing and notify the callback every progress_interval files."""
+        progress.elapsed = time.perf_counter() - start
+        if progress.elapsed > 0:
+            progress.throughput_mb_s = progress.bytes_done / 1e6 / progress.elapsed
+        progress.finished = finished
+        self.last_progress = progress
+
+        handled = progress.files_done + progress.files_failed
+        if not finished and handled % self.progress_interval:
+            return
+        self.logger.info(
+            f"Manifest {progress.operation}: {progress.files_done} files, "
+            f"{progress.bytes_done / 1e6:.1f} MB, {progress.throughput_mb_s:.1f} MB/s"
+        )
+        if callback is not None:
+            try:
+                result = callback(progress)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                self.logger.error(f"Error in manifest progress callback: {e}")
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Merkle Tree - Chunk-Level Evidence Manifests
+
+This module implements the Merkle manifests used by the HashVerifier.
+Every file is split into ``chunk_size`` chunks; the chunk hashes are the
+leaves of a binary hash tree whose root is the file's digest, and each
+directory's digest covers the names, kinds and digests of its entries,
+up to one root digest for the whole evidence folder or image.
+
+Leaves, inner nodes and directories are hashed with distinct prefixes
+(0x00, 0x01, 0x02) so one kind of node can never pass for another.
+
+Two things make re-verification cheap:
+
+- A rebuild against a previous manifest reuses the nodes of files whose
+  size, mtime and inode are unchanged, so only changed files are read.
+- Two manifests are diffed top down, skipping every subtree whose digest
+  matches, down to the indices of the chunks that differ.
+
+Manifests are NDJSON: a header line with the root digest, a line per
+directory and a line per file with its chunk hashes.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from .file_hashing import MultiDigestHasher
+from .manifest_engine import list_directory
+
+MERKLE_MANIFEST_VERSION = 1
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+_DIRECTORY = b"\x02"
+
+
+@dataclass
+class MerkleFileNode:
+    """A file: its chunk hashes and the root of the tree over them."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    chunks: List[str]
+    root: str
+
+
+@dataclass
+class MerkleDirectoryNode:
+    """A directory: its entries by name and the digest over them."""
+
+    path: str
+    children: Dict[str, Union["MerkleDirectoryNode", MerkleFileNode]] = field(
+        default_factory=dict
+    )
+    root: str = ""
+
+
+@dataclass
+class MerkleDiff:
+    """Differences between two Merkle manifests."""
+
+    roots_match: bool
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, List[int]] = field(default_factory=dict)
+    subtrees_compared: int = 0
+
+    @property
+    def is_identical(self) -> bool:
+        """Whether the two manifests describe the same content."""
+        return self.roots_match and not (self.added or self.removed or self.changed)
+
+
+@dataclass
+class MerkleManifest:
+    """A Merkle tree over one file or one directory."""
+
+    algorithm: str
+    chunk_size: int
+    root: Union[MerkleDirectoryNode, MerkleFileNode]
+    created: datetime = field(default_factory=datetime.utcnow)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def root_digest(self) -> str:
+        """Root digest of the whole tree."""
+        return self.root.root
+
+    def files(self) -> Iterator[MerkleFileNode]:
+        """Iterate over the file nodes, depth first in name order."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, MerkleFileNode):
+                yield node
+            else:
+                names = sorted(node.children, reverse=True)
+                stack.extend(node.children[name] for name in names)
+
+    def directories(self) -> Iterator[MerkleDirectoryNode]:
+        """Iterate over the directory nodes, parents first."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, MerkleDirectoryNode):
+                yield node
+                stack.extend(node.children.values())
+
+    def save(self, manifest_file: str):
+        """Write the manifest as NDJSON."""
+        with open(manifest_file, "w") as out:
+            header = {
+                "merkle_manifest_version": MERKLE_MANIFEST_VERSION,
+                "algorithm": self.algorithm,
+                "chunk_size": self.chunk_size,
+                "kind": (
+                    "file" if isinstance(self.root, MerkleFileNode) else "directory"
+                ),
+                "root": self.root_digest,
+                "created": self.created.isoformat(),
+                "metadata": self.metadata,
+            }
+            out.write(json.dumps(header) + "\n")
+            for directory in self.directories():
+                out.write(json.dumps({"directory": directory.path}) + "\n")
+            for node in self.files():
+                out.write(json.dumps(asdict(node)) + "\n")
+
+    @classmethod
+    def load(cls, manifest_file: str) -> "MerkleManifest":
+        """
+        Read an NDJSON manifest and check it.
+
+        Every file's root is recomputed from its chunk hashes and every
+        directory digest from its entries, so an edited chunk hash cannot
+        survive a load and be reused by a later verification.
+        """
+        with open(manifest_file, "r") as f:
+            header = json.loads(f.readline())
+            if "merkle_manifest_version" not in header:
+                raise ValueError(f"Not a Merkle manifest: {manifest_file}")
+
+            algorithm = header["algorithm"]
+            chunk_size = header["chunk_size"]
+            if header["kind"] == "file":
+                root = MerkleFileNode(**json.loads(f.readline()))
+                _check_file(root, algorithm, chunk_size, manifest_file)
+            else:
+                root = MerkleDirectoryNode(path="")
+                directories = {"": root}
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if "directory" in record:
+                        path = record["directory"]
+                        if path not in directories:
+                            node = MerkleDirectoryNode(path=path)
+                            directories[path] = node
+                            parent, name = _split(path)
+                            directories[parent].children[name] = node
+                    else:
+                        node = MerkleFileNode(**record)
+                        _check_file(node, algorithm, chunk_size, manifest_file)
+                        parent, name = _split(node.path)
+                        directories[parent].children[name] = node
+                _seal(root, algorithm)
+
+        if root.root != header["root"]:
+            raise ValueError(f"Merkle manifest root mismatch: {manifest_file}")
+        return cls(
+            algorithm=algorithm,
+            chunk_size=chunk_size,
+            root=root,
+            created=datetime.fromisoformat(header["created"]),
+            metadata=header.get("metadata", {}),
+        )
+
+
+class MerkleTreeBuilder:
+    """Builds, diffs and spot-checks Merkle manifests."""
+
+    def __init__(
+        self,
+        hasher: MultiDigestHasher,
+        algorithm: str = "sha256",
+        chunk_size: int = 4 << 20,
+        max_concurrency: int = 8,
+        chunk_workers: Optional[int] = None,
+    ):
+        """Initialize the Merkle tree builder."""
+        self.logger = logging.getLogger(__name__)
+        self.hasher = hasher
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+
+        # Chunks of one large file are hashed across this pool, separate from
+        # the file pool so a file task never waits on its own pool
+        self.chunk_workers = chunk_workers or os.cpu_count() or 1
+        self._chunk_pool = ThreadPoolExecutor(
+            max_workers=self.chunk_workers, thread_name_prefix="merkle-chunk"
+        )
+
+        # Statistics
+        self.files_hashed = 0
+        self.files_reused = 0
+        self.bytes_hashed = 0
+
+    async def build(
+        self, path: str, previous: Optional[MerkleManifest] = None
+    ) -> MerkleManifest:
+        """
+        Build the Merkle tree of a file or directory.
+
+        Files whose size, mtime and inode match their node in ``previous``
+        (built with the same algorithm and chunk size) are not read again.
+        """
+        reusable: Dict[str, MerkleFileNode] = {}
+        if (
+            previous is not None
+            and previous.algorithm == self.algorithm
+            and previous.chunk_size == self.chunk_size
+        ):
+            reusable = {node.path: node for node in previous.files()}
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if os.path.isdir(path):
+            root = await self._build_directory(path, "", reusable, semaphore)
+        else:
+            stat = os.stat(path)
+            name = os.path.basename(path)
+            root = await self._build_file(path, name, stat, reusable, semaphore)
+
+        return MerkleManifest(
+            algorithm=self.algorithm,
+            chunk_size=self.chunk_size,
+            root=root,
+            metadata={"source": os.path.abspath(path)},
+        )
+
+    def diff(self, old: MerkleManifest, new: MerkleManifest) -> MerkleDiff:
+        """Compare two manifests, descending only into subtrees that differ."""
+        result = MerkleDiff(roots_match=old.root_digest == new.root_digest)
+        if old.algorithm != new.algorithm or old.chunk_size != new.chunk_size:
+            raise ValueError("Manifests use different algorithms or chunk sizes")
+        self._diff_nodes(old.root, new.root, result)
+        return result
+
+    def verify_chunks(
+        self, file_path: str, node: MerkleFileNode, indices: List[int]
+    ) -> List[int]:
+        """Re-hash selected chunks of a file; returns the indices that differ."""
+        mismatched = []
+        with open(file_path, "rb") as f:
+            for index in indices:
+                f.seek(index * self.chunk_size)
+                digest = self._leaf(f.read(self.chunk_size))
+                if index >= len(node.chunks) or digest != node.chunks[index]:
+                    mismatched.append(index)
+        return mismatched
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get Merkle builder statistics."""
+        return {
+            "algorithm": self.algorithm,
+            "chunk_size": self.chunk_size,
+            "files_hashed": self.files_hashed,
+            "files_reused": self.files_reused,
+            "bytes_hashed": self.bytes_hashed,
+        }
+
+    def shutdown(self):
+        """Shut down the chunk pool."""
+        self._chunk_pool.shutdown(wait=False)
+
+    async def _build_directory(
+        self,
+        directory: str,
+        relative: str,
+        reusable: Dict[str, MerkleFileNode],
+        semaphore: asyncio.Semaphore,
+    ) -> MerkleDirectoryNode:
+        """Build a directory node, its files and subdirectories concurrently."""
+        loop = asyncio.get_running_loop()
+        files, subdirectories = await loop.run_in_executor(
+            None, list_directory, directory
+        )
+
+        jobs = [
+            self._build_file(
+                file_path,
+                _join(relative, os.path.basename(file_path)),
+                stat,
+                reusable,
+                semaphore,
+            )
+            for file_path, stat in files
+        ]
+        jobs.extend(
+            self._build_directory(
+                subdirectory,
+                _join(relative, os.path.basename(subdirectory)),
+                reusable,
+                semaphore,
+            )
+            for subdirectory in subdirectories
+        )
+        children = await asyncio.gather(*jobs)
+
+        node = MerkleDirectoryNode(path=relative)
+        for child in children:
+            node.children[_split(child.path)[1]] = child
+        node.root = _directory_digest(node, self.algorithm)
+        return node
+
+    async def _build_file(
+        self,
+        file_path: str,
+        relative: str,
+        stat: os.stat_result,
+        reusable: Dict[str, MerkleFileNode],
+        semaphore: asyncio.Semaphore,
+    ) -> MerkleFileNode:
+        """Build a file node, reusing the previous one if the file is unchanged."""
+        previous = reusable.get(relative)
+        if (
+            previous is not None
+            and previous.size == stat.st_size
+            and previous.mtime_ns == stat.st_mtime_ns
+            and previous.inode == stat.st_ino
+        ):
+            self.files_reused += 1
+            return previous
+
+        async with semaphore:
+            chunks = await asyncio.get_running_loop().run_in_executor(
+                self.hasher.executor, self._hash_chunks, file_path
+            )
+        self.files_hashed += 1
+        self.bytes_hashed += stat.st_size
+        return MerkleFileNode(
+            path=relative,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            inode=stat.st_ino,
+            chunks=chunks,
+            root=_tree_root(chunks, self.algorithm),
+        )
+
+    def _hash_chunks(self, file_path: str) -> List[str]:
+        """Leaf hashes of every chunk of a file, large files across the pool."""
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            count = -(-size // self.chunk_size)
+            if count <= 1:
+                return [self._leaf(f.read())]
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    per_worker = -(-count // self.chunk_workers)
+                    futures = [
+                        self._chunk_pool.submit(
+                            self._hash_range,
+                            view,
+                            start,
+                            min(count, start + per_worker),
+                        )
+                        for start in range(0, count, per_worker)
+                    ]
+                    chunks = []
+                    for future in futures:
+                        chunks.extend(future.result())
+                    return chunks
+                finally:
+                    view.release()
+
+    def _hash_range(self, view: memoryview, start: int, stop: int) -> List[str]:
+        """Leaf hashes of chunks start to stop of a mapped file."""
+        size = self.chunk_size
+        return [
+            self._leaf(view[index * size : (index + 1) * size])
+            for index in range(start, stop)
+        ]
+
+    def _leaf(self, data) -> str:
+        """Leaf hash of one chunk."""
+        digest = hashlib.new(self.algorithm, _LEAF)
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _diff_nodes(self, old, new, result: MerkleDiff):
+        """Record the differences below two nodes with the same path."""
+        result.subtrees_compared += 1
+        if old.root == new.root and type(old) is type(new):
+            return
+
+        if isinstance(old, MerkleFileNode) and isinstance(new, MerkleFileNode):
+            length = max(len(old.chunks), len(new.chunks))
+            result.changed[new.path] = [
+                index
+                for index in range(length)
+                if index >= len(old.chunks)
+                or index >= len(new.chunks)
+                or old.chunks[index] != new.chunks[index]
+            ]
+            return
+
+        if isinstance(old, MerkleDirectoryNode) and isinstance(
+            new, MerkleDirectoryNode
+        ):
+            for name in sorted(set(old.children) | set(new.children)):
+                if name not in new.children:
+                    result.removed.extend(_paths(old.children[name]))
+                elif name not in old.children:
+                    result.added.extend(_paths(new.children[name]))
+                else:
+                    self._diff_nodes(old.children[name], new.children[name], result)
+            return
+
+        # A file replaced by a directory or the other way round
+        result.removed.extend(_paths(old))
+        result.added.extend(_paths(new))
+
+
+def _join(parent: str, name: str) -> str:
+    """Manifest path of a child (always '/'-separated)."""
+    return f"{parent}/{name}" if parent else name
+
+
+def _split(path: str):
+    """Parent path and name of a manifest path."""
+    parent, _, name = path.rpartition("/")
+    return parent, name
+
+
+def _paths(node) -> List[str]:
+    """Paths of every file at or below a node."""
+    if isinstance(node, MerkleFileNode):
+        return [node.path]
+    return [path for child in node.children.values() for path in _paths(child)]
+
+
+def _tree_root(leaves: List[str], algorithm: str) -> str:
+    """Root of the binary hash tree over leaf hashes (odd nodes carried up)."""
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        paired = [
+            hashlib.new(algorithm, _NODE + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def _directory_digest(node: MerkleDirectoryNode, algorithm: str) -> str:
+    """Digest over a directory's entry names, kinds and digests."""
+    digest = hashlib.new(algorithm, _DIRECTORY)
+    for name in sorted(node.children):
+        child = node.children[name]
+        kind = b"f" if isinstance(child, MerkleFileNode) else b"d"
+        digest.update(name.encode("utf-8") + b"\x00" + kind)
+        digest.update(bytes.fromhex(child.root))
+    return digest.hexdigest()
+
+
+def _check_file(
+    node: MerkleFileNode, algorithm: str, chunk_size: int, manifest_file: str
+):
+    """Check a loaded file node's chunk count and root against its chunks."""
+    expected_chunks = max(1, -(-node.size // chunk_size))
+    if (
+        len(node.chunks) != expected_chunks
+        or _tree_root(node.chunks, algorithm) != node.root
+    ):
+        raise ValueError(
+            f"Merkle manifest file digest mismatch for {node.path!r}: {manifest_file}"
+        )
+
+
+def _seal(node: MerkleDirectoryNode, algorithm: str):
+    """Compute the digests of a loaded directory tree, bottom up."""
+    for child in node.children.values():
+        if isinstance(child, MerkleDirectoryNode):
+            _seal(child, algorithm)
+    node.root = _directory_digest(node, algorithm)
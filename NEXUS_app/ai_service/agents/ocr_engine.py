@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+OCR Engine - Page-Parallel OCR over a Process Pool
+
+This module implements the PageOCREngine used by the OCRProcessor:
+
+- A PDF is never rasterized as a whole. Each page is rendered inside a
+  worker process (PyMuPDF, falling back to pdf2image for that one page),
+  preprocessed and passed to Tesseract there, and only the page's text,
+  confidences and boxes come back.
+- Pages are fanned out to a process pool sized to the cores, with at most
+  ``max_in_flight`` pages submitted at once, so peak memory is bounded by
+  the pages in flight rather than by the document length.
+- Results are yielded as an async stream of OCRPage objects in page order,
+  while later pages are still being recognised. The event loop only
+  awaits futures.
+
+Text layers are read per page as well, so a PDF can be handled page by
+page: pages with a usable embedded text layer keep it, and only image-only
+pages or pages with suspiciously little text are OCR'd.
+
+Page images are neither kept nor written to disk; render_page renders a
+page again, exactly as it was OCR'd, when a caller needs its image.
+
+The page-level helpers (preprocessing, post-processing, language
+detection) are module functions so they can run in the workers.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+try:
+    import pytesseract
+    from PIL import Image, ImageEnhance, ImageFilter
+
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+try:
+    import fitz  # PyMuPDF
+
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import pdf2image
+
+    PDF2IMAGE_AVAILABLE = True
+except ImportError:
+    PDF2IMAGE_AVAILABLE = False
+
+try:
+    import pdfplumber
+
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+try:
+    import PyPDF2
+
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+# PDF user space units per inch
+POINTS_PER_INCH = 72.0
+
+
+@dataclass
+class OCRPage:
+    """OCR results for a single page."""
+
+    page_number: int
+    text_content: str
+    confidence_scores: List[float]
+    bounding_boxes: List[Dict[str, Any]]
+    language_detected: str
+    processing_time: float
+    image_path: Optional[str]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PageOCRSettings:
+    """Per-document settings sent to the OCR workers."""
+
+    tesseract_config: str
+    confidence_threshold: float
+    preprocess: bool = True
+    postprocess: bool = True
+    dpi: int = 300
+
+
+@dataclass
+class PageTextLayer:
+    """Embedded text of one PDF page and how much of the page is images."""
+
+    page_number: int
+    text: str
+    page_area: float  # square inches
+    image_coverage: Optional[float]  # None when the reader cannot tell
+
+    @property
+    def char_count(self) -> int:
+        """Non-whitespace characters of the text layer."""
+        return sum(1 for c in self.text if not c.isspace())
+
+    @property
+    def density(self) -> float:
+        """Non-whitespace characters per square inch."""
+        return self.char_count / self.page_area if self.page_area > 0 else 0.0
+
+
+@dataclass
+class TextLayerPolicy:
+    """Thresholds deciding whether a page's text layer can be used."""
+
+    min_chars: int = 20
+    min_density: float = 2.0  # characters per square inch
+    scanned_coverage: float = 0.5  # image coverage of a scanned page
+    max_garbled_ratio: float = 0.1
+
+    def ocr_reason(self, layer: PageTextLayer) -> Optional[str]:
+        """Why a page must be OCR'd, or None if its text layer is usable."""
+        chars = layer.char_count
+        if chars < self.min_chars:
+            return "no_text_layer"
+        garbled = layer.text.count("\ufffd") + layer.text.count("\x00")
+        if garbled / chars > self.max_garbled_ratio:
+            return "garbled_text_layer"
+        if layer.density < self.min_density and (
+            layer.image_coverage is None
+            or layer.image_coverage >= self.scanned_coverage
+        ):
+            return "sparse_text_layer"
+        return None
+
+
+def _image_coverage(page_area: float, boxes: List[Tuple[float, ...]]) -> float:
+    """Fraction of a page (in points squared) covered by image boxes."""
+    if page_area <= 0:
+        return 0.0
+    covered = sum(max(0.0, x1 - x0) * max(0.0, y1 - y0) for x0, y0, x1, y1 in boxes)
+    return min(1.0, covered / page_area)
+
+
+def read_text_layers(
+    document_path: str, max_pages: Optional[int] = None
+) -> List[PageTextLayer]:
+    """Text layer of each page, by PyMuPDF, pdfplumber or PyPDF2."""
+    square_inch = POINTS_PER_INCH * POINTS_PER_INCH
+    layers = []
+
+    if PYMUPDF_AVAILABLE:
+        with fitz.open(document_path) as document:
+            for index in range(min(document.page_count, max_pages or 1 << 30)):
+                page = document[index]
+                area = page.rect.width * page.rect.height
+                boxes = [tuple(info["bbox"]) for info in page.get_image_info()]
+                layers.append(
+                    PageTextLayer(
+                        page_number=index + 1,
+                        text=page.get_text(),
+                        page_area=area / square_inch,
+                        image_coverage=_image_coverage(area, boxes),
+                    )
+                )
+        return layers
+
+    if PDFPLUMBER_AVAILABLE:
+        with pdfplumber.open(document_path) as pdf:
+            for index, page in enumerate(pdf.pages[:max_pages]):
+                area = float(page.width * page.height)
+                boxes = [
+                    (image["x0"], image["top"], image["x1"], image["bottom"])
+                    for image in page.images
+                ]
+                layers.append(
+                    PageTextLayer(
+                        page_number=index + 1,
+                        text=page.extract_text() or "",
+                        page_area=area / square_inch,
+                        image_coverage=_image_coverage(area, boxes),
+                    )
+                )
+                page.flush_cache()
+        return layers
+
+    if PYPDF2_AVAILABLE:
+        with open(document_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            for index, page in enumerate(reader.pages[:max_pages]):
+                box = page.mediabox
+                area = float(box.width) * float(box.height)
+                layers.append(
+                    PageTextLayer(
+                        page_number=index + 1,
+                        text=page.extract_text() or "",
+                        page_area=area / square_inch,
+                        image_coverage=None,
+                    )
+                )
+        return layers
+
+    return layers
+
+
+def preprocess_image(image: "Image.Image") -> "Image.Image":
+    """Grayscale, contrast, sharpen and denoise an image for OCR."""
+    # Convert to grayscale if needed
+    if image.mode != "L":
+        image = image.convert("L")
+
+    # Enhance contrast
+    image = ImageEnhance.Contrast(image).enhance(1.5)
+
+    # Enhance sharpness
+    image = ImageEnhance.Sharpness(image).enhance(1.2)
+
+    # Apply slight blur to reduce noise
+    return image.filter(ImageFilter.GaussianBlur(radius=0.5))
+
+
+def postprocess_text(text: str) -> str:
+    """Normalise whitespace and fix common OCR character confusions."""
+    # Remove extra whitespace
+    text = " ".join(text.split())
+
+    # Fix common OCR errors
+    text = text.replace("|", "I")
+    text = text.replace("0", "O")  # Context-dependent
+    text = text.replace("1", "l")  # Context-dependent
+
+    return text
+
+
+def detect_language(text: str) -> str:
+    """Guess the language of text from its share of Latin characters."""
+    if not text:
+        return "unknown"
+
+    # Count characters from different scripts
+    latin_ratio = sum(1 for c in text if ord(c) < 128) / len(text)
+
+    if latin_ratio > 0.9:
+        return "en"  # Assume English for Latin text
+    elif latin_ratio > 0.7:
+        return "multi"  # Mixed content
+    else:
+        return "unknown"  # Non-Latin script
+
+
+def recognize_image(
+    image: "Image.Image", page_number: int, settings: PageOCRSettings
+) -> OCRPage:
+    """Run Tesseract on one page image."""
+    start = time.perf_counter()
+    if settings.preprocess:
+        image = preprocess_image(image)
+
+    ocr_data = pytesseract.image_to_data(
+        image, config=settings.tesseract_config, output_type=pytesseract.Output.DICT
+    )
+
+    # Extract text and confidence scores
+    words = []
+    confidence_scores = []
+    bounding_boxes = []
+    for i, text in enumerate(ocr_data["text"]):
+        confidence = float(ocr_data["conf"][i])
+        if text.strip() and confidence > settings.confidence_threshold:
+            words.append(text)
+            confidence_scores.append(confidence)
+            bounding_boxes.append(
+                {
+                    "x": ocr_data["left"][i],
+                    "y": ocr_data["top"][i],
+                    "width": ocr_data["width"][i],
+                    "height": ocr_data["height"][i],
+                    "text": text,
+                    "confidence": confidence,
+                }
+            )
+
+    text_content = " ".join(words)
+    if settings.postprocess:
+        text_content = postprocess_text(text_content)
+
+    return OCRPage(
+        page_number=page_number,
+        text_content=text_content.strip(),
+        confidence_scores=confidence_scores,
+        bounding_boxes=bounding_boxes,
+        language_detected=detect_language(text_content),
+        processing_time=time.perf_counter() - start,
+        image_path=None,
+        metadata={
+            "image_size": image.size,
+            "image_mode": image.mode,
+        },
+    )
+
+
+# Document opened by this worker process; consecutive pages of one
+# document reuse it
+_open_document: Tuple[Optional[str], Any] = (None, None)
+
+
+def _init_worker():
+    """Keep Tesseract single-threaded; the pool provides the parallelism."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _render_pdf_page(
+    document_path: str, page_number: int, dpi: int, grayscale: bool
+) -> "Image.Image":
+    """Rasterize one PDF page (1-based)."""
+    global _open_document
+
+    if PYMUPDF_AVAILABLE:
+        path, document = _open_document
+        if path != document_path:
+            if document is not None:
+                document.close()
+            document = fitz.open(document_path)
+            _open_document = (document_path, document)
+        pixmap = document[page_number - 1].get_pixmap(
+            dpi=dpi, colorspace=fitz.csGRAY if grayscale else fitz.csRGB, alpha=False
+        )
+        mode = "L" if grayscale else "RGB"
+        return Image.frombytes(mode, (pixmap.width, pixmap.height), pixmap.samples)
+
+    return pdf2image.convert_from_path(
+        document_path,
+        dpi=dpi,
+        first_page=page_number,
+        last_page=page_number,
+        grayscale=grayscale,
+    )[0]
+
+
+def ocr_pdf_page(
+    document_path: str, page_number: int, settings: PageOCRSettings
+) -> OCRPage:
+    """Rasterize and recognise one PDF page; runs in a worker process."""
+    start = time.perf_counter()
+    image = _render_pdf_page(
+        document_path, page_number, settings.dpi, grayscale=settings.preprocess
+    )
+    try:
+        page = recognize_image(image, page_number, settings)
+    finally:
+        image.close()
+    page.processing_time = time.perf_counter() - start
+    return page
+
+
+def ocr_image_file(image_path: str, settings: PageOCRSettings) -> OCRPage:
+    """Recognise an image file as page 1; runs in a worker process."""
+    with Image.open(image_path) as image:
+        return recognize_image(image, 1, settings)
+
+
+def render_page_png(
+    document_path: str, page_number: int, settings: PageOCRSettings, is_pdf: bool
+) -> bytes:
+    """PNG of the page image OCR was run on; runs in a worker process."""
+    if is_pdf:
+        image = _render_pdf_page(
+            document_path, page_number, settings.dpi, grayscale=settings.preprocess
+        )
+    else:
+        image = Image.open(document_path)
+    try:
+        if settings.preprocess:
+            image = preprocess_image(image)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        return buffer.getvalue()
+    finally:
+        image.close()
+
+
+def count_pdf_pages(document_path: str) -> int:
+    """Number of pages of a PDF without rendering any."""
+    if PYMUPDF_AVAILABLE:
+        with fitz.open(document_path) as document:
+            return document.page_count
+    return int(pdf2image.pdfinfo_from_path(document_path)["Pages"])
+
+
+class PageOCREngine:
+    """Streams page-level OCR results from a process pool."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        page_timeout: Optional[float] = None,
+    ):
+        """Initialize the OCR engine; the pool starts on first use."""
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or 2 * self.max_workers
+        self.page_timeout = page_timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # Statistics
+        self.documents_processed = 0
+        self.pages_processed = 0
+        self.pages_failed = 0
+        self.page_time = 0.0
+        self.wall_time = 0.0
+        self.peak_in_flight = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """The worker pool, created on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker
+            )
+        return self._executor
+
+    async def count_pages(self, document_path: str) -> int:
+        """Number of pages of a PDF."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, count_pdf_pages, document_path
+        )
+
+    async def ocr_pdf(
+        self,
+        document_path: str,
+        settings: PageOCRSettings,
+        max_pages: Optional[int] = None,
+        page_numbers: Optional[List[int]] = None,
+    ) -> AsyncIterator[OCRPage]:
+        """
+        Yield the OCR result of each page of a PDF, in page order.
+
+        Only ``page_numbers`` (1-based) are OCR'd when given. A page that
+        fails or times out is yielded with no text and the error in its
+        metadata, so the stream always covers every page asked for.
+        """
+        start = time.perf_counter()
+        if page_numbers is None:
+            page_count = await self.count_pages(document_path)
+            if max_pages is not None:
+                page_count = min(page_count, max_pages)
+            page_numbers = range(1, page_count + 1)
+        pending = iter(sorted(page_numbers))
+
+        loop = asyncio.get_running_loop()
+        in_flight: Deque[Tuple[int, asyncio.Future]] = deque()
+        next_page = next(pending, None)
+        try:
+            while next_page is not None or in_flight:
+                while next_page is not None and len(in_flight) < self.max_in_flight:
+                    future = loop.run_in_executor(
+                        self.executor, ocr_pdf_page, document_path, next_page, settings
+                    )
+                    in_flight.append((next_page, future))
+                    next_page = next(pending, None)
+                self.peak_in_flight = max(self.peak_in_flight, len(in_flight))
+
+                page_number, future = in_flight.popleft()
+                yield await self._page_result(page_number, future)
+        finally:
+            # Stop queued pages if the consumer stops early
+            for _, future in in_flight:
+                future.cancel()
+            self.documents_processed += 1
+            self.wall_time += time.perf_counter() - start
+
+    async def text_layers(
+        self, document_path: str, max_pages: Optional[int] = None
+    ) -> List[PageTextLayer]:
+        """Text layer of each page of a PDF, read in a worker process."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, read_text_layers, document_path, max_pages
+        )
+
+    async def render_page(
+        self,
+        document_path: str,
+        page_number: int,
+        settings: PageOCRSettings,
+        is_pdf: bool = True,
+    ) -> bytes:
+        """PNG of a page image, rendered again from its document."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, render_page_png, document_path, page_number, settings, is_pdf
+        )
+
+    async def ocr_image(self, image_path: str, settings: PageOCRSettings) -> OCRPage:
+        """OCR result of an image file."""
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, ocr_image_file, image_path, settings
+        )
+        page = await self._page_result(1, future)
+        self.documents_processed += 1
+        self.wall_time += time.perf_counter() - start
+        return page
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get OCR engine statistics."""
+        return {
+            "workers": self.max_workers,
+            "max_in_flight": self.max_in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "documents_processed": self.documents_processed,
+            "pages_processed": self.pages_processed,
+            "pages_failed": self.pages_failed,
+            "average_page_time": (
+                self.page_time / self.pages_processed if self.pages_processed else 0.0
+            ),
+            "pages_per_second": (
+                self.pages_processed / self.wall_time if self.wall_time > 0 else 0.0
+            ),
+        }
+
+    def shutdown(self):
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _page_result(self, page_number: int, future: asyncio.Future) -> OCRPage:
+        """Await one page, turning failures into an empty page."""
+        try:
+            page = await asyncio.wait_for(future, self.page_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"OCR timed out after {self.page_timeout}s")
+            self.logger.warning(f"Error processing page {page_number}: {e}")
+            self.pages_failed += 1
+            return OCRPage(
+                page_number=page_number,
+                text_content="",
+                confidence_scores=[0.0],
+                bounding_boxes=[],
+                language_detected="unknown",
+                processing_time=0.0,
+                image_path=None,
+                metadata={"error": str(e)},
+            )
+
+        self.pages_processed += 1
+        self.page_time += page.processing_time
+        return page
@@ -16,30 +16,30 @@ import tempfile
 import uuid
 from collections import defaultdict
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
-# OCR Libraries
+# OCR Libraries; PDF rendering and text layers are handled by the OCR engine
 try:
-    import fitz  # PyMuPDF
-    import pdf2image
-    import PyPDF2
     import pytesseract
-    from PIL import Image, ImageEnhance, ImageFilter
+    from PIL import Image
     TESSERACT_AVAILABLE = True
 except ImportError:
     TESSERACT_AVAILABLE = False
 
-# PDF Processing Libraries
-try:
-    import pdfplumber
-    PDFPLUMBER_AVAILABLE = True
-except ImportError:
-    PDFPLUMBER_AVAILABLE = False
-
 from ...taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .ocr_engine import (
+    PDFPLUMBER_AVAILABLE,
+    OCRPage,
+    PageOCREngine,
+    PageOCRSettings,
+    PageTextLayer,
+    TextLayerPolicy,
+    detect_language,
+)
+from .page_image_store import PageImageSource, PageImageStore
 
 
 class DocumentType(Enum):
@@ -87,20 +87,6 @@ class Language(Enum):
     MULTI = "multi"                                       # Multiple languages
 
 
-@dataclass
-class OCRPage:
-    """OCR results for a single page."""
-    
-    page_number: int
-    text_content: str
-    confidence_scores: List[float]
-    bounding_boxes: List[Dict[str, Any]]
-    language_detected: str
-    processing_time: float
-    image_path: Optional[str]
-    metadata: Dict[str, Any] = field(default_factory=dict)
-
-
 @dataclass
 class OCRResult:
     """Complete OCR processing result."""
@@ -162,6 +148,32 @@ class OCRProcessor:
         self.enable_postprocessing = config.get('enable_postprocessing', True)
         self.max_pages = config.get('max_pages', 100)
         self.timeout_per_page = config.get('timeout_per_page', 60)  # seconds
+        self.ocr_dpi = config.get('ocr_dpi', 300)
+        
+        # Page-parallel OCR engine; pages are rasterized and recognised in a
+        # process pool, at most ocr_pages_in_flight at a time
+        self.ocr_engine = PageOCREngine(
+            max_workers=config.get('ocr_workers'),
+            max_in_flight=config.get('ocr_pages_in_flight'),
+            page_timeout=self.timeout_per_page,
+        )
+        
+        # Page images are not written during OCR; they are rendered again
+        # when asked for and spooled to a size-bounded directory
+        self.page_images = PageImageStore(
+            self.ocr_engine,
+            config.get('page_image_spool', os.path.join(tempfile.gettempdir(), 'ocr_page_spool')),
+            max_spool_bytes=config.get('page_image_spool_bytes', 512 << 20),
+            max_memory_bytes=config.get('page_image_memory_bytes', 64 << 20),
+            max_pages=config.get('page_image_max_pages', 100000),
+        )
+        
+        # PDF pages keep their embedded text layer unless it looks unusable
+        self.text_layer_policy = TextLayerPolicy(
+            min_chars=config.get('text_layer_min_chars', 20),
+            min_density=config.get('text_layer_min_density', 2.0),
+            scanned_coverage=config.get('scanned_image_coverage', 0.5),
+        )
         
         # OCR management
         self.ocr_results: Dict[str, OCRResult] = {}
@@ -203,7 +215,6 @@ class OCRProcessor:
         
         # Start background tasks
         asyncio.create_task(self._process_ocr_queue())
-        asyncio.create_task(self._cleanup_temp_files())
         
         self.logger.info("OCRProcessor started successfully")
     
@@ -214,6 +225,8 @@ class OCRProcessor:
         # Cancel active processing
         for task in self.active_processing.values():
             task.cancel()
+        self.ocr_engine.shutdown()
+        self.page_images.close()
         
         self.logger.info("OCRProcessor stopped")
     
@@ -242,6 +255,7 @@ class OCRProcessor:
                 result = await self._process_image_document(document_path, config)
             else:
                 result = await self._process_unknown_document(document_path, config)
+            self._defer_page_images(result, config)
             
             # Store result
             self.ocr_results[result.result_id] = result
@@ -263,6 +277,35 @@ class OCRProcessor:
             self.logger.error(f"Error processing document: {e}")
             raise
     
+    async def stream_pdf_pages(self, document_path: str, languages: List[Language] = None,
+                               config: OCRConfiguration = None) -> AsyncIterator[OCRPage]:
+        """Yield the OCR result of each page of a PDF as soon as it is ready."""
+        if not config:
+            config = self._create_default_config(languages or self.default_languages)
+        
+        async for page in self.ocr_engine.ocr_pdf(
+            document_path, self._page_settings(config), max_pages=config.max_pages
+        ):
+            yield page
+    
+    def _page_settings(self, config: OCRConfiguration) -> PageOCRSettings:
+        """Settings sent to the OCR workers for a configuration."""
+        # Configure Tesseract
+        custom_config = f'--oem {config.ocr_engine_mode} --psm {config.page_segmentation_mode}'
+        
+        # Add language configuration
+        languages = '+'.join([lang.value for lang in config.languages])
+        if languages:
+            custom_config += f' -l {languages}'
+        
+        return PageOCRSettings(
+            tesseract_config=custom_config,
+            confidence_threshold=config.confidence_threshold,
+            preprocess=config.enable_preprocessing,
+            postprocess=config.enable_postprocessing,
+            dpi=self.ocr_dpi,
+        )
+    
     def _create_default_config(self, languages: List[Language]) -> OCRConfiguration:
         """Create default OCR configuration."""
         return OCRConfiguration(
@@ -301,116 +344,78 @@ class OCRProcessor:
         try:
             start_time = datetime.utcnow()
             
-            # Extract text using PDF libraries first
-            extracted_text = await self._extract_pdf_text(document_path)
-            
-            if extracted_text and len(extracted_text.strip()) > 100:
-                # PDF has extractable text, use it directly
-                return await self._create_text_result(document_path, DocumentType.PDF, extracted_text, start_time)
-            else:
-                # PDF needs OCR processing
-                return await self._ocr_pdf_document(document_path, config, start_time)
+            # Read each page's text layer; only pages without a usable one
+            # are OCR'd
+            text_layers = await self._extract_pdf_text_layers(document_path, config.max_pages)
+            return await self._ocr_pdf_document(document_path, config, start_time, text_layers)
                 
         except Exception as e:
             self.logger.error(f"Error processing PDF document: {e}")
             raise
     
-    async def _extract_pdf_text(self, document_path: str) -> str:
-        """Extract text from PDF using various methods."""
+    async def _extract_pdf_text_layers(self, document_path: str,
+                                       max_pages: int = None) -> List[PageTextLayer]:
+        """Extract the embedded text layer of each PDF page."""
         try:
-            # Try PDFPlumber first
-            if PDFPLUMBER_AVAILABLE:
-                try:
-                    with pdfplumber.open(document_path) as pdf:
-                        text = ""
-                        for page in pdf.pages:
-                            page_text = page.extract_text()
-                            if page_text:
-                                text += page_text + "\n"
-                        if text.strip():
-                            return text
-                except Exception as e:
-                    self.logger.debug(f"PDFPlumber extraction failed: {e}")
-            
-            # Try PyMuPDF
-            try:
-                import fitz
-                doc = fitz.open(document_path)
-                text = ""
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-                if text.strip():
-                    return text
-            except Exception as e:
-                self.logger.debug(f"PyMuPDF extraction failed: {e}")
-            
-            # Try PyPDF2
-            try:
-                with open(document_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in reader.pages:
-                        text += page.extract_text() + "\n"
-                    if text.strip():
-                        return text
-            except Exception as e:
-                self.logger.debug(f"PyPDF2 extraction failed: {e}")
-            
-            return ""
-            
+            return await self.ocr_engine.text_layers(document_path, max_pages)
         except Exception as e:
-            self.logger.error(f"Error extracting PDF text: {e}")
-            return ""
+            self.logger.debug(f"PDF text layer extraction failed: {e}")
+            return []
     
     async def _ocr_pdf_document(
         self,
         document_path: str,
         config: OCRConfiguration,
-        start_time: datetime
+        start_time: datetime,
+        text_layers: List[PageTextLayer] = None
     ):
-        """Perform OCR on PDF document."""
+        """
+        Perform OCR on PDF document.
+        
+        Pages whose text layer passes the text layer policy use it as is;
+        the rest are OCR'd. Without text layers every page is OCR'd.
+        """
         try:
-            # Convert PDF to images
-            images = await self._convert_pdf_to_images(document_path)
+            pages = []
+            ocr_reasons = {}
+            ocr_page_numbers = None
+            if text_layers:
+                ocr_page_numbers = []
+                for layer in text_layers:
+                    reason = self.text_layer_policy.ocr_reason(layer)
+                    if reason is None:
+                        pages.append(self._text_layer_page(layer))
+                    else:
+                        ocr_page_numbers.append(layer.page_number)
+                        ocr_reasons[layer.page_number] = reason
+            
+            # Pages stream in from the OCR engine, rasterized one at a time
+            if ocr_page_numbers is None or ocr_page_numbers:
+                async for page_result in self.ocr_engine.ocr_pdf(
+                    document_path,
+                    self._page_settings(config),
+                    max_pages=config.max_pages,
+                    page_numbers=ocr_page_numbers,
+                ):
+                    page_result.metadata['source'] = 'ocr'
+                    if page_result.page_number in ocr_reasons:
+                        page_result.metadata['ocr_reason'] = ocr_reasons[page_result.page_number]
+                    pages.append(page_result)
             
-            if not images:
-                raise ValueError("Could not convert PDF to images")
+            pages.sort(key=lambda page: page.page_number)
             
-            # Process each page
-            pages = []
             total_text_length = 0
             languages_detected = set()
             total_confidence = 0.0
-            
-            for i, image in enumerate(images[:config.max_pages]):
-                try:
-                    # Preprocess image
-                    if config.enable_preprocessing:
-                        image = await self._preprocess_image(image)
-                    
-                    # Perform OCR
-                    page_result = await self._perform_ocr_on_image(image, i + 1, config)
-                    pages.append(page_result)
-                    
-                    # Update statistics
-                    total_text_length += len(page_result.text_content)
-                    languages_detected.add(page_result.language_detected)
+            for page_result in pages:
+                # Update statistics
+                total_text_length += len(page_result.text_content)
+                languages_detected.add(page_result.language_detected)
+                if page_result.confidence_scores:
                     total_confidence += sum(page_result.confidence_scores) / len(page_result.confidence_scores)
-                    
-                except Exception as e:
-                    self.logger.warning(f"Error processing page {i + 1}: {e}")
-                    # Create failed page result
-                    failed_page = OCRPage(
-                        page_number=i + 1,
-                        text_content="",
-                        confidence_scores=[0.0],
-                        bounding_boxes=[],
-                        language_detected="unknown",
-                        processing_time=0.0,
-                        image_path=None
-                    )
-                    pages.append(failed_page)
+            
+            if not pages:
+                raise ValueError("PDF has no pages to OCR")
             
             # Calculate final statistics
             end_time = datetime.utcnow()
@@ -437,7 +442,15 @@ class OCRProcessor:
                 processing_time=processing_time,
                 timestamp=datetime.utcnow(),
                 errors=[],
-                warnings=[]
+                warnings=[],
+                metadata={
+                    'text_layer_pages': sum(
+                        1 for page in pages if page.metadata.get('source') == 'text_layer'
+                    ),
+                    'ocr_pages': sum(
+                        1 for page in pages if page.metadata.get('source') == 'ocr'
+                    ),
+                }
             )
             
             return result
@@ -446,17 +459,6 @@ class OCRProcessor:
             self.logger.error(f"Error in PDF OCR processing: {e}")
             raise
     
-    async def _convert_pdf_to_images(self, document_path: str) -> List[Image.Image]:
-        """Convert PDF to images for OCR processing."""
-        try:
-            # Use pdf2image to convert PDF to images
-            images = pdf2image.convert_from_path(document_path, dpi=300)
-            return images
-            
-        except Exception as e:
-            self.logger.error(f"Error converting PDF to images: {e}")
-            return []
-    
     async def _process_image_document(
         self,
         document_path: str,
@@ -466,15 +468,10 @@ class OCRProcessor:
         try:
             start_time = datetime.utcnow()
             
-            # Load image
-            image = Image.open(document_path)
-            
-            # Preprocess image
-            if config.enable_preprocessing:
-                image = await self._preprocess_image(image)
-            
-            # Perform OCR
-            page_result = await self._perform_ocr_on_image(image, 1, config)
+            # Perform OCR in the engine's worker pool
+            page_result = await self.ocr_engine.ocr_image(
+                document_path, self._page_settings(config)
+            )
             
             # Calculate statistics
             end_time = datetime.utcnow()
@@ -549,192 +546,51 @@ class OCRProcessor:
             self.logger.error(f"Error processing unknown document: {e}")
             raise
     
-    async def _create_text_result(self, document_path: str, document_type: DocumentType,
-                                 extracted_text: str, start_time: datetime) -> OCRResult:
-        """Create result for documents with extractable text."""
-        try:
-            end_time = datetime.utcnow()
-            processing_time = (end_time - start_time).total_seconds()
-            
-            # Create page result
-            page_result = OCRPage(
-                page_number=1,
-                text_content=extracted_text,
-                confidence_scores=[100.0],  # High confidence for extracted text
-                bounding_boxes=[],
-                language_detected="en",  # Assume English
-                processing_time=processing_time,
-                image_path=None
-            )
-            
-            # Create result
-            result = OCRResult(
-                result_id=str(uuid.uuid4()),
-                document_path=document_path,
-                document_type=document_type,
-                ocr_status=OCRStatus.COMPLETED,
-                ocr_quality=OCRQuality.EXCELLENT,
-                total_pages=1,
-                pages=[page_result],
-                languages_detected=["en"],
-                total_text_length=len(extracted_text),
-                average_confidence=100.0,
-                processing_time=processing_time,
-                timestamp=datetime.utcnow(),
-                errors=[],
-                warnings=[]
-            )
-            
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"Error creating text result: {e}")
-            raise
-    
-    async def _preprocess_image(self, image: Image.Image) -> Image.Image:
-        """Preprocess image for better OCR results."""
-        try:
-            # Convert to grayscale if needed
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            # Enhance contrast
-            enhancer = ImageEnhance.Contrast(image)
-            image = enhancer.enhance(1.5)
-            
-            # Enhance sharpness
-            enhancer = ImageEnhance.Sharpness(image)
-            image = enhancer.enhance(1.2)
-            
-            # Apply slight blur to reduce noise
-            image = image.filter(ImageFilter.GaussianBlur(radius=0.5))
-            
-            return image
-            
-        except Exception as e:
-            self.logger.error(f"Error preprocessing image: {e}")
-            return image
-    
-    async def _perform_ocr_on_image(self, image: Image.Image, page_number: int,
-                                   config: OCRConfiguration) -> OCRPage:
-        """Perform OCR on a single image."""
-        try:
-            start_time = datetime.utcnow()
-            
-            # Configure Tesseract
-            custom_config = f'--oem {config.ocr_engine_mode} --psm {config.page_segmentation_mode}'
-            
-            # Add language configuration
-            languages = '+'.join([lang.value for lang in config.languages])
-            if languages:
-                custom_config += f' -l {languages}'
-            
-            # Perform OCR
-            ocr_data = (
-    pytesseract.image_to_data(image, config=custom_config, output_type=pytesseract.Output.DICT)
-)
-            
-            # Extract text and confidence scores
-            text_content = ""
-            confidence_scores = []
-            bounding_boxes = []
-            
-            for i in range(len(ocr_data['text'])):
-                text = ocr_data['text'][i]
-                confidence = ocr_data['conf'][i]
-                
-                if text.strip() and confidence > config.confidence_threshold:
-                    text_content += text + " "
-                    confidence_scores.append(confidence)
-                    
-                    # Store bounding box
-                    bbox = {
-                        'x': ocr_data['left'][i],
-                        'y': ocr_data['top'][i],
-                        'width': ocr_data['width'][i],
-                        'height': ocr_data['height'][i],
-                        'text': text,
-                        'confidence': confidence
-                    }
-                    bounding_boxes.append(bbox)
-            
-            # Post-process text
-            if config.enable_postprocessing:
-                text_content = await self._postprocess_text(text_content)
-            
-            # Determine language
-            language_detected = self._detect_language(text_content)
-            
-            # Calculate processing time
-            end_time = datetime.utcnow()
-            processing_time = (end_time - start_time).total_seconds()
-            
-            # Save image to temp file
-            temp_dir = tempfile.gettempdir()
-            image_path = (
-    os.path.join(temp_dir, f"ocr_page_{page_number}_{uuid.uuid4()}.png")
-)
-            image.save(image_path)
-            
-            page_result = OCRPage(
-                page_number=page_number,
-                text_content=text_content.strip(),
-                confidence_scores=confidence_scores,
-                bounding_boxes=bounding_boxes,
-                language_detected=language_detected,
-                processing_time=processing_time,
-                image_path=image_path
+    def _defer_page_images(self, result: OCRResult, config: OCRConfiguration):
+        """Register the images of a result's OCR'd pages for rendering on demand."""
+        is_pdf = result.document_type == DocumentType.PDF
+        settings = self._page_settings(config)
+        deferred = 0
+        for page in result.pages:
+            # Only pages recognised from a rendered image have one to keep
+            if 'image_size' not in page.metadata:
+                continue
+            self.page_images.register(
+                f"{result.result_id}_{page.page_number}",
+                PageImageSource(document_path=result.document_path, page_number=page.page_number,
+                                settings=settings, is_pdf=is_pdf),
             )
-            
-            return page_result
-            
-        except Exception as e:
-            self.logger.error(f"Error performing OCR on image: {e}")
-            raise
-    
-    async def _postprocess_text(self, text: str) -> str:
-        """Post-process extracted text."""
-        try:
-            # Remove extra whitespace
-            text = ' '.join(text.split())
-            
-            # Fix common OCR errors
-            text = text.replace('|', 'I')
-            text = text.replace('0', 'O')  # Context-dependent
-            text = text.replace('1', 'l')  # Context-dependent
-            
-            return text
-            
-        except Exception as e:
-            self.logger.error(f"Error post-processing text: {e}")
-            return text
-    
-    def _detect_language(self, text: str) -> str:
-        """Detect language of text."""
-        try:
-            # Simple language detection based on character sets
-            if not text:
-                return "unknown"
-            
-            # Count characters from different scripts
-            latin_chars = sum(1 for c in text if ord(c) < 128)
-            total_chars = len(text)
-            
-            if total_chars == 0:
-                return "unknown"
-            
-            latin_ratio = latin_chars / total_chars
-            
-            if latin_ratio > 0.9:
-                return "en"  # Assume English for Latin text
-            elif latin_ratio > 0.7:
-                return "multi"  # Mixed content
-            else:
-                return "unknown"  # Non-Latin script
-                
-        except Exception as e:
-            self.logger.error(f"Error detecting language: {e}")
-            return "unknown"
+            deferred += 1
+        
+        result.metadata['page_images'] = {'deferred': deferred}
+    
+    async def get_page_image(self, result_id: str, page_number: int) -> Optional[bytes]:
+        """PNG of an OCR'd page as it was recognised, rendered on demand."""
+        return await self.page_images.get_bytes(f"{result_id}_{page_number}")
+    
+    async def get_page_image_path(self, result_id: str, page_number: int) -> Optional[str]:
+        """Path of an OCR'd page image, written to the page image spool on demand."""
+        path = await self.page_images.get_path(f"{result_id}_{page_number}")
+        result = self.ocr_results.get(result_id)
+        if path and result:
+            for page in result.pages:
+                if page.page_number == page_number:
+                    page.image_path = path
+        return path
+    
+    def _text_layer_page(self, layer: PageTextLayer) -> OCRPage:
+        """Page result for a page whose embedded text layer is used."""
+        text_content = layer.text.strip()
+        return OCRPage(
+            page_number=layer.page_number,
+            text_content=text_content,
+            confidence_scores=[100.0],  # High confidence for extracted text
+            bounding_boxes=[],
+            language_detected=detect_language(text_content),
+            processing_time=0.0,
+            image_path=None,
+            metadata={'source': 'text_layer', 'text_density': layer.density}
+        )
     
     def _determine_ocr_status(self, pages: List[OCRPage]) -> OCRStatus:
         """Determine overall OCR status."""
@@ -804,33 +660,6 @@ class OCRProcessor:
             if document_path in self.active_processing:
                 del self.active_processing[document_path]
     
-    async def _cleanup_temp_files(self):
-        """Clean up temporary files."""
-        while True:
-            try:
-                # Clean up temp directory
-                temp_dir = tempfile.gettempdir()
-                temp_files = (
-    [f for f in os.listdir(temp_dir) if f.startswith('ocr_page_')]
-)
-                
-                for temp_file in temp_files:
-                    temp_path = os.path.join(temp_dir, temp_file)
-                    try:
-                        if os.path.isfile(temp_path):
-                            # Check if file is older than 1 hour
-                            if datetime.utcnow() - datetime.fromtimestamp(os.path.getmtime(temp_path)) > timedelta(hours=1):
-                                os.remove(temp_path)
-                    except Exception:
-                        self.logger.error(f"Error: {e}")
-                        pass
-                
-                await asyncio.sleep(3600)  # Clean up every hour
-                
-            except Exception as e:
-                self.logger.error(f"Error cleaning up temp files: {e}")
-                await asyncio.sleep(3600)
-    
     async def _initialize_ocr_components(self):
         """Initialize OCR components."""
         try:
@@ -870,6 +699,8 @@ class OCRProcessor:
             'total_ocr_results': len(self.ocr_results),
             'documents_in_queue': len(self.processing_queue),
             'active_processing': len(self.active_processing),
+            'ocr_engine': self.ocr_engine.get_statistics(),
+            'page_images': self.page_images.get_statistics(),
             'tesseract_available': TESSERACT_AVAILABLE,
             'pdfplumber_available': PDFPLUMBER_AVAILABLE
         }
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Page Image Store - Lazy, Size-Bounded Storage of OCR Page Images
+
+This module implements the PageImageStore used by the OCRProcessor. OCR
+no longer writes a PNG of every page to the temp directory; the store
+only records how each page image was produced:
+
+- When a caller asks for a page image, it is rendered again from its
+  document by the OCR engine (same DPI and preprocessing as the OCR run)
+  and kept as PNG bytes in a size-bounded in-memory LRU.
+- When a caller asks for a file path, the PNG is written to a spool
+  directory, which is also size-bounded and evicts least recently used
+  files.
+- Page images that were never asked for are never written.
+- Files left in the spool by earlier runs are indexed on startup as the
+  least recently used, so they are evicted first; close() deletes the
+  files the store wrote itself.
+- At most max_pages page images are registered; the least recently used
+  are forgotten first.
+"""
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .ocr_engine import PageOCREngine, PageOCRSettings
+
+
+@dataclass
+class PageImageSource:
+    """How to render a page image again."""
+
+    document_path: str
+    page_number: int
+    settings: PageOCRSettings
+    is_pdf: bool
+
+
+class PageImageStore:
+    """Page images rendered on demand, cached in memory and spooled on request."""
+
+    def __init__(
+        self,
+        engine: PageOCREngine,
+        spool_directory: str,
+        max_spool_bytes: int = 512 << 20,
+        max_memory_bytes: int = 64 << 20,
+        max_pages: int = 100000,
+    ):
+        """Initialize the page image store."""
+        self.logger = logging.getLogger(__name__)
+        self.engine = engine
+        self.spool_directory = spool_directory
+        self.max_spool_bytes = max_spool_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.max_pages = max_pages
+
+        self._sources: "OrderedDict[str, PageImageSource]" = OrderedDict()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._spool: "OrderedDict[str, int]" = OrderedDict()
+        self._spool_bytes = 0
+        # Per-page render locks and how many callers hold or wait on each
+        self._locks: Dict[str, List[Any]] = {}
+
+        # Statistics
+        self.pages_registered = 0
+        self.pages_rendered = 0
+        self.pages_spooled = 0
+        self.bytes_spooled = 0
+        self.memory_hits = 0
+        self.spool_evictions = 0
+        self.pages_forgotten = 0
+        self.stale_files_found = 0
+
+        self._scan_spool()
+
+    def register(self, key: str, source: PageImageSource):
+        """Record how to render the page image stored under ``key``."""
+        self._sources[key] = source
+        self._sources.move_to_end(key)
+        self.pages_registered += 1
+        while len(self._sources) > self.max_pages:
+            self.forget(next(iter(self._sources)))
+            self.pages_forgotten += 1
+
+    def forget(self, key: str):
+        """Drop a page image, its cached bytes and its spooled file."""
+        self._sources.pop(key, None)
+        data = self._memory.pop(key, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+        if key in self._spool:
+            self._spool_bytes -= self._spool.pop(key)
+            self._remove_file(key)
+
+    def __contains__(self, key: str) -> bool:
+        """Whether a page image is registered under ``key``."""
+        return key in self._sources
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """PNG bytes of a page image, rendering it if needed."""
+        if key not in self._sources:
+            return None
+        self._sources.move_to_end(key)
+
+        lock = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        lock[1] += 1
+        try:
+            async with lock[0]:
+                return await self._load_bytes(key)
+        finally:
+            lock[1] -= 1
+            if not lock[1]:
+                del self._locks[key]
+
+    async def _load_bytes(self, key: str) -> Optional[bytes]:
+        """PNG bytes of a page image; called holding the page's lock."""
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return data
+
+        if key in self._spool:
+            data = await asyncio.get_running_loop().run_in_executor(
+                None, self._read_file, key
+            )
+        if data is None:
+            source = self._sources.get(key)
+            if source is None:
+                # Forgotten while waiting for the lock
+                return None
+            data = await self.engine.render_page(
+                source.document_path,
+                source.page_number,
+                source.settings,
+                source.is_pdf,
+            )
+            self.pages_rendered += 1
+
+        if key in self._sources:
+            self._remember(key, data)
+        return data
+
+    async def get_path(self, key: str) -> Optional[str]:
+        """Path of a page image in the spool directory, writing it if needed."""
+        if key not in self._sources:
+            return None
+        if key in self._spool:
+            path = self._path(key)
+            if os.path.exists(path):
+                self._spool.move_to_end(key)
+                return path
+            self._spool_bytes -= self._spool.pop(key)
+
+        data = await self.get_bytes(key)
+        if data is None:
+            return None
+
+        path = self._path(key)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_file, path, data
+        )
+        source = self._sources.get(key)
+        if source is None:
+            # Forgotten while being written
+            self._remove_file(key)
+            return None
+        self._spool_bytes += len(data) - self._spool.pop(key, 0)
+        self._spool[key] = len(data)
+        self.pages_spooled += 1
+        self.bytes_spooled += len(data)
+        self._evict_spool()
+        return path
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get page image statistics."""
+        return {
+            "pages_registered": self.pages_registered,
+            "pages_rendered": self.pages_rendered,
+            "pages_spooled": self.pages_spooled,
+            "bytes_spooled": self.bytes_spooled,
+            "memory_bytes": self._memory_bytes,
+            "memory_hits": self.memory_hits,
+            "spool_bytes": self._spool_bytes,
+            "spool_files": len(self._spool),
+            "spool_evictions": self.spool_evictions,
+            "pages_forgotten": self.pages_forgotten,
+            "pages_tracked": len(self._sources),
+            "stale_files_found": self.stale_files_found,
+        }
+
+    def close(self):
+        """Delete the spool files of registered pages; other files are left."""
+        for key in [key for key in self._spool if key in self._sources]:
+            self._spool_bytes -= self._spool.pop(key)
+            self._remove_file(key)
+
+    def _remember(self, key: str, data: bytes):
+        """Keep PNG bytes in memory, evicting least recently used past the limit."""
+        if len(data) > self.max_memory_bytes:
+            return
+        self._memory_bytes += len(data)
+        self._memory[key] = data
+        while self._memory_bytes > self.max_memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old)
+
+    def _evict_spool(self):
+        """Delete least recently used spool files past max_spool_bytes."""
+        while self._spool_bytes > self.max_spool_bytes and len(self._spool) > 1:
+            old_key, size = self._spool.popitem(last=False)
+            self._spool_bytes -= size
+            self.spool_evictions += 1
+            self._remove_file(old_key)
+
+    def _scan_spool(self):
+        """Index the page images already in the spool, oldest first."""
+        try:
+            entries = list(os.scandir(self.spool_directory))
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            self.logger.warning(f"Could not scan page image spool: {e}")
+            return
+
+        found = []
+        for entry in entries:
+            name = entry.name
+            if not (name.startswith("ocr_page_") and name.endswith(".png")):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            key = name[len("ocr_page_") : -len(".png")]
+            found.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(found):
+            self._spool[key] = size
+            self._spool_bytes += size
+        self.stale_files_found = len(found)
+        self._evict_spool()
+
+    def _path(self, key: str) -> str:
+        """Spool path of a page image."""
+        return os.path.join(self.spool_directory, f"ocr_page_{key}.png")
+
+    def _read_file(self, key: str) -> Optional[bytes]:
+        """Read a spooled page image, or None if it is gone."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_file(self, path: str, data: bytes):
+        """Write a page image to the spool, atomically."""
+        os.makedirs(self.spool_directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _remove_file(self, key: str):
+        """Delete a spooled page image if it is still there."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Could not remove spooled page image {key}: {e}")
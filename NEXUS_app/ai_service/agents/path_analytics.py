@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Path Analytics - Cached Diameter, Path Length and Shortest Path Queries
+
+This module implements the PathAnalytics service used by the
+EntityNetworkAnalyzer. The directed adjacency matrix and its undirected
+closure are built once per graph version and reused by every query:
+
+- Diameter is estimated by repeated double-sweep BFS: a search from a
+  random node finds a far node, whose eccentricity is a lower bound on
+  the diameter. Twice the first eccentricity is an upper bound.
+- Average shortest path length is the mean distance from a random sample
+  of sources, an unbiased estimate of the all-pairs mean.
+- Shortest paths between two entities use a bidirectional BFS over the
+  successor (CSR) and predecessor (CSC) arrays of the cached matrix.
+
+Graphs with at most ``exact_max_nodes`` nodes get exact all-pairs results,
+matching networkx.
+"""
+
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from .graph_store import GraphStoreMultiDiGraph
+
+
+class PathAnalytics:
+    """
+    Versioned path metrics over a directed networkx graph.
+
+    Diameter and average path length are measured on the undirected graph
+    and are infinite when it is disconnected, as with networkx.
+    """
+
+    def __init__(
+        self,
+        exact_max_nodes: int = 1000,
+        sample_sources: int = 64,
+        diameter_sweeps: int = 4,
+        batch_cells: int = 1 << 22,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the path analytics service."""
+        self.logger = logging.getLogger(__name__)
+        self.exact_max_nodes = exact_max_nodes
+        self.sample_sources = sample_sources
+        self.diameter_sweeps = diameter_sweeps
+        self.batch_cells = batch_cells
+        self.rng = np.random.default_rng(seed)
+
+        self._version: Optional[int] = None
+        self._nodes: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+        self._successors: Optional[sparse.csr_matrix] = None
+        self._predecessors: Optional[sparse.csr_matrix] = None
+        self._undirected: Optional[sparse.csr_matrix] = None
+        self._components = 0
+        self._summary: Optional[Dict[str, Any]] = None
+
+        # Statistics
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.path_queries = 0
+
+    def summary(self, graph: nx.Graph, version: int) -> Dict[str, Any]:
+        """Connectivity, diameter and average path length of a graph version."""
+        self._ensure_loaded(graph, version)
+        if self._summary is not None:
+            self.cache_hits += 1
+            return self._summary
+
+        self.cache_misses += 1
+        n = len(self._nodes)
+        connected = self._components <= 1
+        exact = n <= self.exact_max_nodes
+
+        if not connected:
+            diameter = average = float("inf")
+            estimation: Dict[str, Any] = {}
+        elif exact:
+            diameter, average = self._exact_metrics()
+            estimation = {}
+        else:
+            diameter, upper = self._double_sweep_diameter()
+            average, sampled = self._sampled_average_length()
+            estimation = {
+                "diameter_upper_bound": upper,
+                "sampled_sources": sampled,
+            }
+
+        self._summary = {
+            "is_connected": connected,
+            "diameter": diameter,
+            "average_path_length": average,
+            "exact": exact or not connected,
+            **estimation,
+        }
+        return self._summary
+
+    def shortest_path(
+        self, graph: nx.Graph, version: int, source: Hashable, target: Hashable
+    ) -> List[Hashable]:
+        """
+        Directed shortest path from source to target.
+
+        Raises NetworkXNoPath when target is unreachable, like
+        nx.shortest_path.
+        """
+        self._ensure_loaded(graph, version)
+        self.path_queries += 1
+        if source not in self._index or target not in self._index:
+            raise nx.NodeNotFound(
+                f"Either source {source} or target {target} is not in G"
+            )
+
+        path = self._bidirectional_bfs(self._index[source], self._index[target])
+        if path is None:
+            raise nx.NetworkXNoPath(f"No path between {source} and {target}.")
+        return [self._nodes[node] for node in path]
+
+    def invalidate(self):
+        """Drop cached results; the next query rebuilds the matrices."""
+        self._version = None
+        self._summary = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get path analytics statistics."""
+        return {
+            "version": self._version,
+            "nodes": len(self._nodes),
+            "components": self._components,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "path_queries": self.path_queries,
+        }
+
+    def _ensure_loaded(self, graph: nx.Graph, version: int):
+        """Build the matrices of a new graph version."""
+        if version == self._version:
+            return
+
+        self._nodes = list(graph.nodes())
+        self._index = {node: i for i, node in enumerate(self._nodes)}
+        if isinstance(graph, GraphStoreMultiDiGraph) and graph.store is not None:
+            adjacency = graph.store.to_scipy_sparse_array(namespace=graph.namespace)
+        else:
+            adjacency = nx.to_scipy_sparse_array(
+                graph, nodelist=self._nodes, weight=None, dtype=float, format="csr"
+            )
+        adjacency.data[:] = 1.0
+        adjacency.eliminate_zeros()
+        if not graph.is_directed():
+            adjacency = adjacency.maximum(adjacency.T).tocsr()
+
+        self._successors = adjacency.tocsr()
+        self._predecessors = adjacency.T.tocsr()
+        self._undirected = self._successors.maximum(self._predecessors).tocsr()
+        self._components = (
+            csgraph.connected_components(self._undirected, directed=False)[0]
+            if self._nodes
+            else 0
+        )
+        self._summary = None
+        self._version = version
+
+    def _distances(self, sources: np.ndarray) -> np.ndarray:
+        """Undirected hop distances from each source, one row per source."""
+        return csgraph.shortest_path(
+            self._undirected, directed=False, unweighted=True, indices=sources
+        )
+
+    def _exact_metrics(self) -> Tuple[float, float]:
+        """Exact diameter and average path length by all-pairs BFS."""
+        n = len(self._nodes)
+        if n <= 1:
+            return 0, 0.0
+
+        batch = max(1, self.batch_cells // n)
+        diameter = 0
+        total = 0.0
+        for start in range(0, n, batch):
+            distances = self._distances(np.arange(start, min(n, start + batch)))
+            diameter = max(diameter, int(distances.max()))
+            total += float(distances.sum())
+        return diameter, total / (n * (n - 1))
+
+    def _double_sweep_diameter(self) -> Tuple[int, int]:
+        """Lower and upper bounds on the diameter from double sweeps."""
+        n = len(self._nodes)
+        lower = 0
+        upper = None
+        start = int(self.rng.integers(n))
+        for _ in range(self.diameter_sweeps):
+            first = self._distances(np.array([start]))[0]
+            eccentricity = int(first.max())
+            if upper is None or 2 * eccentricity < upper:
+                upper = 2 * eccentricity
+
+            far = int(first.argmax())
+            second = self._distances(np.array([far]))[0]
+            lower = max(lower, int(second.max()))
+            if lower == upper:
+                break
+
+            # Restart from a node halfway out from the far end
+            middle = np.flatnonzero(second == lower // 2)
+            start = int(middle[0]) if len(middle) else int(self.rng.integers(n))
+        return lower, upper
+
+    def _sampled_average_length(self) -> Tuple[float, int]:
+        """Average path length estimated from sampled BFS sources."""
+        n = len(self._nodes)
+        k = min(n, self.sample_sources)
+        sources = np.sort(self.rng.choice(n, size=k, replace=False))
+
+        batch = max(1, self.batch_cells // n)
+        total = 0.0
+        for start in range(0, k, batch):
+            total += float(self._distances(sources[start : start + batch]).sum())
+        return total / (k * (n - 1)), k
+
+    def _bidirectional_bfs(self, source: int, target: int) -> Optional[List[int]]:
+        """Node ids of a shortest directed path, or None if there is none."""
+        if source == target:
+            return [source]
+
+        succ_indptr = self._successors.indptr
+        succ_indices = self._successors.indices
+        pred_indptr = self._predecessors.indptr
+        pred_indices = self._predecessors.indices
+
+        parents = {source: None}
+        children = {target: None}
+        forward = [source]
+        backward = [target]
+
+        while forward and backward:
+            # Expand the smaller frontier one level
+            if len(forward) <= len(backward):
+                next_level = []
+                for u in forward:
+                    neighbors = succ_indices[succ_indptr[u] : succ_indptr[u + 1]]
+                    for v in neighbors.tolist():
+                        if v in parents:
+                            continue
+                        parents[v] = u
+                        if v in children:
+                            return self._join(v, parents, children)
+                        next_level.append(v)
+                forward = next_level
+            else:
+                next_level = []
+                for v in backward:
+                    neighbors = pred_indices[pred_indptr[v] : pred_indptr[v + 1]]
+                    for u in neighbors.tolist():
+                        if u in children:
+                            continue
+                        children[u] = v
+                        if u in parents:
+                            return self._join(u, parents, children)
+                        next_level.append(u)
+                backward = next_level
+        return None
+
+    @staticmethod
+    def _join(
+        meeting: int,
+        parents: Dict[int, Optional[int]],
+        children: Dict[int, Optional[int]],
+    ) -> List[int]:
+        """Stitch the two search trees together at the meeting node."""
+        path = []
+        node = meeting
+        while node is not None:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        node = children[meeting]
+        while node is not None:
+            path.append(node)
+            node = children[node]
+        return path
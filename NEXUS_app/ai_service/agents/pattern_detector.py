@@ -15,6 +15,8 @@ from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field
 
 from ..taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .graph_store import resolve_graph_store
+from .spatial_index import SpatialIndex, haversine_km, resolve_spatial_index
 
 
 class PatternType(Enum):
@@ -124,6 +126,20 @@ class PatternDetector:
         self.max_patterns = config.get("max_patterns", 1000)
         self.enable_visualization = config.get("enable_visualization", True)
 
+        # Shared graph store analysed when no network_data is supplied
+        self.graph_store = resolve_graph_store(config.get("graph_store"))
+
+        # Shared spatial index analysed when no spatial_data is supplied;
+        # transaction locations are added to it as they are seen
+        self.spatial_index = resolve_spatial_index(config.get("spatial_index"))
+        self.spatial_cell_size_km = config.get("spatial_cell_size_km", 1.0)
+        self.colocation_radius_km = config.get("colocation_radius_km", 0.1)
+        self.colocation_min_points = config.get("colocation_min_points", 3)
+        window_minutes = config.get("colocation_time_window_minutes")
+        self.colocation_time_window = (
+            timedelta(minutes=window_minutes) if window_minutes is not None else None
+        )
+
         # Pattern storage
         self.detected_patterns: List[DetectedPattern] = []
         self.pattern_history: Dict[str, List[DetectedPattern]] = {}
@@ -251,6 +267,9 @@ class PatternDetector:
             if not transactions:
                 return patterns
 
+            if self.spatial_index is not None:
+                self.spatial_index.add_records(transactions, source="transaction")
+
             # Convert to DataFrame for analysis
             df = pd.DataFrame(transactions)
 
@@ -564,7 +583,7 @@ class PatternDetector:
             patterns = []
             spatial_data = data.get("spatial_data", [])
 
-            if not spatial_data:
+            if not spatial_data and self.spatial_index is None:
                 return patterns
 
             # Convert to DataFrame for analysis
@@ -614,49 +633,84 @@ class PatternDetector:
                     )
                     patterns.append(pattern)
 
-            # Distance-based patterns
-            if "latitude" in df.columns and "longitude" in df.columns:
-                # Calculate distances between consecutive locations for each entity
-                for entity_id in df["entity_id"].unique():
-                    entity_locations = df[df["entity_id"] == entity_id].sort_values(
-                        "timestamp"
-                    )
+            # Distance-based patterns, answered from a spatial index: the
+            # supplied coordinates, or the shared index without spatial_data.
+            # Only patterns involving this batch's records are reported from
+            # the shared index, not every pattern it has seen
+            index = self.spatial_index
+            batch_keys = None
+            if spatial_data:
+                index = SpatialIndex(cell_size_km=self.spatial_cell_size_km)
+                index.add_records(spatial_data, source="spatial_data")
+            elif index is not None:
+                batch_keys = [
+                    index.record_key(transaction, "transaction")
+                    for transaction in data.get("transactions", [])
+                ]
+                batch_keys = [key for key in batch_keys if key in index]
+            if index is None or not len(index) or batch_keys == []:
+                return patterns
 
-                    if len(entity_locations) > 1:
-                        distances = []
-                        for i in range(1, len(entity_locations)):
-                            prev_loc = entity_locations.iloc[i - 1]
-                            curr_loc = entity_locations.iloc[i]
-
-                            # Calculate distance using Haversine formula
-                            distance = self._calculate_distance(
-                                prev_loc["latitude"],
-                                prev_loc["longitude"],
-                                curr_loc["latitude"],
-                                curr_loc["longitude"],
-                            )
-                            distances.append(distance)
+            entities = index.entities()
+            if batch_keys is not None:
+                batch_entities = {index.get(key)["entity_id"] for key in batch_keys}
+                entities = [entity for entity in entities if entity in batch_entities]
 
-                        # Detect unusual travel patterns
-                        if distances:
-                            mean_distance = np.mean(distances)
-                            if mean_distance > 1000:  # More than 1000 km average
-                                pattern = DetectedPattern(
-                                    id=f"unusual_travel_{entity_id}_{datetime.utcnow().timestamp()}",
-                                    pattern_type=PatternType.SPATIAL_PATTERNS,
-                                    category=PatternCategory.HIGH_RISK,
-                                    detection_method=DetectionMethod.STATISTICAL,
-                                    confidence=0.8,
-                                    description=f"Unusual travel pattern detected for entity {entity_id}",
-                                    entities_involved=[entity_id],
-                                    evidence={
-                                        "average_distance": mean_distance,
-                                        "distances": distances,
-                                    },
-                                    risk_score=0.7,
-                                    timestamp=datetime.utcnow(),
-                                )
-                                patterns.append(pattern)
+            # Travel between consecutive locations of each entity
+            for entity_id in entities:
+                distances = index.travel_distances(entity_id)
+
+                # Detect unusual travel patterns
+                if distances:
+                    mean_distance = np.mean(distances)
+                    if mean_distance > 1000:  # More than 1000 km average
+                        pattern = DetectedPattern(
+                            id=f"unusual_travel_{entity_id}_{datetime.utcnow().timestamp()}",
+                            pattern_type=PatternType.SPATIAL_PATTERNS,
+                            category=PatternCategory.HIGH_RISK,
+                            detection_method=DetectionMethod.STATISTICAL,
+                            confidence=0.8,
+                            description=f"Unusual travel pattern detected for entity {entity_id}",
+                            entities_involved=[entity_id],
+                            evidence={
+                                "average_distance": mean_distance,
+                                "distances": distances,
+                            },
+                            risk_score=0.7,
+                            timestamp=datetime.utcnow(),
+                        )
+                        patterns.append(pattern)
+
+            # Co-location: several entities at the same place (and time)
+            clusters = index.colocation_clusters(
+                self.colocation_radius_km,
+                min_points=self.colocation_min_points,
+                time_window=self.colocation_time_window,
+                keys=batch_keys,
+            )
+            for cluster in clusters:
+                if len(cluster.entity_ids) < 2:
+                    continue
+                pattern = DetectedPattern(
+                    id=f"colocation_{datetime.utcnow().timestamp()}_{len(patterns)}",
+                    pattern_type=PatternType.SPATIAL_PATTERNS,
+                    category=PatternCategory.MEDIUM_RISK,
+                    detection_method=DetectionMethod.CLUSTERING,
+                    confidence=0.75,
+                    description=f"Co-location detected: {len(cluster.entity_ids)} entities within {self.colocation_radius_km} km",
+                    entities_involved=cluster.entity_ids,
+                    evidence={
+                        "center": (cluster.center_latitude, cluster.center_longitude),
+                        "radius_km": cluster.radius_km,
+                        "points": len(cluster.keys),
+                        "keys": cluster.keys,
+                        "sources": cluster.sources,
+                        **cluster.metadata,
+                    },
+                    risk_score=min(0.9, 0.4 + 0.1 * len(cluster.entity_ids)),
+                    timestamp=datetime.utcnow(),
+                )
+                patterns.append(pattern)
 
             return patterns
 
@@ -672,9 +726,6 @@ class PatternDetector:
             patterns = []
             network_data = data.get("network_data", {})
 
-            if not network_data:
-                return patterns
-
             # Analyze network structure
             if "nodes" in network_data and "edges" in network_data:
                 # Create network graph
@@ -689,94 +740,99 @@ class PatternDetector:
                     G.add_edge(
                         edge["source"], edge["target"], **edge.get("attributes", {})
                     )
+            elif self.graph_store is not None:
+                # No network supplied: analyse the shared graph store in place
+                G = self.graph_store.view(directed=False)
+            else:
+                return patterns
 
-                # Network density analysis
-                density = nx.density(G)
-                if density > 0.8:  # Very dense network
+            # Network density analysis
+            density = nx.density(G)
+            if density > 0.8:  # Very dense network
+                pattern = DetectedPattern(
+                    id=f"high_density_network_{datetime.utcnow().timestamp()}",
+                    pattern_type=PatternType.NETWORK_PATTERNS,
+                    category=PatternCategory.MEDIUM_RISK,
+                    detection_method=DetectionMethod.GRAPH_ANALYSIS,
+                    confidence=0.75,
+                    description=f"High-density network detected: density = {density:.3f}",
+                    entities_involved=list(G.nodes()),
+                    evidence={
+                        "density": density,
+                        "nodes": G.number_of_nodes(),
+                        "edges": G.number_of_edges(),
+                    },
+                    risk_score=0.5,
+                    timestamp=datetime.utcnow(),
+                )
+                patterns.append(pattern)
+
+            # Centrality analysis
+            if G.number_of_nodes() > 0:
+                centrality = nx.degree_centrality(G)
+                high_centrality_nodes = [
+                    node
+                    for node, cent in centrality.items()
+                    if cent
+                    > np.mean(list(centrality.values()))
+                    + 2 * np.std(list(centrality.values()))
+                ]
+
+                if high_centrality_nodes:
                     pattern = DetectedPattern(
-                        id=f"high_density_network_{datetime.utcnow().timestamp()}",
+                        id=f"high_centrality_{datetime.utcnow().timestamp()}",
                         pattern_type=PatternType.NETWORK_PATTERNS,
                         category=PatternCategory.MEDIUM_RISK,
                         detection_method=DetectionMethod.GRAPH_ANALYSIS,
-                        confidence=0.75,
-                        description=f"High-density network detected: density = {density:.3f}",
-                        entities_involved=list(G.nodes()),
+                        confidence=0.8,
+                        description=f"High-centrality nodes detected: {len(high_centrality_nodes)} nodes",
+                        entities_involved=high_centrality_nodes,
                         evidence={
-                            "density": density,
-                            "nodes": G.number_of_nodes(),
-                            "edges": G.number_of_edges(),
+                            "centrality_scores": {
+                                node: centrality[node]
+                                for node in high_centrality_nodes
+                            }
                         },
-                        risk_score=0.5,
+                        risk_score=0.6,
                         timestamp=datetime.utcnow(),
                     )
                     patterns.append(pattern)
 
-                # Centrality analysis
-                if G.number_of_nodes() > 0:
-                    centrality = nx.degree_centrality(G)
-                    high_centrality_nodes = [
-                        node
-                        for node, cent in centrality.items()
-                        if cent
-                        > np.mean(list(centrality.values()))
-                        + 2 * np.std(list(centrality.values()))
+            # Community detection
+            if G.number_of_nodes() > 5:
+                communities = list(nx.community.greedy_modularity_communities(G))
+
+                if len(communities) > 1:
+                    # Check for isolated communities
+                    isolated_communities = [
+                        comm
+                        for comm in communities
+                        if len(comm) < 3  # Small communities
                     ]
 
-                    if high_centrality_nodes:
+                    if isolated_communities:
                         pattern = DetectedPattern(
-                            id=f"high_centrality_{datetime.utcnow().timestamp()}",
+                            id=f"isolated_communities_{datetime.utcnow().timestamp()}",
                             pattern_type=PatternType.NETWORK_PATTERNS,
-                            category=PatternCategory.MEDIUM_RISK,
+                            category=PatternCategory.LOW_RISK,
                             detection_method=DetectionMethod.GRAPH_ANALYSIS,
-                            confidence=0.8,
-                            description=f"High-centrality nodes detected: {len(high_centrality_nodes)} nodes",
-                            entities_involved=high_centrality_nodes,
+                            confidence=0.7,
+                            description=f"Isolated communities detected: {len(isolated_communities)} small communities",
+                            entities_involved=[
+                                node
+                                for comm in isolated_communities
+                                for node in comm
+                            ],
                             evidence={
-                                "centrality_scores": {
-                                    node: centrality[node]
-                                    for node in high_centrality_nodes
-                                }
+                                "isolated_communities": [
+                                    list(comm) for comm in isolated_communities
+                                ]
                             },
-                            risk_score=0.6,
+                            risk_score=0.3,
                             timestamp=datetime.utcnow(),
                         )
                         patterns.append(pattern)
 
-                # Community detection
-                if G.number_of_nodes() > 5:
-                    communities = list(nx.community.greedy_modularity_communities(G))
-
-                    if len(communities) > 1:
-                        # Check for isolated communities
-                        isolated_communities = [
-                            comm
-                            for comm in communities
-                            if len(comm) < 3  # Small communities
-                        ]
-
-                        if isolated_communities:
-                            pattern = DetectedPattern(
-                                id=f"isolated_communities_{datetime.utcnow().timestamp()}",
-                                pattern_type=PatternType.NETWORK_PATTERNS,
-                                category=PatternCategory.LOW_RISK,
-                                detection_method=DetectionMethod.GRAPH_ANALYSIS,
-                                confidence=0.7,
-                                description=f"Isolated communities detected: {len(isolated_communities)} small communities",
-                                entities_involved=[
-                                    node
-                                    for comm in isolated_communities
-                                    for node in comm
-                                ],
-                                evidence={
-                                    "isolated_communities": [
-                                        list(comm) for comm in isolated_communities
-                                    ]
-                                },
-                                risk_score=0.3,
-                                timestamp=datetime.utcnow(),
-                            )
-                            patterns.append(pattern)
-
             return patterns
 
         except Exception as e:
@@ -1045,22 +1101,7 @@ class PatternDetector:
     ) -> float:
         """Calculate distance between two points using Haversine formula.Calculate distance between two points using Haversine formula."""
         try:
-            # Convert to radians
-            lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
-
-            # Haversine formula
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = (
-                np.sin(dlat / 2) ** 2
-                + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
-            )
-            c = 2 * np.arcsin(np.sqrt(a))
-
-            # Earth's radius in kilometers
-            r = 6371
-
-            return c * r
+            return float(haversine_km(lat1, lon1, lat2, lon2))
 
         except Exception as e:
             self.logger.error(f"Error calculating distance: {e}")
@@ -1141,6 +1182,11 @@ class PatternDetector:
                 "temporal_analysis",
                 "hybrid",
             ],
+            "spatial_index": (
+                self.spatial_index.get_statistics()
+                if self.spatial_index is not None
+                else None
+            ),
         }
 
 # Example usage and testing
@@ -15,10 +15,11 @@ import re
 import uuid
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 from dataclasses import dataclass, field
 
 from ..taskmaster.models.job import Job, JobPriority, JobStatus, JobType
+from .reconciliation_blocking import BlockingStats, CandidateIndex, build_blockers
 
 
 class MatchingAlgorithm(Enum):
@@ -74,6 +75,7 @@ class ReconciliationRecord:
     record_data: Dict[str, Any]
     hash_value: str
     normalized_data: Dict[str, Any] = field(default_factory=dict)
+    hash_digests: Dict[str, str] = field(default_factory=dict)
     match_candidates: List[MatchResult] = field(default_factory=list)
     best_match: Optional[MatchResult] = None
     reconciliation_status: str = "pending"
@@ -114,15 +116,25 @@ class ReconciliationAgent:
         self.fuzzy_threshold = config.get("fuzzy_threshold", 0.8)
         self.hash_algorithms = config.get("hash_algorithms", ["md5", "sha1", "sha256"])
 
+        # Blocking: only targets sharing a block with the source are compared
+        self.enable_blocking = config.get("enable_blocking", False)
+        self.blockers = config.get("blockers") or build_blockers(config)
+
         # Internal state
         self.reconciliation_records: Dict[str, ReconciliationRecord] = {}
         self.match_results: List[MatchResult] = []
         self.matching_rules: Dict[str, Dict[str, Any]] = {}
+        # Inverted index: algorithm -> digest -> record ids
+        self.hash_index: Dict[str, Dict[str, Set[str]]] = {
+            hash_alg: {} for hash_alg in self.hash_algorithms
+        }
 
         # Performance tracking
         self.total_records_processed = 0
         self.total_matches_found = 0
         self.average_processing_time = 0.0
+        self.total_pairs_pruned = 0
+        self.last_blocking_stats = BlockingStats()
 
         # Event loop
         self.loop = asyncio.get_event_loop()
@@ -150,16 +162,23 @@ class ReconciliationAgent:
     async def add_reconciliation_record(self, record: ReconciliationRecord) -> bool:
         """Add a reconciliation record for processing.Add a reconciliation record for processing."""
         try:
-            # Generate hash value
-            record.hash_value = self._generate_hash(record.record_data)
+            # Serialize once and compute every configured digest up front
+            record.hash_digests = self._generate_hash_digests(record.record_data)
+            record.hash_value = record.hash_digests.get(
+                "sha256"
+            ) or self._generate_hash(record.record_data)
 
             # Normalize data
             record.normalized_data = await self._normalize_record_data(
                 record.record_data
             )
 
-            # Store record
+            # Store record, replacing any previous version in the hash index
+            previous = self.reconciliation_records.get(record.id)
+            if previous is not None:
+                self._unindex_record_hashes(previous)
             self.reconciliation_records[record.id] = record
+            self._index_record_hashes(record)
 
             self.logger.info(f"Added reconciliation record {record.id}")
             return True
@@ -200,11 +219,23 @@ class ReconciliationAgent:
                 f"Processing reconciliation: {len(source_records)} source records vs {len(target_records)} target records"
             )
 
+            # Index targets once so each source only sees its candidate blocks
+            candidate_index = (
+                CandidateIndex(self.blockers).build(target_records)
+                if self.enable_blocking
+                else None
+            )
+
             # Process each source record
             all_matches = []
             for source_record in source_records:
+                candidates = (
+                    candidate_index.candidates_for(source_record)
+                    if candidate_index
+                    else target_records
+                )
                 matches = await self._find_matches_for_record(
-                    source_record, target_records
+                    source_record, candidates
                 )
                 source_record.match_candidates = matches
 
@@ -221,6 +252,14 @@ class ReconciliationAgent:
             self.total_records_processed += len(source_records)
             self.total_matches_found += len(all_matches)
 
+            if candidate_index:
+                self.last_blocking_stats = candidate_index.stats
+                self.total_pairs_pruned += candidate_index.stats.pruned_pairs
+                self.logger.info(
+                    f"Blocking pruned {candidate_index.stats.pruned_pairs} of "
+                    f"{candidate_index.stats.total_pairs} candidate pairs"
+                )
+
             processing_time = (datetime.utcnow() - start_time).total_seconds()
             self._update_average_processing_time(processing_time)
 
@@ -292,6 +331,13 @@ class ReconciliationAgent:
         try:
             matches = []
 
+            # Targets sharing a digest with the source, from the inverted index
+            hash_candidates = (
+                self._lookup_hash_candidates(source_record)
+                if self.enable_hash_matching
+                else set()
+            )
+
             for target_record in target_records:
                 # Skip if same record
                 if source_record.id == target_record.id:
@@ -304,7 +350,7 @@ class ReconciliationAgent:
                         matches.append(exact_match)
                         continue  # Exact match found, no need for other algorithms
 
-                if self.enable_hash_matching:
+                if target_record.id in hash_candidates:
                     hash_match = await self._hash_match(source_record, target_record)
                     if hash_match:
                         matches.append(hash_match)
@@ -386,16 +432,12 @@ class ReconciliationAgent:
     ) -> Optional[MatchResult]:
         """Perform hash-based matching between records.Perform hash-based matching between records."""
         try:
-            # Check multiple hash algorithms
+            # Check multiple hash algorithms using the digests cached on add
             for hash_alg in self.hash_algorithms:
-                source_hash = self._generate_hash_with_algorithm(
-                    source_record.record_data, hash_alg
-                )
-                target_hash = self._generate_hash_with_algorithm(
-                    target_record.record_data, hash_alg
-                )
+                source_hash = self._get_record_digest(source_record, hash_alg)
+                target_hash = self._get_record_digest(target_record, hash_alg)
 
-                if source_hash == target_hash:
+                if source_hash and source_hash == target_hash:
                     return MatchResult(
                         source_id=source_record.id,
                         target_id=target_record.id,
@@ -508,6 +550,57 @@ class ReconciliationAgent:
             self.logger.error(f"Error generating hash with algorithm {algorithm}: {e}")
             return ""
 
+    def _generate_hash_digests(self, data: Dict[str, Any]) -> Dict[str, str]:
+        """Generate a digest per configured algorithm from one serialization."""
+        try:
+            encoded = json.dumps(data, sort_keys=True, default=str).encode()
+            digests = {}
+            for hash_alg in self.hash_algorithms:
+                if hash_alg in ("md5", "sha1", "sha256"):
+                    digests[hash_alg] = hashlib.new(hash_alg, encoded).hexdigest()
+                else:
+                    digests[hash_alg] = hashlib.sha256(encoded).hexdigest()
+            return digests
+
+        except Exception as e:
+            self.logger.error(f"Error generating hash digests: {e}")
+            return {}
+
+    def _get_record_digest(self, record: ReconciliationRecord, algorithm: str) -> str:
+        """Get a cached record digest, computing it if it was never cached."""
+        digest = record.hash_digests.get(algorithm)
+        if digest is None:
+            digest = self._generate_hash_with_algorithm(record.record_data, algorithm)
+            record.hash_digests[algorithm] = digest
+        return digest
+
+    def _index_record_hashes(self, record: ReconciliationRecord):
+        """Add a record's digests to the inverted hash index."""
+        for hash_alg, digest in record.hash_digests.items():
+            if digest:
+                self.hash_index.setdefault(hash_alg, {}).setdefault(
+                    digest, set()
+                ).add(record.id)
+
+    def _unindex_record_hashes(self, record: ReconciliationRecord):
+        """Remove a record's digests from the inverted hash index."""
+        for hash_alg, digest in record.hash_digests.items():
+            record_ids = self.hash_index.get(hash_alg, {}).get(digest)
+            if record_ids is None:
+                continue
+            record_ids.discard(record.id)
+            if not record_ids:
+                del self.hash_index[hash_alg][digest]
+
+    def _lookup_hash_candidates(self, source_record: ReconciliationRecord) -> Set[str]:
+        """Get ids of records sharing any configured digest with the source."""
+        candidates: Set[str] = set()
+        for hash_alg in self.hash_algorithms:
+            digest = self._get_record_digest(source_record, hash_alg)
+            candidates.update(self.hash_index.get(hash_alg, {}).get(digest, ()))
+        candidates.discard(source_record.id)
+        return candidates
+
     async def _normalize_record_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize record data for consistent matching.Normalize record data for consistent matching."""
         try:
@@ -588,6 +681,7 @@ class ReconciliationAgent:
                 ]
 
                 for record_id in old_records:
+                    self._unindex_record_hashes(self.reconciliation_records[record_id])
                     del self.reconciliation_records[record_id]
 
                 if old_records:
@@ -618,6 +712,9 @@ class ReconciliationAgent:
                 if self.total_records_processed > 0
                 else 0
             ),
+            "blocking_enabled": self.enable_blocking,
+            "total_pairs_pruned": self.total_pairs_pruned,
+            "last_blocking_stats": self.last_blocking_stats.to_dict(),
         }
 
 # Example usage and testing
@@ -629,6 +726,8 @@ if __name__ == "__main__":
         "enable_hash_matching": True,
         "fuzzy_threshold": 0.8,
         "hash_algorithms": ["md5", "sha1", "sha256"],
+        "enable_blocking": True,
+        "blocking_strategies": ["hash", "amount_band", "date_window"],
     }
 
     # Initialize reconciliation agent
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Reconciliation Blocking - Candidate Index for Record Matching
+
+This module implements the blocking layer used by the ReconciliationAgent.
+Target records are indexed once under one or more blocking keys (hash
+buckets, amount bands, date windows, sorted-neighbourhood keys) and each
+source record is only compared against targets that share a block with it,
+instead of against every target record.
+"""
+
+import bisect
+import logging
+import math
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from dataclasses import dataclass
+
+
+@dataclass
+class BlockingStats:
+    """Blocking statistics for a reconciliation run."""
+
+    source_records: int = 0
+    target_records: int = 0
+    total_pairs: int = 0
+    candidate_pairs: int = 0
+    fallback_records: int = 0
+
+    @property
+    def pruned_pairs(self) -> int:
+        """Number of pairs skipped because they share no block."""
+        return self.total_pairs - self.candidate_pairs
+
+    @property
+    def reduction_ratio(self) -> float:
+        """Fraction of the full cross product that was pruned."""
+        if self.total_pairs == 0:
+            return 0.0
+        return self.pruned_pairs / self.total_pairs
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert statistics to a dictionary."""
+        return {
+            "source_records": self.source_records,
+            "target_records": self.target_records,
+            "total_pairs": self.total_pairs,
+            "candidate_pairs": self.candidate_pairs,
+            "pruned_pairs": self.pruned_pairs,
+            "reduction_ratio": self.reduction_ratio,
+            "fallback_records": self.fallback_records,
+        }
+
+
+class Blocker:
+    """
+    Base class for blocking strategies.
+
+    A blocker maps a record to the block keys it is stored under
+    (``index_keys``) and the block keys a source record should probe
+    (``query_keys``). The two differ for range-style blockers, which index a
+    record in a single bucket but probe the neighbouring buckets as well.
+    """
+
+    name = "blocker"
+
+    def index_keys(self, record: Any) -> List[Hashable]:
+        """Return the block keys a target record is indexed under."""
+        raise NotImplementedError
+
+    def query_keys(self, record: Any) -> List[Hashable]:
+        """Return the block keys a source record probes."""
+        return self.index_keys(record)
+
+
+class HashBlocker(Blocker):
+    """Block records on their normalized hash value."""
+
+    name = "hash"
+
+    def index_keys(self, record: Any) -> List[Hashable]:
+        """Return the normalized hash value of the record."""
+        hash_value = str(getattr(record, "hash_value", "") or "").strip().lower()
+        return [hash_value] if hash_value else []
+
+
+class AmountBandBlocker(Blocker):
+    """Block records into fixed-width amount bands."""
+
+    name = "amount_band"
+
+    def __init__(self, fields: Iterable[str] = ("amount",), band_width: float = 1.0):
+        """Initialize the amount band blocker."""
+        if band_width <= 0:
+            raise ValueError("band_width must be positive")
+        self.fields = list(fields)
+        self.band_width = band_width
+
+    def _band(self, record: Any) -> Optional[int]:
+        """Return the amount band of a record, if it has an amount."""
+        data = getattr(record, "record_data", {}) or {}
+        for field_name in self.fields:
+            if field_name not in data:
+                continue
+            try:
+                amount = float(str(data[field_name]).replace(",", ""))
+            except (TypeError, ValueError):
+                continue
+            if math.isnan(amount) or math.isinf(amount):
+                continue
+            return int(math.floor(amount / self.band_width))
+        return None
+
+    def index_keys(self, record: Any) -> List[Hashable]:
+        """Return the amount band of the record."""
+        band = self._band(record)
+        return [] if band is None else [band]
+
+    def query_keys(self, record: Any) -> List[Hashable]:
+        """Return the amount band of the record and its two neighbours."""
+        band = self._band(record)
+        return [] if band is None else [band - 1, band, band + 1]
+
+
+class DateWindowBlocker(Blocker):
+    """Block records into fixed-length date windows."""
+
+    name = "date_window"
+
+    def __init__(
+        self,
+        fields: Iterable[str] = ("date", "transaction_date"),
+        window_days: int = 3,
+    ):
+        """Initialize the date window blocker."""
+        if window_days <= 0:
+            raise ValueError("window_days must be positive")
+        self.fields = list(fields)
+        self.window_days = window_days
+
+    def _window(self, record: Any) -> Optional[int]:
+        """Return the date window of a record, if it has a parseable date."""
+        data = getattr(record, "record_data", {}) or {}
+        for field_name in self.fields:
+            value = data.get(field_name)
+            if value is None:
+                continue
+            if isinstance(value, datetime):
+                day = value.date()
+            elif isinstance(value, date):
+                day = value
+            else:
+                try:
+                    day = datetime.fromisoformat(str(value).strip()).date()
+                except ValueError:
+                    continue
+            return day.toordinal() // self.window_days
+        return None
+
+    def index_keys(self, record: Any) -> List[Hashable]:
+        """Return the date window of the record."""
+        window = self._window(record)
+        return [] if window is None else [window]
+
+    def query_keys(self, record: Any) -> List[Hashable]:
+        """Return the date window of the record and its two neighbours."""
+        window = self._window(record)
+        return [] if window is None else [window - 1, window, window + 1]
+
+
+class SortedNeighbourhoodBlocker(Blocker):
+    """
+    Sorted-neighbourhood blocking.
+
+    Target records are sorted on a key built from the leading characters of
+    the configured normalized fields. A source record is paired with the
+    ``window`` targets on either side of its own position in that order.
+    """
+
+    name = "sorted_neighbourhood"
+
+    def __init__(
+        self,
+        fields: Iterable[str] = ("description", "name", "reference"),
+        prefix_length: int = 6,
+        window: int = 10,
+    ):
+        """Initialize the sorted-neighbourhood blocker."""
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.fields = list(fields)
+        self.prefix_length = prefix_length
+        self.window = window
+
+    def sort_key(self, record: Any) -> Optional[str]:
+        """Build the sort key of a record from its normalized fields."""
+        data = getattr(record, "normalized_data", {}) or {}
+        parts = [
+            str(data[field_name]).replace(" ", "")[: self.prefix_length]
+            for field_name in self.fields
+            if data.get(field_name) not in (None, "")
+        ]
+        return "|".join(parts) if parts else None
+
+    def index_keys(self, record: Any) -> List[Hashable]:
+        """Sorted-neighbourhood blocking does not use hash buckets."""
+        return []
+
+
+class CandidateIndex:
+    """
+    Candidate index over target records.
+
+    Target records are indexed once per reconciliation run. A source record
+    reaches the pairwise matchers only for targets that share at least one
+    block with it under any configured blocker. Source records that produce
+    no blocking key at all are compared against every target so that records
+    with missing blocking fields are never silently dropped.
+    """
+
+    def __init__(self, blockers: List[Blocker]):
+        """Initialize the candidate index."""
+        self.logger = logging.getLogger(__name__)
+        self.blockers = blockers
+        self.stats = BlockingStats()
+
+        self._targets: List[Any] = []
+        self._positions: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[str, Hashable], List[int]] = defaultdict(list)
+        self._sorted_keys: Dict[str, List[Tuple[str, int]]] = {}
+
+    def build(self, target_records: List[Any]) -> "CandidateIndex":
+        """Index the target records under every blocker."""
+        self._targets = list(target_records)
+        self._positions = {record.id: i for i, record in enumerate(self._targets)}
+        self._buckets.clear()
+        self._sorted_keys.clear()
+
+        for blocker in self.blockers:
+            if isinstance(blocker, SortedNeighbourhoodBlocker):
+                keyed = []
+                for position, record in enumerate(self._targets):
+                    key = blocker.sort_key(record)
+                    if key is not None:
+                        keyed.append((key, position))
+                keyed.sort()
+                self._sorted_keys[blocker.name] = keyed
+                continue
+
+            for position, record in enumerate(self._targets):
+                for key in blocker.index_keys(record):
+                    self._buckets[(blocker.name, key)].append(position)
+
+        self.stats = BlockingStats(target_records=len(self._targets))
+        return self
+
+    def candidates_for(self, source_record: Any) -> List[Any]:
+        """Return the target records sharing a block with the source record."""
+        positions: Set[int] = set()
+        keyed = False
+
+        for blocker in self.blockers:
+            if isinstance(blocker, SortedNeighbourhoodBlocker):
+                key = blocker.sort_key(source_record)
+                ordered = self._sorted_keys.get(blocker.name, [])
+                if key is None or not ordered:
+                    continue
+                keyed = True
+                anchor = bisect.bisect_left(ordered, (key, -1))
+                low = max(0, anchor - blocker.window)
+                high = min(len(ordered), anchor + blocker.window)
+                positions.update(position for _, position in ordered[low:high])
+                continue
+
+            for key in blocker.query_keys(source_record):
+                keyed = True
+                positions.update(self._buckets.get((blocker.name, key), ()))
+
+        if not keyed:
+            self.stats.fallback_records += 1
+            candidates = self._targets
+        else:
+            candidates = [self._targets[position] for position in sorted(positions)]
+
+        self.stats.source_records += 1
+        self.stats.total_pairs += len(self._targets)
+        self.stats.candidate_pairs += len(candidates)
+        return candidates
+
+
+def build_blockers(config: Dict[str, Any]) -> List[Blocker]:
+    """Build the configured blockers from a ReconciliationAgent config."""
+    blockers: List[Blocker] = []
+    for name in config.get(
+        "blocking_strategies",
+        ["hash", "amount_band", "date_window", "sorted_neighbourhood"],
+    ):
+        if name == "hash":
+            blockers.append(HashBlocker())
+        elif name == "amount_band":
+            blockers.append(
+                AmountBandBlocker(
+                    fields=config.get("blocking_amount_fields", ["amount"]),
+                    band_width=config.get("blocking_amount_band_width", 1.0),
+                )
+            )
+        elif name == "date_window":
+            blockers.append(
+                DateWindowBlocker(
+                    fields=config.get(
+                        "blocking_date_fields", ["date", "transaction_date"]
+                    ),
+                    window_days=config.get("blocking_date_window_days", 3),
+                )
+            )
+        elif name == "sorted_neighbourhood":
+            blockers.append(
+                SortedNeighbourhoodBlocker(
+                    fields=config.get(
+                        "blocking_key_fields", ["description", "name", "reference"]
+                    ),
+                    prefix_length=config.get("blocking_key_prefix_length", 6),
+                    window=config.get("blocking_window", 10),
+                )
+            )
+        else:
+            raise ValueError(f"Unknown blocking strategy: {name}")
+    return blockers
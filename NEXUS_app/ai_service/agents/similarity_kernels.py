@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Similarity Kernels - Batched String Similarity for Fuzzy Matching
+
+This module implements the string similarity kernels used by the
+AIFuzzyMatcher. Levenshtein distance uses Myers' bit-parallel algorithm
+(as generalised by Hyyrö), with Python integers as arbitrarily wide bit
+vectors, so one pattern is compared against many texts in O(len(text))
+word operations per text. N-gram profiles are cached per string.
+"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence
+
+
+@lru_cache(maxsize=65536)
+def pattern_bitmasks(pattern: str) -> Dict[str, int]:
+    """Build the per-character match bitmasks of a pattern."""
+    masks: Dict[str, int] = {}
+    for position, char in enumerate(pattern):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def _myers_distance(
+    pattern: str, masks: Dict[str, int], text: str, max_distance: Optional[int]
+) -> int:
+    """Bit-parallel Levenshtein distance of a pattern against one text."""
+    m = len(pattern)
+    n = len(text)
+    if max_distance is not None and abs(m - n) > max_distance:
+        return max_distance + 1
+    if m == 0 or n == 0:
+        return m + n
+
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv = full
+    mv = 0
+    score = m
+
+    for column, char in enumerate(text, 1):
+        eq = masks.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & full
+        mh = pv & xh
+
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+
+        # Each remaining character can lower the distance by at most one
+        if max_distance is not None and score - (n - column) > max_distance:
+            return max_distance + 1
+
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+
+    return score
+
+
+def levenshtein_distance(s1: str, s2: str, max_distance: Optional[int] = None) -> int:
+    """
+    Calculate the Levenshtein distance between two strings.
+
+    With ``max_distance`` set, any distance above it is reported as
+    ``max_distance + 1`` and the computation stops as soon as it is known.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    return _myers_distance(s2, pattern_bitmasks(s2), s1, max_distance)
+
+
+def levenshtein_one_to_many(
+    pattern: str, texts: Sequence[str], max_distance: Optional[int] = None
+) -> List[int]:
+    """Calculate the Levenshtein distance from one pattern to many texts."""
+    masks = pattern_bitmasks(pattern)
+    return [_myers_distance(pattern, masks, text, max_distance) for text in texts]
+
+
+@lru_cache(maxsize=65536)
+def ngram_profile(value: str, n: int = 3) -> FrozenSet[str]:
+    """Build the set of character n-grams of a string."""
+    return frozenset(value[i : i + n] for i in range(len(value) - n + 1))
+
+
+def ngram_similarity(s1: str, s2: str, n: int = 3) -> float:
+    """Calculate the Jaccard similarity of the n-gram profiles of two strings."""
+    if not s1 or not s2:
+        return 0.0
+
+    s1_grams = ngram_profile(s1, n)
+    s2_grams = ngram_profile(s2, n)
+    if not s1_grams or not s2_grams:
+        return 0.0
+
+    intersection = len(s1_grams & s2_grams)
+    union = len(s1_grams) + len(s2_grams) - intersection
+    return intersection / union if union else 0.0
+
+
+def ngram_one_to_many(pattern: str, texts: Sequence[str], n: int = 3) -> List[float]:
+    """Calculate the n-gram similarity from one pattern to many texts."""
+    return [ngram_similarity(pattern, text, n) for text in texts]
@@ -0,0 +1,854 @@
+#!/usr/bin/env python3
+"""
+Spatial Index - Grid-Bucketed Index of Geotagged Evidence and Transactions
+
+This module implements the SpatialIndex shared by the agents that deal
+with locations (EXIF GPS coordinates, transaction locations):
+
+- Points are held column by column (latitude, longitude, timestamp) in
+  growable NumPy arrays, with a key, entity and source per point.
+- Each point is bucketed in a latitude/longitude grid cell of about
+  ``cell_size_km``. Radius and box queries only visit the cells the
+  query's bounding box overlaps and compute haversine distances for
+  those cells' points in one vectorized call, so their cost follows the
+  number of nearby points rather than the size of the index. Boxes that
+  cross the antimeridian wrap around.
+- Nearest-neighbour queries widen an exact radius query until enough
+  points are found.
+- Co-location clustering (DBSCAN-style, optionally within a time window)
+  compares each cell's points with those of the neighbouring cells only;
+  the clusters around given points are grown from those points alone.
+
+Removed points leave their grid cell; once they outnumber the live
+points, the columns are compacted and point ids renumbered. With
+``max_points`` the index evicts the earliest added points past that
+size. Every mutation bumps ``version``.
+"""
+
+import logging
+import math
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Mean Earth radius in kilometres
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Points kept by a shared index before the earliest added are evicted
+SHARED_INDEX_MAX_POINTS = 1_000_000
+
+_indexes: Dict[str, "SpatialIndex"] = {}
+
+
+def get_spatial_index(name: str = "default") -> "SpatialIndex":
+    """Return the process-wide spatial index with the given name."""
+    if name not in _indexes:
+        _indexes[name] = SpatialIndex(max_points=SHARED_INDEX_MAX_POINTS)
+    return _indexes[name]
+
+
+def resolve_spatial_index(setting: Any) -> Optional["SpatialIndex"]:
+    """Resolve a ``spatial_index`` config value: an index, a shared name, or None."""
+    if setting is None or isinstance(setting, SpatialIndex):
+        return setting
+    return get_spatial_index(str(setting))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometres; accepts scalars or NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _to_seconds(value: Any) -> float:
+    """A timestamp as seconds since the epoch; NaN when missing."""
+    if value is None:
+        return math.nan
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return (value - _EPOCH).total_seconds()
+        return (value - _EPOCH_UTC).total_seconds()
+    return float(value)
+
+
+@dataclass
+class SpatialCluster:
+    """Points located together (and, optionally, at about the same time)."""
+
+    keys: List[Hashable]
+    entity_ids: List[Hashable]
+    sources: List[str]
+    center_latitude: float
+    center_longitude: float
+    radius_km: float  # Largest distance of a member from the center
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class SpatialIndex:
+    """Grid-bucketed point index with radius, box and nearest queries."""
+
+    # Candidate pairs compared per array operation in clustering, and
+    # close pairs kept between clustering passes
+    max_pair_chunk = 1 << 20
+    max_cached_pairs = 10_000_000
+
+    def __init__(
+        self,
+        cell_size_km: float = 1.0,
+        initial_capacity: int = 1024,
+        max_points: Optional[int] = None,
+    ):
+        """Initialize the spatial index."""
+        self.logger = logging.getLogger(__name__)
+        self.cell_size_km = cell_size_km
+        self.max_points = max_points
+        # Whole numbers of rows and columns, so the grid wraps around
+        # evenly at the antimeridian
+        self.rows = math.ceil(180.0 * KM_PER_DEGREE / cell_size_km)
+        self.columns = math.ceil(360.0 * KM_PER_DEGREE / cell_size_km)
+        self.row_degrees = 180.0 / self.rows
+        self.column_degrees = 360.0 / self.columns
+        self.version = 0
+
+        # Point columns in insertion order; removed points leave their cells
+        # until the columns are compacted
+        self._latitude = np.empty(initial_capacity, dtype=np.float64)
+        self._longitude = np.empty(initial_capacity, dtype=np.float64)
+        self._time = np.empty(initial_capacity, dtype=np.float64)
+        self._size = 0
+        self._live_points = 0
+        self._keys: List[Hashable] = []
+        self._entities: List[Optional[Hashable]] = []
+        self._sources: List[Optional[str]] = []
+        self._attrs: List[Dict[str, Any]] = []
+        self._key_index: Dict[Hashable, int] = {}
+        # Lowest point id that may still be live, for evicting the earliest
+        self._oldest = 0
+
+        # Grid cell -> point ids, entity -> point ids
+        self._cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self._entity_points: Dict[Hashable, List[int]] = defaultdict(list)
+
+        # Statistics
+        self.queries = 0
+        self.cells_visited = 0
+        self.candidates_examined = 0
+        self.evictions = 0
+        self.compactions = 0
+
+    def __len__(self) -> int:
+        return self._live_points
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._key_index
+
+    # Mutation
+
+    def add_point(
+        self,
+        key: Hashable,
+        latitude: float,
+        longitude: float,
+        entity_id: Optional[Hashable] = None,
+        timestamp: Any = None,
+        source: Optional[str] = None,
+        **attrs: Any,
+    ) -> int:
+        """Add or replace the point stored under ``key``; returns its id."""
+        latitude = float(latitude)
+        longitude = float(longitude)
+        if not (-90.0 <= latitude <= 90.0) or not math.isfinite(longitude):
+            raise ValueError(f"Invalid coordinates: {latitude}, {longitude}")
+        longitude = (longitude + 180.0) % 360.0 - 180.0
+
+        if key in self._key_index:
+            self._drop(self._key_index.pop(key))
+
+        point_id = self._size
+        if point_id == len(self._latitude):
+            self._grow()
+        self._latitude[point_id] = latitude
+        self._longitude[point_id] = longitude
+        self._time[point_id] = _to_seconds(timestamp)
+        self._size += 1
+        self._live_points += 1
+
+        self._keys.append(key)
+        self._entities.append(entity_id)
+        self._sources.append(source)
+        self._attrs.append(attrs)
+        self._key_index[key] = point_id
+        self._cells[self._cell(latitude, longitude)].append(point_id)
+        if entity_id is not None:
+            self._entity_points[entity_id].append(point_id)
+        self.version += 1
+
+        while self.max_points is not None and self._live_points > self.max_points:
+            self._evict_oldest()
+        self._maybe_compact()
+        return self._key_index[key]
+
+    def add_records(
+        self, records: Iterable[Dict[str, Any]], source: Optional[str] = None
+    ) -> List[Hashable]:
+        """
+        Add records carrying ``latitude``/``longitude`` (or ``lat``/``lon``).
+
+        Points are keyed by ``record_key``, so adding a record again replaces
+        its point; ``entity_id`` and ``timestamp`` are stored with it.
+        Records without usable coordinates are skipped. Returns the keys of
+        the points added.
+        """
+        added = []
+        for record in records:
+            latitude = record.get("latitude", record.get("lat"))
+            longitude = record.get("longitude", record.get("lon"))
+            if latitude is None or longitude is None:
+                continue
+            key = self.record_key(record, source)
+            try:
+                self.add_point(
+                    key,
+                    latitude,
+                    longitude,
+                    entity_id=record.get("entity_id"),
+                    timestamp=record.get("timestamp"),
+                    source=source,
+                )
+            except (TypeError, ValueError) as e:
+                self.logger.debug(f"Skipping record {key}: {e}")
+                continue
+            added.append(key)
+        return added
+
+    @staticmethod
+    def record_key(record: Dict[str, Any], source: Optional[str] = None) -> Hashable:
+        """
+        Key of a record's point: its ``id``, ``transaction_id`` or ``key``.
+
+        Records without one are keyed by their content (source, entity,
+        timestamp, coordinates and amount), so the same record always maps
+        to the same point.
+        """
+        key = record.get("id", record.get("transaction_id", record.get("key")))
+        if key is not None:
+            return key
+        content = (
+            record.get("entity_id"),
+            record.get("timestamp"),
+            record.get("latitude", record.get("lat")),
+            record.get("longitude", record.get("lon")),
+            record.get("amount"),
+        )
+        return (source,) + tuple(
+            None if value is None else str(value) for value in content
+        )
+
+    def add_exif_metadata(self, metadata: Any, entity_id: Optional[Hashable] = None):
+        """Add the GPS position of an EXIFMetadata result, if it has one."""
+        gps = metadata.gps_data
+        if gps is None or gps.latitude is None or gps.longitude is None:
+            return None
+        timestamp = gps.timestamp
+        if timestamp is None and metadata.timestamp_info is not None:
+            timestamp = metadata.timestamp_info.original_date
+        return self.add_point(
+            metadata.file_path,
+            gps.latitude,
+            gps.longitude,
+            entity_id=entity_id,
+            timestamp=timestamp,
+            source="exif",
+            altitude=gps.altitude,
+        )
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove a point; returns False if it is not indexed."""
+        point_id = self._key_index.pop(key, None)
+        if point_id is None:
+            return False
+        self._drop(point_id)
+        self._maybe_compact()
+        return True
+
+    # Queries
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """The stored point under ``key``, or None."""
+        point_id = self._key_index.get(key)
+        return None if point_id is None else self._point(point_id)
+
+    def within_radius(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> List[Tuple[Hashable, float]]:
+        """Keys and distances of the points within ``radius_km``, nearest first."""
+        ids = self._candidates(latitude, longitude, radius_km)
+        if not len(ids):
+            return []
+        distances = haversine_km(
+            latitude, longitude, self._latitude[ids], self._longitude[ids]
+        )
+        inside = distances <= radius_km
+        ids, distances = ids[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return [(self._keys[ids[i]], float(distances[i])) for i in order]
+
+    def within_box(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float
+    ) -> List[Hashable]:
+        """Keys of the points in a box; ``min_lon > max_lon`` wraps the antimeridian."""
+        self.queries += 1
+        row_range = (self._row(min_lat), self._row(max_lat))
+        # 180 would wrap to the first column; it closes the last one instead
+        last_col = self.columns - 1 if max_lon >= 180.0 else self._column(max_lon)
+        col_range = (self._column(min_lon), last_col)
+        ids = self._cell_points(row_range, col_range)
+        if not len(ids):
+            return []
+        latitudes, longitudes = self._latitude[ids], self._longitude[ids]
+        inside = (latitudes >= min_lat) & (latitudes <= max_lat)
+        if min_lon <= max_lon:
+            inside &= (longitudes >= min_lon) & (longitudes <= max_lon)
+        else:
+            inside &= (longitudes >= min_lon) | (longitudes <= max_lon)
+        return [self._keys[point_id] for point_id in ids[inside]]
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        max_distance_km: Optional[float] = None,
+    ) -> List[Tuple[Hashable, float]]:
+        """The ``k`` nearest points as (key, distance), nearest first."""
+        limit = math.pi * EARTH_RADIUS_KM
+        if max_distance_km is not None:
+            limit = min(limit, max_distance_km)
+        radius = min(self.cell_size_km, limit)
+        while True:
+            found = self.within_radius(latitude, longitude, radius)
+            # Exact once k points lie within the radius or nothing lies beyond
+            if len(found) >= k or radius >= limit or len(found) == self._live_points:
+                return found[:k]
+            radius = min(radius * 2, limit)
+
+    def entities(self) -> List[Hashable]:
+        """Entities with at least one point."""
+        return [entity for entity, ids in self._entity_points.items() if ids]
+
+    def entity_track(self, entity_id: Hashable) -> List[Dict[str, Any]]:
+        """Points of an entity in time order; untimed points last."""
+        return [self._point(point_id) for point_id in self._track_ids(entity_id)]
+
+    def travel_distances(self, entity_id: Hashable) -> List[float]:
+        """Distances in km between consecutive points of an entity's track."""
+        ids = self._track_ids(entity_id)
+        if len(ids) < 2:
+            return []
+        distances = haversine_km(
+            self._latitude[ids[:-1]],
+            self._longitude[ids[:-1]],
+            self._latitude[ids[1:]],
+            self._longitude[ids[1:]],
+        )
+        return distances.tolist()
+
+    def colocation_clusters(
+        self,
+        radius_km: float,
+        min_points: int = 2,
+        time_window: Optional[timedelta] = None,
+        keys: Optional[Iterable[Hashable]] = None,
+    ) -> List[SpatialCluster]:
+        """
+        Clusters of points within ``radius_km`` of each other (DBSCAN-style).
+
+        A point with at least ``min_points`` neighbours (itself included)
+        is a core point; core points within the radius of each other share
+        a cluster, and other points join the cluster of a core neighbour.
+        With ``time_window``, neighbours must also lie within that time of
+        each other, and untimed points are left out. With ``keys``, only
+        the clusters containing one of those points are returned; they are
+        grown outward from those points through radius queries, so the cost
+        follows the size of those clusters rather than of the index. A
+        border point in reach of two clusters may then join either.
+        """
+        self.queries += 1
+        window = time_window.total_seconds() if time_window is not None else None
+        if keys is not None:
+            seeds = [self._key_index[key] for key in keys if key in self._key_index]
+            groups = self._grow_clusters(seeds, radius_km, min_points, window)
+            return self._clusters(groups)
+
+        # Neighbour counts decide the core points; the pairs are kept for
+        # the passes below unless there are too many of them
+        counts = np.zeros(self._size, dtype=np.int64)
+        cached: Optional[List[Tuple[np.ndarray, np.ndarray]]] = []
+        cached_pairs = 0
+        for first, second in self._neighbour_pairs(radius_km, window):
+            counts += np.bincount(first, minlength=self._size)
+            if cached is not None:
+                cached.append((first, second))
+                cached_pairs += len(first)
+                if cached_pairs > self.max_cached_pairs:
+                    cached = None
+        core = counts >= min_points
+        if not core.any():
+            return []
+
+        def pairs():
+            if cached is not None:
+                return iter(cached)
+            return self._neighbour_pairs(radius_km, window)
+
+        # Core points take the smallest label among their core neighbours
+        # until nothing changes; labels always name a core point of the
+        # same cluster, so they are followed to shorten chains
+        labels = np.arange(self._size, dtype=np.int64)
+        changed = True
+        while changed:
+            previous = labels.copy()
+            for first, second in pairs():
+                both = core[first] & core[second]
+                np.minimum.at(labels, first[both], labels[second[both]])
+            labels = labels[labels]
+            changed = not np.array_equal(labels, previous)
+
+        # Border points join the cluster of their lowest-labelled core neighbour
+        no_label = np.int64(self._size)
+        assigned = np.where(core, labels, no_label)
+        for first, second in pairs():
+            border = ~core[first] & core[second]
+            np.minimum.at(assigned, first[border], labels[second[border]])
+
+        clustered = np.nonzero(assigned < no_label)[0]
+        clustered = clustered[np.argsort(assigned[clustered], kind="stable")]
+        boundaries = np.nonzero(np.diff(assigned[clustered]))[0] + 1
+        return self._clusters(np.split(clustered, boundaries))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get spatial index statistics."""
+        occupied = sum(1 for ids in self._cells.values() if ids)
+        return {
+            "points": self._live_points,
+            "entities": len(self.entities()),
+            "cell_size_km": self.cell_size_km,
+            "occupied_cells": occupied,
+            "average_points_per_cell": (
+                self._live_points / occupied if occupied else 0.0
+            ),
+            "queries": self.queries,
+            "cells_visited": self.cells_visited,
+            "candidates_examined": self.candidates_examined,
+            "average_candidates_per_query": (
+                self.candidates_examined / self.queries if self.queries else 0.0
+            ),
+            "max_points": self.max_points,
+            "evictions": self.evictions,
+            "compactions": self.compactions,
+            "version": self.version,
+        }
+
+    # Internals
+
+    def _drop(self, point_id: int):
+        """Take a point out of its cell and entity; its key is already unmapped."""
+        self._live_points -= 1
+        self._cells[
+            self._cell(self._latitude[point_id], self._longitude[point_id])
+        ].remove(point_id)
+        entity_id = self._entities[point_id]
+        if entity_id is not None:
+            self._entity_points[entity_id].remove(point_id)
+        self.version += 1
+
+    def _evict_oldest(self):
+        """Remove the earliest added live point."""
+        while self._key_index.get(self._keys[self._oldest]) != self._oldest:
+            self._oldest += 1
+        del self._key_index[self._keys[self._oldest]]
+        self._drop(self._oldest)
+        self.evictions += 1
+
+    def _maybe_compact(self):
+        """Compact the columns once removed points outnumber live ones."""
+        removed = self._size - self._live_points
+        if removed > 1024 and removed > self._live_points:
+            self._compact()
+
+    def _compact(self):
+        """Drop removed points from the columns, renumbering live points in order."""
+        live = np.fromiter(sorted(self._key_index.values()), dtype=np.int64)
+        new_ids = np.full(self._size, -1, dtype=np.int64)
+        new_ids[live] = np.arange(len(live))
+
+        capacity = max(2 * len(live), 16)
+        for name in ("_latitude", "_longitude", "_time"):
+            column = getattr(self, name)
+            compacted = np.zeros(capacity, dtype=column.dtype)
+            compacted[: len(live)] = column[live]
+            setattr(self, name, compacted)
+        self._keys = [self._keys[i] for i in live]
+        self._entities = [self._entities[i] for i in live]
+        self._sources = [self._sources[i] for i in live]
+        self._attrs = [self._attrs[i] for i in live]
+        self._key_index = {key: int(new_ids[i]) for key, i in self._key_index.items()}
+
+        cells = defaultdict(list)
+        for cell, ids in self._cells.items():
+            if ids:
+                cells[cell] = new_ids[ids].tolist()
+        self._cells = cells
+        entity_points = defaultdict(list)
+        for entity_id, ids in self._entity_points.items():
+            if ids:
+                entity_points[entity_id] = new_ids[ids].tolist()
+        self._entity_points = entity_points
+
+        self._size = len(live)
+        self._oldest = 0
+        self.compactions += 1
+
+    def _grow(self):
+        """Double the capacity of the point columns."""
+        capacity = max(2 * len(self._latitude), 16)
+        for name in ("_latitude", "_longitude", "_time"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: len(column)] = column
+            setattr(self, name, grown)
+
+    def _row(self, latitude: float) -> int:
+        """Grid row of a latitude."""
+        return min(int((latitude + 90.0) // self.row_degrees), self.rows - 1)
+
+    def _column(self, longitude: float) -> int:
+        """Grid column of a longitude."""
+        longitude = (longitude + 180.0) % 360.0
+        return min(int(longitude // self.column_degrees), self.columns - 1)
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        """Grid cell of a point."""
+        return self._row(latitude), self._column(longitude)
+
+    def _column_span(self, latitude: float, radius_km: float, minimum: int) -> int:
+        """Columns either side of a cell that a radius can reach at a latitude."""
+        reach = min(90.0, abs(latitude) + radius_km / KM_PER_DEGREE)
+        cos_lat = math.cos(math.radians(reach))
+        if cos_lat < 1e-9:
+            return self.columns
+        degrees = radius_km / (KM_PER_DEGREE * cos_lat)
+        return max(minimum, math.ceil(degrees / self.column_degrees))
+
+    def _candidates(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> np.ndarray:
+        """Ids of the points in the cells a radius query's bounding box overlaps."""
+        self.queries += 1
+        delta = radius_km / KM_PER_DEGREE
+        row_range = (
+            self._row(max(-90.0, latitude - delta)),
+            self._row(min(90.0, latitude + delta)),
+        )
+        column = self._column(longitude)
+        col_span = self._column_span(latitude, radius_km, 0)
+        return self._cell_points(row_range, (column - col_span, column + col_span))
+
+    def _cell_points(
+        self, row_range: Tuple[int, int], col_range: Tuple[int, int]
+    ) -> np.ndarray:
+        """
+        Ids of live points in a cell range; columns wrap around.
+
+        When the range covers more cells than are occupied, the occupied
+        cells are filtered instead of the range being walked.
+        """
+        first_row, last_row = max(0, row_range[0]), min(self.rows - 1, row_range[1])
+        first_col, last_col = col_range
+        col_count = last_col - first_col + 1
+        if first_col > last_col:
+            # Box crossing the antimeridian
+            col_count = self.columns - first_col + last_col + 1
+            last_col = first_col + col_count - 1
+        col_count = min(col_count, self.columns)
+        row_count = last_row - first_row + 1
+
+        ids: List[int] = []
+        if row_count * col_count > len(self._cells):
+            for (row, column), cell_ids in self._cells.items():
+                if not cell_ids or not first_row <= row <= last_row:
+                    continue
+                wrapped = (column - first_col) % self.columns
+                if col_count < self.columns and wrapped >= col_count:
+                    continue
+                self.cells_visited += 1
+                ids.extend(cell_ids)
+        else:
+            for row in range(first_row, last_row + 1):
+                for offset in range(col_count):
+                    column = (first_col + offset) % self.columns
+                    cell_ids = self._cells.get((row, column))
+                    if cell_ids:
+                        self.cells_visited += 1
+                        ids.extend(cell_ids)
+
+        self.candidates_examined += len(ids)
+        return np.asarray(ids, dtype=np.int64)
+
+    def _neighbour_pairs(
+        self, radius_km: float, window: Optional[float]
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Chunks of (first, second) point ids of every pair in reach of each other.
+
+        Points are sorted by grid cell; each point's candidates are the
+        contiguous runs of cells its radius can reach in the rows around
+        it, so pairs are generated with array operations, at most
+        ``max_pair_chunk`` candidates at a time. Pairs are ordered both
+        ways and include each point with itself.
+        """
+        ids = np.fromiter(
+            (point_id for cell_ids in self._cells.values() for point_id in cell_ids),
+            dtype=np.int64,
+        )
+        if window is not None:
+            ids = ids[~np.isnan(self._time[ids])]
+        if not len(ids):
+            return
+
+        latitudes = self._latitude[ids]
+        rows = np.minimum(
+            ((latitudes + 90.0) // self.row_degrees).astype(np.int64), self.rows - 1
+        )
+        columns = np.minimum(
+            ((self._longitude[ids] + 180.0) // self.column_degrees).astype(np.int64),
+            self.columns - 1,
+        )
+        codes = rows * self.columns + columns
+        order = np.argsort(codes, kind="stable")
+        ids, latitudes = ids[order], latitudes[order]
+        rows, columns, codes = rows[order], columns[order], codes[order]
+
+        # Columns either side each point's radius can reach at its latitude
+        row_span = max(1, math.ceil(radius_km / KM_PER_DEGREE / self.row_degrees))
+        reach = np.minimum(90.0, np.abs(latitudes) + radius_km / KM_PER_DEGREE)
+        cos_reach = np.cos(np.radians(reach))
+        with np.errstate(divide="ignore"):
+            col_spans = np.ceil(
+                radius_km / (KM_PER_DEGREE * cos_reach) / self.column_degrees
+            )
+        col_spans = np.where(
+            cos_reach < 1e-9, self.columns, np.minimum(col_spans, self.columns)
+        ).astype(np.int64)
+        col_spans = np.maximum(col_spans, row_span)
+        full_row = 2 * col_spans + 1 >= self.columns
+
+        position = np.arange(len(ids))
+        for row_offset in range(-row_span, row_span + 1):
+            neighbour_rows = rows + row_offset
+            valid = (neighbour_rows >= 0) & (neighbour_rows < self.rows)
+            low = np.where(full_row, 0, columns - col_spans)
+            high = np.where(full_row, self.columns - 1, columns + col_spans)
+            # Runs of cells: the in-range part and the part wrapped around
+            last = self.columns - 1
+            runs = [
+                (np.maximum(low, 0), np.minimum(high, last), valid),
+                (low + self.columns, np.full_like(low, last), valid & (low < 0)),
+                (np.zeros_like(high), high - self.columns, valid & (high > last)),
+            ]
+            for first_col, last_col, use in runs:
+                base = neighbour_rows * self.columns
+                starts = np.searchsorted(codes, base + first_col, side="left")
+                ends = np.searchsorted(codes, base + last_col, side="right")
+                counts = np.where(use, ends - starts, 0)
+                yield from self._expand_pairs(
+                    ids, position, starts, counts, radius_km, window
+                )
+
+    def _expand_pairs(
+        self,
+        ids: np.ndarray,
+        position: np.ndarray,
+        starts: np.ndarray,
+        counts: np.ndarray,
+        radius_km: float,
+        window: Optional[float],
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Close pairs from runs of candidates, ``max_pair_chunk`` at a time."""
+        cumulative = np.cumsum(counts)
+        chunk_start = 0
+        while chunk_start < len(counts):
+            done = cumulative[chunk_start - 1] if chunk_start else 0
+            chunk_end = int(
+                np.searchsorted(cumulative, done + self.max_pair_chunk, side="right")
+            )
+            chunk_end = max(chunk_end, chunk_start + 1)
+            chunk_counts = counts[chunk_start:chunk_end]
+            total = int(chunk_counts.sum())
+            if total:
+                first = np.repeat(position[chunk_start:chunk_end], chunk_counts)
+                # Position of each candidate within its point's run
+                run_start = np.cumsum(chunk_counts) - chunk_counts
+                second = np.repeat(
+                    starts[chunk_start:chunk_end] - run_start, chunk_counts
+                ) + np.arange(total)
+                first, second = ids[first], ids[second]
+                self.candidates_examined += total
+
+                close = (
+                    haversine_km(
+                        self._latitude[first],
+                        self._longitude[first],
+                        self._latitude[second],
+                        self._longitude[second],
+                    )
+                    <= radius_km
+                )
+                if window is not None:
+                    close &= np.abs(self._time[first] - self._time[second]) <= window
+                yield first[close], second[close]
+            chunk_start = chunk_end
+
+    def _neighbours(
+        self, point_id: int, radius_km: float, window: Optional[float]
+    ) -> np.ndarray:
+        """Ids of the points in reach of a point, the point itself included."""
+        latitude, longitude = self._latitude[point_id], self._longitude[point_id]
+        ids = self._candidates(latitude, longitude, radius_km)
+        if not len(ids):
+            return ids
+        close = (
+            haversine_km(latitude, longitude, self._latitude[ids], self._longitude[ids])
+            <= radius_km
+        )
+        if window is not None:
+            # NaN never compares close, so untimed points are left out
+            close &= np.abs(self._time[ids] - self._time[point_id]) <= window
+        return ids[close]
+
+    def _grow_clusters(
+        self,
+        seeds: List[int],
+        radius_km: float,
+        min_points: int,
+        window: Optional[float],
+    ) -> List[np.ndarray]:
+        """
+        Point ids of the clusters containing the seed points.
+
+        Each cluster is grown breadth-first from a core seed, or from a
+        core neighbour of a border seed, expanding through core points
+        only; neighbourhoods are queried once per point reached.
+        """
+        neighbourhoods: Dict[int, np.ndarray] = {}
+
+        def neighbours(point_id: int) -> np.ndarray:
+            if point_id not in neighbourhoods:
+                neighbourhoods[point_id] = self._neighbours(
+                    point_id, radius_km, window
+                )
+            return neighbourhoods[point_id]
+
+        def is_core(point_id: int) -> bool:
+            return len(neighbours(point_id)) >= min_points
+
+        assigned = set()
+        groups = []
+        for seed in seeds:
+            if seed in assigned:
+                continue
+            if window is not None and math.isnan(self._time[seed]):
+                continue
+            start = seed
+            if not is_core(seed):
+                start = next(
+                    (int(i) for i in neighbours(seed) if is_core(int(i))), None
+                )
+                if start is None:
+                    continue
+            members = [start]
+            assigned.add(start)
+            queue = deque([start])
+            while queue:
+                for point_id in neighbours(queue.popleft()).tolist():
+                    if point_id in assigned:
+                        continue
+                    assigned.add(point_id)
+                    members.append(point_id)
+                    if is_core(point_id):
+                        queue.append(point_id)
+            groups.append(np.sort(np.asarray(members, dtype=np.int64)))
+        return groups
+
+    def _clusters(self, groups: List[np.ndarray]) -> List[SpatialCluster]:
+        """Clusters of groups of point ids, largest first."""
+        clusters = [self._cluster(ids) for ids in groups]
+        clusters.sort(key=lambda cluster: len(cluster.keys), reverse=True)
+        return clusters
+
+    def _track_ids(self, entity_id: Hashable) -> np.ndarray:
+        """Point ids of an entity, in time order."""
+        ids = np.asarray(self._entity_points.get(entity_id, []), dtype=np.int64)
+        if len(ids) > 1:
+            # NaN (untimed) sorts last; stable keeps insertion order
+            ids = ids[np.argsort(self._time[ids], kind="stable")]
+        return ids
+
+    def _point(self, point_id: int) -> Dict[str, Any]:
+        """A stored point as a dictionary."""
+        seconds = self._time[point_id]
+        return {
+            "key": self._keys[point_id],
+            "latitude": float(self._latitude[point_id]),
+            "longitude": float(self._longitude[point_id]),
+            "entity_id": self._entities[point_id],
+            "timestamp": (
+                None if math.isnan(seconds) else _EPOCH + timedelta(seconds=seconds)
+            ),
+            "source": self._sources[point_id],
+            **self._attrs[point_id],
+        }
+
+    def _cluster(self, ids: np.ndarray) -> SpatialCluster:
+        """Summary of a cluster's points."""
+        latitudes, longitudes = self._latitude[ids], self._longitude[ids]
+        # Mean longitude on the unit circle, so clusters on the antimeridian
+        # are centred correctly
+        radians = np.radians(longitudes)
+        center_lat = float(latitudes.mean())
+        center_lon = float(
+            np.degrees(np.arctan2(np.sin(radians).mean(), np.cos(radians).mean()))
+        )
+        times = self._time[ids]
+        timed = times[~np.isnan(times)]
+        metadata = {}
+        if len(timed):
+            metadata["first_seen"] = _EPOCH + timedelta(seconds=float(timed.min()))
+            metadata["last_seen"] = _EPOCH + timedelta(seconds=float(timed.max()))
+        return SpatialCluster(
+            keys=[self._keys[i] for i in ids],
+            entity_ids=sorted(
+                {self._entities[i] for i in ids if self._entities[i] is not None},
+                key=str,
+            ),
+            sources=sorted({self._sources[i] for i in ids if self._sources[i]}),
+            center_latitude=center_lat,
+            center_longitude=center_lon,
+            radius_km=float(
+                haversine_km(center_lat, center_lon, latitudes, longitudes).max()
+            ),
+            metadata=metadata,
+        )
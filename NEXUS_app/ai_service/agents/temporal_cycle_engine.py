@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Temporal Cycle Engine - Time-Respecting Cycle Detection
+
+This module implements the TemporalCycleEngine used by the
+CircularTransactionDetector. A temporal cycle is a closed chain of
+transactions whose timestamps strictly increase along the chain and whose
+first and last transactions are at most ``window`` apart, which is how
+funds actually travel round a loop. Every transaction is kept as its own
+edge (parallel transactions are not collapsed), edges are stored per
+entity sorted by timestamp, and edges that fall out of the retention
+window behind the newest timestamp seen are pruned through a time index.
+"""
+
+import heapq
+import logging
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# (timestamp, transaction_id, other entity, amount)
+_Edge = Tuple[datetime, str, str, float]
+
+
+@dataclass
+class TemporalCycle:
+    """A closed chain of transactions with increasing timestamps."""
+
+    entities: List[str]
+    transaction_ids: List[str]
+    timestamps: List[datetime]
+    amounts: List[float]
+
+    @property
+    def start_time(self) -> datetime:
+        """Timestamp of the first transaction."""
+        return self.timestamps[0]
+
+    @property
+    def end_time(self) -> datetime:
+        """Timestamp of the closing transaction."""
+        return self.timestamps[-1]
+
+    @property
+    def duration(self) -> timedelta:
+        """Time taken for the funds to complete the cycle."""
+        return self.end_time - self.start_time
+
+    @property
+    def total_amount(self) -> float:
+        """Total amount moved round the cycle."""
+        return sum(self.amounts)
+
+
+class TemporalCycleEngine:
+    """
+    Windowed transaction index answering temporal cycle queries.
+
+    Each temporal cycle is reported once, from its earliest transaction, so
+    no rotation deduplication is needed. Edges older than ``retention``
+    behind the newest timestamp can no longer close a cycle with a new
+    transaction and are dropped.
+    """
+
+    def __init__(
+        self,
+        window: timedelta,
+        max_cycle_length: int = 10,
+        min_cycle_length: int = 2,
+        retention: Optional[timedelta] = None,
+        max_cycles: int = 10000,
+    ):
+        """Initialize the temporal cycle engine."""
+        self.logger = logging.getLogger(__name__)
+        self.window = window
+        self.max_cycle_length = max_cycle_length
+        self.min_cycle_length = min_cycle_length
+        self.retention = retention if retention is not None else window
+        self.max_cycles = max_cycles
+
+        # Per-entity edges sorted by timestamp, with parallel timestamp lists
+        self._out_edges: Dict[str, List[_Edge]] = defaultdict(list)
+        self._out_times: Dict[str, List[datetime]] = defaultdict(list)
+        self._in_edges: Dict[str, List[_Edge]] = defaultdict(list)
+        self._in_times: Dict[str, List[datetime]] = defaultdict(list)
+
+        # Time index of (timestamp, sequence, source, target) for expiry
+        self._expiry_heap: List[Tuple[datetime, int, str, str]] = []
+        self._sequence = 0
+        self.watermark: Optional[datetime] = None
+
+        # Statistics
+        self.edge_count = 0
+        self.total_edges_added = 0
+        self.total_edges_pruned = 0
+        self.late_edges = 0
+
+    def __len__(self) -> int:
+        """Return the number of edges inside the retention window."""
+        return self.edge_count
+
+    def add_edge(
+        self,
+        source: str,
+        target: str,
+        amount: float,
+        timestamp: datetime,
+        transaction_id: str,
+        find_cycles: bool = False,
+    ) -> List[TemporalCycle]:
+        """
+        Add a transaction edge and prune edges that have expired.
+
+        With ``find_cycles`` set, the temporal cycles that this edge closes
+        as their last transaction are returned. Edges arriving behind the
+        watermark are indexed but only found by ``find_cycles``.
+        """
+        if self.watermark is not None and timestamp < self.watermark - self.retention:
+            return []
+
+        is_late = self.watermark is not None and timestamp < self.watermark
+        if is_late:
+            self.late_edges += 1
+
+        insort(self._out_times[source], timestamp)
+        position = bisect_right(self._out_times[source], timestamp) - 1
+        self._out_edges[source].insert(
+            position, (timestamp, transaction_id, target, amount)
+        )
+        insort(self._in_times[target], timestamp)
+        position = bisect_right(self._in_times[target], timestamp) - 1
+        self._in_edges[target].insert(
+            position, (timestamp, transaction_id, source, amount)
+        )
+
+        heapq.heappush(self._expiry_heap, (timestamp, self._sequence, source, target))
+        self._sequence += 1
+        self.edge_count += 1
+        self.total_edges_added += 1
+
+        if self.watermark is None or timestamp > self.watermark:
+            self.watermark = timestamp
+            self.prune()
+
+        if not find_cycles or is_late or source == target:
+            return []
+        return self._cycles_closed_by(source, target, amount, timestamp, transaction_id)
+
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """Drop edges older than the retention window and return how many."""
+        reference = now if now is not None else self.watermark
+        if reference is None:
+            return 0
+
+        cutoff = reference - self.retention
+        expired_sources = set()
+        expired_targets = set()
+        pruned = 0
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+            _, _, source, target = heapq.heappop(self._expiry_heap)
+            expired_sources.add(source)
+            expired_targets.add(target)
+            pruned += 1
+
+        # Edge lists are time-sorted, so expired edges form a prefix
+        for index_times, index_edges, nodes in (
+            (self._out_times, self._out_edges, expired_sources),
+            (self._in_times, self._in_edges, expired_targets),
+        ):
+            for node in nodes:
+                keep_from = bisect_left(index_times[node], cutoff)
+                if keep_from >= len(index_times[node]):
+                    del index_times[node]
+                    del index_edges[node]
+                else:
+                    del index_times[node][:keep_from]
+                    del index_edges[node][:keep_from]
+
+        self.edge_count -= pruned
+        self.total_edges_pruned += pruned
+        return pruned
+
+    def find_cycles(self, since: Optional[datetime] = None) -> List[TemporalCycle]:
+        """Find all temporal cycles whose first transaction is at or after since."""
+        cycles: List[TemporalCycle] = []
+
+        for start in sorted(self._out_edges):
+            times = self._out_times[start]
+            first = bisect_left(times, since) if since is not None else 0
+            for timestamp, transaction_id, target, amount in self._out_edges[start][
+                first:
+            ]:
+                if target == start:
+                    continue
+                self._extend_forward(
+                    start,
+                    [start, target],
+                    [transaction_id],
+                    [timestamp],
+                    [amount],
+                    timestamp + self.window,
+                    cycles,
+                )
+                if len(cycles) >= self.max_cycles:
+                    self.logger.warning(
+                        f"Temporal cycle search stopped at {self.max_cycles} cycles"
+                    )
+                    return cycles
+
+        return cycles
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get engine statistics."""
+        return {
+            "edges": self.edge_count,
+            "entities": len(set(self._out_edges) | set(self._in_edges)),
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "window_seconds": self.window.total_seconds(),
+            "total_edges_added": self.total_edges_added,
+            "total_edges_pruned": self.total_edges_pruned,
+            "late_edges": self.late_edges,
+        }
+
+    def _extend_forward(
+        self,
+        start: str,
+        path: List[str],
+        transaction_ids: List[str],
+        timestamps: List[datetime],
+        amounts: List[float],
+        deadline: datetime,
+        cycles: List[TemporalCycle],
+    ):
+        """Extend a chain with later edges until it returns to its start."""
+        node = path[-1]
+        times = self._out_times.get(node)
+        if not times:
+            return
+
+        # Only edges strictly after the last one and within the window
+        first = bisect_right(times, timestamps[-1])
+        last = bisect_right(times, deadline)
+        for timestamp, transaction_id, target, amount in self._out_edges[node][
+            first:last
+        ]:
+            if len(cycles) >= self.max_cycles:
+                return
+            if target == start:
+                if len(path) >= self.min_cycle_length:
+                    cycles.append(
+                        TemporalCycle(
+                            entities=list(path),
+                            transaction_ids=transaction_ids + [transaction_id],
+                            timestamps=timestamps + [timestamp],
+                            amounts=amounts + [amount],
+                        )
+                    )
+                continue
+            if target in path or len(path) >= self.max_cycle_length:
+                continue
+
+            path.append(target)
+            self._extend_forward(
+                start,
+                path,
+                transaction_ids + [transaction_id],
+                timestamps + [timestamp],
+                amounts + [amount],
+                deadline,
+                cycles,
+            )
+            path.pop()
+
+    def _cycles_closed_by(
+        self,
+        source: str,
+        target: str,
+        amount: float,
+        timestamp: datetime,
+        transaction_id: str,
+    ) -> List[TemporalCycle]:
+        """Find the temporal cycles ending with the edge source -> target."""
+        cycles: List[TemporalCycle] = []
+        earliest = timestamp - self.window
+
+        # Walk backwards from source over strictly earlier edges until the
+        # chain starts at target; path is built in reverse
+        stack = [([source], [], [], [], timestamp)]
+        while stack and len(cycles) < self.max_cycles:
+            path, transaction_ids, timestamps, amounts, before = stack.pop()
+            node = path[-1]
+            times = self._in_times.get(node)
+            if not times:
+                continue
+
+            first = bisect_left(times, earliest)
+            last = bisect_left(times, before)
+            for edge_time, edge_id, previous, edge_amount in self._in_edges[node][
+                first:last
+            ]:
+                if previous == target:
+                    entities = [target] + path[::-1]
+                    if len(entities) >= self.min_cycle_length:
+                        cycles.append(
+                            TemporalCycle(
+                                entities=entities,
+                                transaction_ids=[edge_id]
+                                + transaction_ids[::-1]
+                                + [transaction_id],
+                                timestamps=[edge_time] + timestamps[::-1] + [timestamp],
+                                amounts=[edge_amount] + amounts[::-1] + [amount],
+                            )
+                        )
+                    continue
+                if previous in path or len(path) + 1 >= self.max_cycle_length:
+                    continue
+                stack.append(
+                    (
+                        path + [previous],
+                        transaction_ids + [edge_id],
+                        timestamps + [edge_time],
+                        amounts + [edge_amount],
+                        edge_time,
+                    )
+                )
+
+        return cycles
@@ -0,0 +1,70 @@
+import io
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from .exif_reader import HeaderSource, read_metadata_header
+
+
+class TestEXIFReader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def save(self, name, image_format, **params):
+        path = os.path.join(self.directory.name, name)
+        image = Image.new("RGB", (32, 24), (200, 40, 40))
+        image.save(path, image_format, **params)
+        return path
+
+    def exif(self):
+        exif = Image.Exif()
+        exif[0x010F] = "NEXUS Camera"  # Make
+        return exif.tobytes()
+
+    def test_webp_header(self):
+        path = self.save("photo.webp", "WEBP", exif=self.exif())
+        header = read_metadata_header(path)
+        self.assertIsNone(header.error)
+        self.assertEqual(header.image_format, "webp")
+        self.assertEqual(header.image_info["format"], "WEBP")
+        self.assertEqual(header.image_info["size"], (32, 24))
+        self.assertEqual(str(header.tags["Image Make"]), "NEXUS Camera")
+
+    def test_formats_are_sniffed_from_content(self):
+        for name, image_format, expected in [
+            ("photo.png", "PNG", "png"),
+            ("photo.gif", "GIF", "gif"),
+            ("photo.bmp", "BMP", "bmp"),
+            # Renamed files are read with the right parser
+            ("renamed.jpg", "WEBP", "webp"),
+        ]:
+            header = read_metadata_header(self.save(name, image_format))
+            self.assertIsNone(header.error, name)
+            self.assertEqual(header.image_format, expected)
+            self.assertEqual(header.image_info["size"], (32, 24))
+
+    def test_header_source_reads_past_prefix(self):
+        content = b"line one\nline two\n" + bytes(range(256)) * 4
+        path = os.path.join(self.directory.name, "data.bin")
+        with open(path, "wb") as f:
+            f.write(content)
+
+        with open(path, "rb") as f:
+            source = HeaderSource(f, 12)
+            self.assertEqual(source.readline(), b"line one\n")
+            self.assertEqual(source.readline(), b"line two\n")
+            self.assertEqual(source.tell(), 18)
+            self.assertEqual(source.read_at(2, 4), content[2:6])
+            source.seek(-4, io.SEEK_END)
+            self.assertEqual(source.read(), content[-4:])
+            self.assertEqual(source.reads, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from datetime import datetime
+
+import networkx as nx
+import numpy as np
+
+from .graph_store import GraphStore
+
+
+class TestGraphStore(unittest.TestCase):
+
+    def setUp(self):
+        # A tiny compaction threshold exercises both the buffer and the columns
+        self.store = GraphStore(min_compact_edges=2)
+        self.transactions = [
+            ("A", "B", 100.0, "t1"),
+            ("B", "C", 50.0, "t2"),
+            ("C", "A", 25.0, "t3"),
+            ("A", "B", 10.0, "t4"),
+        ]
+        self.ownership = [("A", "B", "r1"), ("B", "D", "r2"), ("D", "E", "r3")]
+        for source, target, amount, key in self.transactions:
+            self.store.add_edge(
+                source,
+                target,
+                amount=amount,
+                timestamp=datetime(2024, 1, 1),
+                key=key,
+                namespace="transactions",
+            )
+        for source, target, key in self.ownership:
+            self.store.add_edge(source, target, key=key, namespace="entities")
+
+    def test_views_only_see_their_namespace(self):
+        transactions = self.store.view(multigraph=True, namespace="transactions")
+        entities = self.store.view(multigraph=True, namespace="entities")
+
+        self.assertEqual(set(transactions.nodes()), {"A", "B", "C"})
+        self.assertEqual(set(entities.nodes()), {"A", "B", "D", "E"})
+        self.assertEqual(
+            sorted(transactions.edges(keys=True)),
+            sorted((u, v, k) for u, v, _, k in self.transactions),
+        )
+        self.assertEqual(sorted(entities.edges(keys=True)), sorted(self.ownership))
+        self.assertEqual(transactions.number_of_edges("A", "B"), 2)
+        self.assertEqual(entities.number_of_edges("A", "B"), 1)
+        self.assertEqual(self.store.number_of_edges(), 7)
+        self.assertEqual(self.store.number_of_nodes("entities"), 4)
+
+    def test_views_match_networkx(self):
+        reference = nx.DiGraph()
+        reference.add_edges_from((u, v) for u, v, _, _ in self.transactions)
+        view = self.store.view(namespace="transactions")
+        self.assertEqual(set(view.edges()), set(reference.edges()))
+        ranks = nx.pagerank(view)
+        for node, rank in nx.pagerank(reference).items():
+            self.assertAlmostEqual(ranks[node], rank)
+        self.assertEqual(view["A"]["B"]["amount"], 10.0)
+
+    def test_remove_edges_by_key_stays_in_namespace(self):
+        entity_version = self.store.namespace_version("entities")
+        removed = self.store.remove_edges("A", "B", key="t1", namespace="transactions")
+        self.assertEqual(removed, 1)
+
+        transactions = self.store.view(multigraph=True, namespace="transactions")
+        entities = self.store.view(multigraph=True, namespace="entities")
+        self.assertEqual(
+            [k for _, _, k in transactions.edges(keys=True) if k in ("t1", "t4")],
+            ["t4"],
+        )
+        self.assertIn(("A", "B", "r1"), set(entities.edges(keys=True)))
+        self.assertEqual(self.store.namespace_version("entities"), entity_version)
+
+        # A key from another namespace removes nothing
+        self.assertEqual(
+            self.store.remove_edges("A", "B", key="r1", namespace="transactions"), 0
+        )
+        self.assertEqual(self.store.number_of_edges("entities"), 3)
+
+    def test_remove_node_in_namespace_keeps_other_namespaces(self):
+        self.assertTrue(self.store.remove_node("A", namespace="transactions"))
+        self.assertFalse(self.store.has_node("A", namespace="transactions"))
+        self.assertTrue(self.store.has_node("A", namespace="entities"))
+        self.assertEqual(self.store.number_of_edges("transactions"), 1)
+        self.assertEqual(self.store.number_of_edges("entities"), 3)
+
+        self.assertTrue(self.store.remove_node("A", namespace="entities"))
+        self.assertFalse(self.store.has_node("A"))
+
+    def test_sparse_array_per_namespace(self):
+        matrix = self.store.to_scipy_sparse_array(
+            weight="amount", namespace="transactions"
+        )
+        nodes = list(self.store.nodes("transactions"))
+        self.assertEqual(nodes, ["A", "B", "C"])
+        expected = np.zeros((3, 3))
+        for source, target, amount, _ in self.transactions:
+            expected[nodes.index(source), nodes.index(target)] += amount
+        np.testing.assert_allclose(matrix.toarray(), expected)
+
+        counts = self.store.to_scipy_sparse_array(namespace="entities")
+        self.assertEqual(counts.shape, (4, 4))
+        self.assertEqual(counts.sum(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
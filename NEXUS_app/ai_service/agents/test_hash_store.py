@@ -0,0 +1,148 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from .hash_store import HashStore
+
+
+def digest(algorithm, value):
+    return hashlib.new(algorithm, value.encode()).hexdigest()
+
+
+class TestHashStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hashes.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_import_nsrl_file(self):
+        rows = ['"SHA-1","MD5","CRC32","FileName","FileSize","ProductCode"']
+        for i in range(3):
+            rows.append(
+                f'"{digest("sha1", str(i)).upper()}","{digest("md5", str(i)).upper()}",'
+                f'"00000000","file{i}.dll","{100 + i}","42"'
+            )
+        nsrl = self.write("NSRLFile.txt", "\n".join(rows) + "\n")
+
+        store = HashStore(self.path, bloom_capacity=1000)
+        self.assertEqual(store.import_hash_set(nsrl, source="nsrl"), 6)
+        self.assertEqual(len(store), 6)
+
+        records = store.lookup(digest("md5", "1").upper())
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].algorithm, "md5")
+        self.assertEqual(records[0].file_info, "file1.dll")
+        self.assertEqual(records[0].source, "nsrl")
+        self.assertEqual(records[0].metadata, {"file_size": 101, "product_code": "42"})
+        store.close()
+
+    def test_import_plain_list_infers_algorithm(self):
+        values = [digest("md5", "a"), digest("sha256", "b"), "not-a-digest"]
+        listing = self.write(
+            "list.txt", "# known files\n" + "\n".join(f"{v} name" for v in values)
+        )
+
+        store = HashStore(bloom_capacity=1000)
+        self.assertEqual(store.import_hash_set(listing), 2)
+        self.assertEqual(store.lookup(values[0])[0].algorithm, "md5")
+        records = store.lookup(values[1], algorithm="sha256")
+        self.assertEqual(records[0].file_info, "name")
+        self.assertEqual(store.lookup(values[1], algorithm="md5"), [])
+        store.close()
+
+    def test_batch_lookup(self):
+        store = HashStore(bloom_capacity=10000)
+        known = [digest("sha256", str(i)) for i in range(2000)]
+        listing = self.write("list.txt", "\n".join(known))
+        store.import_hash_set(listing)
+        store.add("h1", known[0], "sha256", "again", "manual", datetime.utcnow())
+
+        unknown = [digest("sha256", f"x{i}") for i in range(2000)]
+        queried = known[::2] + unknown
+        self.assertEqual(store.contains_many(queried), set(known[::2]))
+
+        results = store.lookup_many(v.upper() for v in known[:3])
+        self.assertEqual(set(results), set(known[:3]))
+        self.assertEqual(len(results[known[0]]), 2)
+
+        # Most unknown digests never reach SQLite, and the survivors are
+        # queried in chunks
+        self.assertGreater(store.bloom_rejections, 1900)
+        self.assertLess(store.database_queries, 10)
+        store.close()
+
+    def test_bloom_filter_persists_on_reopen(self):
+        values = [digest("md5", str(i)) for i in range(500)]
+        store = HashStore(self.path, bloom_capacity=1000)
+        store.import_hash_set(self.write("list.txt", "\n".join(values)))
+        num_bits = store.bloom.num_bits
+        bits = store.bloom.bits.copy()
+        store.close()
+
+        # Rows written behind the store's back are folded into the filter
+        late = digest("md5", "late")
+        connection = sqlite3.connect(self.path)
+        with connection:
+            connection.execute(
+                "INSERT INTO hashes (hash_value, algorithm) VALUES (?, 'md5')", (late,)
+            )
+        connection.close()
+
+        reopened = HashStore(self.path, bloom_capacity=10)
+        self.assertEqual(reopened.bloom.num_bits, num_bits)
+        self.assertTrue(((reopened.bloom.bits & bits) == bits).all())
+        self.assertEqual(reopened.contains_many(values + [late]), set(values + [late]))
+        self.assertEqual(reopened.contains_many([digest("md5", "missing")]), set())
+        reopened.close()
+
+    def test_failed_import_into_empty_store_keeps_index(self):
+        values = [digest("md5", str(i)) for i in range(10)]
+
+        def failing_rows(f, algorithm):
+            for value in values:
+                yield value, "md5", "", "{}"
+            raise ValueError("truncated hash set")
+
+        store = HashStore(self.path, bloom_capacity=1000)
+        with mock.patch.object(store, "_list_rows", failing_rows):
+            with self.assertRaises(ValueError):
+                store.import_hash_set(self.write("list.txt", "\n".join(values)))
+        self.assertEqual(len(store), 0)
+        store.close()
+
+        connection = sqlite3.connect(self.path)
+        indexes = connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'"
+        ).fetchall()
+        connection.close()
+        self.assertIn(("idx_hashes_value",), indexes)
+
+    def test_rebuild_bloom_resizes(self):
+        store = HashStore(bloom_capacity=10)
+        values = [digest("sha1", str(i)) for i in range(1000)]
+        store.import_hash_set(self.write("list.txt", "\n".join(values)))
+        self.assertGreater(store.bloom.false_positive_rate(), 0.5)
+        num_bits = store.bloom.num_bits
+
+        store.rebuild_bloom()
+        self.assertGreater(store.bloom.num_bits, num_bits)
+        self.assertLess(store.bloom.false_positive_rate(), 0.05)
+        self.assertEqual(store.contains_many(values), set(values))
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
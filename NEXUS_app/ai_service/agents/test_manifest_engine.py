@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+
+from .file_hashing import MultiDigestHasher
+from .manifest_engine import ManifestEngine
+
+FILES = {
+    "a.txt": b"alpha",
+    "b.bin": bytes(range(256)) * 64,
+    "sub/c.txt": b"charlie",
+    "sub/deeper/d.txt": b"delta" * 1000,
+}
+
+
+class TestManifestEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "evidence")
+        for name, content in FILES.items():
+            self.write(name, content)
+        self.manifest = os.path.join(self.directory.name, "manifest.ndjson")
+        self.hasher = MultiDigestHasher(max_workers=4)
+        self.engine = ManifestEngine(self.hasher, max_concurrency=2)
+
+    def tearDown(self):
+        self.hasher.shutdown()
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def generate(self):
+        return asyncio.run(
+            self.engine.generate(self.root, self.manifest, ["md5", "sha256"])
+        )
+
+    def verify(self, skip_unchanged=True):
+        async def verify_entry(file_path, entry):
+            digests = self.hasher.hash_file(file_path, list(entry.hashes))
+            return digests.digests == entry.hashes
+
+        def skip_entry(file_path, entry):
+            return "skipped"
+
+        return asyncio.run(
+            self.engine.verify(
+                self.manifest,
+                self.root,
+                verify_entry,
+                skip_entry=skip_entry,
+                skip_unchanged=skip_unchanged,
+            )
+        )
+
+    def test_generate(self):
+        progress = self.generate()
+        self.assertTrue(progress.finished)
+        self.assertEqual(progress.files_done, len(FILES))
+        self.assertEqual(progress.bytes_done, sum(map(len, FILES.values())))
+
+        entries = {
+            entry.path.replace(os.sep, "/"): entry
+            for entry in self.engine.read_manifest(self.manifest)
+        }
+        self.assertEqual(set(entries), set(FILES))
+        for name, content in FILES.items():
+            self.assertEqual(
+                entries[name].hashes["md5"], hashlib.md5(content).hexdigest()
+            )
+            self.assertEqual(
+                entries[name].hashes["sha256"], hashlib.sha256(content).hexdigest()
+            )
+            self.assertEqual(entries[name].size, len(content))
+
+    def test_verify_skips_unchanged_files(self):
+        self.generate()
+        results = self.verify()
+        self.assertEqual(set(results.values()), {"skipped"})
+        self.assertEqual(self.engine.last_progress.files_skipped, len(FILES))
+        self.assertEqual(self.engine.last_progress.bytes_done, 0)
+
+    def test_verify_reports_mismatch(self):
+        self.generate()
+        self.write("sub/c.txt", b"tampered evidence")
+        os.remove(os.path.join(self.root, "a.txt"))
+
+        results = self.verify()
+        self.assertIs(results[os.path.join("sub", "c.txt")], False)
+        self.assertNotIn("a.txt", results)
+        self.assertEqual(results["b.bin"], "skipped")
+        self.assertEqual(self.engine.last_progress.files_failed, 1)
+        self.assertEqual(self.engine.last_progress.files_skipped, 2)
+
+    def test_verify_without_skipping_hashes_every_file(self):
+        self.generate()
+        results = self.verify(skip_unchanged=False)
+        self.assertEqual(len(results), len(FILES))
+        self.assertTrue(all(result is True for result in results.values()))
+        self.assertEqual(self.engine.last_progress.files_skipped, 0)
+
+    def test_manifest_inside_directory_is_not_listed(self):
+        self.manifest = os.path.join(self.root, "manifest.ndjson")
+        temp_file = os.path.join(self.root, "checksums.json.ndjson.tmp")
+        with open(temp_file, "w") as f:
+            f.write("partial")
+
+        progress = asyncio.run(
+            self.engine.generate(
+                self.root, self.manifest, ["sha256"], exclude=[temp_file]
+            )
+        )
+        self.assertEqual(progress.files_done, len(FILES))
+        paths = {entry.path for entry in self.engine.read_manifest(self.manifest)}
+        self.assertNotIn("manifest.ndjson", paths)
+        self.assertNotIn("checksums.json.ndjson.tmp", paths)
+        self.assertEqual(set(self.verify().values()), {"skipped"})
+
+    def test_read_legacy_manifest(self):
+        with open(self.manifest, "w") as f:
+            json.dump({"a.txt": {"md5": hashlib.md5(b"alpha").hexdigest()}}, f)
+
+        entries = list(self.engine.read_manifest(self.manifest))
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].path, "a.txt")
+        self.assertIsNone(entries[0].size)
+
+        # Entries without size, mtime and inode are always verified
+        results = self.verify()
+        self.assertEqual(results, {"a.txt": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from .file_hashing import MultiDigestHasher
+from .merkle_tree import MerkleManifest, MerkleTreeBuilder
+
+CHUNK_SIZE = 1024
+
+
+class TestMerkleTree(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "evidence")
+        self.write("a.bin", os.urandom(10 * CHUNK_SIZE + 17))
+        self.write("sub/b.bin", os.urandom(3 * CHUNK_SIZE))
+        self.write("sub/empty.bin", b"")
+        self.hasher = MultiDigestHasher(max_workers=4)
+        self.builder = MerkleTreeBuilder(self.hasher, chunk_size=CHUNK_SIZE)
+
+    def tearDown(self):
+        self.builder.shutdown()
+        self.hasher.shutdown()
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def build(self, path=None, previous=None):
+        return asyncio.run(self.builder.build(path or self.root, previous))
+
+    def save(self, manifest, name="manifest.ndjson"):
+        path = os.path.join(self.directory.name, name)
+        manifest.save(path)
+        return path
+
+    def test_build(self):
+        manifest = self.build()
+        files = {node.path.replace(os.sep, "/"): node for node in manifest.files()}
+        self.assertEqual(set(files), {"a.bin", "sub/b.bin", "sub/empty.bin"})
+        self.assertEqual(len(files["a.bin"].chunks), 11)
+        self.assertEqual(len(files["sub/b.bin"].chunks), 3)
+        self.assertEqual(len(files["sub/empty.bin"].chunks), 1)
+        self.assertEqual(manifest.root_digest, self.build().root_digest)
+
+    def test_save_and_load(self):
+        manifest = self.build()
+        loaded = MerkleManifest.load(self.save(manifest))
+        self.assertEqual(loaded.root_digest, manifest.root_digest)
+        self.assertTrue(self.builder.diff(manifest, loaded).is_identical)
+
+        single = self.build(os.path.join(self.root, "a.bin"))
+        loaded = MerkleManifest.load(self.save(single, "file.ndjson"))
+        self.assertEqual(loaded.root_digest, single.root_digest)
+
+    def test_diff_reports_changed_chunks(self):
+        old = self.build()
+        path = os.path.join(self.root, "a.bin")
+        with open(path, "r+b") as f:
+            f.seek(4 * CHUNK_SIZE + 5)
+            f.write(b"\xff" * 8)
+        os.remove(os.path.join(self.root, "sub", "empty.bin"))
+        self.write("sub/new.bin", b"new")
+
+        new = self.build()
+        diff = self.builder.diff(old, new)
+        self.assertFalse(diff.roots_match)
+        self.assertEqual(diff.changed, {"a.bin": [4]})
+        self.assertEqual(diff.removed, [os.path.join("sub", "empty.bin")])
+        self.assertEqual(diff.added, [os.path.join("sub", "new.bin")])
+
+        node = next(node for node in old.files() if node.path == "a.bin")
+        self.assertEqual(self.builder.verify_chunks(path, node, [3, 4, 5]), [4])
+
+    def test_diff_skips_matching_subtrees(self):
+        old = self.build()
+        self.write("a.bin", os.urandom(CHUNK_SIZE))
+        diff = self.builder.diff(old, self.build())
+        self.assertEqual(list(diff.changed), ["a.bin"])
+        # The unchanged subdirectory is compared by its digest alone
+        compared = diff.subtrees_compared
+
+        self.write("sub/b.bin", os.urandom(CHUNK_SIZE))
+        diff = self.builder.diff(old, self.build())
+        self.assertGreater(diff.subtrees_compared, compared)
+
+    def test_build_reuses_unchanged_files(self):
+        previous = self.build()
+        hashed = self.builder.files_hashed
+
+        self.write("sub/b.bin", os.urandom(2 * CHUNK_SIZE))
+        current = self.build(previous=previous)
+        self.assertEqual(self.builder.files_hashed - hashed, 1)
+        self.assertEqual(self.builder.files_reused, 2)
+        self.assertEqual(current.root_digest, self.build().root_digest)
+
+    def test_load_rejects_tampered_chunks(self):
+        for target, name in [(self.root, "dir.ndjson"), ("a.bin", "file.ndjson")]:
+            manifest = self.build(os.path.join(self.root, target))
+            path = self.save(manifest, name)
+            with open(path) as f:
+                lines = f.read().splitlines()
+            for i, line in enumerate(lines):
+                record = json.loads(line)
+                if len(record.get("chunks", [])) > 1:
+                    record["chunks"][1] = "00" * 32
+                    lines[i] = json.dumps(record)
+                    break
+            with open(path, "w") as f:
+                f.write("\n".join(lines) + "\n")
+
+            with self.assertRaises(ValueError):
+                MerkleManifest.load(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
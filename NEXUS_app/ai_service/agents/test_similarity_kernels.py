@@ -0,0 +1,83 @@
+import random
+import unittest
+
+from .similarity_kernels import (
+    levenshtein_distance,
+    levenshtein_one_to_many,
+    ngram_one_to_many,
+    ngram_similarity,
+)
+
+
+def dynamic_programming_distance(s1, s2):
+    previous = list(range(len(s2) + 1))
+    for i, c1 in enumerate(s1, 1):
+        current = [i]
+        for j, c2 in enumerate(s2, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (c1 != c2))
+            )
+        previous = current
+    return previous[-1]
+
+
+class TestSimilarityKernels(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(6)
+        alphabet = "abcdé "
+        self.strings = ["", "a", "kitten", "sitting", "Müller GmbH", "Mueller GmbH"]
+        for length in [1, 2, 5, 16, 63, 64, 65, 130]:
+            for _ in range(4):
+                self.strings.append(
+                    "".join(generator.choice(alphabet) for _ in range(length))
+                )
+
+    def test_levenshtein_matches_dynamic_programming(self):
+        for s1 in self.strings:
+            for s2 in self.strings:
+                self.assertEqual(
+                    levenshtein_distance(s1, s2),
+                    dynamic_programming_distance(s1, s2),
+                    (s1, s2),
+                )
+
+    def test_levenshtein_max_distance(self):
+        for s1 in self.strings:
+            for s2 in self.strings:
+                expected = dynamic_programming_distance(s1, s2)
+                for max_distance in [0, 1, 3, 10]:
+                    self.assertEqual(
+                        levenshtein_distance(s1, s2, max_distance),
+                        min(expected, max_distance + 1),
+                        (s1, s2, max_distance),
+                    )
+
+    def test_levenshtein_one_to_many(self):
+        for pattern in self.strings:
+            self.assertEqual(
+                levenshtein_one_to_many(pattern, self.strings),
+                [dynamic_programming_distance(pattern, s) for s in self.strings],
+            )
+            self.assertEqual(
+                levenshtein_one_to_many(pattern, self.strings, 2),
+                [
+                    min(dynamic_programming_distance(pattern, s), 3)
+                    for s in self.strings
+                ],
+            )
+
+    def test_ngram_similarity(self):
+        self.assertEqual(ngram_similarity("abcd", "abcd"), 1.0)
+        self.assertEqual(ngram_similarity("abcd", ""), 0.0)
+        self.assertEqual(ngram_similarity("ab", "ab"), 0.0)
+        # {abc, bcd} and {bcd, cde} share one of three trigrams
+        self.assertAlmostEqual(ngram_similarity("abcd", "bcde"), 1 / 3)
+        self.assertEqual(
+            ngram_one_to_many("abcd", ["abcd", "bcde", "xyz"]),
+            [1.0, ngram_similarity("abcd", "bcde"), 0.0],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .spatial_index import SpatialIndex, haversine_km
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        generator = random.Random(25)
+        self.index = SpatialIndex(cell_size_km=5.0)
+        self.points = {}
+        base = datetime(2024, 1, 1)
+        # Dense clusters, scattered points, and points around the poles and
+        # the antimeridian
+        centers = [(51.5, -0.12), (40.7, -74.0), (0.0, 179.99), (89.9, 10.0)]
+        for i in range(1500):
+            if i % 3:
+                lat, lon = centers[i % len(centers)]
+                lat += generator.uniform(-0.05, 0.05)
+                lon += generator.uniform(-0.05, 0.05)
+            else:
+                lat = generator.uniform(-90, 90)
+                lon = generator.uniform(-180, 180)
+            lat = max(-90.0, min(90.0, lat))
+            lon = (lon + 180.0) % 360.0 - 180.0
+            timestamp = base + timedelta(minutes=generator.randrange(600))
+            self.index.add_point(
+                f"p{i}", lat, lon, entity_id=f"e{i % 40}", timestamp=timestamp
+            )
+            self.points[f"p{i}"] = (lat, lon, f"e{i % 40}", timestamp)
+
+    def distance(self, key, lat, lon):
+        point_lat, point_lon = self.points[key][:2]
+        return float(haversine_km(lat, lon, point_lat, point_lon))
+
+    def test_within_radius_matches_brute_force(self):
+        for lat, lon, radius in [
+            (51.5, -0.12, 3.0),
+            (40.7, -74.0, 20.0),
+            (0.0, -179.99, 5.0),
+            (90.0, 0.0, 50.0),
+            (10.0, 10.0, 2000.0),
+        ]:
+            found = self.index.within_radius(lat, lon, radius)
+            expected = {
+                key for key in self.points if self.distance(key, lat, lon) <= radius
+            }
+            self.assertEqual({key for key, _ in found}, expected)
+            distances = [distance for _, distance in found]
+            self.assertEqual(distances, sorted(distances))
+
+    def test_within_box_matches_brute_force(self):
+        for box in [
+            (51.4, -0.2, 51.6, 0.0),
+            (-1.0, 179.0, 1.0, -179.0),
+            (-90.0, -180.0, 90.0, 180.0),
+            (0.0, 170.0, 90.0, 180.0),
+        ]:
+            min_lat, min_lon, max_lat, max_lon = box
+            expected = set()
+            for key, (lat, lon, _, _) in self.points.items():
+                if not min_lat <= lat <= max_lat:
+                    continue
+                if min_lon <= max_lon:
+                    inside = min_lon <= lon <= max_lon
+                else:
+                    inside = lon >= min_lon or lon <= max_lon
+                if inside:
+                    expected.add(key)
+            self.assertEqual(set(self.index.within_box(*box)), expected)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lon in [(51.5, -0.12), (-45.0, 100.0), (0.0, 180.0)]:
+            expected = sorted(self.points, key=lambda key: self.distance(key, lat, lon))
+            found = [key for key, _ in self.index.nearest(lat, lon, k=5)]
+            self.assertEqual(
+                [round(self.distance(key, lat, lon), 9) for key in found],
+                [round(self.distance(key, lat, lon), 9) for key in expected[:5]],
+            )
+
+    def test_colocation_clusters_match_brute_force(self):
+        radius = 0.5
+        keys = list(self.points)
+        lats = np.array([self.points[key][0] for key in keys])
+        lons = np.array([self.points[key][1] for key in keys])
+        close = haversine_km(lats[:, None], lons[:, None], lats, lons) <= radius
+        neighbours = {
+            key: {keys[j] for j in np.nonzero(row)[0]} for key, row in zip(keys, close)
+        }
+        core = {key for key in keys if len(neighbours[key]) >= 4}
+
+        clusters = self.index.colocation_clusters(radius, min_points=4)
+        clustered = {key for cluster in clusters for key in cluster.keys}
+        expected = core | {key for key in keys if neighbours[key] & core}
+        self.assertEqual(clustered, expected)
+        for cluster in clusters:
+            members = set(cluster.keys)
+            # Core points reachable from each other always share a cluster
+            for key in members & core:
+                self.assertLessEqual(neighbours[key] & core, members)
+
+    def test_colocation_clusters_around_keys_match_full_clustering(self):
+        keys = list(self.points)
+        lats = np.array([self.points[key][0] for key in keys])
+        lons = np.array([self.points[key][1] for key in keys])
+        times = np.array([self.points[key][3].timestamp() for key in keys])
+        close = haversine_km(lats[:, None], lons[:, None], lats, lons) <= 0.5
+        for time_window in [None, timedelta(hours=2)]:
+            reach = close
+            if time_window is not None:
+                window = time_window.total_seconds()
+                reach = close & (np.abs(times[:, None] - times) <= window)
+            core = {key for key, row in zip(keys, reach) if row.sum() >= 4}
+            full = self.index.colocation_clusters(
+                0.5, min_points=4, time_window=time_window
+            )
+            for seeds in [["p1"], ["p0", "p2", "p5"], keys[::50]]:
+                local = self.index.colocation_clusters(
+                    0.5, min_points=4, time_window=time_window, keys=seeds
+                )
+                expected = [c for c in full if set(c.keys) & set(seeds)]
+                self.assertEqual(
+                    {frozenset(set(c.keys) & core) for c in local},
+                    {frozenset(set(c.keys) & core) for c in expected},
+                )
+                local_keys = [key for c in local for key in c.keys]
+                self.assertEqual(len(local_keys), len(set(local_keys)))
+
+    def test_entity_track_and_travel(self):
+        track = self.index.entity_track("e7")
+        expected = sorted(
+            (point for point in self.points.values() if point[2] == "e7"),
+            key=lambda point: point[3],
+        )
+        self.assertEqual([p["timestamp"] for p in track], [p[3] for p in expected])
+        distances = self.index.travel_distances("e7")
+        self.assertEqual(len(distances), len(expected) - 1)
+        self.assertAlmostEqual(
+            distances[0],
+            float(haversine_km(*expected[0][:2], *expected[1][:2])),
+        )
+
+    def test_add_records_without_id_is_idempotent(self):
+        index = SpatialIndex()
+        records = [
+            {"entity_id": f"E{i}", "amount": 10, "latitude": 51.5, "longitude": 0.1}
+            for i in range(2)
+        ]
+        first = index.add_records(records, source="transaction")
+        second = index.add_records(records, source="transaction")
+        self.assertEqual(first, second)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.colocation_clusters(0.1, min_points=3), [])
+
+    def test_max_points_evicts_earliest_and_compacts(self):
+        index = SpatialIndex(max_points=1000)
+        for i in range(5000):
+            index.add_point(i, 10.0 + (i % 100) * 1e-3, 20.0, entity_id=i % 7)
+        self.assertEqual(len(index), 1000)
+        self.assertNotIn(3999, index)
+        self.assertIn(4000, index)
+        self.assertGreater(index.compactions, 0)
+        self.assertEqual(
+            {key for key, _ in index.within_radius(10.05, 20.0, 100.0)},
+            set(range(4000, 5000)),
+        )
+        self.assertEqual(sum(len(index.entity_track(e)) for e in range(7)), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
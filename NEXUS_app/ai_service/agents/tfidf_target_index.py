@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+TF-IDF Target Index - Fit-Once Sparse Index for Fuzzy Matching
+
+This module implements the TfidfTargetIndex used by the AIFuzzyMatcher.
+The vectorizer is fitted once over the target texts and the L2-normalized
+sparse TF-IDF matrix is kept, so cosine similarity for any number of source
+records is a single sparse matrix multiply instead of a refit per source.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.base import clone
+
+
+class TfidfTargetIndex:
+    """
+    Persistent TF-IDF index over target records.
+
+    Targets added after the initial fit are transformed with the existing
+    vocabulary and appended; removed targets are tombstoned. Once the number
+    of appended or tombstoned rows exceeds ``refit_ratio`` of the fitted
+    rows, the vectorizer is refitted over the live targets so vocabulary and
+    IDF weights do not drift too far from the indexed corpus.
+
+    Each target is keyed by its id and a digest of its text, so a target
+    whose text changed is reported as stale and re-added rather than
+    scored against its old text.
+    """
+
+    def __init__(self, vectorizer: Any, refit_ratio: float = 0.5):
+        """Initialize the TF-IDF target index."""
+        self.logger = logging.getLogger(__name__)
+        self.vectorizer = clone(vectorizer)
+        self.refit_ratio = refit_ratio
+
+        self._matrix: Optional[sparse.csr_matrix] = None
+        self._row_ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._texts: Dict[str, str] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._fitted_rows = 0
+        self._appended_rows = 0
+        self._dead_rows = 0
+
+        self.fit_count = 0
+
+    def __len__(self) -> int:
+        """Return the number of live targets."""
+        return len(self._rows)
+
+    def __contains__(self, target_id: str) -> bool:
+        """Check whether a target is indexed."""
+        return target_id in self._rows
+
+    def contains_all(self, target_ids: Iterable[str], texts: Iterable[str]) -> bool:
+        """Check whether every given target is indexed with the given text."""
+        return self._matrix is not None and all(
+            self._digests.get(target_id) == self.digest(text)
+            for target_id, text in zip(target_ids, texts)
+        )
+
+    def stale(self, target_ids: List[str], texts: List[str]) -> List[int]:
+        """Positions of the targets that are missing or indexed with other text."""
+        return [
+            position
+            for position, (target_id, text) in enumerate(zip(target_ids, texts))
+            if self._digests.get(target_id) != self.digest(text)
+        ]
+
+    @staticmethod
+    def digest(text: str) -> bytes:
+        """Digest of a target text."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def fit(self, target_ids: List[str], texts: List[str]):
+        """Fit the vectorizer on the targets and build the sparse matrix."""
+        self._texts = dict(zip(target_ids, texts))
+        self._digests = {
+            target_id: self.digest(text) for target_id, text in self._texts.items()
+        }
+        self._refit()
+
+    def clear(self):
+        """Drop every target and the fitted vocabulary."""
+        self._texts = {}
+        self._digests = {}
+        self._refit()
+
+    def add(self, target_ids: List[str], texts: List[str]):
+        """Add or replace targets using the current vocabulary."""
+        if self._matrix is None:
+            self.fit(target_ids, texts)
+            return
+
+        self.remove([target_id for target_id in target_ids if target_id in self._rows])
+        self._texts.update(zip(target_ids, texts))
+        self._digests.update(
+            (target_id, self.digest(text)) for target_id, text in zip(target_ids, texts)
+        )
+
+        if self._needs_refit(extra_rows=len(target_ids)):
+            self._refit()
+            return
+
+        new_rows = self.vectorizer.transform(texts)
+        start = self._matrix.shape[0]
+        self._matrix = sparse.vstack([self._matrix, new_rows], format="csr")
+        for offset, target_id in enumerate(target_ids):
+            self._row_ids.append(target_id)
+            self._rows[target_id] = start + offset
+        self._appended_rows += len(target_ids)
+
+    def remove(self, target_ids: Iterable[str]):
+        """Remove targets from the index."""
+        for target_id in target_ids:
+            row = self._rows.pop(target_id, None)
+            if row is None:
+                continue
+            self._row_ids[row] = None
+            self._texts.pop(target_id, None)
+            self._digests.pop(target_id, None)
+            self._dead_rows += 1
+
+        if self._matrix is not None and self._needs_refit():
+            self._refit()
+
+    def query(
+        self,
+        texts: List[str],
+        top_k: Optional[int] = None,
+        restrict_to: Optional[Set[str]] = None,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Return the targets with positive cosine similarity for each text.
+
+        Results for each text are ordered by target row (insertion order)
+        when ``top_k`` is None, otherwise by descending similarity.
+        """
+        if self._matrix is None or not texts:
+            return [[] for _ in texts]
+
+        # Rows of both matrices are L2-normalized, so the product is the cosine
+        similarities = (self.vectorizer.transform(texts) @ self._matrix.T).tocsr()
+
+        results = []
+        for i in range(similarities.shape[0]):
+            start, stop = similarities.indptr[i], similarities.indptr[i + 1]
+            rows = similarities.indices[start:stop]
+            scores = similarities.data[start:stop]
+
+            hits = []
+            for row, score in zip(rows.tolist(), scores.tolist()):
+                target_id = self._row_ids[row]
+                if target_id is None or score <= 0:
+                    continue
+                if restrict_to is not None and target_id not in restrict_to:
+                    continue
+                hits.append((row, target_id, score))
+
+            if top_k is not None and len(hits) > top_k:
+                hit_scores = np.array([score for _, _, score in hits])
+                keep = np.argpartition(-hit_scores, top_k - 1)[:top_k]
+                hits = [hits[k] for k in keep]
+                hits.sort(key=lambda hit: hit[2], reverse=True)
+            elif top_k is not None:
+                hits.sort(key=lambda hit: hit[2], reverse=True)
+            else:
+                hits.sort(key=lambda hit: hit[0])
+
+            results.append([(target_id, score) for _, target_id, score in hits])
+
+        return results
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            "targets": len(self._rows),
+            "rows": self._matrix.shape[0] if self._matrix is not None else 0,
+            "vocabulary_size": (
+                len(self.vectorizer.vocabulary_) if self._matrix is not None else 0
+            ),
+            "appended_rows": self._appended_rows,
+            "dead_rows": self._dead_rows,
+            "fit_count": self.fit_count,
+        }
+
+    def _needs_refit(self, extra_rows: int = 0) -> bool:
+        """Check whether appended or removed rows warrant a refit."""
+        drift = self._appended_rows + self._dead_rows + extra_rows
+        return drift > self.refit_ratio * max(self._fitted_rows, 1)
+
+    def _refit(self):
+        """Refit the vectorizer over the live targets and rebuild the matrix."""
+        self._row_ids = list(self._texts.keys())
+        self._rows = {target_id: row for row, target_id in enumerate(self._row_ids)}
+        self._fitted_rows = len(self._row_ids)
+        self._appended_rows = 0
+        self._dead_rows = 0
+
+        self._matrix = None
+        if not self._row_ids:
+            return
+
+        self._matrix = self.vectorizer.fit_transform(
+            [self._texts[target_id] for target_id in self._row_ids]
+        ).tocsr()
+        self.fit_count += 1
+        self.logger.debug(f"Refitted TF-IDF index over {self._fitted_rows} targets")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Candidate Search Benchmark
+Measures recall and speed of MinHash/LSH candidate search in AIFuzzyMatcher
+hybrid matching against the exhaustive path, for several LSH settings.
+
+Usage:
+    python testing/performance/benchmark_fuzzy_candidate_search.py --targets 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from ai_service.agents.ai_fuzzy_matcher import AIFuzzyMatcher, FuzzyAlgorithm
+
+PREFIXES = ["North", "Global", "Pacific", "United", "First", "Atlas", "Summit"]
+STEMS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Tyrell"]
+SUFFIXES = ["Trading", "Holdings", "Logistics", "Capital", "Supplies", "Mining"]
+FORMS = ["Ltd", "LLC", "Inc", "Corporation", "GmbH", "PLC"]
+
+# (num_perm, bands, max_candidates)
+SETTINGS = [(64, 8, 25), (64, 16, 50), (128, 32, 50), (128, 32, 100)]
+
+
+def company_name(rng: random.Random) -> str:
+    """Generate a synthetic company name."""
+    return " ".join(
+        [
+            rng.choice(PREFIXES),
+            rng.choice(STEMS) + str(rng.randint(1, 999)),
+            rng.choice(SUFFIXES),
+            rng.choice(FORMS),
+        ]
+    )
+
+
+def perturb(name: str, rng: random.Random) -> str:
+    """Apply a typo and an abbreviation to a name."""
+    chars = list(name)
+    position = rng.randrange(len(chars))
+    chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    perturbed = "".join(chars)
+    return perturbed.replace("Corporation", "Corp").replace("Holdings", "Hldgs")
+
+
+def generate_dataset(targets: int, sources: int, seed: int):
+    """Generate target records and perturbed source records."""
+    rng = random.Random(seed)
+    target_records = [
+        {"id": f"t{i}", "name": company_name(rng), "city": rng.choice(STEMS)}
+        for i in range(targets)
+    ]
+    source_records = []
+    for i in range(sources):
+        original = rng.choice(target_records)
+        source_records.append(
+            {
+                "id": f"s{i}",
+                "name": perturb(original["name"], rng),
+                "city": original["city"],
+            }
+        )
+    return source_records, target_records
+
+
+async def run_matcher(config, source_records, target_records):
+    """Run batch hybrid matching and return results and elapsed time."""
+    matcher = AIFuzzyMatcher(config)
+    start = time.perf_counter()
+    results = await matcher.find_fuzzy_matches_batch(
+        source_records, target_records, FuzzyAlgorithm.HYBRID
+    )
+    return results, time.perf_counter() - start, matcher
+
+
+async def run_benchmark(targets: int, sources: int):
+    """Compare candidate search settings against exhaustive matching."""
+    source_records, target_records = generate_dataset(targets, sources, seed=7)
+
+    exhaustive, exhaustive_time, _ = await run_matcher(
+        {"enable_candidate_search": False}, source_records, target_records
+    )
+    print(f"Exhaustive hybrid ({sources} sources x {targets} targets):")
+    print(f"  Elapsed: {exhaustive_time:.2f}s")
+
+    for num_perm, bands, max_candidates in SETTINGS:
+        config = {
+            "enable_candidate_search": True,
+            "candidate_num_perm": num_perm,
+            "candidate_bands": bands,
+            "max_candidates": max_candidates,
+        }
+        results, elapsed, matcher = await run_matcher(
+            config, source_records, target_records
+        )
+
+        top1_hits = 0
+        top1_total = 0
+        match_hits = 0
+        match_total = 0
+        for source_id, expected in exhaustive.items():
+            found = {match.target_id for match in results.get(source_id, [])}
+            if expected:
+                top1_total += 1
+                top1_hits += expected[0].target_id in found
+            match_total += len(expected)
+            match_hits += sum(match.target_id in found for match in expected)
+
+        stats = matcher.get_performance_metrics()["candidate_index"]
+        print(
+            f"Candidate search (num_perm={num_perm}, bands={bands}, "
+            f"max_candidates={max_candidates}):"
+        )
+        print(f"  Elapsed: {elapsed:.2f}s ({exhaustive_time / elapsed:.1f}x)")
+        print(f"  Average candidates: {stats['average_candidates']:.1f}")
+        print(f"  Top-1 recall: {top1_hits / max(top1_total, 1):.3f}")
+        print(f"  Match recall: {match_hits / max(match_total, 1):.3f}")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--targets", type=int, default=2000)
+    parser.add_argument("--sources", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run_benchmark(args.targets, args.sources))
+
+
+if __name__ == "__main__":
+    main()